@@ -0,0 +1,100 @@
+"""Measure AppCatalog startup and name resolution.
+
+A catalog of synthetic executables and .desktop files is built in a temporary
+directory. The benchmark times the first scan, a start from the on-disk cache,
+and resolving exact, spoken and misspelled names and names that match nothing.
+
+Usage:
+    python -m benchmarks.bench_app_catalog [--apps N] [--repeat N]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from prime.execution import AppCatalog
+
+
+SYLLABLES = ["ka", "lo", "vi", "tra", "mon", "ex", "ze", "pi", "dor", "fu", "ne", "sta", "ri", "qu", "bel",
+             "gra", "tor", "mi", "sen", "co", "da", "lin", "ux", "ra", "pho", "to", "me", "dia", "web", "fox"]
+
+
+def build_tree(root: Path, apps: int) -> List[str]:
+    """Create executables and .desktop files with made-up names, and return the names."""
+    rng = random.Random(42)
+    bin_dir, desktop_dir = root / "bin", root / "applications"
+    bin_dir.mkdir()
+    desktop_dir.mkdir()
+    names = []
+    for i in range(apps):
+        words = ["".join(rng.sample(SYLLABLES, rng.randint(2, 3))) for _ in range(rng.randint(1, 2))]
+        name = f"{'-'.join(words)}-{i}"
+        names.append(name)
+        path = bin_dir / name
+        path.write_text("#!/bin/sh\n")
+        path.chmod(0o755)
+        if i % 10 == 0:
+            (desktop_dir / f"{name}.desktop").write_text(
+                f"[Desktop Entry]\nType=Application\nName={' '.join(w.title() for w in words)} {i}\n"
+                f"Exec={path} %U\n"
+            )
+    return names
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", type=int, default=3000, help="executables in the catalog (default: 3000)")
+    parser.add_argument("--repeat", type=int, default=2000, help="resolutions per query (default: 2000)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        names = build_tree(root, args.apps)
+        make = lambda: AppCatalog([root / "bin"], [root / "applications"], root / "cache", refresh_interval=None)
+
+        start = time.perf_counter()
+        catalog = make()
+        print(f"\n{len(catalog)} applications")
+        print(f"  {'first scan:':24s}{(time.perf_counter() - start) * 1e3:8.1f} ms")
+        start = time.perf_counter()
+        make()
+        print(f"  {'start from cache:':24s}{(time.perf_counter() - start) * 1e3:8.1f} ms")
+
+        # An application with a .desktop file: executables are only found by
+        # their exact name, desktop applications also by spoken and
+        # misspelled names
+        name = names[len(names) // 20 * 10]
+        spoken = name.replace("-", " ")
+        misspelled = spoken[:2] + spoken[3:]
+        time_queries(catalog, args.repeat, (
+            ("exact name", name),
+            ("spoken name", f"the {spoken} please"),
+            ("misspelled name", misspelled),
+            ("no match", "quantum spreadsheet"),
+        ))
+
+        catalog = AppCatalog(cache_dir=root / "installed-cache", refresh_interval=None)
+        print(f"\n{len(catalog)} applications installed on this system")
+        time_queries(catalog, args.repeat, (
+            ("misspelled name", "pyhton"),
+            ("no match", "quantum spreadsheet"),
+        ))
+    return 0
+
+
+def time_queries(catalog: AppCatalog, repeat: int, queries) -> None:
+    """Print the mean time to resolve each query."""
+    for label, query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            catalog.resolve(query)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"  {label + ':':24s}{elapsed * 1e6:8.1f} us/resolve")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+"""Measure interactive turn latency of the synchronous and asyncio Context Engines.
+
+A turn processes a dictated command, adds it to the history and gets the
+suggestions to show. The synchronous ContextEngine saves the session and
+reads usage statistics during the turn; the AsyncContextEngine does both in
+the background and shows the suggestions computed after the previous turn.
+p50 and p99 turn times are reported for each, on encrypted storage in a
+temporary directory.
+
+Usage:
+    python -m benchmarks.bench_async_context [--turns N]
+"""
+
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from prime.models import Command, CommandResult, Session
+from prime.nlp import AsyncContextEngine, ContextEngine, IntentParser
+from prime.persistence import MemoryManager
+from prime.utils.performance import PerformanceProfiler
+
+
+COMMANDS = [
+    "open Chrome",
+    "set volume to 40",
+    "search for quarterly report",
+    "open it",
+    "turn the brightness down to 20",
+    "close Chrome",
+]
+
+
+def make_command(intent, index: int):
+    command = Command(f"cmd-{index}", intent, {}, datetime.now(), False)
+    result = CommandResult(f"cmd-{index}", True, "", None, 10)
+    return command, result
+
+
+def run_sync(memory_manager: MemoryManager, turns: int, profiler: PerformanceProfiler) -> None:
+    """Turns with the synchronous engine."""
+    engine = ContextEngine(IntentParser(), memory_manager)
+    session = Session("sync-session", "bench-user", datetime.now(), None)
+    for i in range(turns):
+        start = time.perf_counter()
+        intent = engine.process_command(COMMANDS[i % len(COMMANDS)], session)
+        engine.add_to_history(*make_command(intent, i), session)
+        engine.get_suggestions(session)
+        profiler.record("turn", time.perf_counter() - start)
+
+
+async def run_async(memory_manager: MemoryManager, turns: int, profiler: PerformanceProfiler) -> None:
+    """Turns with the asyncio engine, pausing between turns as a user would."""
+    async with AsyncContextEngine(IntentParser(), memory_manager, profiler=PerformanceProfiler()) as engine:
+        session = Session("async-session", "bench-user", datetime.now(), None)
+        for i in range(turns):
+            start = time.perf_counter()
+            intent = await engine.process_command(COMMANDS[i % len(COMMANDS)], session)
+            await engine.add_to_history(*make_command(intent, i), session)
+            engine.latest_suggestions(session)
+            profiler.record("turn", time.perf_counter() - start)
+            # Let background work run, as the loop would while speaking the reply
+            await asyncio.sleep(0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=300, help="turns per engine (default: 300)")
+    args = parser.parse_args(argv)
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        memory_manager = MemoryManager(storage_dir=storage_dir)
+        print(f"\n{'engine':>8s}{'p50':>12s}{'p99':>12s}{'max':>12s}")
+        for name, run in (
+            ("sync", lambda profiler: run_sync(memory_manager, args.turns, profiler)),
+            ("async", lambda profiler: asyncio.run(run_async(memory_manager, args.turns, profiler))),
+        ):
+            profiler = PerformanceProfiler()
+            run(profiler)
+            stats = profiler.get_stats("turn")
+            print(f"{name:>8s}{stats['p50'] * 1e3:>9.2f} ms{stats['p99'] * 1e3:>9.2f} ms{stats['max'] * 1e3:>9.2f} ms")
+    finally:
+        shutil.rmtree(storage_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""Measure applying learned corrections to commands.
+
+Compares the compiled CorrectionRewriter with the previous approach, which
+called str.replace for each stored correction in turn, for growing numbers
+of corrections.
+
+Usage:
+    python -m benchmarks.bench_corrections [--repeat N]
+"""
+
+import argparse
+import random
+import string
+import time
+from typing import List, Optional, Tuple
+
+from prime.nlp.correction_rewriter import CorrectionRewriter
+
+
+COMMANDS = [
+    "opn chrome and set the volme to 40", "serch for budget files in documents",
+    "remind me to cal mom tomorow at 9", "clos all windows", "what's on the scren",
+]
+
+
+def replace_loop(corrections: List[Tuple[str, str]], text: str) -> str:
+    """The previous approach: one str.replace per correction."""
+    for original, corrected in corrections:
+        if original in text:
+            text = text.replace(original, corrected)
+    return text
+
+
+def make_corrections(count: int) -> List[Tuple[str, str]]:
+    """Corrections of the typos in COMMANDS padded with random ones."""
+    rng = random.Random(7)
+    corrections = [("opn", "open"), ("volme", "volume"), ("serch", "search"), ("cal mom", "call mom"),
+                   ("tomorow", "tomorrow"), ("clos", "close"), ("scren", "screen")]
+    while len(corrections) < count:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+        corrections.append((word, word[::-1]))
+    return corrections[:count]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000, help="passes over the commands (default: 2000)")
+    args = parser.parse_args(argv)
+
+    rewrites = args.repeat * len(COMMANDS)
+    print(f"\n{'corrections':>12s}{'replace loop':>16s}{'rewriter':>14s}{'compile':>12s}")
+    for count in (10, 100, 1000, 10000):
+        corrections = make_corrections(count)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for command in COMMANDS:
+                replace_loop(corrections, command)
+        loop = (time.perf_counter() - start) / rewrites
+
+        start = time.perf_counter()
+        rewriter = CorrectionRewriter(corrections)
+        compile_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for command in COMMANDS:
+                rewriter.rewrite(command)
+        compiled = (time.perf_counter() - start) / rewrites
+
+        print(f"{count:>12d}{loop * 1e6:>13.2f} us{compiled * 1e6:>11.2f} us{compile_time * 1e3:>9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
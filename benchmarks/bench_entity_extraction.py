@@ -0,0 +1,88 @@
+"""Measure IntentParser.extract_entities on long dictations.
+
+Dictations of increasing length are built from sentences mixing file paths,
+numbers, quoted names, application names and directions. Each is scanned with
+the single-pass lexer and with the previous extractor, which ran one pass per
+entity kind.
+
+Usage:
+    python -m benchmarks.bench_entity_extraction [--repeat N]
+"""
+
+import argparse
+import re
+import time
+from typing import List, Optional
+
+from prime.models import Entity
+from prime.nlp import IntentParser
+
+
+SENTENCES = [
+    "copy the file /home/user/reports/2024/q3.pdf to ~/backup/reports",
+    'open "Quarterly Review" in Google Chrome and set the volume to 40',
+    "then turn the brightness down to 20 and remind me in 15 minutes",
+    "move C:\\Users\\ada\\Documents\\draft.docx to the shared folder",
+    "please increase the volume a little because the music is too quiet",
+    "send the notes to Visual Studio Code and close Slack after 5 minutes",
+]
+
+
+def multi_pass_extract(text: str, stop_words: set) -> List[Entity]:
+    """The previous extractor: one regular expression pass per entity kind."""
+    entities = []
+    normalized_text = text.lower().strip()
+    for match in re.finditer(r'\b(\d+)\b', normalized_text):
+        entities.append(Entity("number", int(match.group(1)), 0.9))
+    for pattern in (
+        r'([A-Za-z]:\\(?:[^\s\\]+\\)*[^\s\\]+)',
+        r'(\\\\[^\s\\]+(?:\\[^\s\\]+)+)',
+        r'(/(?:[^\s/]+/)*[^\s/]+)',
+        r'(~/(?:[^\s/]+/)*[^\s/]+)',
+    ):
+        for match in re.finditer(pattern, text):
+            entities.append(Entity("file_path", match.group(1), 0.85))
+    for match in re.finditer(r'["\']([^"\']+)["\']', text):
+        entities.append(Entity("quoted_string", match.group(1), 0.9))
+    for match in re.finditer(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b', text):
+        if match.group(1).lower() not in stop_words:
+            entities.append(Entity("application", match.group(1), 0.7))
+    for match in re.finditer(r'\b(up|down|increase|decrease|raise|lower|higher|lower)\b', normalized_text):
+        direction = match.group(1)
+        if direction in ("increase", "raise", "higher"):
+            direction = "up"
+        elif direction in ("decrease", "lower"):
+            direction = "down"
+        entities.append(Entity("direction", direction, 0.85))
+    return entities
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="scans of each dictation (default: 200)")
+    args = parser.parse_args(argv)
+
+    intent_parser = IntentParser()
+    print(f"\n{'sentences':>10s}{'chars':>9s}{'multi-pass':>14s}{'single-pass':>14s}{'speedup':>9s}")
+    for sentences in (1, 10, 100, 1000):
+        text = " ".join(SENTENCES[i % len(SENTENCES)] for i in range(sentences))
+        repeat = max(1, args.repeat // sentences)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            multi_pass_extract(text, intent_parser.stop_words)
+        multi_pass = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            intent_parser.extract_entities(text)
+        single_pass = (time.perf_counter() - start) / repeat
+
+        print(f"{sentences:>10d}{len(text):>9d}{multi_pass * 1e6:>11.0f} us"
+              f"{single_pass * 1e6:>11.0f} us{multi_pass / single_pass:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,67 @@
+"""Measure IntentParser.parse throughput over a corpus of commands.
+
+The corpus mixes commands for every intent, keyword-only commands that fall
+back to generic entity extraction, and chatter that matches no intent. It is
+parsed one command at a time without the result cache, with it, and with
+parse_batch.
+
+Usage:
+    python -m benchmarks.bench_intent_parser [--repeat N]
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+from prime.nlp import IntentParser
+
+
+CORPUS = [
+    "open Chrome", "launch Visual Studio Code", "run the tests", "start Spotify",
+    "set volume to 50", "turn the volume down", "volume up", "increase the volume",
+    "set the brightness to 70", "brightness down", "lower the brightness",
+    "find files named report.pdf", "search budget files", "locate ~/notes/todo.txt",
+    "take a note buy milk", "remember to call mom tomorrow", "write down the wifi password",
+    "create a new file called draft.md", "make a file named todo.txt", "delete the file old.log",
+    "remove /tmp/cache", "move notes.txt to ~/Documents", "copy photos to /mnt/backup",
+    "shutdown the computer", "power off the system", "restart", "reboot the pc",
+    "turn on the wifi", "connect to wi-fi HomeNetwork", "turn off bluetooth",
+    "connect to bluetooth device Headphones", "list all running processes", "what's running",
+    "kill process 1234", "close Firefox", "read the screen", "what's on the screen",
+    "remind me to stretch in 10 minutes", "set a reminder to pay rent at 9 am",
+    "the screen is too dark", "new file", "what time is it", "tell me a joke",
+    "how is the weather today", "thanks",
+]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the corpus (default: 200)")
+    args = parser.parse_args(argv)
+
+    parses = args.repeat * len(CORPUS)
+    print(f"\n{parses} parses of {len(CORPUS)} distinct commands")
+
+    for label, cache_size in (("uncached", 0), ("cached", 1024)):
+        intent_parser = IntentParser(cache_size=cache_size)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for command in CORPUS:
+                intent_parser.parse(command)
+        report(label, parses, time.perf_counter() - start)
+
+    intent_parser = IntentParser()
+    start = time.perf_counter()
+    intent_parser.parse_batch(CORPUS * args.repeat)
+    report("parse_batch", parses, time.perf_counter() - start)
+    return 0
+
+
+def report(label: str, parses: int, elapsed: float) -> None:
+    """Print the throughput of a run."""
+    print(f"  {label + ':':13s}{parses / elapsed:12,.0f} parses/s ({elapsed * 1e6 / parses:.2f} us/parse)")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""Benchmark the Memory Manager bulk APIs against per-item loops.
+
+Compares store_notes, load_notes, create_reminders and
+record_application_usage_batch with calling the single-record methods in a
+loop, for both storage backends.
+
+Usage:
+    python -m benchmarks.bench_memory_manager_bulk [--count N] [--workers N]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from prime.models.data_models import Note, Reminder
+from prime.persistence import MemoryManager
+
+
+def make_notes(count: int) -> List[Note]:
+    """Create count notes of realistic size."""
+    now = datetime.now()
+    return [
+        Note(
+            note_id=f"note_{i}",
+            content=f"Meeting notes {i}: " + "discussed the quarterly roadmap and follow-ups " * 8,
+            tags=["work", f"project{i % 10}"],
+            created_at=now,
+            updated_at=now
+        )
+        for i in range(count)
+    ]
+
+
+def make_reminders(count: int) -> List[Reminder]:
+    """Create count reminders spread over the next days."""
+    now = datetime.now()
+    return [
+        Reminder(
+            reminder_id=f"reminder_{i}",
+            content=f"Calendar event {i}",
+            due_time=now + timedelta(minutes=i),
+            is_completed=False
+        )
+        for i in range(count)
+    ]
+
+
+def timed(func: Callable[[], object]) -> float:
+    """Run func once and return the elapsed time in milliseconds."""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(backend: str, count: int, workers: Optional[int]) -> None:
+    """Run every comparison against one backend and print the results."""
+    notes = make_notes(count)
+    reminders = make_reminders(count)
+    apps = [f"app{i % 50}" for i in range(count)]
+    note_ids = [note.note_id for note in notes]
+
+    def fresh_manager(storage_dir: str) -> MemoryManager:
+        return MemoryManager(storage_dir=storage_dir, backend=backend, worker_count=workers)
+
+    rows = []
+    for name, loop, bulk in [
+        (
+            "store notes",
+            lambda m: [m.store_note(note, "user") for note in notes],
+            lambda m: m.store_notes(notes, "user"),
+        ),
+        (
+            "create reminders",
+            lambda m: [m.create_reminder(reminder, "user") for reminder in reminders],
+            lambda m: m.create_reminders(reminders, "user"),
+        ),
+        (
+            "record usage",
+            lambda m: [m.record_application_usage(app, "user") for app in apps],
+            lambda m: m.record_application_usage_batch(apps, "user"),
+        ),
+    ]:
+        timings = []
+        for operation in (loop, bulk):
+            storage_dir = tempfile.mkdtemp()
+            manager = fresh_manager(storage_dir)
+            try:
+                timings.append(timed(lambda: operation(manager)))
+            finally:
+                manager.close()
+                shutil.rmtree(storage_dir, ignore_errors=True)
+        rows.append((name, *timings))
+
+    storage_dir = tempfile.mkdtemp()
+    manager = fresh_manager(storage_dir)
+    try:
+        manager.store_notes(notes, "user")
+        safe_user_id = manager._sanitize_user_id("user")
+        loop_ms = timed(lambda: [
+            manager.decrypt_data(manager.backend.read('notes', note_id, owner=safe_user_id))
+            for note_id in note_ids
+        ])
+        bulk_ms = timed(lambda: manager.load_notes(note_ids, "user"))
+        rows.append(("load notes", loop_ms, bulk_ms))
+    finally:
+        manager.close()
+        shutil.rmtree(storage_dir, ignore_errors=True)
+
+    print(f"\n{backend} backend, {count} records")
+    print(f"{'operation':<20}{'per-item (ms)':>15}{'bulk (ms)':>12}{'speedup':>10}")
+    for name, loop_ms, bulk_ms in rows:
+        print(f"{name:<20}{loop_ms:>15.1f}{bulk_ms:>12.1f}{loop_ms / bulk_ms:>9.1f}x")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=500, help="records per operation (default: 500)")
+    parser.add_argument("--workers", type=int, default=None, help="worker pool size (default: automatic)")
+    args = parser.parse_args(argv)
+
+    for backend in ("file", "sqlite"):
+        run(backend, args.count, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
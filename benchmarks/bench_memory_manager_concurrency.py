@@ -0,0 +1,71 @@
+"""Stress the Memory Manager with concurrent usage updates.
+
+Several threads record application launches against a small set of
+applications, so that most updates contend for the same records. The
+benchmark reports throughput and checks that the stored launch counts add up
+to the number of launches recorded, i.e. that no update was lost.
+
+Usage:
+    python -m benchmarks.bench_memory_manager_concurrency [--threads N] [--updates N] [--apps N]
+"""
+
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+from prime.persistence import MemoryManager
+
+
+def run(backend: str, threads: int, updates: int, apps: int) -> bool:
+    """Run the stress test against one backend and print the results.
+
+    Returns:
+        True if every update was counted.
+    """
+    storage_dir = tempfile.mkdtemp()
+    manager = MemoryManager(storage_dir=storage_dir, backend=backend)
+    start_barrier = threading.Barrier(threads)
+
+    def worker(thread_number: int) -> None:
+        start_barrier.wait()
+        for i in range(updates):
+            manager.record_application_usage(f"app{(thread_number + i) % apps}", "user")
+
+    try:
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        expected = threads * updates
+        counted = sum(usage.launch_count for usage in manager.get_all_application_usage("user"))
+    finally:
+        manager.close()
+        shutil.rmtree(storage_dir, ignore_errors=True)
+
+    print(f"\n{backend} backend, {threads} threads x {updates} updates over {apps} apps")
+    print(f"  throughput: {expected / elapsed:,.0f} updates/s ({elapsed * 1000:.0f} ms)")
+    print(f"  launches counted: {counted} of {expected} ({expected - counted} lost)")
+    return counted == expected
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8, help="concurrent threads (default: 8)")
+    parser.add_argument("--updates", type=int, default=200, help="updates per thread (default: 200)")
+    parser.add_argument("--apps", type=int, default=4, help="distinct applications (default: 4)")
+    args = parser.parse_args(argv)
+
+    results = [run(backend, args.threads, args.updates, args.apps) for backend in ("file", "sqlite")]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""Measure reference resolution in long dictated commands.
+
+Dictations of increasing length, with references such as "it" and "the last
+one" and words that merely contain them ("edit", "submit"), are resolved
+against sessions with short and long command histories. The single-pass
+resolver is compared with the previous one, which tested each reference
+phrase as a substring, walked the history back for each, and replaced three
+casings of it.
+
+Usage:
+    python -m benchmarks.bench_reference_resolution [--repeat N]
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from prime.models import Command, CommandRecord, CommandResult, Entity, Intent, Session
+from prime.nlp import ContextEngine
+
+
+SENTENCES = [
+    "open it and edit the second paragraph",
+    "then submit that to the shared folder",
+    "rename the last one to report final",
+    "set the volume to 40 and close this",
+    "copy those into the previous folder before lunch",
+]
+
+REFERENCE_PATTERNS = [
+    "it", "that", "this", "them", "those", "these",
+    "the previous one", "the last one", "previous", "last"
+]
+
+
+def walk_history(session: Session) -> Optional[Entity]:
+    """The previous resolve_reference: walk the history back to an entity."""
+    for record in reversed(session.command_history):
+        for entity in record.command.intent.entities:
+            if entity.confidence < 0.5:
+                continue
+            if entity.entity_type in ContextEngine.REFERENCE_ENTITY_TYPES:
+                return entity
+        if record.result.success and record.result.output:
+            output = record.result.output.strip()
+            if output and len(output) < 200:
+                return Entity(entity_type="referenced_output", value=output, confidence=0.7)
+    return None
+
+
+def substring_resolve(text: str, session: Session) -> str:
+    """The previous _resolve_text_references."""
+    text_lower = text.lower()
+    if not any(pattern in text_lower for pattern in REFERENCE_PATTERNS):
+        return text
+    for pattern in REFERENCE_PATTERNS:
+        if pattern in text_lower:
+            entity = walk_history(session)
+            if entity:
+                replacement = str(entity.value)
+                text = text.replace(pattern, replacement)
+                text = text.replace(pattern.capitalize(), replacement)
+                text = text.replace(pattern.upper(), replacement)
+    return text
+
+
+def make_session(records: int) -> Session:
+    """A session whose only file path is in its first command."""
+    session = Session("bench", "bench-user", datetime.now(), None)
+    for i in range(records):
+        entities = [Entity("file_path", "/home/ada/report.txt", 0.9)] if i == 0 else [Entity("number", i, 0.9)]
+        intent = Intent("adjust_volume" if i else "search_files", entities, 0.9, False)
+        command = Command(f"cmd-{i}", intent, {}, datetime.now(), False)
+        result = CommandResult(f"cmd-{i}", True, "", None, 10)
+        session.command_history.append(CommandRecord(command, result, datetime.now()))
+    return session
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="resolutions of each dictation (default: 200)")
+    args = parser.parse_args(argv)
+
+    engine = ContextEngine.__new__(ContextEngine)
+    print(f"\n{'history':>8s}{'sentences':>10s}{'chars':>8s}{'substring':>13s}{'single-pass':>14s}{'speedup':>9s}")
+    for records in (10, 1000):
+        session = make_session(records)
+        for sentences in (1, 10, 100):
+            text = " ".join(SENTENCES[i % len(SENTENCES)] for i in range(sentences))
+            repeat = max(1, args.repeat // sentences)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                substring_resolve(text, session)
+            substring = (time.perf_counter() - start) / repeat
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                engine._resolve_text_references(text, session)
+            single_pass = (time.perf_counter() - start) / repeat
+
+            print(f"{records:>8d}{sentences:>10d}{len(text):>8d}{substring * 1e6:>10.0f} us"
+                  f"{single_pass * 1e6:>11.0f} us{substring / single_pass:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+"""Measure repetitive pattern detection over long command histories.
+
+A history of intent types with a few routines mixed into random commands is
+fed one command at a time to the streaming SequenceMiner, whose cost per
+command is reported, and its top routines are queried. Queries are compared
+with the previous approach, which rebuilt the n-gram counts of the whole
+window on every call.
+
+Usage:
+    python -m benchmarks.bench_sequence_miner [--commands N]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from prime.nlp.sequence_miner import SequenceMiner
+
+
+INTENT_TYPES = [
+    "launch_app", "close_app", "adjust_volume", "adjust_brightness",
+    "search_files", "create_file", "delete_file", "open_folder",
+    "set_reminder", "send_message", "take_screenshot", "lock_screen",
+]
+
+ROUTINES = [
+    ["launch_app", "adjust_volume", "open_folder"],
+    ["take_screenshot", "send_message"],
+    ["search_files", "create_file", "open_folder", "close_app"],
+]
+
+
+def make_history(length: int, seed: int = 0) -> List[str]:
+    """Random commands with a routine started a third of the time."""
+    rng = random.Random(seed)
+    history: List[str] = []
+    while len(history) < length:
+        if rng.random() < 0.3:
+            history.extend(rng.choice(ROUTINES))
+        else:
+            history.append(rng.choice(INTENT_TYPES))
+    return history[:length]
+
+
+def rescan_detect(commands: List[str]) -> Optional[Tuple[Tuple[str, ...], int]]:
+    """The previous detector: count every 2-4 command sequence again."""
+    for length in range(2, 5):
+        sequences: Dict[Tuple[str, ...], int] = {}
+        for i in range(len(commands) - length + 1):
+            sequence = tuple(commands[i:i + length])
+            sequences[sequence] = sequences.get(sequence, 0) + 1
+        for sequence, count in sequences.items():
+            if count >= 3:
+                return sequence, count
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=2000, help="commands added (default: 2000)")
+    args = parser.parse_args(argv)
+
+    history = make_history(args.commands)
+    start_time = datetime(2024, 1, 1, 9, 0)
+    queries = list(range(0, len(history), 10))
+    print(f"\n{'window':>8s}{'add':>11s}{'rescan query':>16s}{'top-k query':>15s}")
+    for window in (20, 50, 200, 500):
+        rescan = 0.0
+        for i in queries:
+            buffer = history[max(0, i + 1 - window):i + 1]
+            start = time.perf_counter()
+            rescan_detect(buffer)
+            rescan += time.perf_counter() - start
+
+        miner = SequenceMiner(window=window)
+        add = top_k = 0.0
+        for i, command in enumerate(history):
+            timestamp = start_time + timedelta(seconds=30 * i)
+            start = time.perf_counter()
+            miner.add(command, timestamp)
+            add += time.perf_counter() - start
+            if i % 10 == 0:
+                start = time.perf_counter()
+                miner.top_k(3)
+                top_k += time.perf_counter() - start
+
+        print(f"{window:>8d}{add / len(history) * 1e6:>8.1f} us"
+              f"{rescan / len(queries) * 1e6:>13.1f} us{top_k / len(queries) * 1e6:>12.1f} us")
+
+    print("\ntop routines:")
+    for sequence in miner.top_k(3):
+        print(f"  {sequence.frequency:4d}  {' → '.join(sequence.commands)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""Measure the cost of opening a long session.
+
+A session with many command records is saved, then loaded repeatedly. The
+benchmark compares reading only the latest few records, as the context
+engine does, with materializing the whole history.
+
+Usage:
+    python -m benchmarks.bench_session_load [--records N] [--repeat N] [--format json|binary]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from prime.models.data_models import (
+    Command, CommandRecord, CommandResult, Entity, Intent, Session
+)
+from prime.persistence import MemoryManager
+
+
+def make_record(i: int) -> CommandRecord:
+    """Create a command record numbered i."""
+    timestamp = datetime(2024, 1, 1) + timedelta(seconds=i)
+    return CommandRecord(
+        command=Command(
+            command_id=f"cmd_{i}",
+            intent=Intent(
+                intent_type="launch_app",
+                entities=[Entity(entity_type="application", value=f"app{i % 10}", confidence=0.9)],
+                confidence=0.9,
+                requires_clarification=False
+            ),
+            parameters={"app_name": f"app{i % 10}"},
+            timestamp=timestamp,
+            requires_confirmation=False
+        ),
+        result=CommandResult(
+            command_id=f"cmd_{i}", success=True, output="Launched", error=None, execution_time_ms=50
+        ),
+        timestamp=timestamp
+    )
+
+
+def time_ms(repeat: int, action) -> float:
+    """Average run time of action in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        action()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=5000, help="records in the session (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=10, help="loads per measurement (default: 10)")
+    parser.add_argument("--format", choices=["json", "binary"], default="json", help="record format")
+    args = parser.parse_args(argv)
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        manager = MemoryManager(storage_dir=storage_dir, record_format=args.format)
+        manager.save_session(Session(
+            session_id="long", user_id="user", start_time=datetime(2024, 1, 1), end_time=None,
+            command_history=[make_record(i) for i in range(args.records)]
+        ))
+
+        latest = time_ms(args.repeat, lambda: manager.load_session("long").command_history[-5:])
+        full = time_ms(args.repeat, lambda: list(manager.load_session("long").command_history))
+        paged = time_ms(args.repeat, lambda: next(manager.iter_history("long")))
+        manager.close()
+    finally:
+        shutil.rmtree(storage_dir, ignore_errors=True)
+
+    print(f"\n{args.records} records, {args.format} format")
+    print(f"  load + last 5 records:  {latest:8.2f} ms")
+    print(f"  iter_history, newest:   {paged:8.2f} ms")
+    print(f"  load + full history:    {full:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
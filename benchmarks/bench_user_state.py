@@ -0,0 +1,93 @@
+"""Measure per-user context state kept in memory for many users.
+
+Thousands of users, each with learned corrections and a history of commands,
+send commands with a skewed popularity: a few users are active most of the
+time. Their states are held in a UserStateCache, unbounded and with memory
+budgets, and loaded from prebuilt stored state on a miss. The estimated and
+traced memory, the hit rate and the evictions are reported.
+
+Usage:
+    python -m benchmarks.bench_user_state [--users N] [--requests N]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from prime.nlp.sequence_miner import SequenceMiner
+from prime.nlp.user_state import UserState, UserStateCache
+
+
+INTENT_TYPES = [
+    "launch_app", "close_app", "adjust_volume", "adjust_brightness",
+    "search_files", "create_file", "delete_file", "open_folder",
+    "set_reminder", "send_message", "take_screenshot", "lock_screen",
+]
+
+
+def make_storage(users: int, seed: int = 0) -> Dict[str, Tuple[List[Tuple[str, str]], dict]]:
+    """Stored corrections and sequence state of each user."""
+    rng = random.Random(seed)
+    start_time = datetime(2024, 1, 1, 9, 0)
+    storage = {}
+    for n in range(users):
+        corrections = [(f"typo {n} {i}", f"fixed text {i}") for i in range(rng.randint(0, 20))]
+        events = [
+            [(start_time + timedelta(seconds=30 * i)).timestamp(), rng.choice(INTENT_TYPES)]
+            for i in range(rng.randint(10, 200))
+        ]
+        storage[f"user-{n}"] = (corrections, {'version': 1, 'events': events})
+    return storage
+
+
+def run(storage, requests: List[str], budget_mb: Optional[float]):
+    """Serve the requests; returns (stats, traced bytes, seconds)."""
+    def load(user_id: str) -> UserState:
+        corrections, sequences = storage[user_id]
+        miner = SequenceMiner()
+        miner.load_dict(sequences)
+        return UserState(corrections, miner)
+
+    budget = int(budget_mb * 1024 * 1024) if budget_mb is not None else None
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    cache = UserStateCache(load, memory_budget_bytes=budget)
+    start = time.perf_counter()
+    for user_id in requests:
+        cache.get(user_id).rewriter.rewrite("open the typo 1 2 file")
+    elapsed = time.perf_counter() - start
+    traced = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return cache.get_stats(), traced, elapsed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000, help="users (default: 2000)")
+    parser.add_argument("--requests", type=int, default=10000, help="commands sent (default: 10000)")
+    args = parser.parse_args(argv)
+
+    storage = make_storage(args.users)
+    rng = random.Random(1)
+    # Zipf-like popularity: user n is picked with weight 1 / (n + 1)
+    user_ids = list(storage)
+    weights = [1 / (n + 1) for n in range(len(user_ids))]
+    requests = rng.choices(user_ids, weights=weights, k=args.requests)
+
+    print(f"\n{'budget':>10s}{'users':>8s}{'estimated':>12s}{'traced':>11s}"
+          f"{'hit rate':>10s}{'evictions':>11s}{'per request':>14s}")
+    for budget_mb in (None, 16.0, 4.0, 1.0):
+        stats, traced, elapsed = run(storage, requests, budget_mb)
+        label = "none" if budget_mb is None else f"{budget_mb:g} MB"
+        print(f"{label:>10s}{stats['users']:>8d}{stats['memory_bytes'] / 2**20:>9.1f} MB"
+              f"{traced / 2**20:>8.1f} MB{stats['hit_rate']:>9.1f}%{stats['evictions']:>11d}"
+              f"{elapsed / len(requests) * 1e6:>11.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,11 @@
 """Execution layer components."""
 
-from prime.execution.command_executor import CommandExecutor, ExecutionStatus, ExecutionState
+from prime.execution.app_catalog import AppCatalog, AppEntry, AppMatch
+from prime.execution.command_executor import (
+    CommandExecutor, ConfirmationRequiredError, ExecutionStatus, ExecutionState
+)
 
-__all__ = ['CommandExecutor', 'ExecutionStatus', 'ExecutionState']
+__all__ = [
+    'AppCatalog', 'AppEntry', 'AppMatch', 'CommandExecutor', 'ConfirmationRequiredError',
+    'ExecutionStatus', 'ExecutionState'
+]
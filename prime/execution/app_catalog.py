@@ -0,0 +1,529 @@
+"""Catalog of launchable applications for PRIME.
+
+The catalog indexes the executables on PATH and, on Linux and other XDG
+desktops, the applications listed by .desktop files, so that a spoken name
+such as "visual studio code please" resolves to the command that launches it.
+
+- Each directory is scanned only when its modification time changes, and the
+  scanned entries are kept in an on-disk JSON cache in Config.CACHE_DIR, so
+  later starts only stat the directories and rebuild the index
+- An exact name or command is found directly, followed by the arguments
+  given after it. Other queries are scored against the names of .desktop
+  applications sharing trigrams with them; PATH executables are only found
+  by their exact name, so a near miss never runs an unrelated program
+- System administration commands (power control, process killing,
+  privilege and disk tools) and sbin directories are left out
+"""
+
+import json
+import logging
+import os
+import re
+import shlex
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from prime.utils.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bumped when the cached form changes, so stale caches are not reused
+_CACHE_FORMAT = 3
+
+# Words in a spoken application name that are not part of the name
+FILLER_WORDS = frozenset({
+    "please", "the", "a", "an", "my", "app", "application", "program", "for", "me", "now", "up",
+})
+
+# System administration commands, never launched by name
+SYSTEM_COMMANDS = frozenset({
+    "shutdown", "poweroff", "reboot", "halt", "init", "telinit", "systemctl", "loginctl",
+    "kill", "killall", "pkill", "xkill", "sudo", "su", "doas", "pkexec", "chroot",
+    "dd", "mkfs", "fsck", "fdisk", "sfdisk", "gdisk", "parted", "wipefs", "shred", "mkswap",
+    "mount", "umount", "rm", "rmdir", "chmod", "chown", "chgrp", "passwd", "visudo",
+    "useradd", "userdel", "usermod", "modprobe", "insmod", "rmmod", "iptables", "nft",
+})
+
+# Directories of system administration executables, left out of the catalog
+_SYSTEM_DIRS = frozenset({"sbin"})
+
+# Field codes of a .desktop Exec key (arguments added by the launcher)
+_FIELD_CODES = frozenset({"%f", "%F", "%u", "%U", "%d", "%D", "%n", "%N", "%i", "%c", "%k", "%v", "%m"})
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+@dataclass
+class AppEntry:
+    """A launchable application.
+
+    Attributes:
+        name: Name of the application ("Visual Studio Code", "firefox")
+        command: Canonical command that launches it: the executable's path,
+            or the Exec line of a .desktop file without field codes
+        argv: The command split into program and arguments
+        source: The executable or .desktop file the entry was read from
+    """
+    name: str
+    command: str
+    argv: Tuple[str, ...]
+    source: str
+
+
+@dataclass
+class AppMatch:
+    """An application found for a query.
+
+    Attributes:
+        entry: The application
+        args: Arguments given after the application's name or command
+        score: Similarity of the query to the application's name, 1.0 for
+            an exact name or command
+    """
+    entry: AppEntry
+    args: Tuple[str, ...] = ()
+    score: float = 1.0
+
+    @property
+    def exact(self) -> bool:
+        """Whether the query named the application exactly."""
+        return self.score >= 1.0
+
+    @property
+    def argv(self) -> Tuple[str, ...]:
+        """The application's command followed by the given arguments."""
+        return self.entry.argv + self.args
+
+    @property
+    def command(self) -> str:
+        """The command line that launches the application with the arguments."""
+        return shlex.join(self.argv) if self.args else self.entry.command
+
+
+def normalize_name(name: str) -> str:
+    """Lower-case a name and replace punctuation with single spaces."""
+    return _NON_ALNUM.sub(' ', name.lower()).strip()
+
+
+def is_system_command(program: str) -> bool:
+    """Check whether an executable name or path is a system administration command."""
+    name = os.path.splitext(os.path.basename(program))[0].lower()
+    return name in SYSTEM_COMMANDS or name.split('.', 1)[0] in SYSTEM_COMMANDS
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def default_desktop_dirs() -> List[Path]:
+    """Application directories of the XDG base directory specification, user's first."""
+    if sys.platform.startswith('win') or sys.platform == 'darwin':
+        return []
+    data_home = os.environ.get('XDG_DATA_HOME') or str(Path.home() / '.local' / 'share')
+    data_dirs = os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+    return [Path(d) / 'applications' for d in [data_home, *data_dirs.split(':')] if d]
+
+
+def default_path_dirs() -> List[Path]:
+    """Directories of the PATH environment variable, in search order."""
+    return [Path(d) for d in dict.fromkeys(os.environ.get('PATH', '').split(os.pathsep)) if d]
+
+
+class AppCatalog:
+    """Indexed catalog of launchable applications.
+
+    Entries from .desktop files come before PATH executables, and within each
+    kind earlier directories shadow later ones, as they do for a launcher and
+    a shell. Directories are checked for changes at most once every
+    refresh_interval seconds, from whichever thread calls resolve or search,
+    so no background thread is needed.
+
+    Directories named sbin and system administration commands
+    (SYSTEM_COMMANDS) are never part of the catalog.
+    """
+
+    def __init__(
+        self,
+        path_dirs: Optional[Iterable[Union[str, Path]]] = None,
+        desktop_dirs: Optional[Iterable[Union[str, Path]]] = None,
+        cache_dir: Union[str, Path, None] = None,
+        refresh_interval: Optional[float] = 60.0,
+        min_score: float = 0.5
+    ):
+        """
+        Initialize the catalog from its cache and bring it up to date.
+
+        Args:
+            path_dirs: Directories of executables (default: PATH); sbin
+                directories are skipped
+            desktop_dirs: Directories of .desktop files (default: the XDG
+                application directories)
+            cache_dir: Directory of the on-disk cache (default:
+                Config.CACHE_DIR). Failing to write the cache is not an error.
+            refresh_interval: Seconds between checks for changed directories,
+                or None to only refresh when refresh() is called
+            min_score: Lowest similarity (0 to 1) of a fuzzy match
+        """
+        self._path_dirs = [
+            str(d) for d in (default_path_dirs() if path_dirs is None else path_dirs)
+            if Path(d).name.lower() not in _SYSTEM_DIRS
+        ]
+        self._desktop_dirs = [str(d) for d in (default_desktop_dirs() if desktop_dirs is None else desktop_dirs)]
+        self._cache_path = Path(cache_dir if cache_dir is not None else Config.CACHE_DIR) / (
+            f"app-catalog.v{_CACHE_FORMAT}.json"
+        )
+        self._refresh_interval = refresh_interval
+        self.min_score = min_score
+
+        # (kind, directory) -> (modification time, [(file id, entry or None)])
+        # where None marks a hidden .desktop file
+        self._dirs: Dict[Tuple[str, str], Tuple[Optional[int], List[Tuple[str, Optional[AppEntry]]]]] = {}
+        self._entries: List[AppEntry] = []
+        # Index: normalized names of .desktop applications, the entry of
+        # each, the names of each trigram, and exact lookups of names,
+        # executable names and commands
+        self._keys: List[str] = []
+        self._key_entries: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._exact: Dict[str, int] = {}
+
+        self._read_cache()
+        self.refresh()
+        self._next_refresh = time.monotonic() + (refresh_interval or 0.0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def entries(self) -> List[AppEntry]:
+        """All applications in the catalog."""
+        return list(self._entries)
+
+    def refresh(self) -> bool:
+        """
+        Rescan the directories that changed since they were last scanned.
+
+        Returns:
+            True if the catalog changed
+        """
+        wanted = [('desktop', d) for d in self._desktop_dirs] + [('path', d) for d in self._path_dirs]
+        changed = set(self._dirs) != set(wanted)
+        dirs = {}
+        for kind, directory in wanted:
+            mtime = _mtime(directory)
+            cached = self._dirs.get((kind, directory))
+            if cached is not None and cached[0] == mtime:
+                dirs[(kind, directory)] = cached
+                continue
+            scan = _scan_desktop_dir if kind == 'desktop' else _scan_path_dir
+            dirs[(kind, directory)] = (mtime, scan(directory) if mtime is not None else [])
+            changed = True
+
+        if changed:
+            self._dirs = dirs
+            self._build_index()
+            self._write_cache()
+        return changed
+
+    def resolve(self, query: str) -> Optional[AppEntry]:
+        """
+        Find the application a spoken or typed name refers to.
+
+        Args:
+            query: Application name, command or path, possibly with filler
+                words ("open" arguments such as "the firefox browser please")
+
+        Returns:
+            The best matching AppEntry, or None if nothing matches well enough
+        """
+        match = self.match(query)
+        return match.entry if match is not None else None
+
+    def match(self, query: str) -> Optional[AppMatch]:
+        """
+        Find the application a query refers to, with the arguments it gives.
+
+        A query naming an application or command exactly, or starting with
+        one ("python3 script.py"), matches with score 1.0 and keeps the
+        arguments. Otherwise the best fuzzy match among the .desktop
+        applications is returned, without arguments; callers should confirm
+        it before launching it.
+
+        Args:
+            query: Application name, command or path, possibly followed by
+                arguments
+
+        Returns:
+            The AppMatch, or None if nothing matches well enough
+        """
+        self._maybe_refresh()
+        match = self._exact_match(query)
+        if match is not None:
+            return match
+        fuzzy = self._fuzzy_search(_name_key(query), 1)
+        if not fuzzy:
+            return None
+        entry_id, score = fuzzy[0]
+        return AppMatch(self._entries[entry_id], (), score)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[AppEntry, float]]:
+        """
+        Find the applications best matching a name.
+
+        Args:
+            query: Application name, command or path
+            limit: Maximum number of results
+
+        Returns:
+            (entry, score) pairs with scores of at least min_score, best first.
+            Exact matches of a name or command score 1.0; only .desktop
+            applications are matched fuzzily.
+        """
+        self._maybe_refresh()
+        match = self._exact_match(query)
+        if match is not None:
+            return [(match.entry, 1.0)]
+        return [(self._entries[entry_id], score) for entry_id, score in self._fuzzy_search(_name_key(query), limit)]
+
+    def _exact_match(self, query: str) -> Optional[AppMatch]:
+        """Look up a query naming an application, or starting with its command."""
+        query = query.strip()
+        index = self._exact.get(query)
+        if index is None:
+            key = _name_key(query)
+            index = self._exact.get(key) if key else None
+        if index is not None:
+            return AppMatch(self._entries[index])
+
+        # A command followed by arguments
+        try:
+            words = shlex.split(query, posix=os.name != 'nt')
+        except ValueError:
+            words = query.split()
+        if len(words) > 1:
+            index = self._exact.get(words[0])
+            if index is not None:
+                return AppMatch(self._entries[index], tuple(words[1:]))
+        return None
+
+    def _fuzzy_search(self, key: str, limit: int) -> List[Tuple[int, float]]:
+        """Score the .desktop application names similar to a key; (entry id, score) pairs, best first."""
+        if not key:
+            return []
+        query_trigrams = _trigrams(key)
+        shared = Counter(chain.from_iterable(self._postings.get(trigram, ()) for trigram in query_trigrams))
+        # Keys sharing fewer trigrams score below min_score even if they
+        # have no other trigrams
+        min_shared = self.min_score * len(query_trigrams) / (2.0 - self.min_score)
+
+        query_words = set(key.split())
+        best: Dict[int, float] = {}
+        for key_id, count in shared.items():
+            if count < min_shared:
+                continue
+            candidate = self._keys[key_id]
+            # Dice coefficient of the trigram sets; the number of trigrams of
+            # a key is its length + 1 (duplicates are rare enough to ignore)
+            score = 2.0 * count / (len(query_trigrams) + len(candidate) + 1)
+            if query_words <= set(candidate.split()):
+                # Every query word is a word of the name ("chrome" in
+                # "google chrome"), which beats a similar spelling ("chromium")
+                score = max(score, 0.75 + 0.25 * len(key) / len(candidate))
+            # Below 1.0: only exact names are exact matches
+            score = min(score, 0.99)
+            entry_id = self._key_entries[key_id]
+            if score >= self.min_score and score > best.get(entry_id, 0.0):
+                best[entry_id] = score
+
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def _maybe_refresh(self) -> None:
+        if self._refresh_interval is None:
+            return
+        now = time.monotonic()
+        if now >= self._next_refresh:
+            self._next_refresh = now + self._refresh_interval
+            self.refresh()
+
+    def _build_index(self) -> None:
+        """Merge the scanned directories and index the entries' names."""
+        entries: List[AppEntry] = []
+        seen: Set[Tuple[str, str]] = set()
+        kinds: List[str] = []
+        for (kind, _), (_, scanned) in self._dirs.items():
+            for file_id, entry in scanned:
+                # Earlier directories shadow files with the same id
+                if (kind, file_id) in seen:
+                    continue
+                seen.add((kind, file_id))
+                if entry is not None and not is_system_command(entry.argv[0]):
+                    entries.append(entry)
+                    kinds.append(kind)
+
+        keys: List[str] = []
+        key_entries: List[int] = []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        exact: Dict[str, int] = {}
+        for entry_id, (kind, entry) in enumerate(zip(kinds, entries)):
+            exact.setdefault(entry.command, entry_id)
+            exact.setdefault(entry.source, entry_id)
+            if kind == 'path':
+                # Executables are only found by their exact name
+                exact.setdefault(entry.name, entry_id)
+                continue
+            program = os.path.splitext(os.path.basename(entry.argv[0]))[0]
+            for key in dict.fromkeys((normalize_name(entry.name), normalize_name(program))):
+                if not key:
+                    continue
+                exact.setdefault(key, entry_id)
+                key_id = len(keys)
+                keys.append(key)
+                key_entries.append(entry_id)
+                for trigram in _trigrams(key):
+                    postings[trigram].append(key_id)
+
+        self._entries = entries
+        self._keys = keys
+        self._key_entries = key_entries
+        self._postings = dict(postings)
+        self._exact = exact
+
+    def _read_cache(self) -> None:
+        """Load the scanned directories and build the index, if the cache is usable."""
+        try:
+            with open(self._cache_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('format') != _CACHE_FORMAT:
+                return
+            dirs = {}
+            for kind, directory, mtime, scanned in state['dirs']:
+                dirs[(kind, directory)] = (mtime, [
+                    (file_id, AppEntry(entry[0], entry[1], tuple(entry[2]), entry[3]) if entry is not None else None)
+                    for file_id, entry in scanned
+                ])
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable application catalog cache {self._cache_path}: {e}")
+            return
+        self._dirs = dirs
+        self._build_index()
+
+    def _write_cache(self) -> None:
+        """Write the scanned directories, replacing the cache atomically."""
+        state = {
+            'format': _CACHE_FORMAT,
+            'dirs': [
+                [kind, directory, mtime, [
+                    [file_id, [entry.name, entry.command, list(entry.argv), entry.source] if entry else None]
+                    for file_id, entry in scanned
+                ]]
+                for (kind, directory), (mtime, scanned) in self._dirs.items()
+            ],
+        }
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self._cache_path.parent, prefix='.app-catalog-', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(temp_path, self._cache_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not write application catalog cache {self._cache_path}: {e}")
+
+
+def _name_key(query: str) -> str:
+    """Normalize a spoken name and drop its filler words (unless it has only those)."""
+    words = normalize_name(query).split()
+    return ' '.join(word for word in words if word not in FILLER_WORDS) or ' '.join(words)
+
+
+def _mtime(directory: str) -> Optional[int]:
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan_path_dir(directory: str) -> List[Tuple[str, Optional[AppEntry]]]:
+    """List the executables in a directory, keyed by name."""
+    if sys.platform.startswith('win'):
+        extensions = {ext.lower() for ext in os.environ.get('PATHEXT', '.COM;.EXE;.BAT;.CMD').split(';') if ext}
+    else:
+        extensions = None
+
+    found = []
+    try:
+        with os.scandir(directory) as it:
+            for item in it:
+                name = item.name
+                if extensions is not None:
+                    stem, ext = os.path.splitext(name)
+                    if ext.lower() not in extensions:
+                        continue
+                    name = stem
+                try:
+                    if not item.is_file() or (extensions is None and not os.access(item.path, os.X_OK)):
+                        continue
+                except OSError:
+                    continue
+                found.append((name.lower() if extensions is not None else name,
+                              AppEntry(name=name, command=item.path, argv=(item.path,), source=item.path)))
+    except OSError as e:
+        logger.debug(f"Skipping unreadable directory {directory}: {e}")
+    found.sort(key=lambda item: item[0])
+    return found
+
+
+def _scan_desktop_dir(directory: str) -> List[Tuple[str, Optional[AppEntry]]]:
+    """Read the .desktop files in a directory tree, keyed by desktop file id."""
+    found = []
+    root = Path(directory)
+    for path in sorted(root.rglob('*.desktop')):
+        # The id of applications/kde/foo.desktop is kde-foo.desktop
+        file_id = '-'.join(path.relative_to(root).parts)
+        try:
+            entry = _read_desktop_file(path)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            logger.debug(f"Skipping unreadable desktop file {path}: {e}")
+            continue
+        found.append((file_id, entry))
+    return found
+
+
+def _read_desktop_file(path: Path) -> Optional[AppEntry]:
+    """Read the application of a .desktop file, or None if it is hidden or not an application."""
+    values = {}
+    in_entry = False
+    for line in path.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if line.startswith('['):
+            if in_entry:
+                break
+            in_entry = line == '[Desktop Entry]'
+        elif in_entry and '=' in line and not line.startswith('#'):
+            key, value = line.split('=', 1)
+            values.setdefault(key.strip(), value.strip())
+
+    if (values.get('Type') != 'Application' or values.get('Hidden') == 'true' or
+            values.get('NoDisplay') == 'true' or not values.get('Name') or not values.get('Exec')):
+        return None
+
+    argv = tuple(
+        arg.replace('%%', '%') for arg in shlex.split(values['Exec']) if arg not in _FIELD_CODES
+    )
+    if not argv:
+        return None
+    return AppEntry(name=values['Name'], command=shlex.join(argv), argv=argv, source=str(path))
@@ -16,6 +16,7 @@ from enum import Enum
 from typing import Dict, Optional, Callable
 from dataclasses import dataclass
 
+from prime.execution.app_catalog import AppCatalog, AppMatch
 from prime.models import Command, CommandResult
 from prime.safety import SafetyController
 
@@ -29,6 +30,18 @@ class ExecutionStatus(Enum):
     CANCELLED = "cancelled"
 
 
+class ConfirmationRequiredError(Exception):
+    """Raised when an application name only resembles an installed application."""
+    
+    def __init__(self, app_name: str, match: AppMatch):
+        super().__init__(
+            f"'{app_name}' is not an installed application. "
+            f"Did you mean {match.entry.name}? Please confirm to launch {match.command}."
+        )
+        self.app_name = app_name
+        self.match = match
+
+
 @dataclass
 class ExecutionState:
     """Represents the current state of a command execution."""
@@ -57,7 +70,8 @@ class CommandExecutor:
         self,
         safety_controller: Optional[SafetyController] = None,
         logger: Optional[logging.Logger] = None,
-        status_callback: Optional[Callable[[str, str], None]] = None
+        status_callback: Optional[Callable[[str, str], None]] = None,
+        app_catalog: Optional[AppCatalog] = None
     ):
         """Initialize the Command Executor.
         
@@ -65,10 +79,13 @@ class CommandExecutor:
             safety_controller: Optional SafetyController instance for safety checks
             logger: Optional logger instance
             status_callback: Optional callback for status updates (command_id, message)
+            app_catalog: Optional AppCatalog used to resolve application names
+                to the commands that launch them
         """
         self.safety_controller = safety_controller or SafetyController()
         self.logger = logger or logging.getLogger(__name__)
         self.status_callback = status_callback
+        self.app_catalog = app_catalog
         
         # Track execution states
         self._execution_states: Dict[str, ExecutionState] = {}
@@ -179,7 +196,7 @@ class CommandExecutor:
                 execution_time_ms=execution_time
             )
     
-    def launch_application(self, app_name: str) -> subprocess.Popen:
+    def launch_application(self, app_name: str, confirmed: bool = False) -> subprocess.Popen:
         """Launch an application by name.
         
         **Validates: Requirements 4.1**
@@ -187,28 +204,55 @@ class CommandExecutor:
         This method launches an application and returns a process handle.
         The application should start within 3 seconds.
         
+        With an app_catalog, only applications of the catalog are launched,
+        without a shell and with the arguments given after their name. A
+        name that only resembles an application is launched once the user
+        has confirmed it; a name that matches nothing fails at once.
+        
         Args:
-            app_name: Name or path of the application to launch
+            app_name: Name or path of the application to launch, possibly
+                followed by arguments
+            confirmed: Whether the user confirmed the application that a
+                name only resembles
             
         Returns:
             Process handle for the launched application
             
         Raises:
             FileNotFoundError: If the application cannot be found
+            ConfirmationRequiredError: If the name only resembles an
+                application and was not confirmed
             subprocess.SubprocessError: If the application fails to launch
         """
         self.logger.info(f"Launching application: {app_name}")
         
         try:
-            # Try to launch the application
-            # Use shell=True to allow launching by name (e.g., "notepad", "firefox")
-            process = subprocess.Popen(
-                app_name,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdin=subprocess.DEVNULL  # Prevent interactive prompts
-            )
+            if self.app_catalog is not None:
+                match = self.app_catalog.match(app_name)
+                if match is None:
+                    raise FileNotFoundError(
+                        f"Could not find application '{app_name}'. "
+                        f"Please check the application name and try again."
+                    )
+                if not match.exact and not confirmed:
+                    raise ConfirmationRequiredError(app_name, match)
+                self.logger.info(f"Resolved application '{app_name}' to {match.command}")
+                process = subprocess.Popen(
+                    list(match.argv),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    stdin=subprocess.DEVNULL
+                )
+            else:
+                # Try to launch the application
+                # Use shell=True to allow launching by name (e.g., "notepad", "firefox")
+                process = subprocess.Popen(
+                    app_name,
+                    shell=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    stdin=subprocess.DEVNULL  # Prevent interactive prompts
+                )
             
             # Give it a moment to start and check for immediate failures
             time.sleep(0.2)
@@ -240,6 +284,9 @@ class CommandExecutor:
         except FileNotFoundError:
             self.logger.error(f"Application not found: {app_name}")
             raise
+        except ConfirmationRequiredError:
+            self.logger.info(f"Application '{app_name}' needs confirmation")
+            raise
         except subprocess.SubprocessError:
             self.logger.error(f"Failed to launch application {app_name}")
             raise
@@ -302,8 +349,11 @@ class CommandExecutor:
                 f"Launching {app_name}..."
             )
             
-            # Launch the application
-            process = self.launch_application(app_name)
+            # Launch the application; the caller sets the "confirmed"
+            # parameter once the user confirmed a suggested application
+            process = self.launch_application(
+                app_name, confirmed=bool(command.parameters.get("confirmed"))
+            )
             
             execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
             
@@ -322,7 +372,7 @@ class CommandExecutor:
                 execution_time_ms=execution_time
             )
             
-        except FileNotFoundError as e:
+        except (FileNotFoundError, ConfirmationRequiredError) as e:
             execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
             return CommandResult(
                 command_id=command.command_id,
@@ -7,8 +7,10 @@ from .data_models import (
     Command,
     CommandRecord,
     CommandResult,
+    ContextSummary,
     Coordinates,
     Entity,
+    EntityMention,
     Intent,
     Note,
     Process,
@@ -26,8 +28,10 @@ __all__ = [
     "Command",
     "CommandRecord",
     "CommandResult",
+    "ContextSummary",
     "Coordinates",
     "Entity",
+    "EntityMention",
     "Intent",
     "Note",
     "Process",
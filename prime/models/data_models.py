@@ -6,9 +6,10 @@ including session management, command processing, voice profiles, notes,
 reminders, automation, and system monitoring.
 """
 
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, ClassVar, Deque, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -70,6 +71,67 @@ class CommandRecord:
     timestamp: datetime
 
 
+@dataclass
+class EntityMention:
+    """Represents where an entity occurred in a command history."""
+    entity: Entity
+    record_index: int  # Index of the command record in the history
+    position: int  # Index of the entity in the record's intent
+
+
+@dataclass
+class ContextSummary:
+    """Rolling summary of a session's command history.
+    
+    Updated one record at a time as the history grows, so the recent
+    intents, the latest entity of each type and the recent errors can be
+    read without walking the history. A summary built for an existing
+    history covers its last MAX_RECORDS records only.
+    """
+    MAX_RECORDS: ClassVar[int] = 50
+    MAX_INTENTS: ClassVar[int] = 10
+    MAX_ERRORS: ClassVar[int] = 5
+    # Less confident entities are not remembered
+    MIN_ENTITY_CONFIDENCE: ClassVar[float] = 0.5
+    # Longer outputs are not remembered
+    MAX_OUTPUT_LENGTH: ClassVar[int] = 200
+    
+    record_count: int = 0
+    last_record: Optional[CommandRecord] = field(default=None, repr=False)
+    # Intent types of the last MAX_INTENTS records, oldest first
+    recent_intents: Deque[str] = field(default_factory=lambda: deque(maxlen=ContextSummary.MAX_INTENTS))
+    # First entity of each type in the latest record having one
+    latest_entities: Dict[str, EntityMention] = field(default_factory=dict)
+    # (record index, record) of the last MAX_ERRORS failed records
+    recent_errors: Deque[Tuple[int, CommandRecord]] = field(
+        default_factory=lambda: deque(maxlen=ContextSummary.MAX_ERRORS)
+    )
+    # (record index, stripped output) of the latest successful record with
+    # a non-empty output shorter than MAX_OUTPUT_LENGTH
+    last_output: Optional[Tuple[int, str]] = None
+    
+    def add(self, record: CommandRecord) -> None:
+        """Add the next record of the history to the summary."""
+        index = self.record_count
+        intent = record.command.intent
+        self.recent_intents.append(intent.intent_type)
+        for position, entity in enumerate(intent.entities):
+            if entity.confidence < self.MIN_ENTITY_CONFIDENCE:
+                continue
+            mention = self.latest_entities.get(entity.entity_type)
+            if mention is None or mention.record_index != index:
+                self.latest_entities[entity.entity_type] = EntityMention(entity, index, position)
+        result = record.result
+        if not result.success:
+            self.recent_errors.append((index, record))
+        elif result.output:
+            output = result.output.strip()
+            if output and len(output) < self.MAX_OUTPUT_LENGTH:
+                self.last_output = (index, output)
+        self.record_count = index + 1
+        self.last_record = record
+
+
 @dataclass
 class Session:
     """Represents a user session with PRIME."""
@@ -79,6 +141,37 @@ class Session:
     end_time: Optional[datetime]
     command_history: List[CommandRecord] = field(default_factory=list)
     context_state: Dict[str, Any] = field(default_factory=dict)
+    
+    # Rolling summary of command_history; not a field, so it is left out of
+    # the constructor, comparisons, asdict() and the stored session
+    _summary = None
+    
+    def summary(self) -> ContextSummary:
+        """
+        Get the rolling summary of the command history.
+        
+        Records appended since the last call are added to the summary, so
+        each record is summarized once. If the history was otherwise
+        changed, or more than MAX_RECORDS records were added, the summary is
+        rebuilt from the last MAX_RECORDS records, so a long history loaded
+        from storage is not decoded in full.
+        
+        Returns:
+            The ContextSummary, up to date with command_history
+        """
+        summary = self._summary
+        history = self.command_history
+        count = summary.record_count if summary is not None else 0
+        start = max(count, len(history) - ContextSummary.MAX_RECORDS)
+        if (
+            summary is None or start > count or len(history) < count or
+            (count and history[count - 1] is not summary.last_record)
+        ):
+            start = max(0, len(history) - ContextSummary.MAX_RECORDS)
+            summary = self._summary = ContextSummary(record_count=start)
+        for index in range(start, len(history)):
+            summary.add(history[index])
+        return summary
 
 
 @dataclass
@@ -1,6 +1,8 @@
 """Natural Language Processing components."""
 
 from .intent_parser import IntentParser
+from .entity_lexer import EntitySpan
 from .context_engine import ContextEngine, Suggestion, Pattern
+from .async_context_engine import AsyncContextEngine
 
-__all__ = ["IntentParser", "ContextEngine", "Suggestion", "Pattern"]
+__all__ = ["IntentParser", "EntitySpan", "ContextEngine", "AsyncContextEngine", "Suggestion", "Pattern"]
@@ -0,0 +1,279 @@
+"""
+Asyncio Context Engine for PRIME Voice Assistant.
+
+AsyncContextEngine runs the Context Engine inside an event loop without
+blocking a turn on storage. Processing a command returns the intent as soon
+as parsing finishes, and adding a command to the history only updates the
+in-memory session and sequence counts. Saving the session and computing
+suggestions, which read and write encrypted storage, run on worker threads
+from background tasks. A user's corrections and command sequences are
+loaded on a worker thread too when they are not in memory.
+
+Saves are queued per session: a session waiting to be saved is saved once,
+with every command added meanwhile. When max_pending_saves sessions are
+waiting, add_to_history waits for a free slot, so a slow disk slows callers
+down instead of letting unsaved sessions pile up. Suggestions are computed
+by at most one task per session; commands added while it runs make it run
+again once it finishes. The latest suggestions of a session are kept until
+end_session is called for it or the engine is closed.
+"""
+
+import asyncio
+import copy
+import dataclasses
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from prime.models import Command, CommandResult, Intent, Session
+from prime.nlp import IntentParser
+from prime.nlp.context_engine import ContextEngine, Suggestion
+from prime.persistence import MemoryManager
+from prime.utils.performance import PerformanceProfiler, get_profiler
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncContextEngine:
+    """Asyncio variant of the Context Engine that keeps storage off the turn."""
+
+    def __init__(
+        self,
+        intent_parser: IntentParser,
+        memory_manager: MemoryManager,
+        max_pending_saves: int = 32,
+        profiler: Optional[PerformanceProfiler] = None,
+        **engine_options: Any
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            intent_parser: The intent parser for parsing commands
+            memory_manager: The memory manager for persistence
+            max_pending_saves: Sessions that may wait to be saved before
+                add_to_history waits
+            profiler: Profiler recording turn latencies as
+                "context.process_command" and "context.add_to_history"
+                (default: the global profiler)
+            **engine_options: Further ContextEngine options (max_users,
+                user_ttl_seconds, memory_budget_mb)
+
+        Raises:
+            ValueError: If max_pending_saves is less than 1.
+        """
+        if max_pending_saves < 1:
+            raise ValueError("max_pending_saves must be at least 1")
+
+        # The synchronous engine holds the context; its blocking parts are
+        # run on worker threads
+        self.engine = ContextEngine(intent_parser, memory_manager, **engine_options)
+        self.profiler = profiler if profiler is not None else get_profiler()
+        self.max_pending_saves = max_pending_saves
+
+        # Sessions waiting to be saved, by session id; the queue holds their
+        # ids in order and is created in the event loop
+        self._pending_saves: Dict[str, Session] = {}
+        self._save_queue: Optional[asyncio.Queue] = None
+        self._save_worker: Optional[asyncio.Task] = None
+        self.failed_saves = 0
+
+        # Latest suggestions of each session and the tasks computing them
+        self._suggestions: Dict[str, List[Suggestion]] = {}
+        self._suggestion_tasks: Dict[str, asyncio.Task] = {}
+        self._stale_suggestions: Set[str] = set()
+
+    async def __aenter__(self) -> 'AsyncContextEngine':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def process_command(self, text: str, session: Session) -> Intent:
+        """
+        Process a command with context awareness.
+
+        Args:
+            text: The command text to process
+            session: The current session
+
+        Returns:
+            Intent object with resolved references
+        """
+        start = time.perf_counter()
+        await self._load_user_state(session.user_id)
+        intent = self.engine.process_command(text, session)
+        self.profiler.record("context.process_command", time.perf_counter() - start)
+        return intent
+
+    async def add_to_history(
+        self, command: Command, result: CommandResult, session: Session
+    ) -> None:
+        """
+        Add a command and its result to the session history.
+
+        The session is updated at once, so the next command sees this one;
+        it is saved, and its suggestions refreshed, in the background.
+
+        Args:
+            command: The executed command
+            result: The result of the command execution
+            session: The current session to update
+        """
+        start = time.perf_counter()
+        await self._load_user_state(session.user_id)
+        self.engine.record_command(command, result, session)
+        await self._schedule_save(session)
+        self._schedule_suggestions(session)
+        self.profiler.record("context.add_to_history", time.perf_counter() - start)
+
+    async def get_suggestions(self, session: Session) -> List[Suggestion]:
+        """
+        Generate proactive suggestions based on session context.
+
+        The usage statistics are read on a worker thread.
+
+        Args:
+            session: The current session
+
+        Returns:
+            List of Suggestion objects
+        """
+        suggestions = self.engine.history_suggestions(session)
+        if len(session.command_history) > 0:
+            top_apps = await asyncio.to_thread(
+                self.engine.memory_manager.get_top_applications, session.user_id, 1
+            )
+            suggestions.extend(self.engine.usage_suggestions(top_apps))
+        return suggestions
+
+    def latest_suggestions(self, session: Session) -> List[Suggestion]:
+        """
+        Get the suggestions computed in the background, without waiting.
+
+        Args:
+            session: The current session
+
+        Returns:
+            The suggestions as of a recent add_to_history (empty until the
+            first ones are computed)
+        """
+        return list(self._suggestions.get(session.session_id, []))
+
+    async def end_session(self, session: Session) -> None:
+        """
+        Forget an ended session's suggestions.
+
+        A suggestion update in progress is cancelled; a queued save of the
+        session still runs.
+
+        Args:
+            session: The session that ended
+        """
+        session_id = session.session_id
+        self._suggestions.pop(session_id, None)
+        self._stale_suggestions.discard(session_id)
+        task = self._suggestion_tasks.pop(session_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def pending_saves(self) -> int:
+        """Number of sessions waiting to be saved."""
+        return len(self._pending_saves)
+
+    async def flush(self) -> None:
+        """Wait until every queued save and suggestion update has finished."""
+        if self._save_queue is not None:
+            await self._save_queue.join()
+        tasks = [task for task in self._suggestion_tasks.values() if not task.done()]
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def close(self) -> None:
+        """
+        Finish the queued work, stop the background save task, store the
+        users' command sequences and forget all suggestions.
+        """
+        await self.flush()
+        await asyncio.to_thread(self.engine.save_user_states)
+        self._suggestions.clear()
+        self._suggestion_tasks.clear()
+        self._stale_suggestions.clear()
+        if self._save_worker is not None:
+            self._save_worker.cancel()
+            try:
+                await self._save_worker
+            except asyncio.CancelledError:
+                pass
+            self._save_worker = None
+            self._save_queue = None
+
+    async def _load_user_state(self, user_id: str) -> None:
+        """Load a user's state on a worker thread if it is not in memory."""
+        if not self.engine.has_user_state(user_id):
+            await asyncio.to_thread(self.engine.load_user_state, user_id)
+
+    async def _schedule_save(self, session: Session) -> None:
+        """Queue a session to be saved, waiting while the queue is full."""
+        session_id = session.session_id
+        if session_id in self._pending_saves:
+            # Already queued; the save will include this command
+            self._pending_saves[session_id] = session
+            return
+
+        if self._save_worker is None:
+            self._save_queue = asyncio.Queue(maxsize=self.max_pending_saves)
+            self._save_worker = asyncio.get_running_loop().create_task(self._run_saves())
+        self._pending_saves[session_id] = session
+        await self._save_queue.put(session_id)
+
+    async def _run_saves(self) -> None:
+        """Save queued sessions, one at a time, on a worker thread."""
+        queue = self._save_queue
+        while True:
+            session_id = await queue.get()
+            try:
+                session = self._pending_saves.pop(session_id)
+                # Copy what is saved, so the session can change meanwhile
+                snapshot = dataclasses.replace(
+                    session,
+                    command_history=session.command_history.copy(),
+                    context_state=copy.deepcopy(session.context_state)
+                )
+                await asyncio.to_thread(self.engine.save_session, snapshot)
+            except Exception as e:
+                self.failed_saves += 1
+                logger.error(f"Failed to save session {session_id}: {e}")
+            finally:
+                queue.task_done()
+
+    def _schedule_suggestions(self, session: Session) -> None:
+        """Refresh a session's suggestions in the background."""
+        session_id = session.session_id
+        task = self._suggestion_tasks.get(session_id)
+        if task is not None and not task.done():
+            # The running task goes again when it finishes
+            self._stale_suggestions.add(session_id)
+            return
+        self._suggestion_tasks[session_id] = asyncio.get_running_loop().create_task(
+            self._refresh_suggestions(session)
+        )
+
+    async def _refresh_suggestions(self, session: Session) -> None:
+        """Compute a session's suggestions until they are up to date."""
+        session_id = session.session_id
+        while True:
+            self._stale_suggestions.discard(session_id)
+            try:
+                self._suggestions[session_id] = await self.get_suggestions(session)
+            except Exception as e:
+                logger.error(f"Failed to compute suggestions for session {session_id}: {e}")
+            if session_id not in self._stale_suggestions:
+                self._suggestion_tasks.pop(session_id, None)
+                return
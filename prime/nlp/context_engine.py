@@ -7,12 +7,31 @@ tracks command history, generates proactive suggestions, learns from corrections
 and detects repetitive patterns.
 """
 
-from typing import List, Optional, Dict, Any, Tuple
+import logging
+import re
+import threading
+from typing import List, Mapping, Optional, Dict, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 from prime.models import Intent, Entity, Session, CommandRecord, Command, CommandResult
 from prime.nlp import IntentParser
+from prime.nlp.correction_rewriter import CorrectionRewriter
+from prime.nlp.sequence_miner import SequenceMiner
+from prime.nlp.user_state import UserState, UserStateCache, UserStateView
 from prime.persistence import MemoryManager
+from prime.utils.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+# References to an earlier entity ("it", "that", "this", "them", "those",
+# "these", "the previous one", "the last one", "previous", "last") as whole
+# words. Alternatives share their prefixes, and "the last one" is tried
+# before "last" so it is one reference.
+_REFERENCE_PATTERN = re.compile(
+    r"\b(?:th(?:e (?:previous|last) one|at|is|em|ose|ese)|it|previous|last)\b",
+    re.IGNORECASE
+)
 
 
 @dataclass
@@ -47,22 +66,111 @@ class ContextEngine:
     - Detecting repetitive patterns for automation opportunities
     """
     
-    def __init__(self, intent_parser: IntentParser, memory_manager: MemoryManager):
+    # Decayed launches at the current hour needed for a launch suggestion
+    USAGE_SUGGESTION_MIN_SCORE = 5.0
+    
+    # Corrections kept per user (the most recent ones)
+    MAX_CORRECTIONS = 1000
+    
+    # Entity types a reference like "it" can refer to
+    REFERENCE_ENTITY_TYPES = (
+        "file_path", "application", "file_name",
+        "quoted_string", "process_name", "network_name",
+        "device_name"
+    )
+    
+    # Recent commands per user searched for repeated sequences, and the
+    # longest pause within a sequence
+    PATTERN_WINDOW = 200
+    PATTERN_MAX_GAP_SECONDS = 1800.0
+    
+    # Share of Config.MAX_MEMORY_MB that per-user state may use by default
+    USER_STATE_MEMORY_SHARE = 0.25
+    
+    def __init__(
+        self,
+        intent_parser: IntentParser,
+        memory_manager: MemoryManager,
+        max_users: Optional[int] = None,
+        user_ttl_seconds: Optional[float] = 3600.0,
+        memory_budget_mb: Optional[float] = None
+    ):
         """
         Initialize the Context Engine.
         
         Args:
             intent_parser: The IntentParser instance for parsing commands
             memory_manager: The MemoryManager instance for persistent storage
+            max_users: Most users whose state is kept in memory (None for
+                no limit)
+            user_ttl_seconds: Idle time after which a user's state is
+                dropped from memory (None to keep idle users)
+            memory_budget_mb: Memory for per-user state (default:
+                USER_STATE_MEMORY_SHARE of Config.MAX_MEMORY_MB)
         """
         self.intent_parser = intent_parser
         self.memory_manager = memory_manager
         
-        # Track corrections for learning
-        self._corrections: Dict[str, List[Tuple[str, str]]] = {}
+        # Corrections, their compiled rewriters and command sequence counts
+        # of recent users; others are loaded from memory when seen again
+        if memory_budget_mb is None:
+            memory_budget_mb = Config.MAX_MEMORY_MB * self.USER_STATE_MEMORY_SHARE
+        self._user_states = UserStateCache(
+            self._load_user_state,
+            max_users=max_users,
+            ttl_seconds=user_ttl_seconds,
+            memory_budget_bytes=int(memory_budget_mb * 1024 * 1024),
+            on_evict=self._user_state_evicted
+        )
         
-        # Track patterns for automation suggestions
-        self._pattern_buffer: Dict[str, List[Tuple[datetime, str]]] = {}
+        # Evicted users whose command sequences are not stored yet; they are
+        # stored with the next saved session, off the turn that evicted them
+        self._unsaved_states: Dict[str, UserState] = {}
+        self._unsaved_lock = threading.Lock()
+    
+    @property
+    def _corrections(self) -> Mapping[str, List[Tuple[str, str]]]:
+        """Corrections of the users in memory."""
+        return UserStateView(self._user_states, "corrections")
+    
+    @property
+    def _correction_rewriters(self) -> Mapping[str, CorrectionRewriter]:
+        """Compiled corrections of the users in memory."""
+        return UserStateView(self._user_states, "rewriter")
+    
+    def get_user_state_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of the per-user state kept in memory.
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions, expirations,
+            users, max_users, memory_bytes and memory_budget_bytes
+        """
+        return self._user_states.get_stats()
+    
+    def has_user_state(self, user_id: str) -> bool:
+        """
+        Check whether a user's corrections and command sequences are in memory.
+        
+        Args:
+            user_id: The user identifier
+            
+        Returns:
+            True if using the user's state does not read storage
+        """
+        return user_id in self._user_states
+    
+    def load_user_state(self, user_id: str) -> None:
+        """
+        Load a user's corrections and command sequences into memory.
+        
+        The other methods load them on first use; calling this first lets
+        the storage reads be done elsewhere, such as on a worker thread.
+        
+        Args:
+            user_id: The user identifier
+        """
+        self._user_states.get(user_id)
     
     def process_command(self, text: str, session: Session) -> Intent:
         """
@@ -127,36 +235,44 @@ class ContextEngine:
         if not (is_pronoun or is_previous):
             return None
         
-        # Search command history in reverse order (most recent first)
-        for record in reversed(session.command_history):
-            # Look for entities in the command
-            for entity in record.command.intent.entities:
-                # Skip low-confidence entities
-                if entity.confidence < 0.5:
-                    continue
-                
-                # Return the first relevant entity found
-                # Prioritize file paths, applications, and specific values
-                if entity.entity_type in [
-                    "file_path", "application", "file_name",
-                    "quoted_string", "process_name", "network_name",
-                    "device_name"
-                ]:
-                    return entity
+        return self._latest_referent(session)
+    
+    def _latest_referent(self, session: Session) -> Optional[Entity]:
+        """
+        Get the entity a reference in the session refers to.
+        
+        This is the first relevant entity of the most recent command having
+        one, or that command's output if a later command has a short output.
+        
+        Args:
+            session: The current session
             
-            # Also check the command result for referenced entities
-            if record.result.success and record.result.output:
-                # If the output contains a path or name, create an entity
-                output = record.result.output.strip()
-                if output and len(output) < 200:  # Reasonable length for an entity
-                    return Entity(
-                        entity_type="referenced_output",
-                        value=output,
-                        confidence=0.7
-                    )
-        
-        # No suitable reference found
-        return None
+        Returns:
+            The referenced Entity, or None if the history has none
+        """
+        # Find the most recent record with a relevant entity or a usable
+        # output; within a record, its first relevant entity wins
+        summary = session.summary()
+        latest = None
+        for entity_type in self.REFERENCE_ENTITY_TYPES:
+            mention = summary.latest_entities.get(entity_type)
+            if mention is not None and (
+                latest is None or
+                (mention.record_index, -mention.position) > (latest.record_index, -latest.position)
+            ):
+                latest = mention
+        
+        # The command result may hold the referenced entity
+        output = summary.last_output
+        if output is not None and (latest is None or output[0] > latest.record_index):
+            return Entity(
+                entity_type="referenced_output",
+                value=output[1],
+                confidence=0.7
+            )
+        
+        # The most recent relevant entity, if any
+        return latest.entity if latest is not None else None
     
     def add_to_history(
         self, command: Command, result: CommandResult, session: Session
@@ -165,7 +281,25 @@ class ContextEngine:
         Add a command and its result to the session history.
         
         This method updates the session's command history and persists
-        the session to storage.
+        the session to storage. Because the Memory Manager journals sessions,
+        only the new record is encrypted and appended.
+        
+        Args:
+            command: The executed command
+            result: The result of the command execution
+            session: The current session to update
+        """
+        self.record_command(command, result, session)
+        self.save_session(session)
+    
+    def record_command(
+        self, command: Command, result: CommandResult, session: Session
+    ) -> None:
+        """
+        Add a command and its result to the session history without saving it.
+        
+        The user's command sequence counts are updated too; save_session
+        persists the session.
         
         Args:
             command: The executed command
@@ -182,21 +316,38 @@ class ContextEngine:
         # Add to session history
         session.command_history.append(record)
         
-        # Update pattern buffer for pattern detection
-        user_id = session.user_id
-        if user_id not in self._pattern_buffer:
-            self._pattern_buffer[user_id] = []
-        
-        # Store command text and timestamp
-        command_text = command.intent.intent_type
-        self._pattern_buffer[user_id].append((datetime.now(), command_text))
+        # Count the command sequences ending with this command
+        state = self._user_states.get(session.user_id)
+        state.sequences.add(command.intent.intent_type, record.timestamp)
+        state.sequences_changed = True
+        self._user_states.resize(session.user_id)
+    
+    def save_session(self, session: Session) -> None:
+        """
+        Persist a session to storage.
         
-        # Keep only recent commands (last 50)
-        if len(self._pattern_buffer[user_id]) > 50:
-            self._pattern_buffer[user_id] = self._pattern_buffer[user_id][-50:]
+        The command sequences of users evicted from memory since the last
+        save are stored too.
         
-        # Persist the session
+        Args:
+            session: The session to save
+        """
         self.memory_manager.save_session(session)
+        self._store_unsaved_states()
+    
+    def save_user_states(self) -> None:
+        """
+        Store the command sequences of every user that changed.
+        
+        Sequences are otherwise stored when a user's state leaves memory;
+        call this before shutting down so the next start does not have to
+        replay the latest commands from the sessions.
+        """
+        self._store_unsaved_states()
+        for user_id in self._user_states.user_ids():
+            state = self._user_states.peek(user_id)
+            if state is not None:
+                self._store_sequences(user_id, state)
     
     def get_suggestions(self, session: Session) -> List[Suggestion]:
         """
@@ -206,6 +357,28 @@ class ContextEngine:
         generate helpful suggestions for automation, alternatives, or
         preference-based improvements.
         
+        Args:
+            session: The current session
+            
+        Returns:
+            List of Suggestion objects
+        """
+        suggestions = self.history_suggestions(session)
+        
+        # Suggest the app the user most often launches at this hour
+        if len(session.command_history) > 0:
+            top_apps = self.memory_manager.get_top_applications(session.user_id, k=1)
+            suggestions.extend(self.usage_suggestions(top_apps))
+        
+        return suggestions
+    
+    def history_suggestions(self, session: Session) -> List[Suggestion]:
+        """
+        Generate the suggestions that only need the in-memory history.
+        
+        These are the automation and alternative suggestions of
+        get_suggestions, without reading storage.
+        
         Args:
             session: The current session
             
@@ -225,13 +398,12 @@ class ContextEngine:
             ))
         
         # Suggest alternatives based on recent errors
-        recent_errors = [
-            record for record in session.command_history[-5:]
-            if not record.result.success
-        ]
+        summary = session.summary()
+        recent_errors = summary.recent_errors
         
-        if recent_errors:
-            last_error = recent_errors[-1]
+        # Only errors among the last 5 commands count
+        if recent_errors and recent_errors[-1][0] >= summary.record_count - 5:
+            last_error = recent_errors[-1][1]
             intent_type = last_error.command.intent.intent_type
             
             # Suggest alternatives based on intent type
@@ -244,25 +416,30 @@ class ContextEngine:
                     confidence=0.7
                 ))
         
-        # Suggest based on usage patterns
-        usage_patterns = self.memory_manager.get_all_application_usage(session.user_id)
-        if usage_patterns and len(session.command_history) > 0:
-            # Check if user frequently uses certain apps at certain times
-            current_hour = datetime.now().hour
-            
-            # Morning suggestions (6-12)
-            if 6 <= current_hour < 12 and usage_patterns:
-                top_app = usage_patterns[0]
-                if top_app.launch_count > 5:
-                    suggestions.append(Suggestion(
-                        suggestion_type="preference",
-                        description=f"Launch {top_app.application_name}",
-                        benefit=f"You frequently use {top_app.application_name}",
-                        confidence=0.6
-                    ))
-        
         return suggestions
     
+    def usage_suggestions(self, top_apps: List[Tuple[str, float]]) -> List[Suggestion]:
+        """
+        Generate a suggestion from the user's top application at this hour.
+        
+        Args:
+            top_apps: (application, score) pairs as returned by
+                MemoryManager.get_top_applications
+            
+        Returns:
+            A launch suggestion if the top application is used often enough
+        """
+        if top_apps:
+            app_name, score = top_apps[0]
+            if score > self.USAGE_SUGGESTION_MIN_SCORE:
+                return [Suggestion(
+                    suggestion_type="preference",
+                    description=f"Launch {app_name}",
+                    benefit=f"You frequently use {app_name} at this time of day",
+                    confidence=min(0.8, 0.5 + score * 0.02)
+                )]
+        return []
+    
     def learn_from_correction(
         self, original: str, corrected: str, session: Session
     ) -> None:
@@ -270,7 +447,8 @@ class ContextEngine:
         Learn from user corrections to improve future parsing.
         
         When a user corrects PRIME's interpretation, this method stores
-        the correction to improve future command understanding.
+        the correction to improve future command understanding. A new
+        correction of the same text replaces the earlier one.
         
         Args:
             original: The original command text that was misunderstood
@@ -278,31 +456,31 @@ class ContextEngine:
             session: The current session
         """
         user_id = session.user_id
+        original, corrected = original.lower(), corrected.lower()
         
-        # Initialize corrections list for this user if needed
-        if user_id not in self._corrections:
-            self._corrections[user_id] = []
-        
-        # Store the correction
-        self._corrections[user_id].append((original.lower(), corrected.lower()))
+        # Start from the stored corrections, so they are not overwritten
+        corrections = [
+            (old_original, old_corrected)
+            for old_original, old_corrected in self._get_corrections(user_id)
+            if old_original != original
+        ]
         
-        # Keep only recent corrections (last 100)
-        if len(self._corrections[user_id]) > 100:
-            self._corrections[user_id] = self._corrections[user_id][-100:]
+        # Store the correction, keeping only the most recent ones
+        corrections.append((original, corrected))
+        state = self._user_states.get(user_id)
+        state.set_corrections(corrections[-self.MAX_CORRECTIONS:])
+        self._user_states.resize(user_id)
         
         # Persist corrections as a preference
         self.memory_manager.store_preference(
             "command_corrections",
-            self._corrections[user_id],
+            state.corrections,
             user_id
         )
     
     def detect_repetitive_pattern(self, session: Session) -> Optional[Pattern]:
         """
-        Detect repetitive patterns in command history.
-        
-        This method analyzes the command history to identify sequences
-        of commands that are repeated, which could be automated.
+        Detect the best repetitive pattern in command history.
         
         Args:
             session: The current session
@@ -310,50 +488,140 @@ class ContextEngine:
         Returns:
             Pattern object if a repetitive pattern is detected, None otherwise
         """
-        user_id = session.user_id
-        
-        # Need at least 6 commands to detect a pattern
-        if user_id not in self._pattern_buffer:
-            return None
+        patterns = self.detect_repetitive_patterns(session, k=1)
+        return patterns[0] if patterns else None
+    
+    def detect_repetitive_patterns(self, session: Session, k: int = 3) -> List[Pattern]:
+        """
+        Detect the best candidates for automation in command history.
         
-        buffer = self._pattern_buffer[user_id]
-        if len(buffer) < 6:
-            return None
+        Sequences of 2-4 commands are counted as commands are added to the
+        history, over the user's last PATTERN_WINDOW commands (across
+        sessions and restarts). Sequences repeated at least 3 times are
+        candidates, ranked by frequency, then length, then recency.
         
-        # Look for sequences of 2-4 commands that repeat
-        for sequence_length in range(2, 5):
-            # Check recent commands
-            recent_commands = buffer[-20:]  # Look at last 20 commands
-            
-            # Extract command sequences
-            sequences: Dict[tuple, List[datetime]] = {}
-            
-            for i in range(len(recent_commands) - sequence_length + 1):
-                sequence = tuple(
-                    cmd_text for _, cmd_text in recent_commands[i:i+sequence_length]
-                )
-                timestamp = recent_commands[i][0]
-                
-                if sequence not in sequences:
-                    sequences[sequence] = []
-                sequences[sequence].append(timestamp)
+        Args:
+            session: The current session
+            k: Maximum number of patterns
             
-            # Find sequences that repeat at least 3 times
-            for sequence, timestamps in sequences.items():
-                if len(timestamps) >= 3:
-                    # Found a repetitive pattern
-                    command_names = list(sequence)
-                    description = " → ".join(command_names)
-                    
-                    return Pattern(
-                        pattern_type="command_sequence",
-                        commands=command_names,
-                        frequency=len(timestamps),
-                        last_occurrence=max(timestamps),
-                        description=description
-                    )
-        
-        return None
+        Returns:
+            Pattern objects, best first
+        """
+        return [
+            Pattern(
+                pattern_type="command_sequence",
+                commands=list(sequence.commands),
+                frequency=sequence.frequency,
+                last_occurrence=sequence.last_occurrence,
+                description=" → ".join(sequence.commands)
+            )
+            for sequence in self._get_sequence_miner(session.user_id).top_k(k)
+        ]
+    
+    def _get_sequence_miner(self, user_id: str) -> SequenceMiner:
+        """Get a user's sequence miner, loading its window from memory if not in cache."""
+        return self._user_states.get(user_id).sequences
+    
+    def _load_user_state(self, user_id: str) -> UserState:
+        """
+        Load a user's corrections and command sequences from memory.
+        
+        The sequences are stored when the user's state leaves memory, so
+        only the commands run after that (e.g. before a crash) are replayed
+        from the newest sessions.
+        """
+        with self._unsaved_lock:
+            state = self._unsaved_states.pop(user_id, None)
+        if state is not None:
+            # Evicted but not stored yet
+            return state
+        
+        stored_corrections = self.memory_manager.get_preference(
+            "command_corrections", user_id
+        )
+        corrections = [tuple(pair) for pair in stored_corrections or []]
+        
+        miner = SequenceMiner(window=self.PATTERN_WINDOW, max_gap_seconds=self.PATTERN_MAX_GAP_SECONDS)
+        stored_sequences = self.memory_manager.get_preference("command_sequences", user_id)
+        if stored_sequences is not None:
+            try:
+                miner.load_dict(stored_sequences)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Ignoring stored command sequences of user {user_id}: {e}")
+                miner = SequenceMiner(window=self.PATTERN_WINDOW, max_gap_seconds=self.PATTERN_MAX_GAP_SECONDS)
+        
+        state = UserState(corrections, miner)
+        for timestamp, intent_type in self._recent_commands(user_id, self.PATTERN_WINDOW, miner.last_timestamp):
+            miner.add(intent_type, timestamp)
+            state.sequences_changed = True
+        return state
+    
+    def _recent_commands(
+        self, user_id: str, limit: int, since: Optional[float] = None
+    ) -> List[Tuple[datetime, str]]:
+        """
+        Read a user's latest commands from their stored sessions.
+        
+        Sessions are read newest first and reading stops at the first
+        command not newer than since, so when the stored sequences are up
+        to date only the latest session is read.
+        
+        Args:
+            user_id: The user identifier
+            limit: Most commands returned
+            since: POSIX time of the latest command already counted (None
+                for all commands)
+        
+        Returns:
+            Up to limit (timestamp, intent type) pairs, oldest first
+        """
+        commands: List[Tuple[datetime, str]] = []
+        caught_up = False
+        for session_id in self.memory_manager.list_sessions(user_id):
+            try:
+                for record in self.memory_manager.iter_history(session_id):
+                    if since is not None and record.timestamp.timestamp() <= since:
+                        caught_up = True
+                        break
+                    commands.append((record.timestamp, record.command.intent.intent_type))
+                    if len(commands) >= limit:
+                        break
+            except Exception as e:
+                logger.warning(f"Skipping commands of session {session_id}: {e}")
+                continue
+            if caught_up or len(commands) >= limit:
+                break
+        
+        # Newest first per session; sessions may overlap, so order by time
+        commands.reverse()
+        commands.sort(key=lambda command: command[0])
+        return commands
+    
+    def _user_state_evicted(self, user_id: str, state: UserState) -> None:
+        """Keep an evicted user's changed sequences until the next save stores them."""
+        if state.sequences_changed:
+            with self._unsaved_lock:
+                self._unsaved_states[user_id] = state
+    
+    def _store_unsaved_states(self) -> None:
+        """Store the command sequences of the users evicted since the last save."""
+        with self._unsaved_lock:
+            states = list(self._unsaved_states.items())
+            self._unsaved_states.clear()
+        for user_id, state in states:
+            self._store_sequences(user_id, state)
+    
+    def _store_sequences(self, user_id: str, state: UserState) -> None:
+        """Store a user's command sequences if they changed."""
+        if not state.sequences_changed:
+            return
+        state.sequences_changed = False
+        try:
+            self.memory_manager.store_preference("command_sequences", state.sequences.to_dict(), user_id)
+        except Exception as e:
+            # Retried on the next save; replayed from the sessions meanwhile
+            state.sequences_changed = True
+            logger.error(f"Failed to store command sequences of user {user_id}: {e}")
     
     def _apply_corrections(self, text: str, user_id: str) -> str:
         """
@@ -366,32 +634,29 @@ class ContextEngine:
         Returns:
             The corrected command text
         """
-        # Load corrections from memory if not in cache
-        if user_id not in self._corrections:
-            stored_corrections = self.memory_manager.get_preference(
-                "command_corrections", user_id
-            )
-            if stored_corrections:
-                self._corrections[user_id] = stored_corrections
-            else:
-                self._corrections[user_id] = []
+        rewriter = self._user_states.get(user_id).rewriter
         
-        # Apply corrections
-        corrected_text = text.lower()
-        for original, corrected in self._corrections.get(user_id, []):
-            if original in corrected_text:
-                corrected_text = corrected_text.replace(original, corrected)
+        # Apply all corrections in one pass; replaced text is not corrected again
+        lowered_text = text.lower()
+        corrected_text = rewriter.rewrite(lowered_text)
         
         # Return with original casing if no corrections were applied
-        if corrected_text == text.lower():
+        if corrected_text == lowered_text:
             return text
         
         return corrected_text
     
+    def _get_corrections(self, user_id: str) -> List[Tuple[str, str]]:
+        """Get a user's corrections, loading them from memory if not in cache."""
+        return self._user_states.get(user_id).corrections
+    
     def _resolve_text_references(self, text: str, session: Session) -> str:
         """
         Resolve references in the command text.
         
+        Each reference ("it", "that", "the last one", ...) standing as a
+        whole word, in any case, is replaced by the entity it refers to.
+        
         Args:
             text: The command text
             session: The current session
@@ -399,34 +664,26 @@ class ContextEngine:
         Returns:
             The text with references resolved
         """
-        # Common reference patterns
-        reference_patterns = [
-            "it", "that", "this", "them", "those", "these",
-            "the previous one", "the last one", "previous", "last"
-        ]
-        
-        text_lower = text.lower()
-        
-        # Check if text contains any references
-        has_reference = any(pattern in text_lower for pattern in reference_patterns)
-        
-        if not has_reference:
+        # Find every reference in one scan; "it" in "edit" is not one
+        spans = [match.span() for match in _REFERENCE_PATTERN.finditer(text)]
+        if not spans:
             return text
         
-        # Try to resolve each reference pattern
-        for pattern in reference_patterns:
-            if pattern in text_lower:
-                # Resolve the reference
-                entity = self.resolve_reference(pattern, session)
-                if entity:
-                    # Replace the reference with the entity value
-                    # Be careful to maintain case and context
-                    replacement = str(entity.value)
-                    text = text.replace(pattern, replacement)
-                    text = text.replace(pattern.capitalize(), replacement)
-                    text = text.replace(pattern.upper(), replacement)
-        
-        return text
+        # All references resolve to the same entity
+        entity = self._latest_referent(session)
+        if entity is None:
+            return text
+        replacement = str(entity.value)
+        
+        # Rebuild the text with each reference replaced
+        parts = []
+        position = 0
+        for start, end in spans:
+            parts.append(text[position:start])
+            parts.append(replacement)
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
     
     def _enhance_intent_with_context(
         self, intent: Intent, session: Session
@@ -444,10 +701,7 @@ class ContextEngine:
         # If intent has low confidence, try to improve it with context
         if intent.confidence < 0.6 and len(session.command_history) > 0:
             # Look at recent commands to infer context
-            recent_intents = [
-                record.command.intent.intent_type
-                for record in session.command_history[-3:]
-            ]
+            recent_intents = list(session.summary().recent_intents)[-3:]
             
             # If user is doing similar operations, boost confidence
             if intent.intent_type in recent_intents:
@@ -0,0 +1,80 @@
+"""Correction rewriter for PRIME.
+
+A user's learned corrections ("opn" -> "open") are compiled into a single
+regular expression shaped like a trie of the original texts, so rewriting a
+command takes one scan however many corrections there are. At each position
+the longest original text wins, matches do not overlap, and replaced text is
+not scanned again, so corrections cannot cascade into each other.
+"""
+
+import re
+from typing import Dict, Iterable, Optional, Sequence
+
+
+class CorrectionRewriter:
+    """Applies a set of (original, corrected) text replacements in one pass."""
+
+    def __init__(self, corrections: Iterable[Sequence[str]]):
+        """
+        Compile the corrections.
+
+        Args:
+            corrections: (original, corrected) pairs. When an original text
+                appears more than once, the last correction is used. Empty
+                original texts are ignored.
+        """
+        self._replacements: Dict[str, str] = {}
+        for original, corrected in corrections:
+            if original:
+                self._replacements[original] = corrected
+        self._pattern: Optional[re.Pattern] = (
+            re.compile(_trie_pattern(self._replacements)) if self._replacements else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._replacements)
+
+    def rewrite(self, text: str) -> str:
+        """
+        Replace every occurrence of an original text by its correction.
+
+        Args:
+            text: The text to rewrite
+
+        Returns:
+            The rewritten text (text itself if nothing matched)
+        """
+        if self._pattern is None:
+            return text
+        replacements = self._replacements
+        return self._pattern.sub(lambda match: replacements[match.group(0)], text)
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regular expression matching the longest of words at a position."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        # Follow chains of single characters without recursing
+        prefix = []
+        while len(node) == 1 and '' not in node:
+            [(char, node)] = node.items()
+            prefix.append(re.escape(char))
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            body = ''
+        elif '' in node:
+            # Trying the longer words first makes the match the longest one
+            body = f"(?:{'|'.join(branches)})?"
+        elif len(branches) == 1:
+            body = branches[0]
+        else:
+            body = f"(?:{'|'.join(branches)})"
+        return ''.join(prefix) + body
+
+    return build(trie)
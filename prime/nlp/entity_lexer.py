@@ -0,0 +1,141 @@
+"""Single-pass entity lexer for PRIME.
+
+The lexer scans a command once with a combined regular expression whose
+alternatives are, in order of priority: quoted strings, file paths (Windows,
+UNC, home-relative and Unix), numbers, direction words and capitalized
+application names. At each position the first alternative that matches wins
+and consumes its text, so a number inside a path or an application name
+inside quotes is not reported a second time. Runs of lower-case words are
+skipped in one step, so the scan does not stop at every word of a long
+dictation.
+
+Spans carry the offsets of their value in the scanned text.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from prime.models import Entity
+
+
+_DIRECTION_WORDS = r"(?i:up|down|increase|decrease|raise|lower|higher)\b"
+
+# Alternatives in priority order. An application name is whole words only,
+# never part of a longer word ("iPhone" holds no "Phone"), and does not run
+# into a direction word ("Open Up" is an application and a direction). The last
+# alternative skips a run of lower-case words and whitespace, stopping before
+# a direction word or a Windows drive letter, even one ending a word
+# ("abc:\x" holds the path "c:\x").
+_TOKEN_REGEX = re.compile(
+    r"""
+      ["'](?P<quoted>[^"']+)["']
+    | (?P<windows_path>[A-Za-z]:\\(?:[^\s\\]+\\)*[^\s\\]+)
+    | (?P<unc_path>\\\\[^\s\\]+(?:\\[^\s\\]+)+)
+    | (?P<home_path>~/(?:[^\s/]+/)*[^\s/]+)
+    | (?P<unix_path>/(?:[^\s/]+/)*[^\s/]+)
+    | \b(?P<number>\d+)\b
+    | \b(?P<direction>""" + _DIRECTION_WORDS + r""")
+    | (?<!\w)(?P<application>[A-Z][a-z]+(?:\s+(?!""" + _DIRECTION_WORDS + r""")[A-Z][a-z]+)*)(?!\w)
+    | [a-z]+(?!:\\)\s*(?:(?!""" + _DIRECTION_WORDS + r""")[a-z]+(?!:\\)\s*)*
+    """,
+    re.VERBOSE
+)
+
+# Entity type and confidence of each token
+_TOKEN_TYPES = {
+    'quoted': ("quoted_string", 0.9),
+    'windows_path': ("file_path", 0.85),
+    'unc_path': ("file_path", 0.85),
+    'home_path': ("file_path", 0.85),
+    'unix_path': ("file_path", 0.85),
+    'number': ("number", 0.9),
+    'direction': ("direction", 0.85),
+    'application': ("application", 0.7),
+}
+
+# Direction words normalized to up/down
+_DIRECTIONS = {
+    "up": "up", "increase": "up", "raise": "up", "higher": "up",
+    "down": "down", "decrease": "down", "lower": "down",
+}
+
+
+@dataclass
+class EntitySpan:
+    """An entity found in a text, with the offsets of its value.
+
+    Attributes:
+        entity_type: Entity type, as in Entity
+        value: Entity value (an int for numbers, "up"/"down" for directions)
+        confidence: Extraction confidence
+        start: Offset of the first character of the value's text
+        end: Offset just past the value's text
+        text: The value's text as it appears in the scanned text
+    """
+    entity_type: str
+    value: Any
+    confidence: float
+    start: int
+    end: int
+    text: str
+
+    def to_entity(self) -> Entity:
+        """Convert the span to an Entity."""
+        return Entity(entity_type=self.entity_type, value=self.value, confidence=self.confidence)
+
+
+def scan_entities(text: str, stop_words: Iterable[str] = ()) -> List[EntitySpan]:
+    """Find the entities in a text, with their offsets.
+
+    Args:
+        text: The text to scan.
+        stop_words: Lower-case words that are not application names.
+
+    Returns:
+        Non-overlapping entity spans in the order they appear in the text.
+    """
+    spans = []
+    for entity_type, value, confidence, match, kind in _tokens(text, stop_words):
+        start, end = match.span(kind)
+        spans.append(EntitySpan(entity_type, value, confidence, start, end, match[kind]))
+    return spans
+
+
+def extract_entities(text: str, stop_words: Iterable[str] = ()) -> List[Entity]:
+    """Find the entities in a text.
+
+    Same as scan_entities without the offsets, for callers that only need
+    the entities.
+
+    Args:
+        text: The text to scan.
+        stop_words: Lower-case words that are not application names.
+
+    Returns:
+        Non-overlapping entities in the order they appear in the text.
+    """
+    return [
+        Entity(entity_type, value, confidence)
+        for entity_type, value, confidence, _, _ in _tokens(text, stop_words)
+    ]
+
+
+def _tokens(text: str, stop_words: Iterable[str]) -> Iterator[Tuple[str, Any, float, re.Match, str]]:
+    """Yield (entity_type, value, confidence, match, group name) per entity."""
+    for match in _TOKEN_REGEX.finditer(text):
+        kind = match.lastgroup
+        if kind is None:
+            # Skipped lower-case words
+            continue
+        token = match[kind]
+        if kind == 'number':
+            value = int(token)
+        elif kind == 'direction':
+            value = _DIRECTIONS[token.lower()]
+        elif kind == 'application' and token.lower() in stop_words:
+            continue
+        else:
+            value = token
+        entity_type, confidence = _TOKEN_TYPES[kind]
+        yield entity_type, value, confidence, match, kind
@@ -0,0 +1,188 @@
+"""Intent grammar loading for PRIME.
+
+The IntentParser's grammar (intent keywords, entity types and patterns, stop
+words, required entities and clarification texts) is defined in a versioned
+JSON file, grammar.json next to this module by default. Loading it
+validates the file, builds the IntentMatcher tables and compiles every
+pattern, so an invalid grammar is rejected when it is loaded rather than when
+a command first reaches the broken pattern.
+
+GrammarWatcher checks the file's modification time so that a running parser
+can pick up a new grammar without restarting.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Union
+
+from prime.nlp.intent_matcher import IntentMatcher
+
+
+logger = logging.getLogger(__name__)
+
+
+# Version of the grammar file format
+GRAMMAR_VERSION = 1
+
+# Grammar shipped with PRIME
+DEFAULT_GRAMMAR_PATH = Path(__file__).with_name('grammar.json')
+
+
+@dataclass
+class Grammar:
+    """A loaded intent grammar.
+
+    Attributes:
+        intent_patterns: Keywords, entity types and patterns per intent
+        stop_words: Words ignored when extracting application names
+        required_entities: Entity types of which an intent needs at least one
+        missing_entity_questions: Question asked when an intent lacks entities
+        intent_descriptions: Description of each intent, for confirmation questions
+        source_hash: SHA-256 of the grammar file
+        matcher: IntentMatcher compiled from intent_patterns
+    """
+    intent_patterns: Dict[str, Dict[str, Any]]
+    stop_words: Set[str]
+    required_entities: Dict[str, List[str]]
+    missing_entity_questions: Dict[str, str]
+    intent_descriptions: Dict[str, str]
+    source_hash: str = ''
+    matcher: Optional[IntentMatcher] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source_hash: str = '') -> 'Grammar':
+        """Build and compile a grammar from the contents of a grammar file.
+
+        Raises:
+            ValueError: If the data was written for an unsupported version,
+                or is missing sections or has invalid patterns.
+        """
+        if data.get('version') != GRAMMAR_VERSION:
+            raise ValueError(f"Unsupported grammar version: {data.get('version')}")
+
+        try:
+            intent_patterns = {
+                intent_type: {
+                    'keywords': list(info['keywords']),
+                    'entity_types': list(info['entity_types']),
+                    'patterns': list(info['patterns']),
+                }
+                for intent_type, info in data['intents'].items()
+            }
+            grammar = cls(
+                intent_patterns=intent_patterns,
+                stop_words=set(data['stop_words']),
+                required_entities={k: list(v) for k, v in data['required_entities'].items()},
+                missing_entity_questions=dict(data['missing_entity_questions']),
+                intent_descriptions=dict(data['intent_descriptions']),
+                source_hash=source_hash,
+            )
+            grammar.matcher = IntentMatcher(intent_patterns)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid grammar: {e!r}") from e
+        except re.error as e:
+            raise ValueError(f"Invalid grammar pattern: {e}") from e
+        return grammar
+
+
+def load_grammar(path: Union[str, Path, None] = None) -> Grammar:
+    """Load and compile a grammar file.
+
+    Args:
+        path: Grammar file. Defaults to the grammar shipped with PRIME.
+
+    Returns:
+        The loaded Grammar.
+
+    Raises:
+        FileNotFoundError: If the grammar file doesn't exist.
+        ValueError: If the grammar file is invalid.
+    """
+    source = Path(path) if path is not None else DEFAULT_GRAMMAR_PATH
+    content = source.read_bytes()
+    try:
+        data = json.loads(content.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid grammar file {source}: {e}") from e
+    return Grammar.from_dict(data, hashlib.sha256(content).hexdigest())
+
+
+class GrammarWatcher:
+    """Reloads a grammar file when its modification time changes.
+
+    The file is checked at most once every check_interval seconds, from
+    whichever thread calls poll, so no background thread is needed.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        check_interval: float = 2.0
+    ):
+        """
+        Initialize the watcher and load the grammar.
+
+        Args:
+            path: Grammar file. Defaults to the grammar shipped with PRIME.
+            check_interval: Minimum time between modification time checks
+
+        Raises:
+            FileNotFoundError: If the grammar file doesn't exist.
+            ValueError: If the grammar file is invalid.
+        """
+        self.path = Path(path) if path is not None else DEFAULT_GRAMMAR_PATH
+        self._check_interval = check_interval
+        self._mtime = self._stat()
+        self.grammar = load_grammar(self.path)
+        self._next_check = time.monotonic() + check_interval
+
+    def poll(self) -> Optional[Grammar]:
+        """
+        Reload the grammar if the file changed since it was loaded.
+
+        A file that cannot be loaded is logged and the current grammar kept.
+
+        Returns:
+            The new Grammar if it was reloaded, otherwise None
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return None
+        self._next_check = now + self._check_interval
+        return self.reload(force=False)
+
+    def reload(self, force: bool = True) -> Optional[Grammar]:
+        """
+        Reload the grammar now.
+
+        Args:
+            force: Reload even if the modification time did not change
+
+        Returns:
+            The new Grammar if it was reloaded, otherwise None
+        """
+        mtime = self._stat()
+        if not force and mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        try:
+            grammar = load_grammar(self.path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Keeping current grammar, could not load {self.path}: {e}")
+            return None
+        if grammar.source_hash == self.grammar.source_hash:
+            return None
+        self.grammar = grammar
+        logger.info(f"Reloaded grammar from {self.path}")
+        return grammar
+
+    def _stat(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
@@ -0,0 +1,135 @@
+"""Compiled intent matcher for PRIME.
+
+The IntentMatcher turns the IntentParser's intent_patterns into a form that
+can be matched in one pass:
+
+- Every keyword of every intent is searched for with a single regular
+  expression. It finds the longest keyword starting at each position of the
+  text; the shorter keywords starting there are its prefixes, which are
+  precomputed, so every keyword occurrence is found, including overlapping
+  ones ("start" inside "restart")
+- Only intents with at least one keyword in the text are candidates, and
+  they are tried in order of the confidence they would get, so patterns of
+  intents that cannot win are never run
+
+Matching is keyword substring search, like ``keyword in text``.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+
+class IntentMatcher:
+    """Matches text against compiled intent patterns."""
+
+    def __init__(self, intent_patterns: Dict[str, Dict[str, Any]]):
+        """Compile intent patterns.
+
+        Args:
+            intent_patterns: Intent definitions in the IntentParser format,
+                mapping intent types to their keywords, entity types and
+                regular expression patterns. The "unknown" intent is skipped.
+
+        Raises:
+            re.error: If a pattern is not a valid regular expression.
+        """
+        self._intent_types: List[str] = []
+        # Compiled patterns by intent position
+        self._patterns: List[List[Pattern]] = []
+        self._entity_types: Dict[str, List[str]] = {}
+        # Positions of the intents of each keyword
+        self._keyword_intents: Dict[str, List[int]] = {}
+
+        for intent_type, pattern_info in intent_patterns.items():
+            self._entity_types[intent_type] = list(pattern_info.get("entity_types", []))
+            if intent_type == "unknown":
+                continue
+            position = len(self._intent_types)
+            self._intent_types.append(intent_type)
+            self._patterns.append([
+                re.compile(pattern, re.IGNORECASE) for pattern in pattern_info["patterns"]
+            ])
+            for keyword in pattern_info["keywords"]:
+                self._keyword_intents.setdefault(keyword, []).append(position)
+
+        # Keywords that are prefixes of each keyword, including itself
+        self._keyword_prefixes: Dict[str, List[str]] = {
+            keyword: [prefix for prefix in self._keyword_intents if keyword.startswith(prefix)]
+            for keyword in self._keyword_intents
+        }
+
+        # Longest alternatives first, so the longest keyword at each position wins
+        keywords = sorted(self._keyword_intents, key=len, reverse=True)
+        self._keyword_regex: Optional[Pattern] = (
+            re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in keywords) + "))")
+            if keywords else None
+        )
+
+    def entity_types(self, intent_type: str) -> List[str]:
+        """Get the entity types of an intent's pattern groups."""
+        return self._entity_types.get(intent_type, [])
+
+    def keyword_matches(self, text: str) -> Dict[str, int]:
+        """Count how many of each intent's keywords occur in text.
+
+        Returns:
+            Mapping of intent types with at least one keyword in the text to
+            their number of matching keywords.
+        """
+        counts = self._count_keywords(text)
+        return {
+            self._intent_types[position]: count
+            for position, count in enumerate(counts) if count
+        }
+
+    def match(self, text: str) -> Tuple[Optional[str], float, Optional[re.Match]]:
+        """Find the best intent for normalized text.
+
+        An intent with keywords in the text whose pattern matches gets a
+        confidence of min(0.9, 0.5 + 0.2 * keywords). If no pattern of such
+        an intent matches, the best keyword-only intent gets min(0.7, 0.3 +
+        0.2 * keywords). Ties go to the intent defined first.
+
+        Args:
+            text: Lower-cased, stripped command text.
+
+        Returns:
+            (intent_type, confidence, match) tuple. match is the pattern
+            match, or None for a keyword-only match; intent_type is None and
+            confidence 0.0 if no keyword occurs in the text.
+        """
+        counts = self._count_keywords(text)
+        candidates = [position for position, count in enumerate(counts) if count]
+        if not candidates:
+            return None, 0.0, None
+
+        # Try the candidates that would be most confident first
+        candidates.sort(key=lambda position: -min(0.9, 0.5 + (counts[position] * 0.2)))
+        for position in candidates:
+            for pattern in self._patterns[position]:
+                match = pattern.search(text)
+                if match:
+                    return (
+                        self._intent_types[position],
+                        min(0.9, 0.5 + (counts[position] * 0.2)),
+                        match,
+                    )
+
+        # max() keeps the first of equally confident candidates
+        best = max(candidates, key=lambda position: min(0.7, 0.3 + (counts[position] * 0.2)))
+        return self._intent_types[best], min(0.7, 0.3 + (counts[best] * 0.2)), None
+
+    def _count_keywords(self, text: str) -> List[int]:
+        """Count the keywords of each intent, by position, that occur in text."""
+        counts = [0] * len(self._intent_types)
+        if self._keyword_regex is None:
+            return counts
+
+        # A keyword occurring several times counts once
+        found = set()
+        for longest in {match.group(1) for match in self._keyword_regex.finditer(text)}:
+            found.update(self._keyword_prefixes[longest])
+        for keyword in found:
+            for position in self._keyword_intents[keyword]:
+                counts[position] += 1
+        return counts
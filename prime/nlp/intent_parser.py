@@ -6,9 +6,19 @@ user commands, extract entities, detect ambiguity, and generate clarification
 questions when needed.
 """
 
+import os
 import re
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Dict, Optional, Set, Tuple, Union
 from prime.models import Intent, Entity
+from prime.nlp.entity_lexer import EntitySpan, extract_entities, scan_entities
+from prime.nlp.grammar import Grammar, GrammarWatcher
+from prime.nlp.intent_matcher import IntentMatcher
+from prime.utils.performance import LRUCache
+
+if TYPE_CHECKING:
+    from prime.execution.app_catalog import AppCatalog
 
 
 class IntentParser:
@@ -17,168 +27,104 @@ class IntentParser:
     
     The Intent Parser uses pattern matching and keyword detection to identify
     user intents and extract relevant entities from voice commands.
+    
+    The grammar is loaded from a versioned JSON file (see prime.nlp.grammar)
+    and reloaded when the file changes. intent_patterns is compiled into an
+    IntentMatcher when it is assigned; call compile_patterns() after
+    modifying it or stop_words in place.
+    
+    Parse results are cached by normalized text, so repeated commands are
+    answered without matching them again.
     """
     
-    def __init__(self):
-        """Initialize the Intent Parser with command patterns and entity extractors."""
-        # Define intent patterns with keywords and entity types
-        self.intent_patterns = {
-            "launch_app": {
-                "keywords": ["open", "launch", "start", "run"],
-                "entity_types": ["application"],
-                "patterns": [
-                    r"(?:open|launch|start|run)\s+(.+)",
-                ]
-            },
-            "adjust_volume": {
-                "keywords": ["volume", "sound"],
-                "entity_types": ["volume_level", "direction"],
-                "patterns": [
-                    r"(?:set|adjust|change)\s+(?:the\s+)?volume\s+to\s+(\d+)",
-                    r"(?:turn|make)\s+(?:the\s+)?volume\s+(up|down)",
-                    r"volume\s+(up|down)",
-                    r"(?:increase|decrease|raise|lower)\s+(?:the\s+)?volume",
-                    r"set\s+volume\s+to\s+(\d+)",
-                ]
-            },
-            "adjust_brightness": {
-                "keywords": ["brightness", "screen"],
-                "entity_types": ["brightness_level", "direction"],
-                "patterns": [
-                    r"(?:set|adjust|change)\s+(?:the\s+)?brightness\s+to\s+(\d+)",
-                    r"(?:turn|make)\s+(?:the\s+)?brightness\s+(up|down)",
-                    r"brightness\s+(up|down)",
-                    r"(?:increase|decrease|raise|lower)\s+(?:the\s+)?brightness",
-                ]
-            },
-            "search_files": {
-                "keywords": ["find", "search", "locate"],
-                "entity_types": ["file_name", "file_type", "search_path"],
-                "patterns": [
-                    r"(?:find|search|locate)\s+(?:file|files)\s+(?:named|called)\s+(.+)",
-                    r"(?:find|search|locate)\s+(.+)\s+(?:file|files)",
-                    r"(?:find|search|locate)\s+(.+)",
-                ]
-            },
-            "create_note": {
-                "keywords": ["note", "remember", "write down"],
-                "entity_types": ["note_content"],
-                "patterns": [
-                    r"(?:create|make|take)\s+(?:a\s+)?note\s+(.+)",
-                    r"(?:remember|write\s+down)\s+(.+)",
-                ]
-            },
-            "create_file": {
-                "keywords": ["create", "make", "new", "file"],
-                "entity_types": ["file_name", "file_path"],
-                "patterns": [
-                    r"(?:create|make)\s+(?:a\s+)?(?:new\s+)?file\s+(?:named|called)\s+(.+)",
-                    r"(?:create|make)\s+(?:a\s+)?(?:new\s+)?file\s+(.+)",
-                ]
-            },
-            "delete_file": {
-                "keywords": ["delete", "remove", "erase"],
-                "entity_types": ["file_name", "file_path"],
-                "patterns": [
-                    r"(?:delete|remove|erase)\s+(?:the\s+)?file\s+(.+)",
-                    r"(?:delete|remove|erase)\s+(.+)",
-                ]
-            },
-            "move_file": {
-                "keywords": ["move", "relocate"],
-                "entity_types": ["source_path", "destination_path"],
-                "patterns": [
-                    r"move\s+(.+)\s+to\s+(.+)",
-                    r"relocate\s+(.+)\s+to\s+(.+)",
-                ]
-            },
-            "copy_file": {
-                "keywords": ["copy", "duplicate"],
-                "entity_types": ["source_path", "destination_path"],
-                "patterns": [
-                    r"copy\s+(.+)\s+to\s+(.+)",
-                    r"duplicate\s+(.+)\s+to\s+(.+)",
-                ]
-            },
-            "shutdown_system": {
-                "keywords": ["shutdown", "power off", "turn off"],
-                "entity_types": [],
-                "patterns": [
-                    r"(?:shutdown|power\s+off|turn\s+off)\s+(?:the\s+)?(?:computer|system|pc)",
-                    r"shutdown",
-                ]
-            },
-            "restart_system": {
-                "keywords": ["restart", "reboot", "computer", "system"],
-                "entity_types": [],
-                "patterns": [
-                    r"(?:restart|reboot)\s+(?:the\s+)?(?:computer|system|pc)",
-                    r"^(?:restart|reboot)$",
-                ]
-            },
-            "manage_wifi": {
-                "keywords": ["wifi", "wi-fi", "wireless"],
-                "entity_types": ["action", "network_name"],
-                "patterns": [
-                    r"(?:turn|switch)\s+(on|off)\s+(?:the\s+)?(?:wifi|wi-fi)",
-                    r"(?:connect|disconnect)\s+(?:to\s+)?(?:wifi|wi-fi)\s+(.+)",
-                    r"(?:wifi|wi-fi)\s+(on|off)",
-                ]
-            },
-            "manage_bluetooth": {
-                "keywords": ["bluetooth"],
-                "entity_types": ["action", "device_name"],
-                "patterns": [
-                    r"(?:turn|switch)\s+(on|off)\s+(?:the\s+)?bluetooth",
-                    r"(?:connect|disconnect)\s+(?:to\s+)?bluetooth\s+(?:device\s+)?(.+)",
-                    r"bluetooth\s+(on|off)",
-                ]
-            },
-            "list_processes": {
-                "keywords": ["list", "show", "processes", "running"],
-                "entity_types": [],
-                "patterns": [
-                    r"(?:list|show)\s+(?:all\s+)?(?:running\s+)?processes",
-                    r"what(?:'s|\s+is)\s+running",
-                ]
-            },
-            "terminate_process": {
-                "keywords": ["kill", "terminate", "stop", "close"],
-                "entity_types": ["process_name", "pid"],
-                "patterns": [
-                    r"(?:kill|terminate|stop|close)\s+(?:the\s+)?process\s+(.+)",
-                    r"(?:kill|terminate|stop|close)\s+(.+)",
-                ]
-            },
-            "read_screen": {
-                "keywords": ["read", "screen", "what's on"],
-                "entity_types": [],
-                "patterns": [
-                    r"(?:read|describe)\s+(?:the\s+)?screen",
-                    r"what(?:'s|\s+is)\s+on\s+(?:the\s+)?screen",
-                ]
-            },
-            "create_reminder": {
-                "keywords": ["remind", "reminder"],
-                "entity_types": ["reminder_content", "time"],
-                "patterns": [
-                    r"remind\s+me\s+to\s+(.+)\s+(?:at|in)\s+(.+)",
-                    r"(?:create|set)\s+(?:a\s+)?reminder\s+(?:to\s+)?(.+)\s+(?:at|in)\s+(.+)",
-                ]
-            },
-            "unknown": {
-                "keywords": [],
-                "entity_types": [],
-                "patterns": []
-            }
-        }
-        
-        # Common words to filter out when extracting entities
-        self.stop_words = {
-            "the", "a", "an", "to", "from", "in", "on", "at", "for", "with",
-            "by", "of", "and", "or", "but", "is", "are", "was", "were",
-            "please", "can", "you", "could", "would"
-        }
+    # parse_batch spreads batches with at least this many distinct commands
+    # across worker processes; smaller batches are parsed inline because
+    # starting the workers costs more than it saves
+    PARALLEL_BATCH_MIN = 2000
+    
+    def __init__(
+        self,
+        cache_size: int = 1024,
+        grammar_path: Optional[Union[str, Path]] = None,
+        reload_interval: Optional[float] = 2.0,
+        app_catalog: Optional['AppCatalog'] = None
+    ):
+        """
+        Initialize the Intent Parser with command patterns and entity extractors.
+        
+        Args:
+            cache_size: Number of parse results to cache (0 disables caching)
+            grammar_path: Grammar file (default: the grammar shipped with PRIME)
+            reload_interval: Seconds between checks for a changed grammar
+                file, or None to never reload it
+            app_catalog: Optional AppCatalog; application names of launch_app
+                intents are replaced by the command of the installed
+                application they name exactly, and names that only resemble
+                one require clarification
+        
+        Raises:
+            FileNotFoundError: If the grammar file doesn't exist.
+            ValueError: If the grammar file is invalid.
+        """
+        self._cache = LRUCache(cache_size) if cache_size > 0 else None
+        self.app_catalog = app_catalog
+        # The grammar (intent patterns, stop words, required entities and
+        # clarification texts) is loaded from a file and reloaded when it changes
+        self._grammar_watcher = GrammarWatcher(grammar_path, reload_interval or 0.0)
+        self._watch_grammar = reload_interval is not None
+        self._apply_grammar(self._grammar_watcher.grammar)
+    
+    @property
+    def intent_patterns(self) -> Dict[str, Dict]:
+        """Intent definitions: keywords, entity types and patterns per intent."""
+        return self._intent_patterns
+    
+    @intent_patterns.setter
+    def intent_patterns(self, intent_patterns: Dict[str, Dict]) -> None:
+        self._intent_patterns = intent_patterns
+        self.compile_patterns()
+    
+    def reload_grammar(self) -> bool:
+        """
+        Reload the grammar file now, even if its modification time is unchanged.
+        
+        Returns:
+            True if a changed grammar was loaded
+        """
+        grammar = self._grammar_watcher.reload()
+        if grammar is None:
+            return False
+        self._apply_grammar(grammar)
+        return True
+    
+    def _apply_grammar(self, grammar: Grammar) -> None:
+        """Use a loaded grammar, replacing any assigned patterns."""
+        self._intent_patterns = grammar.intent_patterns
+        self._matcher = grammar.matcher
+        self.stop_words = set(grammar.stop_words)
+        self.required_entities = grammar.required_entities
+        self.missing_entity_questions = grammar.missing_entity_questions
+        self.intent_descriptions = grammar.intent_descriptions
+        if self._cache is not None:
+            self._cache.clear()
+    
+    def compile_patterns(self) -> None:
+        """Compile intent_patterns into the matcher used by parse, and clear cached results."""
+        self._matcher = IntentMatcher(self._intent_patterns)
+        if self._cache is not None:
+            self._cache.clear()
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get parse cache statistics.
+        
+        Returns:
+            Dictionary with cache stats (hits, misses, size, max_size, hit_rate),
+            all zero if caching is disabled
+        """
+        if self._cache is None:
+            return {"hits": 0, "misses": 0, "size": 0, "max_size": 0, "hit_rate": 0}
+        return self._cache.get_stats()
     
     def parse(self, text: str) -> Intent:
         """
@@ -199,59 +145,121 @@ class IntentParser:
                 requires_clarification=True
             )
         
+        if self._watch_grammar:
+            self._poll_grammar()
+        
         # Normalize the text
         normalized_text = text.lower().strip()
         
-        # Try to match against known patterns
-        best_match = None
-        best_confidence = 0.0
-        matched_entities = []
+        if self._cache is None:
+            return self._resolve_applications(self._parse_normalized(normalized_text))
+        
+        cached = self._cache.get(normalized_text)
+        if cached is None:
+            cached = self._parse_normalized(normalized_text)
+            self._cache.put(normalized_text, cached)
+        # Callers may modify the Intent they get, so the cached one is copied.
+        # Applications are resolved after the cache, so that cached results
+        # follow changes to the catalog
+        return self._resolve_applications(_copy_intent(cached))
+    
+    def parse_batch(self, texts: Iterable[str], workers: Optional[int] = None) -> List[Intent]:
+        """
+        Parse many commands, such as a day's transcripts.
         
-        for intent_type, pattern_info in self.intent_patterns.items():
-            if intent_type == "unknown":
-                continue
-            
-            # Check if any keywords are present
-            keyword_matches = sum(
-                1 for keyword in pattern_info["keywords"]
-                if keyword in normalized_text
-            )
+        Each distinct normalized command is parsed once. Batches with at least
+        PARALLEL_BATCH_MIN distinct commands that are not cached are parsed
+        in worker processes, which use this parser's intent_patterns and
+        stop_words.
+        
+        Args:
+            texts: The natural language command texts
+            workers: Number of worker processes (default: number of CPUs)
             
-            if keyword_matches > 0:
-                # Try to match specific patterns
-                for pattern in pattern_info["patterns"]:
-                    match = re.search(pattern, normalized_text, re.IGNORECASE)
-                    if match:
-                        # Calculate confidence based on keyword matches and pattern match
-                        confidence = min(0.9, 0.5 + (keyword_matches * 0.2))
-                        
-                        if confidence > best_confidence:
-                            best_confidence = confidence
-                            best_match = intent_type
-                            # Extract entities from regex groups
-                            matched_entities = self._extract_entities_from_match(
-                                match, pattern_info["entity_types"]
-                            )
-                        break
-        
-        # If no pattern matched but keywords were found, use keyword-based matching
-        if best_match is None:
-            for intent_type, pattern_info in self.intent_patterns.items():
-                if intent_type == "unknown":
-                    continue
-                
-                keyword_matches = sum(
-                    1 for keyword in pattern_info["keywords"]
-                    if keyword in normalized_text
+        Returns:
+            Intent objects in the order of texts
+        """
+        if self._watch_grammar:
+            self._poll_grammar()
+        
+        texts = list(texts)
+        normalized = [text.lower().strip() if text else "" for text in texts]
+        
+        results: Dict[str, Intent] = {}
+        pending = []
+        for normalized_text in dict.fromkeys(normalized):
+            cached = self._cache.get(normalized_text) if self._cache is not None and normalized_text else None
+            if cached is not None:
+                results[normalized_text] = cached
+            else:
+                pending.append(normalized_text)
+        
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and len(pending) >= self.PARALLEL_BATCH_MIN:
+            chunk_size = -(-len(pending) // workers)
+            chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = executor.map(
+                    _parse_chunk, [self._intent_patterns] * len(chunks), [self.stop_words] * len(chunks), chunks
                 )
-                
-                if keyword_matches > 0:
-                    confidence = min(0.7, 0.3 + (keyword_matches * 0.2))
-                    if confidence > best_confidence:
-                        best_confidence = confidence
-                        best_match = intent_type
-                        # Extract entities using generic extraction
-                        matched_entities = self.extract_entities(normalized_text)
+                intents = [intent for chunk_intents in parsed for intent in chunk_intents]
+        else:
+            intents = [
+                self._parse_normalized(normalized_text) if normalized_text else self.parse(normalized_text)
+                for normalized_text in pending
+            ]
+        
+        for normalized_text, intent in zip(pending, intents):
+            results[normalized_text] = intent
+            if self._cache is not None and normalized_text:
+                self._cache.put(normalized_text, intent)
+        
+        return [self._resolve_applications(_copy_intent(results[normalized_text])) for normalized_text in normalized]
+    
+    def _resolve_applications(self, intent: Intent) -> Intent:
+        """
+        Replace the application names of a launch_app intent by catalog commands.
+        
+        Only exact names and commands are replaced, keeping their arguments.
+        A name that only resembles an application is left as spoken and the
+        intent asks for clarification, so nothing is launched on a guess.
+        """
+        if self.app_catalog is None or intent.intent_type != "launch_app":
+            return intent
+        for entity in intent.entities:
+            if entity.entity_type == "application" and isinstance(entity.value, str):
+                match = self.app_catalog.match(entity.value)
+                if match is None:
+                    continue
+                if match.exact:
+                    entity.value = match.command
+                else:
+                    intent.requires_clarification = True
+        return intent
+    
+    def _poll_grammar(self) -> None:
+        """Apply the grammar file if it changed."""
+        grammar = self._grammar_watcher.poll()
+        if grammar is not None:
+            self._apply_grammar(grammar)
+    
+    def _parse_normalized(self, normalized_text: str) -> Intent:
+        """Parse lower-cased, stripped, non-empty command text."""
+        # Match keywords and patterns of all intents in one pass. Confidence
+        # is based on keyword matches, and is higher if a pattern matched
+        best_match, best_confidence, match = self._matcher.match(normalized_text)
+        
+        if best_match is None:
+            matched_entities = []
+        elif match is not None:
+            # Extract entities from regex groups
+            matched_entities = self._extract_entities_from_match(
+                match, self._matcher.entity_types(best_match)
+            )
+        else:
+            # Keywords were found but no pattern matched: use generic extraction
+            matched_entities = self.extract_entities(normalized_text)
         
         # Determine if clarification is needed
         requires_clarification = (
@@ -316,75 +324,27 @@ class IntentParser:
             text: The command text to extract entities from
             
         Returns:
-            List of Entity objects found in the text
+            List of Entity objects found in the text, in the order they appear
         """
-        entities = []
-        normalized_text = text.lower().strip()
+        return extract_entities(text, self.stop_words)
+    
+    def extract_entity_spans(self, text: str) -> List[EntitySpan]:
+        """
+        Extract entities from text together with their offsets.
         
-        # Extract numbers (potential volume levels, brightness, etc.)
-        number_pattern = r'\b(\d+)\b'
-        for match in re.finditer(number_pattern, normalized_text):
-            entities.append(Entity(
-                entity_type="number",
-                value=int(match.group(1)),
-                confidence=0.9
-            ))
-        
-        # Extract file paths (basic detection)
-        # Windows paths: C:\path\to\file or \\network\path
-        # Unix paths: /path/to/file or ~/path
-        path_patterns = [
-            r'([A-Za-z]:\\(?:[^\s\\]+\\)*[^\s\\]+)',  # Windows absolute
-            r'(\\\\[^\s\\]+(?:\\[^\s\\]+)+)',  # UNC paths
-            r'(/(?:[^\s/]+/)*[^\s/]+)',  # Unix absolute
-            r'(~/(?:[^\s/]+/)*[^\s/]+)',  # Unix home-relative
-        ]
-        
-        for pattern in path_patterns:
-            for match in re.finditer(pattern, text):  # Use original text for paths
-                entities.append(Entity(
-                    entity_type="file_path",
-                    value=match.group(1),
-                    confidence=0.85
-                ))
-        
-        # Extract quoted strings (often file names or specific values)
-        quoted_pattern = r'["\']([^"\']+)["\']'
-        for match in re.finditer(quoted_pattern, text):
-            entities.append(Entity(
-                entity_type="quoted_string",
-                value=match.group(1),
-                confidence=0.9
-            ))
-        
-        # Extract potential application names (capitalized words)
-        app_pattern = r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b'
-        for match in re.finditer(app_pattern, text):
-            app_name = match.group(1)
-            # Filter out common words
-            if app_name.lower() not in self.stop_words:
-                entities.append(Entity(
-                    entity_type="application",
-                    value=app_name,
-                    confidence=0.7
-                ))
-        
-        # Extract direction indicators
-        direction_pattern = r'\b(up|down|increase|decrease|raise|lower|higher|lower)\b'
-        for match in re.finditer(direction_pattern, normalized_text):
-            direction = match.group(1)
-            # Normalize to up/down
-            if direction in ["increase", "raise", "higher"]:
-                direction = "up"
-            elif direction in ["decrease", "lower"]:
-                direction = "down"
-            entities.append(Entity(
-                entity_type="direction",
-                value=direction,
-                confidence=0.85
-            ))
+        The text is scanned once (see prime.nlp.entity_lexer). Where entities
+        overlap, the one with the higher priority is kept: quoted strings,
+        then file paths, numbers, directions and application names, so a
+        number inside a path is not reported on its own.
         
-        return entities
+        Args:
+            text: The command text to extract entities from
+            
+        Returns:
+            Non-overlapping EntitySpan objects in the order they appear, with
+            offsets into text
+        """
+        return scan_entities(text, self.stop_words)
     
     def is_ambiguous(self, intent: Intent) -> bool:
         """
@@ -414,20 +374,8 @@ class IntentParser:
             return True
         
         # Check if required entities are missing for specific intents
-        required_entities = {
-            "launch_app": ["application"],
-            "search_files": ["file_name", "quoted_string", "file_path"],
-            "create_file": ["file_name", "quoted_string", "file_path"],
-            "delete_file": ["file_name", "quoted_string", "file_path"],
-            "move_file": ["source_path", "destination_path"],
-            "copy_file": ["source_path", "destination_path"],
-            "terminate_process": ["process_name", "pid"],
-            "create_note": ["note_content"],
-            "create_reminder": ["reminder_content", "time"],
-        }
-        
-        if intent.intent_type in required_entities:
-            required = required_entities[intent.intent_type]
+        if intent.intent_type in self.required_entities:
+            required = self.required_entities[intent.intent_type]
             entity_types = [e.entity_type for e in intent.entities]
             
             # Check if at least one required entity type is present
@@ -451,46 +399,42 @@ class IntentParser:
         if intent.intent_type == "unknown" or intent.confidence < 0.3:
             return "I'm not sure what you want me to do. Could you please rephrase your request?"
         
+        # Handle application names that only resemble an installed application
+        if intent.intent_type == "launch_app" and self.app_catalog is not None:
+            for entity in intent.entities:
+                if entity.entity_type == "application" and isinstance(entity.value, str):
+                    match = self.app_catalog.match(entity.value)
+                    if match is not None and not match.exact:
+                        return f"Did you mean {match.entry.name}?"
+        
         # Handle low confidence intents
         if intent.confidence < 0.5:
-            intent_descriptions = {
-                "launch_app": "launch an application",
-                "adjust_volume": "adjust the volume",
-                "adjust_brightness": "adjust the brightness",
-                "search_files": "search for files",
-                "create_file": "create a file",
-                "delete_file": "delete a file",
-                "move_file": "move a file",
-                "copy_file": "copy a file",
-                "shutdown_system": "shutdown the system",
-                "restart_system": "restart the system",
-                "manage_wifi": "manage Wi-Fi",
-                "manage_bluetooth": "manage Bluetooth",
-                "list_processes": "list running processes",
-                "terminate_process": "terminate a process",
-                "read_screen": "read the screen",
-                "create_note": "create a note",
-                "create_reminder": "create a reminder",
-            }
-            
-            description = intent_descriptions.get(intent.intent_type, "perform an action")
+            description = self.intent_descriptions.get(intent.intent_type, "perform an action")
             return f"Did you want me to {description}?"
         
         # Handle missing entities
-        missing_entity_questions = {
-            "launch_app": "Which application would you like me to launch?",
-            "search_files": "What file are you looking for?",
-            "create_file": "What should I name the new file?",
-            "delete_file": "Which file would you like me to delete?",
-            "move_file": "Where would you like me to move the file to?",
-            "copy_file": "Where would you like me to copy the file to?",
-            "terminate_process": "Which process would you like me to terminate?",
-            "create_note": "What would you like me to note down?",
-            "create_reminder": "What should I remind you about, and when?",
-        }
-        
-        if intent.intent_type in missing_entity_questions:
-            return missing_entity_questions[intent.intent_type]
+        if intent.intent_type in self.missing_entity_questions:
+            return self.missing_entity_questions[intent.intent_type]
         
         # Default clarification
         return "Could you provide more details about what you'd like me to do?"
+
+
+def _copy_intent(intent: Intent) -> Intent:
+    """Copy an Intent and its entities."""
+    return Intent(
+        intent_type=intent.intent_type,
+        entities=[Entity(e.entity_type, e.value, e.confidence) for e in intent.entities],
+        confidence=intent.confidence,
+        requires_clarification=intent.requires_clarification
+    )
+
+
+def _parse_chunk(
+    intent_patterns: Dict[str, Dict], stop_words: Set[str], texts: List[str]
+) -> List[Intent]:
+    """Parse normalized commands in a worker process."""
+    parser = IntentParser(cache_size=0, reload_interval=None)
+    parser.intent_patterns = intent_patterns
+    parser.stop_words = stop_words
+    return [parser.parse(text) for text in texts]
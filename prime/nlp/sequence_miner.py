@@ -0,0 +1,210 @@
+"""Streaming command sequence miner for PRIME.
+
+The miner counts the sequences (n-grams) of consecutive commands of a user
+as commands arrive. Adding a command updates the counts of the few sequences
+ending with it and forgets the sequences starting with the command that falls
+out of the window, so the cost per command does not depend on the window
+size. Sequences do not span gaps longer than max_gap_seconds between
+commands, so unrelated sittings are not joined.
+"""
+
+import heapq
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+# Version of the dictionary written by to_dict
+_STATE_VERSION = 1
+
+# A sequence is left out of top_k when a sequence one command longer
+# containing it occurred at least this share of its occurrences
+_EXTENSION_SHARE = 0.75
+
+
+@dataclass
+class SequenceCount:
+    """A repeated command sequence.
+
+    Attributes:
+        commands: The commands of the sequence, in order
+        frequency: Number of times the sequence occurred in the window
+        last_occurrence: When the sequence last ended
+    """
+    commands: Tuple[str, ...]
+    frequency: int
+    last_occurrence: datetime
+
+
+class SequenceMiner:
+    """Counts repeated command sequences over a sliding window of commands."""
+
+    def __init__(
+        self,
+        min_length: int = 2,
+        max_length: int = 4,
+        window: int = 200,
+        max_gap_seconds: float = 1800.0,
+        min_support: int = 3
+    ):
+        """
+        Initialize an empty miner.
+
+        Args:
+            min_length: Shortest sequence counted
+            max_length: Longest sequence counted
+            window: Number of recent commands whose sequences are counted
+            max_gap_seconds: Longest pause between two commands of a sequence
+            min_support: Occurrences needed for a sequence to be reported
+
+        Raises:
+            ValueError: If the lengths, window or support are out of range.
+        """
+        if not 1 <= min_length <= max_length or window < 1 or min_support < 1:
+            raise ValueError("Invalid sequence miner settings")
+        self.min_length = min_length
+        self.max_length = max_length
+        self.window = window
+        self.max_gap_seconds = max_gap_seconds
+        self.min_support = min_support
+
+        # (timestamp, command, sequences starting with the command)
+        self._events: Deque[Tuple[float, str, List[Tuple[str, ...]]]] = deque()
+        # Previous commands of the current run, for the sequences of the next one
+        self._run: Deque[str] = deque(maxlen=max(max_length - 1, 1))
+        self._last_time: Optional[float] = None
+        self._counts: Dict[Tuple[str, ...], int] = {}
+        self._last_seen: Dict[Tuple[str, ...], float] = {}
+        # Sequences with at least min_support occurrences, and whether each
+        # is a shorter sequence repeated
+        self._frequent: Dict[Tuple[str, ...], bool] = {}
+
+    def __len__(self) -> int:
+        """Number of commands in the window."""
+        return len(self._events)
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        """POSIX time of the latest command added, or None if there is none."""
+        return self._last_time
+
+    def add(self, command: str, timestamp: Optional[datetime] = None) -> None:
+        """
+        Add a command and count the sequences ending with it.
+
+        Args:
+            command: The command (e.g. its intent type)
+            timestamp: When the command was run (default: now)
+        """
+        now = (timestamp or datetime.now()).timestamp()
+        if self._last_time is not None and now - self._last_time > self.max_gap_seconds:
+            self._run.clear()
+        self._last_time = now
+
+        events = self._events
+        events.append((now, command, []))
+        if len(events) > self.window:
+            _, _, expired = events.popleft()
+            for sequence in expired:
+                count = self._counts[sequence] - 1
+                if count == 0:
+                    del self._counts[sequence]
+                    del self._last_seen[sequence]
+                else:
+                    self._counts[sequence] = count
+                if count == self.min_support - 1:
+                    self._frequent.pop(sequence, None)
+
+        previous = tuple(self._run)
+        for length in range(self.min_length, self.max_length + 1):
+            if length - 1 > len(previous) or length > len(events):
+                break
+            sequence = previous[len(previous) - length + 1:] + (command,)
+            count = self._counts.get(sequence, 0) + 1
+            self._counts[sequence] = count
+            self._last_seen[sequence] = now
+            if count == self.min_support:
+                self._frequent[sequence] = _is_periodic(sequence)
+            # Forgotten when the command starting it leaves the window
+            events[-length][2].append(sequence)
+        self._run.append(command)
+
+    def count(self, commands: Tuple[str, ...]) -> int:
+        """Number of times a sequence occurred in the window."""
+        return self._counts.get(tuple(commands), 0)
+
+    def top_k(self, k: int = 3) -> List[SequenceCount]:
+        """
+        Get the best candidate sequences for automation.
+
+        Sequences are ranked by frequency, then length, then how recently
+        they occurred. A sequence is left out when most of its occurrences
+        are part of a longer routine (A, B within A, B, C), or when it is
+        part of a better ranked routine repeated (for A, B, C: B, C, A or
+        C, A, B, C), so each routine is reported once and in full.
+
+        Args:
+            k: Maximum number of sequences
+
+        Returns:
+            SequenceCount objects, best first
+        """
+        counts, last_seen = self._counts, self._last_seen
+        # Highest count of a routine one command longer than each sequence
+        extended: Dict[Tuple[str, ...], int] = {}
+        for sequence, periodic in self._frequent.items():
+            if not periodic and len(sequence) > self.min_length:
+                count = counts[sequence]
+                for part in (sequence[:-1], sequence[1:]):
+                    if extended.get(part, 0) < count:
+                        extended[part] = count
+        ranked = [
+            (-counts[sequence], -len(sequence), -last_seen[sequence], sequence)
+            for sequence in self._frequent
+            if extended.get(sequence, 0) < _EXTENSION_SHARE * counts[sequence]
+        ]
+        heapq.heapify(ranked)
+        selected: List[Tuple[str, ...]] = []
+        while ranked and len(selected) < k:
+            sequence = heapq.heappop(ranked)[-1]
+            if not any(_repeats(other, sequence) for other in selected):
+                selected.append(sequence)
+        return [
+            SequenceCount(sequence, counts[sequence], datetime.fromtimestamp(last_seen[sequence]))
+            for sequence in selected
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the commands in the window, for storage."""
+        return {
+            'version': _STATE_VERSION,
+            'events': [[timestamp, command] for timestamp, command, _ in self._events],
+        }
+
+    def load_dict(self, state: Dict[str, Any]) -> None:
+        """
+        Add the commands stored by to_dict.
+
+        Args:
+            state: Dictionary written by to_dict
+
+        Raises:
+            ValueError: If the state was written by an unsupported version.
+        """
+        if state.get('version') != _STATE_VERSION:
+            raise ValueError(f"Unsupported sequence miner state version: {state.get('version')}")
+        for timestamp, command in state['events']:
+            self.add(command, datetime.fromtimestamp(timestamp))
+
+
+def _repeats(sequence: Tuple[str, ...], part: Tuple[str, ...]) -> bool:
+    """Check whether part occurs as consecutive commands of sequence run repeatedly."""
+    repeated = sequence * (len(part) // len(sequence) + 2)
+    n = len(part)
+    return any(repeated[i:i + n] == part for i in range(len(repeated) - n + 1))
+
+
+def _is_periodic(sequence: Tuple[str, ...]) -> bool:
+    """Check whether sequence is a shorter sequence repeated (A, B, A or A, B, A, B)."""
+    return any(sequence[p:] == sequence[:-p] for p in range(1, len(sequence)))
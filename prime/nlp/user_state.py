@@ -0,0 +1,289 @@
+"""Bounded per-user state for the Context Engine.
+
+The Context Engine keeps some state of each user in memory: the learned
+corrections, their compiled rewriter and the command sequence counts.
+UserStateCache holds this state for the users seen recently. A user's state
+is loaded on first use, and users are evicted least recently used first when
+there are more than max_users, when their estimated size exceeds the memory
+budget, or when they have been idle for longer than the TTL. An on_evict
+callback is told of every state dropped, so changes not yet persisted can be
+saved, and an evicted user is simply loaded again.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from prime.nlp.correction_rewriter import CorrectionRewriter
+from prime.nlp.sequence_miner import SequenceMiner
+
+
+# Approximate memory use, in bytes, of a user's state without corrections or
+# commands, of a correction besides its text, of a character of correction
+# text (kept in the list and in the compiled rewriter) and of a command in
+# the sequence window with the sequences it counts
+_STATE_BYTES = 2500
+_CORRECTION_BYTES = 150
+_CORRECTION_CHAR_BYTES = 4
+_COMMAND_BYTES = 600
+
+
+class UserState:
+    """In-memory state of one user."""
+
+    def __init__(self, corrections: Sequence[Tuple[str, str]], sequences: SequenceMiner):
+        """
+        Initialize the state.
+
+        Args:
+            corrections: (original, corrected) pairs, oldest first
+            sequences: The user's command sequence miner
+        """
+        self.sequences = sequences
+        # Whether commands were added to the miner since it was stored
+        self.sequences_changed = False
+        self.set_corrections(corrections)
+
+    def set_corrections(self, corrections: Sequence[Tuple[str, str]]) -> None:
+        """Replace the corrections and recompile the rewriter."""
+        self.corrections: List[Tuple[str, str]] = list(corrections)
+        self.rewriter = CorrectionRewriter(self.corrections)
+        self._corrections_size = sum(
+            _CORRECTION_BYTES + _CORRECTION_CHAR_BYTES * (len(original) + len(corrected))
+            for original, corrected in self.corrections
+        )
+
+    def estimated_size(self) -> int:
+        """Approximate memory use of the state, in bytes."""
+        return _STATE_BYTES + self._corrections_size + _COMMAND_BYTES * len(self.sequences)
+
+
+class UserStateCache:
+    """Least recently used cache of user states, loaded on a miss."""
+
+    def __init__(
+        self,
+        load: Callable[[str], UserState],
+        max_users: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        memory_budget_bytes: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[str, UserState], None]] = None
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            load: Loads a user's state from storage
+            max_users: Most users kept (None for no limit)
+            ttl_seconds: Idle time after which a user is evicted (None to
+                keep idle users)
+            memory_budget_bytes: Most estimated memory used by the states
+                (None for no limit). The most recently used user is kept
+                even if its state alone is larger.
+            clock: Time source for the TTL, in seconds
+            on_evict: Called with the user id and state of every user
+                evicted, expired or cleared, outside the cache's lock
+
+        Raises:
+            ValueError: If a limit is not positive.
+        """
+        if (max_users is not None and max_users < 1) or \
+                (ttl_seconds is not None and ttl_seconds <= 0) or \
+                (memory_budget_bytes is not None and memory_budget_bytes <= 0):
+            raise ValueError("User state cache limits must be positive")
+        self._load = load
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+        self._clock = clock
+        self._on_evict = on_evict
+
+        # user_id -> [state, estimated size, last use], least recently used first
+        self._entries: 'OrderedDict[str, List[Any]]' = OrderedDict()
+        self._memory = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    def user_ids(self) -> List[str]:
+        """Get the users in memory, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, user_id: str) -> UserState:
+        """
+        Get a user's state, loading it if it is not in memory.
+
+        Args:
+            user_id: The user identifier
+
+        Returns:
+            The user's state
+        """
+        with self._lock:
+            dropped = self._expire()
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self.hits += 1
+                entry[2] = self._clock()
+                self._entries.move_to_end(user_id)
+                state = entry[0]
+            else:
+                self.misses += 1
+                state = None
+        self._notify(dropped)
+        if state is not None:
+            return state
+
+        # Load without the lock, so other users are not held up by storage
+        state = self._load(user_id)
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                # Loaded meanwhile by another thread
+                return entry[0]
+            size = state.estimated_size()
+            self._entries[user_id] = [state, size, self._clock()]
+            self._memory += size
+            dropped = self._evict_over_limits()
+        self._notify(dropped)
+        return state
+
+    def peek(self, user_id: str) -> Optional[UserState]:
+        """Get a user's state if it is in memory, without counting a use."""
+        entry = self._entries.get(user_id)
+        return entry[0] if entry is not None else None
+
+    def resize(self, user_id: str) -> None:
+        """
+        Re-estimate a user's state after it changed, evicting other users
+        if the memory budget is now exceeded.
+
+        Args:
+            user_id: The user identifier
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return
+            size = entry[0].estimated_size()
+            self._memory += size - entry[1]
+            entry[1] = size
+            dropped = self._evict_over_limits()
+        self._notify(dropped)
+
+    def evict(self, user_id: str) -> bool:
+        """
+        Drop a user's state from memory.
+
+        Returns:
+            True if the user was in memory
+        """
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry is None:
+                return False
+            self._memory -= entry[1]
+            self.evictions += 1
+        self._notify([(user_id, entry[0])])
+        return True
+
+    def clear(self) -> None:
+        """Drop every state and reset the statistics."""
+        with self._lock:
+            dropped = [(user_id, entry[0]) for user_id, entry in self._entries.items()]
+            self._entries.clear()
+            self._memory = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+        self._notify(dropped)
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate (percent), evictions (for
+            the user or memory limit, or by evict), expirations (idle users),
+            users, max_users, memory_bytes and memory_budget_bytes
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total * 100) if total > 0 else 0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "users": len(self._entries),
+                "max_users": self.max_users,
+                "memory_bytes": self._memory,
+                "memory_budget_bytes": self.memory_budget_bytes,
+            }
+
+    def _expire(self) -> List[Tuple[str, UserState]]:
+        """Evict the users idle for longer than the TTL; returns them."""
+        dropped: List[Tuple[str, UserState]] = []
+        if self.ttl_seconds is None:
+            return dropped
+        deadline = self._clock() - self.ttl_seconds
+        while self._entries:
+            user_id, entry = next(iter(self._entries.items()))
+            if entry[2] > deadline:
+                break
+            del self._entries[user_id]
+            self._memory -= entry[1]
+            self.expirations += 1
+            dropped.append((user_id, entry[0]))
+        return dropped
+
+    def _evict_over_limits(self) -> List[Tuple[str, UserState]]:
+        """Evict least recently used users until the limits are met; returns them."""
+        dropped: List[Tuple[str, UserState]] = []
+        while len(self._entries) > 1 and (
+            (self.max_users is not None and len(self._entries) > self.max_users) or
+            (self.memory_budget_bytes is not None and self._memory > self.memory_budget_bytes)
+        ):
+            user_id, entry = self._entries.popitem(last=False)
+            self._memory -= entry[1]
+            self.evictions += 1
+            dropped.append((user_id, entry[0]))
+        return dropped
+
+    def _notify(self, dropped: List[Tuple[str, UserState]]) -> None:
+        """Pass dropped states to the on_evict callback."""
+        if self._on_evict is not None:
+            for user_id, state in dropped:
+                self._on_evict(user_id, state)
+
+
+class UserStateView(Mapping):
+    """Read-only mapping of the users in memory to one attribute of their state."""
+
+    def __init__(self, cache: UserStateCache, attribute: str):
+        self._cache = cache
+        self._attribute = attribute
+
+    def __getitem__(self, user_id: str) -> Any:
+        state = self._cache.peek(user_id)
+        if state is None:
+            raise KeyError(user_id)
+        return getattr(state, self._attribute)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._cache.user_ids())
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -1,5 +1,26 @@
 """Persistence layer components."""
 
 from .memory_manager import MemoryManager, derive_key_from_password
+from .key_derivation import DerivedKeyCache, default_kdf_params
+from .reminder_scheduler import ReminderScheduler
+from .maintenance import MaintenanceWorker, MaintenanceReport
+from .storage_backend import (
+    StorageBackend,
+    FileStorageBackend,
+    SQLiteStorageBackend,
+    migrate_storage,
+)
 
-__all__ = ['MemoryManager', 'derive_key_from_password']
+__all__ = [
+    'MemoryManager',
+    'derive_key_from_password',
+    'DerivedKeyCache',
+    'default_kdf_params',
+    'ReminderScheduler',
+    'MaintenanceWorker',
+    'MaintenanceReport',
+    'StorageBackend',
+    'FileStorageBackend',
+    'SQLiteStorageBackend',
+    'migrate_storage',
+]
@@ -0,0 +1,331 @@
+"""Password-based key derivation for PRIME.
+
+This module provides:
+- derive_key_from_password: PBKDF2 (default) or scrypt key derivation, with
+  a process-local cache so that repeatedly unlocking the same store does not
+  pay the KDF cost every time
+- DerivedKeyCache: the size-bounded, TTL-expiring cache behind it. Entries
+  are keyed by an HMAC of the password, salt and KDF parameters under a
+  per-process secret, and key material is zeroized when evicted
+- unlock_key_store: password unlocking for a store. A random data key is
+  wrapped with the password-derived key and saved, together with the KDF
+  parameters, in the store's 'keystore' collection. Later opens verify the
+  password by unwrapping the data key and can upgrade the KDF by re-wrapping
+  it, without re-encrypting any records
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+from cryptography.hazmat.backends import default_backend
+
+from prime.persistence.storage_backend import StorageBackend
+
+
+# PBKDF2 iterations, OWASP recommendation as of 2023
+PBKDF2_ITERATIONS = 480000
+
+# scrypt cost parameters (32 MiB of memory per derivation)
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# Version of the key store record format
+KEY_STORE_VERSION = 1
+
+# Collection and record id of the key store record
+KEY_STORE_COLLECTION = 'keystore'
+KEY_STORE_RECORD = 'kdf'
+
+
+def default_kdf_params(algorithm: str = 'pbkdf2') -> Dict[str, Any]:
+    """Get the default parameters of a key derivation function.
+
+    Args:
+        algorithm: 'pbkdf2' (PBKDF2-HMAC-SHA256) or 'scrypt'.
+
+    Returns:
+        A JSON-serializable parameter dictionary.
+
+    Raises:
+        ValueError: If the algorithm is unknown.
+    """
+    if algorithm == 'pbkdf2':
+        return {'algorithm': 'pbkdf2', 'iterations': PBKDF2_ITERATIONS}
+    if algorithm == 'scrypt':
+        return {'algorithm': 'scrypt', 'n': SCRYPT_N, 'r': SCRYPT_R, 'p': SCRYPT_P}
+    raise ValueError(f"Unknown key derivation function: {algorithm!r}")
+
+
+def _derive(password: str, salt: bytes, kdf_params: Dict[str, Any]) -> bytes:
+    """Run the key derivation function, without caching."""
+    algorithm = kdf_params.get('algorithm')
+    if algorithm == 'pbkdf2':
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=kdf_params['iterations'],
+            backend=default_backend()
+        )
+    elif algorithm == 'scrypt':
+        kdf = Scrypt(
+            salt=salt,
+            length=32,
+            n=kdf_params['n'],
+            r=kdf_params['r'],
+            p=kdf_params['p'],
+            backend=default_backend()
+        )
+    else:
+        raise ValueError(f"Unknown key derivation function: {algorithm!r}")
+    return kdf.derive(password.encode())
+
+
+class DerivedKeyCache:
+    """
+    Size-bounded, TTL-expiring cache of derived keys.
+
+    Passwords are never stored: entries are looked up by an HMAC-SHA256 of
+    the password, salt and KDF parameters under a random per-process secret.
+    Keys are held in bytearrays that are overwritten with zeros when an entry
+    expires, is evicted or the cache is cleared. Copies handed to callers are
+    outside the cache's control.
+    """
+
+    def __init__(self, max_size: int = 16, ttl_seconds: float = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of keys to keep
+            ttl_seconds: Time after which a cached key expires
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._secret = os.urandom(32)
+        self._entries: 'OrderedDict[bytes, Tuple[bytearray, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _cache_key(self, password: str, salt: bytes, kdf_params: Dict[str, Any]) -> bytes:
+        """Compute the lookup key for a derivation."""
+        message = b'\0'.join([
+            json.dumps(kdf_params, sort_keys=True).encode(),
+            len(salt).to_bytes(4, 'big') + salt,
+            password.encode(),
+        ])
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def get(self, password: str, salt: bytes, kdf_params: Dict[str, Any]) -> Optional[bytes]:
+        """
+        Look up a derived key.
+
+        Returns:
+            The derived key, or None if it is not cached or has expired
+        """
+        cache_key = self._cache_key(password, salt, kdf_params)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            key, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._evict(cache_key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return bytes(key)
+
+    def put(self, password: str, salt: bytes, kdf_params: Dict[str, Any], key: bytes) -> None:
+        """Cache a derived key, evicting the least recently used one if full."""
+        if self.max_size <= 0:
+            return
+        cache_key = self._cache_key(password, salt, kdf_params)
+        with self._lock:
+            if cache_key in self._entries:
+                self._evict(cache_key)
+            while len(self._entries) >= self.max_size:
+                self._evict(next(iter(self._entries)))
+            self._entries[cache_key] = (bytearray(key), time.monotonic() + self.ttl_seconds)
+
+    def cleanup_expired(self) -> int:
+        """
+        Remove expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [cache_key for cache_key, (_, expires_at) in self._entries.items() if now >= expires_at]
+            for cache_key in expired:
+                self._evict(cache_key)
+        return len(expired)
+
+    def clear(self) -> None:
+        """Remove and zeroize all cached keys."""
+        with self._lock:
+            for cache_key in list(self._entries):
+                self._evict(cache_key)
+
+    def _evict(self, cache_key: bytes) -> None:
+        """Remove an entry and zeroize its key. Must be called with _lock held."""
+        key, _ = self._entries.pop(cache_key)
+        for i in range(len(key)):
+            key[i] = 0
+
+
+# Process-wide cache used by derive_key_from_password
+_key_cache = DerivedKeyCache()
+
+
+def get_derived_key_cache() -> DerivedKeyCache:
+    """Get the process-wide derived key cache."""
+    return _key_cache
+
+
+def derive_key_from_password(
+    password: str,
+    salt: bytes,
+    kdf_params: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True
+) -> bytes:
+    """Derive an encryption key from a password.
+
+    This utility function can be used to generate an encryption key from a
+    user password, allowing password-based encryption. The derived key is
+    base64-encoded to be compatible with Fernet. Derived keys are kept in a
+    process-local cache, so deriving the same key again is cheap.
+
+    Args:
+        password: The password to derive the key from.
+        salt: A random salt value (should be at least 16 bytes).
+        kdf_params: Optional KDF parameters (see default_kdf_params).
+            Defaults to PBKDF2-HMAC-SHA256 with 480000 iterations.
+        use_cache: Whether to use the process-local derived key cache.
+
+    Returns:
+        A 32-byte base64-encoded encryption key suitable for use with Fernet.
+
+    Raises:
+        ValueError: If kdf_params names an unknown algorithm.
+    """
+    if kdf_params is None:
+        kdf_params = default_kdf_params()
+
+    if use_cache:
+        cached = _key_cache.get(password, salt, kdf_params)
+        if cached is not None:
+            return cached
+
+    # Fernet requires base64-encoded keys
+    key = base64.urlsafe_b64encode(_derive(password, salt, kdf_params))
+    if use_cache:
+        _key_cache.put(password, salt, kdf_params, key)
+    return key
+
+
+def _is_weaker(stored: Dict[str, Any], requested: Dict[str, Any]) -> bool:
+    """Check whether stored KDF parameters should be upgraded to the requested ones."""
+    if stored['algorithm'] != requested['algorithm']:
+        # scrypt is memory-hard; never switch back to PBKDF2 automatically
+        return requested['algorithm'] == 'scrypt'
+    if stored['algorithm'] == 'pbkdf2':
+        return stored['iterations'] < requested['iterations']
+    return (stored['n'] * stored['r'] * stored['p']) < (requested['n'] * requested['r'] * requested['p'])
+
+
+def unlock_key_store(
+    backend: StorageBackend,
+    password: str,
+    kdf_params: Optional[Dict[str, Any]] = None,
+    legacy_salt: Optional[bytes] = None,
+    upgrade: bool = True
+) -> bytes:
+    """Get a store's data key, unlocking it with a password.
+
+    The first time a store is unlocked a data key is created (a random one,
+    or for stores previously encrypted with derive_key_from_password, the key
+    derived from legacy_salt) and saved wrapped with the password-derived key
+    along with the KDF parameters and salt. Later unlocks derive the wrapping
+    key with the recorded parameters. If kdf_params are stronger than the
+    recorded ones and upgrade is True, the data key is re-wrapped with them.
+
+    Args:
+        backend: The storage backend of the store.
+        password: The store password.
+        kdf_params: KDF parameters for new or upgraded key stores. Defaults
+            to PBKDF2 (see default_kdf_params).
+        legacy_salt: Salt the store's records were encrypted with via
+            derive_key_from_password, for stores created before key stores.
+        upgrade: Whether to upgrade weaker recorded KDF parameters.
+
+    Returns:
+        The data key to pass to MemoryManager as encryption_key.
+
+    Raises:
+        ValueError: If the password is incorrect or the key store is
+            unsupported.
+    """
+    if kdf_params is None:
+        kdf_params = default_kdf_params()
+
+    stored_data = backend.read(KEY_STORE_COLLECTION, KEY_STORE_RECORD)
+    if stored_data is None:
+        if legacy_salt is not None:
+            data_key = derive_key_from_password(password, legacy_salt)
+        else:
+            data_key = Fernet.generate_key()
+        _write_key_store(backend, password, kdf_params, data_key)
+        return data_key
+
+    key_store = json.loads(stored_data.decode('utf-8'))
+    if key_store.get('version') != KEY_STORE_VERSION:
+        raise ValueError(f"Unsupported key store version: {key_store.get('version')}")
+
+    stored_params = key_store['kdf']
+    wrapping_key = derive_key_from_password(
+        password, base64.b64decode(key_store['salt']), stored_params
+    )
+    try:
+        data_key = Fernet(wrapping_key).decrypt(key_store['wrapped_key'].encode('ascii'))
+    except InvalidToken:
+        raise ValueError("Incorrect password for key store") from None
+
+    if upgrade and _is_weaker(stored_params, kdf_params):
+        _write_key_store(backend, password, kdf_params, data_key)
+    return data_key
+
+
+def _write_key_store(
+    backend: StorageBackend, password: str, kdf_params: Dict[str, Any], data_key: bytes
+) -> None:
+    """Wrap a data key with a freshly salted password-derived key and save it."""
+    salt = os.urandom(16)
+    wrapping_key = derive_key_from_password(password, salt, kdf_params)
+    key_store = {
+        'version': KEY_STORE_VERSION,
+        'kdf': kdf_params,
+        'salt': base64.b64encode(salt).decode('ascii'),
+        'wrapped_key': Fernet(wrapping_key).encrypt(data_key).decode('ascii'),
+    }
+    backend.write(KEY_STORE_COLLECTION, KEY_STORE_RECORD, json.dumps(key_store).encode('utf-8'))
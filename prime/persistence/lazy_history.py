@@ -0,0 +1,140 @@
+"""Lazily materialized session command history for PRIME.
+
+Sessions loaded by the Memory Manager hold a LazyHistory instead of a list.
+It keeps each stored command record in its parsed, still serialized form (a
+JSON dictionary or a binary codec list) and builds the CommandRecord, with
+its Command, Intent, Entity and CommandResult objects, only when the record
+is first accessed. Callers that look at the last few commands of a long
+session therefore only pay for those.
+
+Records that were never accessed are written back in their stored form when
+the session is saved again, so rewriting a snapshot does not materialize the
+whole history either.
+"""
+
+from collections.abc import MutableSequence
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+from prime.models.data_models import CommandRecord
+
+
+# Builds a CommandRecord from its stored form
+RecordDecoder = Callable[[Any], CommandRecord]
+
+
+class LazyHistory(MutableSequence):
+    """A list of CommandRecords that are decoded on first access.
+
+    Behaves like a list: it supports indexing, slicing, iteration (oldest
+    first), reversed() (newest first), append/extend and comparison with
+    lists. Decoded records are kept, so repeated accesses return the same
+    object.
+    """
+
+    __slots__ = ('_items',)
+
+    def __init__(self, stored: Any = (), decode: Optional[RecordDecoder] = None):
+        """Initialize the history.
+
+        Args:
+            stored: Records in their stored form, oldest first, or
+                CommandRecords if decode is None.
+            decode: Converter from the stored form to a CommandRecord.
+        """
+        # Each item is a CommandRecord or a (decode, stored record) tuple
+        self._items: List[Union[CommandRecord, Tuple[RecordDecoder, Any]]] = []
+        if decode is not None:
+            self.extend_stored(stored, decode)
+        else:
+            self.extend(stored)
+
+    def extend_stored(self, stored: Any, decode: RecordDecoder) -> None:
+        """Append records in their stored form without decoding them."""
+        self._items.extend((decode, record) for record in stored)
+
+    @property
+    def decoded_count(self) -> int:
+        """Number of records that have been decoded or added as objects."""
+        return sum(1 for item in self._items if type(item) is not tuple)
+
+    def _record(self, index: int) -> CommandRecord:
+        item = self._items[index]
+        if type(item) is tuple:
+            decode, stored = item
+            item = self._items[index] = decode(stored)
+        return item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self._items)))]
+        return self._record(index)
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        if isinstance(index, slice):
+            self._items[index] = list(value)
+        else:
+            self._items[index] = value
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        del self._items[index]
+
+    def insert(self, index: int, value: CommandRecord) -> None:
+        self._items.insert(index, value)
+
+    def append(self, value: CommandRecord) -> None:
+        self._items.append(value)
+
+    def copy(self) -> 'LazyHistory':
+        """Get a shallow copy, without decoding any record."""
+        clone = LazyHistory()
+        clone._items = list(self._items)
+        return clone
+
+    def __iter__(self) -> Iterator[CommandRecord]:
+        for index in range(len(self._items)):
+            yield self._record(index)
+
+    def __reversed__(self) -> Iterator[CommandRecord]:
+        for index in range(len(self._items) - 1, -1, -1):
+            yield self._record(index)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (list, LazyHistory)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"LazyHistory({len(self._items)} records, {self.decoded_count} decoded)"
+
+    def export(self, decode: RecordDecoder, encode: Callable[[CommandRecord], Any]) -> List[Any]:
+        """Convert every record to a stored form.
+
+        Records still held in the stored form that decode reads are returned
+        as they are; all others are converted with encode.
+
+        Args:
+            decode: The decoder of the target stored form.
+            encode: Converter from a CommandRecord to the target stored form.
+
+        Returns:
+            The records in the target stored form, oldest first.
+        """
+        exported = []
+        for index, item in enumerate(self._items):
+            if type(item) is tuple and item[0] is decode:
+                exported.append(item[1])
+            else:
+                exported.append(encode(self._record(index)))
+        return exported
+
+
+def export_history(
+    history: Any, decode: RecordDecoder, encode: Callable[[CommandRecord], Any]
+) -> List[Any]:
+    """Convert a command history, lazy or not, to a stored form."""
+    if isinstance(history, LazyHistory):
+        return history.export(decode, encode)
+    return [encode(record) for record in history]
@@ -0,0 +1,215 @@
+"""Storage maintenance worker for PRIME.
+
+The MaintenanceWorker runs in a background thread and keeps the store within
+the limits set in Config:
+
+- Sessions inactive for longer than SESSION_RETENTION_DAYS are deleted
+- Completed reminders are moved to the reminder archive
+- Session journals are folded into their snapshots
+- Space left behind by deleted records is reclaimed
+- If the store is still larger than MAX_STORAGE_GB, older sessions are
+  deleted until it fits
+
+Work is done in small batches with a pause between them, so a maintenance
+pass never holds the store's record locks for long and leaves most of the
+I/O to the interactive path. The store size is tracked incrementally by the
+storage backend, so checking the quota does not walk the store.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+
+from prime.persistence.memory_manager import MemoryManager
+from prime.utils.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MaintenanceReport:
+    """Outcome of one maintenance pass."""
+    started_at: datetime = field(default_factory=datetime.now)
+    run_time_seconds: float = 0.0
+    size_before: int = 0
+    size_after: int = 0
+    sessions_expired: int = 0
+    reminders_archived: int = 0
+    journals_compacted: int = 0
+    quota_sessions_deleted: int = 0
+    over_quota: bool = False
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        """Bytes freed by the pass (never negative)."""
+        return max(0, self.size_before - self.size_after)
+
+
+class MaintenanceWorker:
+    """
+    Enforces session retention and the storage quota in the background.
+
+    Attributes:
+        _memory_manager: MemoryManager whose store is maintained
+        _interval_seconds: Time between maintenance passes
+        _max_storage_bytes: Storage quota in bytes
+        _retention_days: Days to keep inactive sessions
+        _batch_size: Records deleted or compacted per batch
+        _batch_pause_seconds: Pause between batches
+        _min_journal_bytes: Smallest session journal worth compacting
+        last_report: Report of the most recent pass, if any
+    """
+
+    def __init__(
+        self,
+        memory_manager: MemoryManager,
+        interval_seconds: float = 3600.0,
+        max_storage_bytes: Optional[int] = None,
+        retention_days: Optional[float] = None,
+        batch_size: int = 50,
+        batch_pause_seconds: float = 0.5,
+        min_journal_bytes: int = 4096
+    ):
+        """
+        Initialize the Maintenance Worker.
+
+        Args:
+            memory_manager: MemoryManager whose store is maintained
+            interval_seconds: Time between maintenance passes (default: 1 hour)
+            max_storage_bytes: Storage quota. Defaults to Config.MAX_STORAGE_GB.
+            retention_days: Days to keep inactive sessions. Defaults to
+                Config.SESSION_RETENTION_DAYS.
+            batch_size: Records deleted or compacted per batch (default: 50)
+            batch_pause_seconds: Pause between batches (default: 0.5s)
+            min_journal_bytes: Smallest session journal worth compacting
+                (default: 4 KiB)
+        """
+        if max_storage_bytes is None:
+            max_storage_bytes = Config.MAX_STORAGE_GB * 1024 ** 3
+        if retention_days is None:
+            retention_days = Config.SESSION_RETENTION_DAYS
+
+        self._memory_manager = memory_manager
+        self._interval_seconds = interval_seconds
+        self._max_storage_bytes = max_storage_bytes
+        self._retention_days = retention_days
+        self._batch_size = batch_size
+        self._batch_pause_seconds = batch_pause_seconds
+        self._min_journal_bytes = min_journal_bytes
+        self.last_report: Optional[MaintenanceReport] = None
+        self._pass_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> MaintenanceReport:
+        """
+        Run one maintenance pass.
+
+        Returns:
+            MaintenanceReport describing what was done
+        """
+        with self._pass_lock:
+            manager = self._memory_manager
+            report = MaintenanceReport(size_before=manager.storage_size())
+            start = time.perf_counter()
+
+            report.sessions_expired = self._in_batches(
+                lambda limit: manager.delete_expired_sessions(self._retention_days, limit=limit)
+            )
+            report.reminders_archived = manager.archive_all_completed_reminders()
+            report.journals_compacted = self._in_batches(
+                lambda limit: manager.compact_sessions(self._min_journal_bytes, limit=limit)
+            )
+            manager.compact_storage()
+            report.quota_sessions_deleted = self._enforce_quota()
+
+            report.size_after = manager.storage_size()
+            report.over_quota = report.size_after > self._max_storage_bytes
+            report.run_time_seconds = time.perf_counter() - start
+            self.last_report = report
+
+        logger.info(
+            f"Storage maintenance reclaimed {report.reclaimed_bytes} bytes "
+            f"in {report.run_time_seconds:.2f}s"
+        )
+        if report.over_quota:
+            logger.warning(
+                f"Storage is {report.size_after} bytes, over the quota of "
+                f"{self._max_storage_bytes} bytes"
+            )
+        return report
+
+    def _enforce_quota(self) -> int:
+        """Delete the oldest sessions until the store fits the quota.
+
+        The retention period is halved until the store fits, down to a
+        minimum of one day.
+
+        Returns:
+            The number of sessions deleted.
+        """
+        manager = self._memory_manager
+        deleted = 0
+        retention_days = self._retention_days
+        while (manager.storage_size() > self._max_storage_bytes and retention_days > 1
+               and not self._stop_event.is_set()):
+            retention_days = max(1, retention_days / 2)
+            deleted += self._in_batches(
+                lambda limit: manager.delete_expired_sessions(retention_days, limit=limit)
+            )
+            manager.compact_storage()
+        return deleted
+
+    def _in_batches(self, operation: Callable[[int], int]) -> int:
+        """Repeat a limited operation until it runs out of work.
+
+        Pauses between batches and stops early if the worker is stopped.
+
+        Returns:
+            Total count returned by the operation.
+        """
+        total = 0
+        while True:
+            done = operation(self._batch_size)
+            total += done
+            if done < self._batch_size:
+                return total
+            if self._stop_event.wait(self._batch_pause_seconds):
+                return total
+
+    def start(self) -> None:
+        """Start running maintenance passes in a background thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._running = False
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def is_running(self) -> bool:
+        """Check whether the background thread is running."""
+        return self._running
+
+    def _run_loop(self) -> None:
+        """Internal maintenance loop (runs in background thread)."""
+        while self._running:
+            try:
+                self.run_once()
+            except Exception as e:
+                # Log error but keep maintaining
+                logger.error(f"Storage maintenance error: {e}")
+
+            self._stop_event.wait(self._interval_seconds)
@@ -6,24 +6,127 @@ This module provides the MemoryManager class responsible for:
 - Managing notes and reminders
 - Encrypting sensitive data
 - Handling data deletion requests
+
+Encrypted records are persisted through a pluggable StorageBackend (see
+storage_backend.py).
 """
 
-import os
-import json
+import atexit
 import base64
+import copy
+import json
 import hashlib
+import os
+import threading
+import uuid
+import weakref
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Optional, List, Dict
-from cryptography.fernet import Fernet
+from typing import Any, Callable, Iterable, Iterator, Optional, List, Dict, Set, Tuple, Union
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from prime.models.data_models import (
+    ApplicationUsage, Command, CommandRecord, CommandResult, Entity,
+    Intent, Note, Reminder, Session
+)
+from prime.persistence.key_derivation import derive_key_from_password, unlock_key_store
+from prime.persistence.lazy_history import LazyHistory, export_history
+from prime.persistence import record_codec
+from prime.persistence.note_index import NoteIndex
+from prime.persistence.record_lock import RecordKey, RecordLocks
+from prime.persistence.reminder_index import ReminderIndex
+from prime.persistence.session_index import SessionIndex
+from prime.persistence.usage_table import BUCKET_HOUR, UsageTable
+from prime.persistence.storage_backend import (
+    StorageBackend, FileStorageBackend, SQLiteStorageBackend
+)
+from prime.utils.config import Config
+
+
+# File name of the database used by the 'sqlite' backend
+SQLITE_DATABASE_NAME = 'prime_store.db'
+
+# Record id of a user's usage table in the usage_patterns collection
+# (application records, which it replaces, are keyed by 64-digit hashes)
+USAGE_TABLE_RECORD = 'usage_table'
+
+# Record formats: readable JSON encrypted with Fernet (the default), or the
+# compact binary codec encrypted with raw AES-GCM framing
+RECORD_FORMAT_JSON = 'json'
+RECORD_FORMAT_BINARY = 'binary'
+
+# First byte of AES-GCM framed records (Fernet tokens start with 'g')
+AES_GCM_FRAME_VERSION = b'\x01'
+
+# Smallest batch that is spread across the worker pool; smaller batches are
+# processed inline because handing them to threads costs more than it saves
+PARALLEL_BATCH_MIN = 16
+
+# Records decoded ahead of the consumer, per worker, by parallel scans
+SCAN_PREFETCH_PER_WORKER = 4
+
+# Record id, in the 'session_index' collection, of the marker written once
+# every stored session has been indexed by user
+SESSION_INDEX_MANIFEST = 'manifest'
+
+
+@dataclass
+class _SessionJournal:
+    """What has been persisted of a session, so later saves can append.
+
+    Attributes:
+        generation: Generation of the snapshot the journal belongs to
+        user_id: The persisted session owner
+        start_time: The persisted session start time
+        end_time: The persisted session end time
+        record_count: Number of command records persisted
+        last_record: The last persisted command record
+        state_json: JSON of the persisted end_time and context_state
+        frames: Number of frames appended since the snapshot
+    """
+    generation: Optional[str]
+    user_id: str
+    start_time: datetime
+    end_time: Optional[datetime]
+    record_count: int
+    last_record: Optional[CommandRecord]
+    state_json: str
+    frames: int = 0
+
+    def can_append(self, session: Session) -> bool:
+        """Check whether a session only grew since it was persisted."""
+        history = session.command_history
+        return (
+            session.user_id == self.user_id and
+            session.start_time == self.start_time and
+            len(history) >= self.record_count and
+            (self.record_count == 0 or history[self.record_count - 1] is self.last_record)
+        )
 
 
 class MemoryManager:
     """Manages persistent storage and encryption for PRIME."""
 
-    def __init__(self, encryption_key: Optional[bytes] = None, storage_dir: Optional[str] = None):
+    def __init__(
+        self,
+        encryption_key: Optional[bytes] = None,
+        storage_dir: Optional[str] = None,
+        backend: Union[str, StorageBackend, None] = None,
+        preference_flush_interval: Optional[float] = None,
+        preference_flush_threshold: int = 64,
+        session_compaction_threshold: int = 100,
+        worker_count: Optional[int] = None,
+        parallel_scans: bool = False,
+        record_format: str = RECORD_FORMAT_JSON,
+        usage_half_life_days: Optional[float] = None
+    ):
         """Initialize the Memory Manager.
 
         Args:
@@ -31,6 +134,33 @@ class MemoryManager:
                           will be generated. The key should be 32 bytes for Fernet.
             storage_dir: Optional directory for storing data. If not provided,
                         defaults to '.prime_data' in the user's home directory.
+            backend: Optional storage backend. Either a StorageBackend instance,
+                    'file' for the one-file-per-record layout (the default) or
+                    'sqlite' for a single database file inside storage_dir.
+            preference_flush_interval: Optional interval in seconds for
+                    write-behind flushing of preference changes. If not
+                    provided, every change is written through immediately.
+            preference_flush_threshold: Number of unflushed preference changes
+                    that triggers an immediate flush in write-behind mode.
+            session_compaction_threshold: Number of journal frames appended
+                    to a session before it is compacted into a new snapshot.
+            worker_count: Optional number of worker threads used to encrypt
+                    and decrypt large batches of records. Defaults to the
+                    number of CPUs, at most 4; 1 disables the worker pool.
+            parallel_scans: Whether scans (note search, due reminders, usage
+                    listing, session indexing) decrypt and parse records
+                    across the worker pool while the next records are read.
+            record_format: 'json' (the default) to write readable JSON
+                    records encrypted with Fernet, or 'binary' to write sessions,
+                    notes, reminders and usage records with the compact binary
+                    codec and every record with raw AES-GCM framing. Records in
+                    either format are always readable.
+            usage_half_life_days: Half-life of application launch scores in
+                    new usage tables. Defaults to Config.USAGE_HALF_LIFE_DAYS.
+
+        Raises:
+            ValueError: If backend is an unknown backend name or record_format
+                an unknown format.
         """
         if encryption_key is None:
             # Generate a new encryption key
@@ -40,6 +170,23 @@ class MemoryManager:
         
         self._cipher = Fernet(self._encryption_key)
         
+        # AES-GCM key for the binary record format, derived from the Fernet
+        # key so that the two ciphers never share key material
+        self._aes_gcm = AESGCM(HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b'prime-record-aes-gcm'
+        ).derive(base64.urlsafe_b64decode(self._encryption_key)))
+        
+        if record_format not in (RECORD_FORMAT_JSON, RECORD_FORMAT_BINARY):
+            raise ValueError(f"Unknown record format: {record_format!r}")
+        self._record_format = record_format
+        
+        if usage_half_life_days is None:
+            usage_half_life_days = Config.USAGE_HALF_LIFE_DAYS
+        self._usage_half_life_days = usage_half_life_days
+        
         # Set up storage directory
         if storage_dir is None:
             self._storage_dir = Path.home() / '.prime_data'
@@ -49,18 +196,115 @@ class MemoryManager:
         # Create storage directory if it doesn't exist
         self._storage_dir.mkdir(parents=True, exist_ok=True)
         
-        # Create subdirectories for different data types
+        # Paths of the file layout, kept for callers that inspect it
         self._preferences_dir = self._storage_dir / 'preferences'
-        self._preferences_dir.mkdir(exist_ok=True)
-        
         self._sessions_dir = self._storage_dir / 'sessions'
-        self._sessions_dir.mkdir(exist_ok=True)
-        
         self._notes_dir = self._storage_dir / 'notes'
-        self._notes_dir.mkdir(exist_ok=True)
-        
         self._reminders_dir = self._storage_dir / 'reminders'
-        self._reminders_dir.mkdir(exist_ok=True)
+        
+        # Set up the storage backend
+        self._backend = _create_backend(self._storage_dir, backend)
+        
+        # Striped record locks for read-modify-write updates, shared with the
+        # other managers of this process and, through the backend's lock
+        # file, with other processes using the same storage
+        self._record_locks = RecordLocks.for_path(self._backend.lock_path)
+        
+        # Worker pool for batch encryption and decryption, created on first use
+        if worker_count is None:
+            worker_count = min(4, os.cpu_count() or 1)
+        self._worker_count = max(1, worker_count)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._parallel_scans = parallel_scans and self._worker_count > 1
+        
+        # Decoded per-user indexes keyed by (collection, sanitized user id),
+        # with the ciphertext they were decoded from so that changes made by
+        # other instances are noticed
+        self._indexes: Dict[Tuple[str, str], Tuple[bytes, Any]] = {}
+        
+        # Preference cache: sanitized user id -> {key: JSON-encoded value}.
+        # Values are kept encoded so callers always get fresh copies with the
+        # same types a round trip through storage would produce.
+        self._preference_cache: Dict[str, Dict[str, str]] = {}
+        # Keys changed since the last flush, per sanitized user id
+        self._dirty_preferences: Dict[str, Set[str]] = {}
+        # Last stored preference record per user and its ciphertext, so a
+        # flush only decrypts the record again if another manager changed it
+        self._stored_preferences: Dict[str, Tuple[bytes, Dict[str, Any]]] = {}
+        self._pending_preference_changes = 0
+        self._preference_lock = threading.Lock()
+        # Serializes flushes so an older snapshot never overwrites a newer one
+        self._preference_flush_lock = threading.Lock()
+        self._preference_flush_interval = preference_flush_interval
+        self._preference_flush_threshold = preference_flush_threshold
+        self._preference_flush_stop = threading.Event()
+        self._preference_flush_thread: Optional[threading.Thread] = None
+        
+        # Sessions saved or loaded by this manager: session_id -> journal state
+        self._session_journals: Dict[str, _SessionJournal] = {}
+        self._session_compaction_threshold = session_compaction_threshold
+        self._session_lock = threading.RLock()
+        self._session_index_ready = False
+        
+        if preference_flush_interval is not None:
+            self._preference_flush_thread = threading.Thread(
+                target=self._preference_flush_loop,
+                daemon=True
+            )
+            self._preference_flush_thread.start()
+            # Flush unwritten preferences on interpreter shutdown
+            atexit.register(_flush_preferences_at_exit, weakref.ref(self))
+
+    @classmethod
+    def open_with_password(
+        cls,
+        password: str,
+        storage_dir: Optional[str] = None,
+        backend: Union[str, StorageBackend, None] = None,
+        kdf_params: Optional[Dict[str, Any]] = None,
+        legacy_salt: Optional[bytes] = None,
+        **kwargs: Any
+    ) -> 'MemoryManager':
+        """Open a store whose data key is protected by a password.
+
+        The store's key store records the KDF parameters and salt, so the
+        password is verified on open and weaker parameters are upgraded to
+        kdf_params (see key_derivation.unlock_key_store). Derived keys are
+        cached per process, so reopening the same store is cheap.
+
+        Args:
+            password: The store password.
+            storage_dir: Optional directory for storing data (see __init__).
+            backend: Optional storage backend (see __init__).
+            kdf_params: Optional KDF parameters for new or upgraded key
+                stores, e.g. default_kdf_params('scrypt').
+            legacy_salt: Salt used with derive_key_from_password for stores
+                created before key stores existed.
+            **kwargs: Further MemoryManager arguments.
+
+        Returns:
+            The MemoryManager for the store.
+
+        Raises:
+            ValueError: If the password is incorrect.
+        """
+        if storage_dir is None:
+            storage_path = Path.home() / '.prime_data'
+        else:
+            storage_path = Path(storage_dir)
+        storage_path.mkdir(parents=True, exist_ok=True)
+        
+        store_backend = _create_backend(storage_path, backend)
+        encryption_key = unlock_key_store(
+            store_backend, password, kdf_params=kdf_params, legacy_salt=legacy_salt
+        )
+        return cls(
+            encryption_key=encryption_key,
+            storage_dir=str(storage_path),
+            backend=store_backend,
+            **kwargs
+        )
 
     @property
     def encryption_key(self) -> bytes:
@@ -71,11 +315,32 @@ class MemoryManager:
         """
         return self._encryption_key
 
+    @property
+    def backend(self) -> StorageBackend:
+        """Get the storage backend records are persisted to.
+
+        Returns:
+            The StorageBackend instance.
+        """
+        return self._backend
+
+    def close(self) -> None:
+        """Flush pending preference changes and release the storage backend."""
+        self._preference_flush_stop.set()
+        if self._preference_flush_thread and self._preference_flush_thread.is_alive():
+            self._preference_flush_thread.join(timeout=2.0)
+        self.flush_preferences()
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self._backend.close()
+
     def _sanitize_user_id(self, user_id: str) -> str:
         """Sanitize user_id to create a valid filename.
         
         Uses SHA-256 hash to create a safe filename from any user_id string.
-        This ensures that any characters (including special characters like :, /, \, etc.)
+        This ensures that any characters (including special characters like :, /, \\, etc.)
         are converted to a valid filename.
         
         Args:
@@ -88,6 +353,234 @@ class MemoryManager:
         hash_obj = hashlib.sha256(user_id.encode('utf-8'))
         return hash_obj.hexdigest()
 
+    def _decode_record(self, encrypted_data: bytes) -> Dict[str, Any]:
+        """Decrypt and parse a stored record.
+
+        Args:
+            encrypted_data: The encrypted record bytes.
+
+        Returns:
+            The decoded record dictionary.
+        """
+        decrypted_data = self.decrypt_data(encrypted_data)
+        return json.loads(decrypted_data.decode('utf-8'))
+
+    def _read_record(
+        self, collection: str, record_id: str, owner: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Read, decrypt and parse a single record from the backend.
+
+        Returns:
+            The decoded record dictionary, or None if it does not exist.
+        """
+        encrypted_data = self._backend.read(collection, record_id, owner=owner)
+        if encrypted_data is None:
+            return None
+        return self._decode_record(encrypted_data)
+
+    def _encode_record(self, record: Dict[str, Any]) -> bytes:
+        """Serialize and encrypt a record."""
+        return self._encrypt_record(json.dumps(record).encode('utf-8'))
+
+    def _lock_records(self, *keys: RecordKey) -> Any:
+        """Lock records for a read-modify-write update.
+
+        Args:
+            keys: (collection, owner, record_id) keys of the records.
+
+        Returns:
+            A context manager holding the locks, in this process and in other
+            processes sharing the storage.
+        """
+        return self._record_locks.hold(keys)
+
+    def _encrypt_record(self, data: bytes) -> bytes:
+        """Encrypt record bytes with the cipher of the configured record format."""
+        if self._record_format == RECORD_FORMAT_BINARY:
+            nonce = os.urandom(12)
+            return AES_GCM_FRAME_VERSION + nonce + self._aes_gcm.encrypt(nonce, data, None)
+        return self.encrypt_data(data)
+
+    def _encode_model(
+        self,
+        obj: Any,
+        to_dict: Callable[[Any], Dict[str, Any]],
+        journal_generation: Optional[str] = None
+    ) -> bytes:
+        """Serialize and encrypt a Session, Note, Reminder or ApplicationUsage.
+
+        Args:
+            obj: The dataclass instance.
+            to_dict: Converter to the JSON record dictionary.
+            journal_generation: For session snapshots, the journal generation.
+
+        Returns:
+            The encrypted record in the configured record format.
+        """
+        if self._record_format == RECORD_FORMAT_BINARY:
+            return self._encrypt_record(record_codec.encode(obj, journal_generation))
+        
+        record = to_dict(obj)
+        if journal_generation is not None:
+            record['journal_generation'] = journal_generation
+        return self._encode_record(record)
+
+    def _decode_model(self, encrypted_data: bytes, from_dict: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Decrypt and parse a Session, Note, Reminder or ApplicationUsage in either format.
+
+        Args:
+            encrypted_data: The encrypted record bytes.
+            from_dict: Converter from the JSON record dictionary.
+
+        Returns:
+            The dataclass instance.
+        """
+        return self._decode_model_with_generation(encrypted_data, from_dict)[0]
+
+    def _decode_model_with_generation(
+        self, encrypted_data: bytes, from_dict: Callable[[Dict[str, Any]], Any]
+    ) -> Tuple[Any, Optional[str]]:
+        """Decrypt and parse a record, also returning a session snapshot's journal generation."""
+        decrypted_data = self.decrypt_data(encrypted_data)
+        if record_codec.is_binary(decrypted_data):
+            return record_codec.decode_with_generation(decrypted_data)
+        
+        record = json.loads(decrypted_data.decode('utf-8'))
+        generation = record.pop('journal_generation', None)
+        return from_dict(record), generation
+
+    def _read_model(
+        self,
+        collection: str,
+        record_id: str,
+        from_dict: Callable[[Dict[str, Any]], Any],
+        owner: Optional[str] = None
+    ) -> Optional[Any]:
+        """Read and decode a single dataclass record, or return None if it does not exist."""
+        encrypted_data = self._backend.read(collection, record_id, owner=owner)
+        if encrypted_data is None:
+            return None
+        return self._decode_model(encrypted_data, from_dict)
+
+    def _write_model(
+        self,
+        collection: str,
+        record_id: str,
+        obj: Any,
+        to_dict: Callable[[Any], Dict[str, Any]],
+        owner: Optional[str] = None
+    ) -> None:
+        """Encode and write a single dataclass record."""
+        self._backend.write(collection, record_id, self._encode_model(obj, to_dict), owner=owner)
+
+    def _write_record(
+        self, collection: str, record_id: str, record: Dict[str, Any], owner: Optional[str] = None
+    ) -> None:
+        """Serialize, encrypt and write a single record to the backend."""
+        self._backend.write(collection, record_id, self._encode_record(record), owner=owner)
+
+    def _map_parallel(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Apply a function to every item, using the worker pool for large batches.
+
+        Args:
+            func: The function to apply.
+            items: The items to apply it to.
+
+        Returns:
+            The results, in the order of items.
+        """
+        if self._worker_count == 1 or len(items) < PARALLEL_BATCH_MIN:
+            return [func(item) for item in items]
+        
+        # One contiguous chunk per worker keeps the per-task overhead low
+        chunk_size = -(-len(items) // self._worker_count)
+        chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+        results = self._get_executor().map(lambda chunk: [func(item) for item in chunk], chunks)
+        return [result for chunk_results in results for result in chunk_results]
+
+    def _scan(
+        self, records: Iterable[Tuple[str, bytes]], decode: Callable[[bytes], Any]
+    ) -> Iterator[Tuple[str, Any]]:
+        """Decode a stream of records, in parallel if parallel scans are enabled.
+
+        In parallel mode up to SCAN_PREFETCH_PER_WORKER records per worker
+        are decoded ahead of the consumer, so reading the next records
+        overlaps with decrypting and parsing the previous ones while memory
+        stays bounded. Results are yielded in the order of records either way.
+
+        Args:
+            records: (record_id, encrypted_data) tuples, read lazily.
+            decode: Function turning encrypted data into a result. Exceptions
+                it raises are re-raised to the consumer.
+
+        Yields:
+            (record_id, result) tuples.
+        """
+        if not self._parallel_scans:
+            for record_id, encrypted_data in records:
+                yield record_id, decode(encrypted_data)
+            return
+        
+        executor = self._get_executor()
+        limit = self._worker_count * SCAN_PREFETCH_PER_WORKER
+        pending = deque()
+        try:
+            for record_id, encrypted_data in records:
+                pending.append((record_id, executor.submit(decode, encrypted_data)))
+                if len(pending) >= limit:
+                    record_id, future = pending.popleft()
+                    yield record_id, future.result()
+            while pending:
+                record_id, future = pending.popleft()
+                yield record_id, future.result()
+        finally:
+            # Stop decoding ahead if the consumer gave up early
+            for _, future in pending:
+                future.cancel()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the worker pool, creating it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._worker_count,
+                    thread_name_prefix='prime-memory'
+                )
+            return self._executor
+
+    def _decode_note(self, encrypted_data: bytes) -> Optional[Note]:
+        """Decrypt and parse a note, or return None if it is corrupted."""
+        try:
+            return self._decode_model(encrypted_data, _note_from_dict)
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    def _decode_reminder(self, encrypted_data: bytes) -> Optional[Reminder]:
+        """Decrypt and parse a reminder, or return None if it is corrupted."""
+        try:
+            return self._decode_model(encrypted_data, _reminder_from_dict)
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    def _decode_usage(self, encrypted_data: bytes) -> Optional[ApplicationUsage]:
+        """Decrypt and parse a usage record, or return None if it is corrupted."""
+        try:
+            return self._decode_model(encrypted_data, _usage_from_dict)
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    def _decode_session_snapshot(self, encrypted_data: bytes) -> Optional[Tuple[Session, Optional[str]]]:
+        """Decrypt and parse a session snapshot and its journal generation.
+
+        Returns:
+            (session, journal_generation) tuple, or None if it is corrupted
+            or unreadable.
+        """
+        try:
+            return self._decode_model_with_generation(encrypted_data, _session_from_dict)
+        except (InvalidToken, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
     def encrypt_data(self, data: bytes) -> bytes:
         """Encrypt data using Fernet symmetric encryption.
 
@@ -112,7 +605,8 @@ class MemoryManager:
         """Decrypt data that was encrypted with encrypt_data.
 
         This method decrypts data that was previously encrypted using the
-        encrypt_data method.
+        encrypt_data method, or stored with AES-GCM framing by a manager
+        using the binary record format.
 
         Args:
             encrypted: The encrypted data as bytes.
@@ -128,13 +622,22 @@ class MemoryManager:
         if not isinstance(encrypted, bytes):
             raise TypeError(f"Encrypted data must be bytes, got {type(encrypted).__name__}")
         
+        # Records written in the binary record format use AES-GCM framing
+        if encrypted[:1] == AES_GCM_FRAME_VERSION:
+            try:
+                return self._aes_gcm.decrypt(encrypted[1:13], encrypted[13:], None)
+            except (InvalidTag, ValueError):
+                raise InvalidToken from None
+        
         return self._cipher.decrypt(encrypted)
 
     def store_preference(self, key: str, value: Any, user_id: str) -> None:
         """Store a user preference.
 
-        Preferences are stored as encrypted JSON files in the user's preference
-        directory. Each user has their own preference file.
+        Preferences are cached in memory and stored as a single encrypted JSON
+        record per user. The record is rewritten immediately unless the
+        manager was created with a preference_flush_interval, in which case
+        changes are coalesced and written by flush_preferences.
 
         Args:
             key: The preference key.
@@ -144,28 +647,24 @@ class MemoryManager:
         Raises:
             TypeError: If the value is not JSON-serializable.
         """
-        # Sanitize user_id to create a valid filename
+        # Sanitize user_id to create a valid record id
         safe_user_id = self._sanitize_user_id(user_id)
         
-        # Get the user's preference file path
-        user_pref_file = self._preferences_dir / f"{safe_user_id}.json"
-        
-        # Load existing preferences or create new dict
-        if user_pref_file.exists():
-            # Read and decrypt existing preferences
-            encrypted_data = user_pref_file.read_bytes()
-            decrypted_data = self.decrypt_data(encrypted_data)
-            preferences = json.loads(decrypted_data.decode('utf-8'))
-        else:
-            preferences = {}
-        
-        # Update the preference
-        preferences[key] = value
+        # Serialize first so invalid values never reach the cache
+        encoded_value = json.dumps(value)
+        
+        with self._preference_lock:
+            # Update the cached preferences and mark them dirty
+            self._cached_preferences(safe_user_id)[key] = encoded_value
+            self._dirty_preferences.setdefault(safe_user_id, set()).add(key)
+            self._pending_preference_changes += 1
+            flush_now = (
+                self._preference_flush_interval is None or
+                self._pending_preference_changes >= self._preference_flush_threshold
+            )
         
-        # Serialize, encrypt, and save
-        json_data = json.dumps(preferences).encode('utf-8')
-        encrypted_data = self.encrypt_data(json_data)
-        user_pref_file.write_bytes(encrypted_data)
+        if flush_now:
+            self.flush_preferences()
 
     def get_preference(self, key: str, user_id: str) -> Optional[Any]:
         """Retrieve a user preference.
@@ -177,29 +676,126 @@ class MemoryManager:
         Returns:
             The preference value, or None if not found.
         """
-        # Sanitize user_id to create a valid filename
+        # Sanitize user_id to create a valid record id
         safe_user_id = self._sanitize_user_id(user_id)
         
-        # Get the user's preference file path
-        user_pref_file = self._preferences_dir / f"{safe_user_id}.json"
+        with self._preference_lock:
+            encoded_value = self._cached_preferences(safe_user_id).get(key)
         
-        # Return None if file doesn't exist
-        if not user_pref_file.exists():
+        # Return the preference value or None if key doesn't exist
+        if encoded_value is None:
             return None
+        return json.loads(encoded_value)
+
+    def flush_preferences(self) -> int:
+        """Write all cached preference changes to storage.
+
+        Only the keys changed through this manager are written: each user's
+        stored record is re-read under its record lock and the changes are
+        merged into it, so managers in other processes sharing the storage
+        do not overwrite each other's preferences.
+
+        Returns:
+            The number of users whose preferences were written.
+        """
+        with self._preference_flush_lock:
+            with self._preference_lock:
+                dirty_keys = self._dirty_preferences
+                self._dirty_preferences = {}
+                self._pending_preference_changes = 0
+                snapshots = {
+                    safe_user_id: {
+                        key: self._preference_cache[safe_user_id][key] for key in keys
+                    }
+                    for safe_user_id, keys in dirty_keys.items()
+                }
+            
+            # Merge into the stored records, then serialize, encrypt, and save
+            written = []
+            try:
+                for safe_user_id, changes in snapshots.items():
+                    with self._lock_records(('preferences', None, safe_user_id)):
+                        stored = self._read_stored_preferences(safe_user_id)
+                        for key, encoded_value in changes.items():
+                            stored[key] = json.loads(encoded_value)
+                        encrypted_data = self._encode_record(stored)
+                        self._backend.write('preferences', safe_user_id, encrypted_data)
+                        self._stored_preferences[safe_user_id] = (encrypted_data, stored)
+                    written.append(safe_user_id)
+                    
+                    # Pick up keys written by other processes
+                    with self._preference_lock:
+                        cached = self._preference_cache.get(safe_user_id)
+                        if cached is not None:
+                            pending = self._dirty_preferences.get(safe_user_id, ())
+                            for key, value in stored.items():
+                                if key not in pending:
+                                    cached[key] = json.dumps(value)
+            except Exception:
+                # Keep unwritten users dirty so the next flush retries them
+                with self._preference_lock:
+                    for safe_user_id, changes in snapshots.items():
+                        if safe_user_id not in written and safe_user_id in self._preference_cache:
+                            self._dirty_preferences.setdefault(safe_user_id, set()).update(changes)
+                raise
+        
+        return len(snapshots)
+
+    def _cached_preferences(self, safe_user_id: str) -> Dict[str, str]:
+        """Get a user's cached preferences, loading them on first use.
+
+        Must be called with _preference_lock held.
+        """
+        preferences = self._preference_cache.get(safe_user_id)
+        if preferences is None:
+            # Read and decrypt preferences
+            stored = self._read_stored_preferences(safe_user_id)
+            preferences = {key: json.dumps(value) for key, value in stored.items()}
+            self._preference_cache[safe_user_id] = preferences
+        return preferences
+
+    def _read_stored_preferences(self, safe_user_id: str) -> Dict[str, Any]:
+        """Read a user's stored preference record, decrypting it only if it changed.
+
+        Returns:
+            A copy of the stored preferences, or an empty dict if none are
+            stored.
+        """
+        encrypted_data = self._backend.read('preferences', safe_user_id)
+        if encrypted_data is None:
+            return {}
         
-        # Read and decrypt preferences
-        encrypted_data = user_pref_file.read_bytes()
-        decrypted_data = self.decrypt_data(encrypted_data)
-        preferences = json.loads(decrypted_data.decode('utf-8'))
+        cached = self._stored_preferences.get(safe_user_id)
+        if cached is not None and cached[0] == encrypted_data:
+            return dict(cached[1])
         
-        # Return the preference value or None if key doesn't exist
-        return preferences.get(key)
+        stored = self._decode_record(encrypted_data)
+        self._stored_preferences[safe_user_id] = (encrypted_data, stored)
+        return dict(stored)
+
+    def _preference_flush_loop(self) -> None:
+        """Internal write-behind loop (runs in background thread)."""
+        while not self._preference_flush_stop.wait(self._preference_flush_interval):
+            try:
+                self.flush_preferences()
+            except Exception:
+                # Unwritten users stay dirty and are retried next interval
+                continue
 
     def save_session(self, session: Any) -> None:
         """Save a session to persistent storage.
 
-        Sessions are stored as encrypted JSON files in the sessions directory.
-        Each session is stored in a file named with its session_id.
+        Sessions are stored as an encrypted JSON snapshot keyed by session_id
+        plus an append-only journal. When a session saved or loaded by this
+        manager has only grown since (new command records, a changed end_time
+        or context_state), just the changes are encrypted and appended to the
+        journal as one frame, so saving after every command costs the same
+        however long the session is. Every session_compaction_threshold frames
+        the journal is folded into a new snapshot. Any other change, or a
+        session this manager has not seen, rewrites the snapshot.
+
+        Command records already saved are assumed not to change; call
+        compact_session after modifying one in place.
 
         Args:
             session: The session to save (must be a Session dataclass).
@@ -208,39 +804,64 @@ class MemoryManager:
             AttributeError: If session doesn't have required attributes.
             TypeError: If session data is not JSON-serializable.
         """
-        from prime.models.data_models import Session
-        from dataclasses import asdict
-        
         # Verify it's a Session object
         if not isinstance(session, Session):
             raise TypeError(f"Expected Session object, got {type(session).__name__}")
         
-        # Convert session to dictionary
-        session_dict = asdict(session)
-        
-        # Convert datetime objects to ISO format strings for JSON serialization
-        session_dict['start_time'] = session.start_time.isoformat()
-        if session.end_time:
-            session_dict['end_time'] = session.end_time.isoformat()
-        
-        # Convert command_history timestamps
-        for i, record in enumerate(session_dict['command_history']):
-            record['timestamp'] = session.command_history[i].timestamp.isoformat()
-            record['command']['timestamp'] = session.command_history[i].command.timestamp.isoformat()
+        state = _session_state_to_dict(session)
+        state_json = json.dumps(state, sort_keys=True)
         
-        # Serialize to JSON
-        json_data = json.dumps(session_dict).encode('utf-8')
-        
-        # Encrypt the data
-        encrypted_data = self.encrypt_data(json_data)
-        
-        # Save to file
-        session_file = self._sessions_dir / f"{session.session_id}.json"
-        session_file.write_bytes(encrypted_data)
+        with self._session_lock:
+            journal = self._session_journals.get(session.session_id)
+            
+            # The session and the session indexes it may touch are locked
+            # together, so that other processes sharing the storage neither
+            # interleave journal frames nor lose index updates
+            owners = {self._sanitize_user_id(session.user_id)}
+            if journal is not None:
+                owners.add(self._sanitize_user_id(journal.user_id))
+            keys = [('sessions', None, session.session_id)]
+            keys += [('session_index', None, owner) for owner in owners]
+            with self._lock_records(*keys):
+                # Keep the user's session index in step when the session is new
+                # to this manager, changed owner or ended
+                if journal is None or journal.user_id != session.user_id or journal.end_time != session.end_time:
+                    self._index_session(session, journal.user_id if journal else None)
+                
+                if journal is None or not journal.can_append(session):
+                    self._write_session_snapshot(session, state_json)
+                    return
+                
+                frame: Dict[str, Any] = {'generation': journal.generation}
+                new_records = session.command_history[journal.record_count:]
+                if new_records:
+                    frame['records'] = [_command_record_to_dict(record) for record in new_records]
+                if state_json != journal.state_json:
+                    frame['state'] = state
+                if len(frame) == 1:
+                    # Nothing changed since the last save
+                    return
+                
+                encrypted_frame = self.encrypt_data(json.dumps(frame).encode('utf-8'))
+                # Fernet tokens are URL-safe base64, so a newline delimits frames
+                self._backend.append('session_journal', session.session_id, encrypted_frame + b'\n')
+                
+                journal.end_time = session.end_time
+                journal.record_count = len(session.command_history)
+                journal.last_record = session.command_history[-1] if session.command_history else None
+                journal.state_json = state_json
+                journal.frames += 1
+                
+                if journal.frames >= self._session_compaction_threshold:
+                    self._write_session_snapshot(session, state_json)
 
     def load_session(self, session_id: str) -> Any:
         """Load a session from persistent storage.
 
+        The snapshot is read and the frames journaled since are replayed on
+        top of it. The command history is a LazyHistory: command records are
+        rebuilt as dataclass instances only when they are accessed.
+
         Args:
             session_id: The session identifier.
 
@@ -251,76 +872,349 @@ class MemoryManager:
             FileNotFoundError: If the session file doesn't exist.
             ValueError: If the session data is corrupted or invalid.
         """
-        from prime.models.data_models import Session, CommandRecord, Command, CommandResult, Intent, Entity
-        from datetime import datetime
+        session, generation, frames = self._read_session(session_id)
+        
+        with self._session_lock:
+            self._session_journals[session_id] = _SessionJournal(
+                generation=generation,
+                user_id=session.user_id,
+                start_time=session.start_time,
+                end_time=session.end_time,
+                record_count=len(session.command_history),
+                last_record=session.command_history[-1] if session.command_history else None,
+                state_json=json.dumps(_session_state_to_dict(session), sort_keys=True),
+                frames=frames
+            )
         
-        # Get the session file path
-        session_file = self._sessions_dir / f"{session_id}.json"
+        return session
+
+    def iter_history(self, session_id: str, newest_first: bool = True) -> Iterator[CommandRecord]:
+        """Iterate over a session's command records.
+
+        Records are rebuilt one at a time as the iterator advances, so
+        reading the latest few commands of a long session is cheap. Unlike
+        load_session, this does not prepare the session for incremental
+        saves.
+
+        Args:
+            session_id: The session identifier.
+            newest_first: Yield the most recent command first (default),
+                or the oldest first.
+
+        Returns:
+            Iterator over CommandRecord objects.
+
+        Raises:
+            FileNotFoundError: If the session doesn't exist.
+        """
+        history = self._read_session(session_id)[0].command_history
+        return reversed(history) if newest_first else iter(history)
+
+    def _read_session(self, session_id: str) -> Tuple[Session, Optional[str], int]:
+        """Read a session's snapshot and replay its journal.
+
+        Returns:
+            (session, journal_generation, replayed frame count) tuple.
+
+        Raises:
+            FileNotFoundError: If the session doesn't exist.
+        """
+        encrypted_data = self._backend.read('sessions', session_id)
         
-        # Check if file exists
-        if not session_file.exists():
+        # Check if the session exists
+        if encrypted_data is None:
             raise FileNotFoundError(f"Session {session_id} not found")
         
-        # Read and decrypt the file
-        encrypted_data = session_file.read_bytes()
-        decrypted_data = self.decrypt_data(encrypted_data)
+        session, generation = self._decode_model_with_generation(encrypted_data, _session_from_dict)
         
-        # Parse JSON
-        session_dict = json.loads(decrypted_data.decode('utf-8'))
-        
-        # Convert ISO format strings back to datetime objects
-        session_dict['start_time'] = datetime.fromisoformat(session_dict['start_time'])
-        if session_dict['end_time']:
-            session_dict['end_time'] = datetime.fromisoformat(session_dict['end_time'])
-        
-        # Reconstruct command_history with proper dataclass instances
-        command_history = []
-        for record_dict in session_dict['command_history']:
-            # Reconstruct entities
-            entities = [
-                Entity(**entity_dict)
-                for entity_dict in record_dict['command']['intent']['entities']
-            ]
-            
-            # Reconstruct intent
-            intent = Intent(
-                intent_type=record_dict['command']['intent']['intent_type'],
-                entities=entities,
-                confidence=record_dict['command']['intent']['confidence'],
-                requires_clarification=record_dict['command']['intent']['requires_clarification']
+        frames = 0
+        for frame in self._read_session_journal(session_id):
+            # Frames left behind by an interrupted compaction belong to an
+            # older snapshot and are already part of this one
+            if frame.get('generation') != generation:
+                continue
+            session.command_history.extend_stored(frame.get('records', []), _command_record_from_dict)
+            if 'state' in frame:
+                _apply_session_state(session, frame['state'])
+            frames += 1
+        return session, generation, frames
+
+    def compact_session(self, session_id: str) -> int:
+        """Fold a session's journal into a new snapshot.
+
+        Args:
+            session_id: The session identifier.
+
+        Returns:
+            The number of journal frames that were compacted.
+
+        Raises:
+            FileNotFoundError: If the session doesn't exist.
+        """
+        session = self.load_session(session_id)
+        with self._session_lock:
+            frames = self._session_journals[session_id].frames
+            self._write_session_snapshot(
+                session, json.dumps(_session_state_to_dict(session), sort_keys=True)
             )
-            
-            # Reconstruct command
-            command = Command(
-                command_id=record_dict['command']['command_id'],
-                intent=intent,
-                parameters=record_dict['command']['parameters'],
-                timestamp=datetime.fromisoformat(record_dict['command']['timestamp']),
-                requires_confirmation=record_dict['command']['requires_confirmation']
+        return frames
+
+    def _write_session_snapshot(self, session: Session, state_json: str) -> None:
+        """Rewrite a session's snapshot and start a new, empty journal.
+
+        Must be called with _session_lock held.
+        """
+        # A new generation marks frames of the old journal as stale, so a
+        # crash before the journal is deleted cannot replay them twice
+        generation = uuid.uuid4().hex
+        self._backend.write(
+            'sessions', session.session_id,
+            self._encode_model(session, _session_to_dict, journal_generation=generation)
+        )
+        self._backend.delete('session_journal', session.session_id)
+        
+        self._session_journals[session.session_id] = _SessionJournal(
+            generation=generation,
+            user_id=session.user_id,
+            start_time=session.start_time,
+            end_time=session.end_time,
+            record_count=len(session.command_history),
+            last_record=session.command_history[-1] if session.command_history else None,
+            state_json=state_json
+        )
+
+    def _read_session_journal(self, session_id: str) -> List[Dict[str, Any]]:
+        """Read and decrypt the frames of a session's journal.
+
+        A frame that cannot be decrypted, such as one torn by a crash while
+        it was appended, ends the journal.
+        """
+        data = self._backend.read('session_journal', session_id)
+        if not data:
+            return []
+        
+        frames = []
+        for line in data.split(b'\n'):
+            if not line:
+                continue
+            try:
+                frames.append(self._decode_record(line))
+            except (InvalidToken, json.JSONDecodeError, UnicodeDecodeError):
+                break
+        return frames
+
+    def list_sessions(self, user_id: str) -> List[str]:
+        """List a user's sessions.
+
+        Args:
+            user_id: The user identifier.
+
+        Returns:
+            Session ids, most recently started first.
+        """
+        safe_user_id = self._sanitize_user_id(user_id)
+        with self._session_lock:
+            self._ensure_session_index()
+            index = self._read_index('session_index', safe_user_id, SessionIndex)
+        return index.session_ids() if index is not None else []
+
+    def delete_expired_sessions(
+        self, retention_days: Optional[float] = None, limit: Optional[int] = None
+    ) -> int:
+        """Delete sessions that have been inactive for longer than the retention period.
+
+        A session's last activity is its end_time, or its start_time if it
+        has not ended. Only the per-user session indexes and the expired
+        sessions are read.
+
+        Args:
+            retention_days: Number of days to keep sessions. Defaults to
+                Config.SESSION_RETENTION_DAYS.
+            limit: Optional maximum number of sessions to delete, so that
+                callers can spread the work out.
+
+        Returns:
+            The number of sessions deleted.
+        """
+        if retention_days is None:
+            retention_days = Config.SESSION_RETENTION_DAYS
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        
+        deleted = 0
+        with self._session_lock:
+            self._ensure_session_index()
+            owners = [
+                record_id for record_id, _ in self._backend.iter_records('session_index')
+                if record_id != SESSION_INDEX_MANIFEST
+            ]
+            for safe_user_id in owners:
+                with self._lock_records(('session_index', None, safe_user_id)):
+                    index = self._read_index('session_index', safe_user_id, SessionIndex)
+                    expired = index.inactive_since(cutoff) if index is not None else []
+                    if limit is not None:
+                        expired = expired[:limit - deleted]
+                    if not expired:
+                        continue
+                    for session_id in expired:
+                        if self._delete_session(session_id):
+                            deleted += 1
+                        index.remove(session_id)
+                    self._save_session_index(safe_user_id, index)
+                if limit is not None and deleted >= limit:
+                    break
+        return deleted
+
+    def compact_sessions(self, min_journal_bytes: int = 0, limit: Optional[int] = None) -> int:
+        """Compact the journals of sessions saved incrementally.
+
+        Args:
+            min_journal_bytes: Only compact journals at least this large.
+            limit: Optional maximum number of sessions to compact.
+
+        Returns:
+            The number of sessions compacted.
+        """
+        compacted = 0
+        for session_id, data in list(self._backend.iter_records('session_journal')):
+            if limit is not None and compacted >= limit:
+                break
+            if len(data) < min_journal_bytes:
+                continue
+            try:
+                self.compact_session(session_id)
+            except FileNotFoundError:
+                # A journal without a snapshot belongs to a deleted session
+                self._backend.delete('session_journal', session_id)
+                continue
+            except (InvalidToken, json.JSONDecodeError, KeyError, TypeError, ValueError):
+                # Skip corrupted or unreadable sessions
+                continue
+            compacted += 1
+        return compacted
+
+    def rebuild_session_index(self) -> int:
+        """Rebuild the per-user session indexes from the stored sessions.
+
+        This decrypts every session once. It runs automatically the first
+        time sessions are listed, expired or deleted in a store written
+        before session indexing existed.
+
+        Returns:
+            The number of sessions indexed.
+        """
+        with self._session_lock:
+            indexes: Dict[str, SessionIndex] = {}
+            sessions = self._scan(
+                self._backend.iter_records('sessions'), self._decode_session_snapshot
             )
+            for session_id, snapshot in sessions:
+                if snapshot is None:
+                    # Skip corrupted or unreadable sessions
+                    continue
+                try:
+                    session, generation = snapshot
+                    end_time = session.end_time
+                    for frame in self._read_session_journal(session_id):
+                        if frame.get('generation') == generation and 'state' in frame:
+                            end_iso = frame['state']['end_time']
+                            end_time = datetime.fromisoformat(end_iso) if end_iso else None
+                    
+                    safe_user_id = self._sanitize_user_id(session.user_id)
+                    indexes.setdefault(safe_user_id, SessionIndex()).add(
+                        session_id, session.start_time, end_time
+                    )
+                except (KeyError, TypeError, ValueError):
+                    # Skip corrupted or unreadable sessions
+                    continue
             
-            # Reconstruct command result
-            result = CommandResult(**record_dict['result'])
+            for record_id, _ in list(self._backend.iter_records('session_index')):
+                if record_id != SESSION_INDEX_MANIFEST and record_id not in indexes:
+                    self._delete_index('session_index', record_id)
+            for safe_user_id, index in indexes.items():
+                self._save_index('session_index', safe_user_id, index)
             
-            # Reconstruct command record
-            command_record = CommandRecord(
-                command=command,
-                result=result,
-                timestamp=datetime.fromisoformat(record_dict['timestamp'])
-            )
+            self._write_record('session_index', SESSION_INDEX_MANIFEST, {'version': 1})
+            self._session_index_ready = True
+            return sum(len(index) for index in indexes.values())
+
+    def _ensure_session_index(self) -> None:
+        """Index the sessions of a store written before session indexing existed.
+
+        Must be called with _session_lock held.
+        """
+        if self._session_index_ready:
+            return
+        if self._backend.read('session_index', SESSION_INDEX_MANIFEST) is not None:
+            self._session_index_ready = True
+        else:
+            self.rebuild_session_index()
+
+    def _index_session(self, session: Session, previous_user_id: Optional[str]) -> None:
+        """Add or update a session in its owner's session index.
+
+        Must be called with _session_lock held.
+
+        Args:
+            session: The session being saved.
+            previous_user_id: The owner the session was last saved with, if
+                known and different from the current one.
+        """
+        self._ensure_session_index()
+        
+        safe_user_id = self._sanitize_user_id(session.user_id)
+        previous_owner = None
+        if previous_user_id is not None and previous_user_id != session.user_id:
+            previous_owner = self._sanitize_user_id(previous_user_id)
+        
+        with self._lock_records(
+            ('session_index', None, safe_user_id), ('session_index', None, previous_owner or safe_user_id)
+        ):
+            if previous_owner is not None:
+                index = self._read_index('session_index', previous_owner, SessionIndex)
+                if index is not None and index.remove(session.session_id):
+                    self._save_session_index(previous_owner, index)
             
-            command_history.append(command_record)
-        
-        session_dict['command_history'] = command_history
-        
-        # Create and return Session object
-        return Session(**session_dict)
+            index = self._read_index('session_index', safe_user_id, SessionIndex) or SessionIndex()
+            if index.add(session.session_id, session.start_time, session.end_time):
+                self._save_session_index(safe_user_id, index)
+
+    def _save_session_index(self, safe_user_id: str, index: SessionIndex) -> None:
+        """Persist a user's session index, deleting it once it is empty."""
+        if len(index):
+            self._save_index('session_index', safe_user_id, index)
+        else:
+            self._delete_index('session_index', safe_user_id)
+
+    def _delete_session(self, session_id: str, user_id: Optional[str] = None) -> bool:
+        """Delete a session's snapshot and journal.
+
+        Must be called with _session_lock held.
+
+        Args:
+            session_id: The session identifier.
+            user_id: If given, the session is only deleted if it belongs to
+                this user.
+
+        Returns:
+            True if the session was deleted, False otherwise.
+        """
+        if user_id is not None:
+            encrypted_data = self._backend.read('sessions', session_id)
+            snapshot = self._decode_session_snapshot(encrypted_data) if encrypted_data else None
+            if snapshot is None or snapshot[0].user_id != user_id:
+                # Skip missing, corrupted or unreadable sessions
+                return False
+        
+        deleted = self._backend.delete('sessions', session_id)
+        self._backend.delete('session_journal', session_id)
+        self._session_journals.pop(session_id, None)
+        return deleted
 
     def store_note(self, note: Any, user_id: str) -> None:
         """Store a note.
 
-        Notes are stored as encrypted JSON files in the user's notes directory.
-        Each note is stored in a file named with its note_id.
+        Notes are stored as encrypted JSON records owned by the user and
+        keyed by note_id.
 
         Args:
             note: The note to store (must be a Note dataclass).
@@ -329,42 +1223,115 @@ class MemoryManager:
         Raises:
             TypeError: If note is not a Note object or data is not JSON-serializable.
         """
-        from prime.models.data_models import Note
-        from dataclasses import asdict
-        
         # Verify it's a Note object
         if not isinstance(note, Note):
             raise TypeError(f"Expected Note object, got {type(note).__name__}")
         
-        # Sanitize user_id to create a valid directory name
+        # Sanitize user_id to create a valid owner key
         safe_user_id = self._sanitize_user_id(user_id)
         
-        # Create user-specific notes directory
-        user_notes_dir = self._notes_dir / safe_user_id
-        user_notes_dir.mkdir(exist_ok=True)
-        
-        # Convert note to dictionary
-        note_dict = asdict(note)
-        
-        # Convert datetime objects to ISO format strings for JSON serialization
-        note_dict['created_at'] = note.created_at.isoformat()
-        note_dict['updated_at'] = note.updated_at.isoformat()
-        
-        # Serialize to JSON
-        json_data = json.dumps(note_dict).encode('utf-8')
+        with self._lock_records(('note_index', None, safe_user_id)):
+            # Load the index first so that a missing index is built from the
+            # notes stored so far, not including this one twice
+            index = self._load_note_index(safe_user_id)
+            
+            self._write_model('notes', note.note_id, note, _note_to_dict, owner=safe_user_id)
+            
+            # Update the note index incrementally
+            index.add(note.note_id, note.content, note.tags)
+            self._save_note_index(safe_user_id, index)
+
+    def store_notes(self, notes: Iterable[Any], user_id: str) -> int:
+        """Store several notes at once.
+
+        Behaves like calling store_note for each note, but the notes are
+        encrypted across the worker pool and written, together with the
+        updated note index, in a single backend batch (one transaction for
+        the SQLite backend).
+
+        Args:
+            notes: The notes to store (must be Note dataclasses).
+            user_id: The user identifier.
+
+        Returns:
+            The number of notes stored.
+
+        Raises:
+            TypeError: If any note is not a Note object or data is not
+                JSON-serializable. Nothing is stored in that case.
+        """
+        notes = list(notes)
+        for note in notes:
+            if not isinstance(note, Note):
+                raise TypeError(f"Expected Note object, got {type(note).__name__}")
+        if not notes:
+            return 0
         
-        # Encrypt the data
-        encrypted_data = self.encrypt_data(json_data)
+        safe_user_id = self._sanitize_user_id(user_id)
+        encrypted_notes = self._map_parallel(
+            lambda note: self._encode_model(note, _note_to_dict), notes
+        )
+        
+        with self._lock_records(('note_index', None, safe_user_id)):
+            index = self._load_note_index(safe_user_id)
+            for note in notes:
+                index.add(note.note_id, note.content, note.tags)
+            self._write_batch_with_index(
+                [('notes', note.note_id, data, safe_user_id) for note, data in zip(notes, encrypted_notes)],
+                'note_index', safe_user_id, index
+            )
+        return len(notes)
+
+    def load_notes(self, note_ids: Iterable[str], user_id: str) -> List[Any]:
+        """Load several notes by id.
+
+        Args:
+            note_ids: The note identifiers.
+            user_id: The user identifier.
+
+        Returns:
+            List of Note objects in the order of note_ids, skipping notes
+            that do not exist or are corrupted.
+        """
+        safe_user_id = self._sanitize_user_id(user_id)
+        records = self._backend.read_many('notes', list(note_ids), owner=safe_user_id)
         
-        # Save to file
-        note_file = user_notes_dir / f"{note.note_id}.json"
-        note_file.write_bytes(encrypted_data)
+        def decode(encrypted_data: bytes) -> Optional[Note]:
+            try:
+                return self._decode_note(encrypted_data)
+            except InvalidToken:
+                return None
+        
+        # Skip corrupted notes
+        return [
+            note for note in self._map_parallel(decode, [data for _, data in records])
+            if note is not None
+        ]
+
+    def _write_batch_with_index(
+        self,
+        records: List[Tuple[str, str, bytes, Optional[str]]],
+        collection: str,
+        safe_user_id: str,
+        index: Any
+    ) -> None:
+        """Write a batch of encrypted records together with the updated per-user index."""
+        encrypted_index = self._encode_record(index.to_dict())
+        try:
+            self._backend.write_many(records + [(collection, safe_user_id, encrypted_index, None)])
+        except Exception:
+            # The cached index already holds the batch; drop it so the next
+            # read decodes whatever was actually persisted
+            self._indexes.pop((collection, safe_user_id), None)
+            raise
+        self._indexes[(collection, safe_user_id)] = (encrypted_index, index)
 
     def search_notes(self, query: str, user_id: str) -> List[Any]:
         """Search for notes.
 
         Searches notes by keywords in content, tags, or date. The search is
-        case-insensitive and matches partial strings.
+        case-insensitive and matches partial strings. The user's note index
+        narrows the search down so that only candidate notes are decrypted.
 
         Args:
             query: The search query (searches in content and tags).
@@ -373,58 +1340,205 @@ class MemoryManager:
         Returns:
             List of matching Note objects, sorted by updated_at (most recent first).
         """
-        from prime.models.data_models import Note
-        from datetime import datetime
-        
-        # Sanitize user_id to create a valid directory name
+        # Sanitize user_id to create a valid owner key
         safe_user_id = self._sanitize_user_id(user_id)
         
-        # Get user-specific notes directory
-        user_notes_dir = self._notes_dir / safe_user_id
-        
-        # Return empty list if directory doesn't exist
-        if not user_notes_dir.exists():
+        # Return empty list if the user has no notes
+        if not self._backend.has_owner('notes', safe_user_id):
             return []
         
-        # Load all notes
-        matching_notes = []
         query_lower = query.lower()
+        candidate_ids = self._load_note_index(safe_user_id).substring_candidates(query_lower)
         
-        for note_file in user_notes_dir.glob("*.json"):
-            try:
-                # Read and decrypt the note
-                encrypted_data = note_file.read_bytes()
-                decrypted_data = self.decrypt_data(encrypted_data)
-                note_dict = json.loads(decrypted_data.decode('utf-8'))
-                
-                # Convert ISO format strings back to datetime objects
-                note_dict['created_at'] = datetime.fromisoformat(note_dict['created_at'])
-                note_dict['updated_at'] = datetime.fromisoformat(note_dict['updated_at'])
-                
-                # Create Note object
-                note = Note(**note_dict)
-                
-                # Check if query matches content or tags
-                content_match = query_lower in note.content.lower()
-                tags_match = any(query_lower in tag.lower() for tag in note.tags)
-                
-                if content_match or tags_match:
-                    matching_notes.append(note)
-                    
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                # Skip corrupted notes
+        # Queries without word characters cannot use the index
+        if candidate_ids is None:
+            candidates = self._backend.iter_records('notes', safe_user_id)
+        else:
+            candidates = self._read_notes(safe_user_id, sorted(candidate_ids))
+        
+        matching_notes = []
+        for _, note in self._scan(candidates, self._decode_note):
+            # Skip corrupted notes
+            if note is None:
                 continue
+            
+            # Check if query matches content or tags
+            content_match = query_lower in note.content.lower()
+            tags_match = any(query_lower in tag.lower() for tag in note.tags)
+            
+            if content_match or tags_match:
+                matching_notes.append(note)
         
         # Sort by updated_at (most recent first)
         matching_notes.sort(key=lambda n: n.updated_at, reverse=True)
         
         return matching_notes
 
+    def search_notes_ranked(
+        self, query: str, user_id: str, limit: Optional[int] = None, prefix: bool = True
+    ) -> List[Any]:
+        """Search notes and rank the results by relevance.
+
+        Query words are matched against whole words of note content and tags
+        (or word prefixes when prefix is True) and results are ranked with
+        BM25. Only the returned notes are decrypted.
+
+        Args:
+            query: The search query.
+            user_id: The user identifier.
+            limit: Optional maximum number of notes to return.
+            prefix: Whether query words also match longer words they start.
+
+        Returns:
+            List of matching Note objects, most relevant first.
+        """
+        safe_user_id = self._sanitize_user_id(user_id)
+        if not self._backend.has_owner('notes', safe_user_id):
+            return []
+        
+        ranked = self._load_note_index(safe_user_id).rank(query, prefix=prefix)
+        if limit is not None:
+            ranked = ranked[:limit]
+        
+        records = self._read_notes(safe_user_id, [note_id for note_id, _ in ranked])
+        # Skip corrupted notes
+        return [note for _, note in self._scan(records, self._decode_note) if note is not None]
+
+    def get_notes_by_tag(self, tag: str, user_id: str) -> List[Any]:
+        """Retrieve all notes carrying a tag.
+
+        Args:
+            tag: The tag to look up (case-insensitive, whole tag).
+            user_id: The user identifier.
+
+        Returns:
+            List of Note objects, sorted by updated_at (most recent first).
+        """
+        safe_user_id = self._sanitize_user_id(user_id)
+        if not self._backend.has_owner('notes', safe_user_id):
+            return []
+        
+        note_ids = sorted(self._load_note_index(safe_user_id).notes_with_tag(tag))
+        records = self._read_notes(safe_user_id, note_ids)
+        # Skip corrupted notes
+        notes = [note for _, note in self._scan(records, self._decode_note) if note is not None]
+        notes.sort(key=lambda n: n.updated_at, reverse=True)
+        return notes
+
+    def rebuild_note_index(self, user_id: Optional[str] = None) -> int:
+        """Rebuild note indexes from the stored notes.
+
+        Use this for stores written before note indexing existed, or to
+        repair an index. Indexes are also rebuilt automatically the first
+        time a user without one is searched.
+
+        Args:
+            user_id: The user whose index to rebuild. If None, the indexes
+                of every user with notes are rebuilt.
+
+        Returns:
+            The number of notes indexed.
+        """
+        if user_id is not None:
+            owners = [self._sanitize_user_id(user_id)]
+        else:
+            owners = sorted({
+                owner for collection, owner, _, _ in self._backend.iter_all()
+                if collection == 'notes' and owner is not None
+            })
+        
+        indexed = 0
+        for safe_user_id in owners:
+            indexed += len(self._build_note_index(safe_user_id))
+        return indexed
+
+    def _read_notes(self, safe_user_id: str, note_ids: List[str]) -> Iterator[Tuple[str, bytes]]:
+        """Lazily read the encrypted records of specific notes, skipping missing ones."""
+        return self._read_records('notes', safe_user_id, note_ids)
+
+    def _read_records(
+        self, collection: str, safe_user_id: str, record_ids: List[str]
+    ) -> Iterator[Tuple[str, bytes]]:
+        """Lazily read specific records of a user, skipping missing ones."""
+        for record_id in record_ids:
+            encrypted_data = self._backend.read(collection, record_id, owner=safe_user_id)
+            if encrypted_data is not None:
+                yield record_id, encrypted_data
+
+    def _read_index(
+        self, collection: str, safe_user_id: str, index_class: Any, record_id: Optional[str] = None
+    ) -> Optional[Any]:
+        """Read a persisted per-user index, reusing the decoded copy if unchanged.
+
+        Args:
+            collection: The collection the index is stored in.
+            safe_user_id: The sanitized user id.
+            index_class: The index class, providing from_dict.
+            record_id: If given, the index is stored as this record owned by
+                the user rather than as the user's record in the collection.
+
+        Returns:
+            The index, or None if none has been persisted.
+        """
+        if record_id is None:
+            encrypted_index = self._backend.read(collection, safe_user_id)
+        else:
+            encrypted_index = self._backend.read(collection, record_id, owner=safe_user_id)
+        if encrypted_index is None:
+            return None
+        
+        cached = self._indexes.get((collection, safe_user_id))
+        if cached is not None and cached[0] == encrypted_index:
+            return cached[1]
+        
+        index = index_class.from_dict(self._decode_record(encrypted_index))
+        self._indexes[(collection, safe_user_id)] = (encrypted_index, index)
+        return index
+
+    def _save_index(
+        self, collection: str, safe_user_id: str, index: Any, record_id: Optional[str] = None
+    ) -> None:
+        """Encrypt and persist a per-user index (see _read_index for record_id)."""
+        encrypted_index = self._encode_record(index.to_dict())
+        if record_id is None:
+            self._backend.write(collection, safe_user_id, encrypted_index)
+        else:
+            self._backend.write(collection, record_id, encrypted_index, owner=safe_user_id)
+        self._indexes[(collection, safe_user_id)] = (encrypted_index, index)
+
+    def _delete_index(self, collection: str, safe_user_id: str) -> None:
+        """Delete a persisted per-user index."""
+        self._backend.delete(collection, safe_user_id)
+        self._indexes.pop((collection, safe_user_id), None)
+
+    def _load_note_index(self, safe_user_id: str) -> NoteIndex:
+        """Get a user's note index, building it if the user has none yet."""
+        index = self._read_index('note_index', safe_user_id, NoteIndex)
+        if index is None:
+            index = self._build_note_index(safe_user_id)
+        return index
+
+    def _save_note_index(self, safe_user_id: str, index: NoteIndex) -> None:
+        """Encrypt and persist a user's note index."""
+        self._save_index('note_index', safe_user_id, index)
+
+    def _build_note_index(self, safe_user_id: str) -> NoteIndex:
+        """Index every stored note of a user and persist the index."""
+        index = NoteIndex()
+        for _, encrypted_data in self._backend.iter_records('notes', safe_user_id):
+            note = self._decode_note(encrypted_data)
+            if note is None:
+                # Skip corrupted notes
+                continue
+            index.add(note.note_id, note.content, note.tags)
+        self._save_note_index(safe_user_id, index)
+        return index
+
     def create_reminder(self, reminder: Any, user_id: str) -> None:
         """Create a reminder.
 
-        Reminders are stored as encrypted JSON files in the user's reminders directory.
-        Each reminder is stored in a file named with its reminder_id.
+        Reminders are stored as encrypted JSON records owned by the user and
+        keyed by reminder_id.
 
         Args:
             reminder: The reminder to create (must be a Reminder dataclass).
@@ -433,41 +1547,75 @@ class MemoryManager:
         Raises:
             TypeError: If reminder is not a Reminder object or data is not JSON-serializable.
         """
-        from prime.models.data_models import Reminder
-        from dataclasses import asdict
-        
         # Verify it's a Reminder object
         if not isinstance(reminder, Reminder):
             raise TypeError(f"Expected Reminder object, got {type(reminder).__name__}")
         
-        # Sanitize user_id to create a valid directory name
+        # Sanitize user_id to create a valid owner key
         safe_user_id = self._sanitize_user_id(user_id)
         
-        # Create user-specific reminders directory
-        user_reminders_dir = self._reminders_dir / safe_user_id
-        user_reminders_dir.mkdir(exist_ok=True)
-        
-        # Convert reminder to dictionary
-        reminder_dict = asdict(reminder)
-        
-        # Convert datetime objects to ISO format strings for JSON serialization
-        reminder_dict['due_time'] = reminder.due_time.isoformat()
-        
-        # Serialize to JSON
-        json_data = json.dumps(reminder_dict).encode('utf-8')
-        
-        # Encrypt the data
-        encrypted_data = self.encrypt_data(json_data)
+        with self._lock_records(('reminder_index', None, safe_user_id)):
+            # Load the index first so that a missing index is built from the
+            # reminders stored so far
+            index = self._load_reminder_index(safe_user_id)
+            
+            self._write_model(
+                'reminders', reminder.reminder_id, reminder, _reminder_to_dict, owner=safe_user_id
+            )
+            
+            # Keep the due-time index in step
+            index.add(reminder.reminder_id, reminder.due_time, reminder.is_completed)
+            self._save_index('reminder_index', safe_user_id, index)
+
+    def create_reminders(self, reminders: Iterable[Any], user_id: str) -> int:
+        """Create several reminders at once.
+
+        Behaves like calling create_reminder for each reminder, but the
+        reminders are encrypted across the worker pool and written, together
+        with the updated due-time index, in a single backend batch.
+
+        Args:
+            reminders: The reminders to create (must be Reminder dataclasses).
+            user_id: The user identifier.
+
+        Returns:
+            The number of reminders created.
+
+        Raises:
+            TypeError: If any reminder is not a Reminder object or data is not
+                JSON-serializable. Nothing is stored in that case.
+        """
+        reminders = list(reminders)
+        for reminder in reminders:
+            if not isinstance(reminder, Reminder):
+                raise TypeError(f"Expected Reminder object, got {type(reminder).__name__}")
+        if not reminders:
+            return 0
         
-        # Save to file
-        reminder_file = user_reminders_dir / f"{reminder.reminder_id}.json"
-        reminder_file.write_bytes(encrypted_data)
+        safe_user_id = self._sanitize_user_id(user_id)
+        encrypted_reminders = self._map_parallel(
+            lambda reminder: self._encode_model(reminder, _reminder_to_dict), reminders
+        )
+        
+        with self._lock_records(('reminder_index', None, safe_user_id)):
+            index = self._load_reminder_index(safe_user_id)
+            for reminder in reminders:
+                index.add(reminder.reminder_id, reminder.due_time, reminder.is_completed)
+            self._write_batch_with_index(
+                [
+                    ('reminders', reminder.reminder_id, data, safe_user_id)
+                    for reminder, data in zip(reminders, encrypted_reminders)
+                ],
+                'reminder_index', safe_user_id, index
+            )
+        return len(reminders)
 
     def get_due_reminders(self, user_id: str) -> List[Any]:
         """Get reminders that are due.
 
         Returns all reminders that are not completed and whose due_time has passed
-        or is equal to the current time.
+        or is equal to the current time. The user's due-time index is used to
+        find them, so only due reminders are decrypted.
 
         Args:
             user_id: The user identifier.
@@ -475,49 +1623,151 @@ class MemoryManager:
         Returns:
             List of due Reminder objects, sorted by due_time (earliest first).
         """
-        from prime.models.data_models import Reminder
-        from datetime import datetime
-        
-        # Sanitize user_id to create a valid directory name
+        # Sanitize user_id to create a valid owner key
         safe_user_id = self._sanitize_user_id(user_id)
         
-        # Get user-specific reminders directory
-        user_reminders_dir = self._reminders_dir / safe_user_id
-        
-        # Return empty list if directory doesn't exist
-        if not user_reminders_dir.exists():
+        # Return empty list if the user has no reminders
+        if not self._backend.has_owner('reminders', safe_user_id):
             return []
         
-        # Load all reminders
         due_reminders = []
         current_time = datetime.now()
         
-        for reminder_file in user_reminders_dir.glob("*.json"):
-            try:
-                # Read and decrypt the reminder
-                encrypted_data = reminder_file.read_bytes()
-                decrypted_data = self.decrypt_data(encrypted_data)
-                reminder_dict = json.loads(decrypted_data.decode('utf-8'))
-                
-                # Convert ISO format strings back to datetime objects
-                reminder_dict['due_time'] = datetime.fromisoformat(reminder_dict['due_time'])
-                
-                # Create Reminder object
-                reminder = Reminder(**reminder_dict)
-                
-                # Check if reminder is due and not completed
-                if not reminder.is_completed and reminder.due_time <= current_time:
-                    due_reminders.append(reminder)
-                    
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                # Skip corrupted reminders
+        due_ids = self._load_reminder_index(safe_user_id).due(current_time)
+        records = self._read_records('reminders', safe_user_id, due_ids)
+        for _, reminder in self._scan(records, self._decode_reminder):
+            # Skip corrupted reminders
+            if reminder is None:
                 continue
+            
+            # Check if reminder is due and not completed
+            if not reminder.is_completed and reminder.due_time <= current_time:
+                due_reminders.append(reminder)
         
         # Sort by due_time (earliest first)
         due_reminders.sort(key=lambda r: r.due_time)
         
         return due_reminders
 
+    def get_next_reminder_time(self, user_id: str) -> Optional[datetime]:
+        """Get the due time of the user's earliest pending reminder.
+
+        Args:
+            user_id: The user identifier.
+
+        Returns:
+            The earliest due time, or None if nothing is pending.
+        """
+        safe_user_id = self._sanitize_user_id(user_id)
+        if not self._backend.has_owner('reminders', safe_user_id):
+            return None
+        return self._load_reminder_index(safe_user_id).next_due_time()
+
+    def complete_reminder(self, reminder_id: str, user_id: str) -> bool:
+        """Mark a reminder as completed.
+
+        Completed reminders leave the due-time index and stay in storage until
+        archived with archive_completed_reminders.
+
+        Args:
+            reminder_id: The reminder identifier.
+            user_id: The user identifier.
+
+        Returns:
+            True if the reminder was found, False otherwise.
+        """
+        safe_user_id = self._sanitize_user_id(user_id)
+        with self._lock_records(('reminder_index', None, safe_user_id)):
+            reminder = self._read_model('reminders', reminder_id, _reminder_from_dict, owner=safe_user_id)
+            if reminder is None:
+                return False
+            
+            index = self._load_reminder_index(safe_user_id)
+            
+            reminder.is_completed = True
+            self._write_model('reminders', reminder_id, reminder, _reminder_to_dict, owner=safe_user_id)
+            
+            index.add(reminder_id, reminder.due_time, True)
+            self._save_index('reminder_index', safe_user_id, index)
+        return True
+
+    def archive_completed_reminders(self, user_id: str) -> int:
+        """Move a user's completed reminders out of the active reminder set.
+
+        Archived reminders are kept, still encrypted, in a separate
+        collection so that they no longer cost anything on the hot path.
+
+        Args:
+            user_id: The user identifier.
+
+        Returns:
+            The number of reminders archived.
+        """
+        return self._archive_completed_reminders(self._sanitize_user_id(user_id))
+
+    def archive_all_completed_reminders(self) -> int:
+        """Archive the completed reminders of every user.
+
+        Returns:
+            The number of reminders archived.
+        """
+        owners = [record_id for record_id, _ in self._backend.iter_records('reminder_index')]
+        return sum(self._archive_completed_reminders(safe_user_id) for safe_user_id in owners)
+
+    def _archive_completed_reminders(self, safe_user_id: str) -> int:
+        """Archive the completed reminders of a user given by sanitized id."""
+        if not self._backend.has_owner('reminders', safe_user_id):
+            return 0
+        
+        archived = 0
+        with self._lock_records(('reminder_index', None, safe_user_id)):
+            index = self._load_reminder_index(safe_user_id)
+            for reminder_id in index.completed_ids:
+                encrypted_data = self._backend.read('reminders', reminder_id, owner=safe_user_id)
+                if encrypted_data is not None:
+                    # Records are moved as ciphertext, without decrypting them
+                    self._backend.write('reminders_archive', reminder_id, encrypted_data, owner=safe_user_id)
+                    self._backend.delete('reminders', reminder_id, owner=safe_user_id)
+                    archived += 1
+                index.remove(reminder_id)
+            
+            self._save_index('reminder_index', safe_user_id, index)
+        return archived
+
+    def get_archived_reminders(self, user_id: str) -> List[Any]:
+        """Retrieve a user's archived reminders.
+
+        Args:
+            user_id: The user identifier.
+
+        Returns:
+            List of archived Reminder objects, sorted by due_time (earliest first).
+        """
+        safe_user_id = self._sanitize_user_id(user_id)
+        reminders = []
+        for _, encrypted_data in self._backend.iter_records('reminders_archive', safe_user_id):
+            reminder = self._decode_reminder(encrypted_data)
+            if reminder is None:
+                # Skip corrupted reminders
+                continue
+            reminders.append(reminder)
+        reminders.sort(key=lambda r: r.due_time)
+        return reminders
+
+    def _load_reminder_index(self, safe_user_id: str) -> ReminderIndex:
+        """Get a user's reminder index, building it if the user has none yet."""
+        index = self._read_index('reminder_index', safe_user_id, ReminderIndex)
+        if index is None:
+            index = ReminderIndex()
+            for _, encrypted_data in self._backend.iter_records('reminders', safe_user_id):
+                reminder = self._decode_reminder(encrypted_data)
+                if reminder is None:
+                    # Skip corrupted reminders
+                    continue
+                index.add(reminder.reminder_id, reminder.due_time, reminder.is_completed)
+            self._save_index('reminder_index', safe_user_id, index)
+        return index
+
     def delete_user_data(self, user_id: str) -> None:
         """Delete all data for a user.
 
@@ -534,102 +1784,92 @@ class MemoryManager:
         Raises:
             OSError: If there are issues deleting files or directories.
         """
-        import shutil
-        
-        # Sanitize user_id to get the safe filename/directory name
+        # Sanitize user_id to get the safe owner key
         safe_user_id = self._sanitize_user_id(user_id)
         
-        # Delete user preferences file
-        user_pref_file = self._preferences_dir / f"{safe_user_id}.json"
-        if user_pref_file.exists():
-            user_pref_file.unlink()
-        
-        # Delete user notes directory
-        user_notes_dir = self._notes_dir / safe_user_id
-        if user_notes_dir.exists():
-            shutil.rmtree(user_notes_dir)
-        
-        # Delete user reminders directory
-        user_reminders_dir = self._reminders_dir / safe_user_id
-        if user_reminders_dir.exists():
-            shutil.rmtree(user_reminders_dir)
-        
-        # Delete user usage patterns directory
-        user_usage_dir = self._storage_dir / 'usage_patterns' / safe_user_id
-        if user_usage_dir.exists():
-            shutil.rmtree(user_usage_dir)
-        
-        # Delete user sessions
-        # Sessions are stored with session_id as filename, but we need to find
-        # all sessions belonging to this user by reading and checking user_id
-        for session_file in self._sessions_dir.glob("*.json"):
-            try:
-                # Read and decrypt the session
-                encrypted_data = session_file.read_bytes()
-                decrypted_data = self.decrypt_data(encrypted_data)
-                session_dict = json.loads(decrypted_data.decode('utf-8'))
-                
-                # Check if this session belongs to the user
-                if session_dict.get('user_id') == user_id:
-                    session_file.unlink()
-                    
-            except (json.JSONDecodeError, KeyError, ValueError, Exception) as e:
-                # Skip corrupted or unreadable sessions
-                continue
-
-    def record_application_usage(self, application_name: str, user_id: str) -> None:
+        # Delete user preferences, dropping cached changes first so that a
+        # pending flush cannot write them back
+        with self._preference_flush_lock:
+            with self._preference_lock:
+                self._preference_cache.pop(safe_user_id, None)
+                self._dirty_preferences.pop(safe_user_id, None)
+                self._stored_preferences.pop(safe_user_id, None)
+            self._backend.delete('preferences', safe_user_id)
+        
+        # Delete user notes and their index
+        with self._lock_records(('note_index', None, safe_user_id)):
+            self._backend.delete_owner('notes', safe_user_id)
+            self._delete_index('note_index', safe_user_id)
+        
+        # Delete user reminders, archived reminders and their index
+        with self._lock_records(('reminder_index', None, safe_user_id)):
+            self._backend.delete_owner('reminders', safe_user_id)
+            self._backend.delete_owner('reminders_archive', safe_user_id)
+            self._delete_index('reminder_index', safe_user_id)
+        
+        # Delete user usage patterns
+        self._backend.delete_owner('usage_patterns', safe_user_id)
+        
+        # Delete user sessions, found through the user's session index
+        with self._session_lock:
+            self._ensure_session_index()
+            with self._lock_records(('session_index', None, safe_user_id)):
+                index = self._read_index('session_index', safe_user_id, SessionIndex)
+                if index is not None:
+                    for session_id in index.session_ids():
+                        self._delete_session(session_id, user_id)
+                    self._delete_index('session_index', safe_user_id)
+
+    def record_application_usage(
+        self, application_name: str, user_id: str, when: Optional[datetime] = None
+    ) -> None:
         """Record application usage for tracking patterns.
 
-        This method tracks when applications are launched by users. It maintains
-        a count of launches and timestamps for first and last launch.
+        This method tracks when applications are launched by users. All of a
+        user's applications are kept in one usage table holding launch
+        counts, first and last launch times, and decaying launch scores per
+        hour of day and day of week (see get_top_applications). Recording a
+        launch updates the table in constant time.
 
         Args:
             application_name: The name of the application that was launched.
             user_id: The user identifier.
+            when: Time of the launch. Defaults to now.
 
         Raises:
             TypeError: If data is not JSON-serializable.
         """
-        from datetime import datetime
+        self.record_application_usage_batch([application_name], user_id, when)
+
+    def record_application_usage_batch(
+        self, application_names: Iterable[str], user_id: str, when: Optional[datetime] = None
+    ) -> int:
+        """Record several application launches at once.
+
+        Each name counts as one launch, so a name may appear more than once.
+        The user's usage table is read, updated and rewritten once.
+
+        Args:
+            application_names: Names of the applications that were launched.
+            user_id: The user identifier.
+            when: Time of the launches. Defaults to now.
+
+        Returns:
+            The number of distinct applications recorded.
+        """
+        launches = Counter(application_names)
+        if not launches:
+            return 0
+        if when is None:
+            when = datetime.now()
         
-        # Sanitize user_id to create a valid directory name
         safe_user_id = self._sanitize_user_id(user_id)
-        
-        # Create user-specific usage patterns directory
-        user_usage_dir = self._storage_dir / 'usage_patterns' / safe_user_id
-        user_usage_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Get the usage file path for this application
-        # Sanitize application name for filename
-        safe_app_name = self._sanitize_user_id(application_name)
-        usage_file = user_usage_dir / f"{safe_app_name}.json"
-        
-        current_time = datetime.now()
-        
-        # Load existing usage data or create new
-        if usage_file.exists():
-            # Read and decrypt existing usage data
-            encrypted_data = usage_file.read_bytes()
-            decrypted_data = self.decrypt_data(encrypted_data)
-            usage_data = json.loads(decrypted_data.decode('utf-8'))
-            
-            # Update usage data
-            usage_data['launch_count'] += 1
-            usage_data['last_launched'] = current_time.isoformat()
-            # Keep first_launched as is
-        else:
-            # Create new usage data
-            usage_data = {
-                'application_name': application_name,
-                'launch_count': 1,
-                'first_launched': current_time.isoformat(),
-                'last_launched': current_time.isoformat()
-            }
-        
-        # Serialize, encrypt, and save
-        json_data = json.dumps(usage_data).encode('utf-8')
-        encrypted_data = self.encrypt_data(json_data)
-        usage_file.write_bytes(encrypted_data)
+        with self._lock_records(('usage_patterns', safe_user_id, USAGE_TABLE_RECORD)):
+            table = self._load_usage_table(safe_user_id)
+            for name, count in launches.items():
+                table.record(name, when, count)
+            self._save_index('usage_patterns', safe_user_id, table, record_id=USAGE_TABLE_RECORD)
+        return len(launches)
 
     def get_application_usage(self, application_name: str, user_id: str) -> Optional[Any]:
         """Retrieve usage pattern data for an application.
@@ -641,38 +1881,8 @@ class MemoryManager:
         Returns:
             ApplicationUsage object if found, None otherwise.
         """
-        from prime.models.data_models import ApplicationUsage
-        from datetime import datetime
-        
-        # Sanitize user_id to create a valid directory name
         safe_user_id = self._sanitize_user_id(user_id)
-        
-        # Get user-specific usage patterns directory
-        user_usage_dir = self._storage_dir / 'usage_patterns' / safe_user_id
-        
-        # Return None if directory doesn't exist
-        if not user_usage_dir.exists():
-            return None
-        
-        # Get the usage file path for this application
-        safe_app_name = self._sanitize_user_id(application_name)
-        usage_file = user_usage_dir / f"{safe_app_name}.json"
-        
-        # Return None if file doesn't exist
-        if not usage_file.exists():
-            return None
-        
-        # Read and decrypt usage data
-        encrypted_data = usage_file.read_bytes()
-        decrypted_data = self.decrypt_data(encrypted_data)
-        usage_data = json.loads(decrypted_data.decode('utf-8'))
-        
-        # Convert ISO format strings back to datetime objects
-        usage_data['first_launched'] = datetime.fromisoformat(usage_data['first_launched'])
-        usage_data['last_launched'] = datetime.fromisoformat(usage_data['last_launched'])
-        
-        # Create and return ApplicationUsage object
-        return ApplicationUsage(**usage_data)
+        return self._load_usage_table(safe_user_id).get(application_name)
 
     def get_all_application_usage(self, user_id: str) -> List[Any]:
         """Retrieve all application usage patterns for a user.
@@ -683,68 +1893,243 @@ class MemoryManager:
         Returns:
             List of ApplicationUsage objects, sorted by launch_count (most used first).
         """
-        from prime.models.data_models import ApplicationUsage
-        from datetime import datetime
-        
-        # Sanitize user_id to create a valid directory name
         safe_user_id = self._sanitize_user_id(user_id)
-        
-        # Get user-specific usage patterns directory
-        user_usage_dir = self._storage_dir / 'usage_patterns' / safe_user_id
-        
-        # Return empty list if directory doesn't exist
-        if not user_usage_dir.exists():
-            return []
-        
-        # Load all usage patterns
-        usage_patterns = []
-        
-        for usage_file in user_usage_dir.glob("*.json"):
-            try:
-                # Read and decrypt the usage data
-                encrypted_data = usage_file.read_bytes()
-                decrypted_data = self.decrypt_data(encrypted_data)
-                usage_data = json.loads(decrypted_data.decode('utf-8'))
-                
-                # Convert ISO format strings back to datetime objects
-                usage_data['first_launched'] = datetime.fromisoformat(usage_data['first_launched'])
-                usage_data['last_launched'] = datetime.fromisoformat(usage_data['last_launched'])
-                
-                # Create ApplicationUsage object
-                usage = ApplicationUsage(**usage_data)
-                usage_patterns.append(usage)
-                
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
+        return self._load_usage_table(safe_user_id).all_usage()
+
+    def get_top_applications(
+        self,
+        user_id: str,
+        k: int = 3,
+        when: Optional[datetime] = None,
+        bucket: str = BUCKET_HOUR
+    ) -> List[Tuple[str, float]]:
+        """Get a user's most used applications for a time of day or week.
+
+        Launches are scored with exponential decay (half-life
+        usage_half_life_days), so recent habits outweigh old ones.
+
+        Args:
+            user_id: The user identifier.
+            k: Maximum number of applications.
+            when: The time to rank for. Defaults to now.
+            bucket: 'hour' to rank by launches at the same hour of day,
+                'weekday' by launches on the same day of the week, or 'any'
+                by all launches.
+
+        Returns:
+            (application_name, score) tuples, highest score first.
+
+        Raises:
+            ValueError: If bucket is unknown.
+        """
+        safe_user_id = self._sanitize_user_id(user_id)
+        return self._load_usage_table(safe_user_id).top_apps(k, when, bucket)
+
+    def _load_usage_table(self, safe_user_id: str) -> UsageTable:
+        """Get a user's usage table.
+
+        Stores written before usage tables existed keep one record per
+        application; these are folded into a new table, which replaces them.
+        """
+        with self._lock_records(('usage_patterns', safe_user_id, USAGE_TABLE_RECORD)):
+            table = self._read_index(
+                'usage_patterns', safe_user_id, UsageTable, record_id=USAGE_TABLE_RECORD
+            )
+            if table is not None:
+                return table
+            
+            legacy = [
+                (record_id, data)
+                for record_id, data in self._backend.iter_records('usage_patterns', safe_user_id)
+                if record_id != USAGE_TABLE_RECORD
+            ]
+            table = UsageTable(self._usage_half_life_days)
+            if not legacy:
+                return table
+            
+            usage_records = []
+            for _, usage in self._scan(iter(legacy), self._decode_usage):
                 # Skip corrupted usage data
-                continue
-        
-        # Sort by launch_count (most used first)
-        usage_patterns.sort(key=lambda u: u.launch_count, reverse=True)
-        
-        return usage_patterns
+                if usage is not None:
+                    usage_records.append(usage)
+            table = UsageTable.from_usage(usage_records, self._usage_half_life_days)
+            self._save_index('usage_patterns', safe_user_id, table, record_id=USAGE_TABLE_RECORD)
+            for record_id, _ in legacy:
+                self._backend.delete('usage_patterns', record_id, owner=safe_user_id)
+            return table
+
+    def storage_size(self) -> int:
+        """Get the number of bytes the store occupies.
+
+        The size is tracked by the storage backend, so this is cheap to call
+        repeatedly.
+        """
+        return self._backend.storage_size()
 
+    def compact_storage(self) -> int:
+        """Reclaim space left behind by deleted or rewritten records.
 
-def derive_key_from_password(password: str, salt: bytes) -> bytes:
-    """Derive an encryption key from a password using PBKDF2.
+        Returns:
+            The number of bytes reclaimed.
+        """
+        return self._backend.compact()
 
-    This utility function can be used to generate an encryption key from a
-    user password, allowing password-based encryption. The derived key is
-    base64-encoded to be compatible with Fernet.
 
-    Args:
-        password: The password to derive the key from.
-        salt: A random salt value (should be at least 16 bytes).
+def _create_backend(storage_dir: Path, backend: Union[str, StorageBackend, None]) -> StorageBackend:
+    """Create the storage backend named by a MemoryManager backend argument.
 
-    Returns:
-        A 32-byte base64-encoded encryption key suitable for use with Fernet.
+    Raises:
+        ValueError: If backend is an unknown backend name.
     """
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=480000,  # OWASP recommendation as of 2023
-        backend=default_backend()
+    if backend is None or backend == 'file':
+        return FileStorageBackend(storage_dir)
+    if backend == 'sqlite':
+        return SQLiteStorageBackend(storage_dir / SQLITE_DATABASE_NAME)
+    if isinstance(backend, StorageBackend):
+        return backend
+    raise ValueError(f"Unknown storage backend: {backend!r}")
+
+
+def _note_to_dict(note: Note) -> Dict[str, Any]:
+    """Convert a Note into a JSON-serializable dictionary."""
+    note_dict = asdict(note)
+    
+    # Convert datetime objects to ISO format strings for JSON serialization
+    note_dict['created_at'] = note.created_at.isoformat()
+    note_dict['updated_at'] = note.updated_at.isoformat()
+    return note_dict
+
+
+def _note_from_dict(note_dict: Dict[str, Any]) -> Note:
+    """Rebuild a Note from its stored dictionary."""
+    # Convert ISO format strings back to datetime objects
+    note_dict['created_at'] = datetime.fromisoformat(note_dict['created_at'])
+    note_dict['updated_at'] = datetime.fromisoformat(note_dict['updated_at'])
+    return Note(**note_dict)
+
+
+def _reminder_to_dict(reminder: Reminder) -> Dict[str, Any]:
+    """Convert a Reminder into a JSON-serializable dictionary."""
+    reminder_dict = asdict(reminder)
+    
+    # Convert datetime objects to ISO format strings for JSON serialization
+    reminder_dict['due_time'] = reminder.due_time.isoformat()
+    return reminder_dict
+
+
+def _reminder_from_dict(reminder_dict: Dict[str, Any]) -> Reminder:
+    """Rebuild a Reminder from its stored dictionary."""
+    # Convert ISO format strings back to datetime objects
+    reminder_dict['due_time'] = datetime.fromisoformat(reminder_dict['due_time'])
+    return Reminder(**reminder_dict)
+
+
+def _usage_from_dict(usage_data: Dict[str, Any]) -> ApplicationUsage:
+    """Rebuild an ApplicationUsage from its stored dictionary."""
+    # Convert ISO format strings back to datetime objects
+    usage_data['first_launched'] = datetime.fromisoformat(usage_data['first_launched'])
+    usage_data['last_launched'] = datetime.fromisoformat(usage_data['last_launched'])
+    return ApplicationUsage(**usage_data)
+
+
+def _session_to_dict(session: Session) -> Dict[str, Any]:
+    """Convert a Session into a JSON-serializable dictionary."""
+    return {
+        'session_id': session.session_id,
+        'user_id': session.user_id,
+        # Convert datetime objects to ISO format strings for JSON serialization
+        'start_time': session.start_time.isoformat(),
+        'end_time': session.end_time.isoformat() if session.end_time else None,
+        # Records of a lazily loaded history that were never accessed are
+        # written back as they were read
+        'command_history': export_history(
+            session.command_history, _command_record_from_dict, _command_record_to_dict
+        ),
+        'context_state': copy.deepcopy(session.context_state),
+    }
+
+
+def _command_record_to_dict(record: CommandRecord) -> Dict[str, Any]:
+    """Convert a CommandRecord into a JSON-serializable dictionary."""
+    record_dict = asdict(record)
+    
+    # Convert datetime objects to ISO format strings for JSON serialization
+    record_dict['timestamp'] = record.timestamp.isoformat()
+    record_dict['command']['timestamp'] = record.command.timestamp.isoformat()
+    return record_dict
+
+
+def _session_state_to_dict(session: Session) -> Dict[str, Any]:
+    """Get the mutable, non-history part of a Session as a dictionary."""
+    return {
+        'end_time': session.end_time.isoformat() if session.end_time else None,
+        'context_state': session.context_state,
+    }
+
+
+def _apply_session_state(session: Session, state: Dict[str, Any]) -> None:
+    """Apply a journaled end_time and context_state to a Session."""
+    session.end_time = datetime.fromisoformat(state['end_time']) if state['end_time'] else None
+    session.context_state = state['context_state']
+
+
+def _command_record_from_dict(record_dict: Dict[str, Any]) -> CommandRecord:
+    """Rebuild a CommandRecord, with all nested dataclasses, from its dictionary."""
+    # Reconstruct entities
+    entities = [
+        Entity(**entity_dict)
+        for entity_dict in record_dict['command']['intent']['entities']
+    ]
+    
+    # Reconstruct intent
+    intent = Intent(
+        intent_type=record_dict['command']['intent']['intent_type'],
+        entities=entities,
+        confidence=record_dict['command']['intent']['confidence'],
+        requires_clarification=record_dict['command']['intent']['requires_clarification']
+    )
+    
+    # Reconstruct command
+    command = Command(
+        command_id=record_dict['command']['command_id'],
+        intent=intent,
+        parameters=record_dict['command']['parameters'],
+        timestamp=datetime.fromisoformat(record_dict['command']['timestamp']),
+        requires_confirmation=record_dict['command']['requires_confirmation']
+    )
+    
+    # Reconstruct command result
+    result = CommandResult(**record_dict['result'])
+    
+    # Reconstruct command record
+    return CommandRecord(
+        command=command,
+        result=result,
+        timestamp=datetime.fromisoformat(record_dict['timestamp'])
+    )
+
+
+def _session_from_dict(session_dict: Dict[str, Any]) -> Session:
+    """Rebuild a Session, including its command history, from its dictionary."""
+    # Convert ISO format strings back to datetime objects
+    session_dict['start_time'] = datetime.fromisoformat(session_dict['start_time'])
+    if session_dict['end_time']:
+        session_dict['end_time'] = datetime.fromisoformat(session_dict['end_time'])
+    
+    # Command records are rebuilt as dataclass instances when first accessed
+    session_dict['command_history'] = LazyHistory(
+        session_dict['command_history'], _command_record_from_dict
     )
-    key = kdf.derive(password.encode())
-    # Fernet requires base64-encoded keys
-    return base64.urlsafe_b64encode(key)
+    
+    # Create and return Session object
+    return Session(**session_dict)
+
+
+def _flush_preferences_at_exit(manager_ref: 'weakref.ReferenceType[MemoryManager]') -> None:
+    """Flush a manager's pending preference changes at interpreter shutdown."""
+    manager = manager_ref()
+    if manager is not None:
+        try:
+            manager.flush_preferences()
+        except Exception:
+            pass
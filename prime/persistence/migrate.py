@@ -0,0 +1,90 @@
+"""One-shot migration from the file-per-record layout to the SQLite backend.
+
+Usage:
+    python -m prime.persistence.migrate [STORAGE_DIR] [--database PATH]
+
+Records are copied as ciphertext, so no encryption key is needed and the
+migrated store opens with the same key as before. The original files are left
+in place; remove them once the migrated store has been verified.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from prime.persistence.memory_manager import SQLITE_DATABASE_NAME
+from prime.persistence.storage_backend import (
+    FileStorageBackend, SQLiteStorageBackend, migrate_storage
+)
+
+
+def migrate_file_store(storage_dir: Path, database_path: Optional[Path] = None) -> int:
+    """Copy a file-layout store into a SQLite database.
+
+    Args:
+        storage_dir: The storage directory of the existing file-layout store.
+        database_path: Path of the database to create. Defaults to the file
+            that MemoryManager(backend='sqlite') opens inside storage_dir.
+
+    Returns:
+        The number of records migrated.
+
+    Raises:
+        FileNotFoundError: If storage_dir does not exist.
+    """
+    storage_dir = Path(storage_dir)
+    if not storage_dir.is_dir():
+        raise FileNotFoundError(f"Storage directory {storage_dir} not found")
+
+    if database_path is None:
+        database_path = storage_dir / SQLITE_DATABASE_NAME
+
+    source = FileStorageBackend(storage_dir)
+    target = SQLiteStorageBackend(database_path)
+    try:
+        return migrate_storage(source, target)
+    finally:
+        target.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point for the migration tool.
+
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+
+    Returns:
+        Exit code (0 for success, non-zero for error)
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m prime.persistence.migrate",
+        description="Migrate a PRIME file-layout store to the SQLite backend",
+    )
+    parser.add_argument(
+        "storage_dir",
+        type=Path,
+        nargs="?",
+        default=Path.home() / ".prime_data",
+        help="Storage directory to migrate (default: ~/.prime_data)",
+    )
+    parser.add_argument(
+        "--database",
+        type=Path,
+        help=f"Database file to create (default: STORAGE_DIR/{SQLITE_DATABASE_NAME})",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        count = migrate_file_store(args.storage_dir, args.database)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Migrated {count} records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""Inverted full-text index for PRIME notes.
+
+The NoteIndex maps tokens to the notes that contain them, plus a tag index,
+so the Memory Manager only has to decrypt the notes that can match a query.
+It supports:
+
+- Candidate pruning for the substring semantics of MemoryManager.search_notes
+- Prefix matching against the sorted vocabulary
+- BM25 ranking of results
+
+The index itself holds plaintext tokens, so the Memory Manager stores it as an
+encrypted record like any other user data.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Tokens are runs of word characters, compared in lower case
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Version of the serialized index format
+INDEX_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-case word tokens.
+
+    Args:
+        text: The text to tokenize.
+
+    Returns:
+        List of tokens in order of appearance.
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class NoteIndex:
+    """Incrementally maintained inverted index over one user's notes."""
+
+    # BM25 parameters
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # note_id -> {token: term frequency}
+        self._documents: Dict[str, Dict[str, int]] = {}
+        # note_id -> lower-case tags
+        self._document_tags: Dict[str, List[str]] = {}
+        # note_id -> number of tokens
+        self._lengths: Dict[str, int] = {}
+        # token -> {note_id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # lower-case tag -> note_ids
+        self._tags: Dict[str, Set[str]] = {}
+        self._total_length = 0
+        self._sorted_vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, note_id: str) -> bool:
+        return note_id in self._documents
+
+    @property
+    def note_ids(self) -> List[str]:
+        """Get the ids of all indexed notes."""
+        return list(self._documents)
+
+    def add(self, note_id: str, content: str, tags: Iterable[str]) -> None:
+        """Index a note, replacing any previous version of it.
+
+        Args:
+            note_id: The note identifier.
+            content: The note content.
+            tags: The note tags.
+        """
+        self.remove(note_id)
+
+        tag_list = [tag.lower() for tag in tags]
+        tokens = tokenize(content)
+        for tag in tag_list:
+            tokens.extend(tokenize(tag))
+
+        terms: Dict[str, int] = {}
+        for token in tokens:
+            terms[token] = terms.get(token, 0) + 1
+
+        self._documents[note_id] = terms
+        self._document_tags[note_id] = tag_list
+        self._lengths[note_id] = len(tokens)
+        self._total_length += len(tokens)
+
+        for token, frequency in terms.items():
+            if token not in self._postings:
+                self._sorted_vocabulary = None
+                self._postings[token] = {}
+            self._postings[token][note_id] = frequency
+
+        for tag in tag_list:
+            self._tags.setdefault(tag, set()).add(note_id)
+
+    def remove(self, note_id: str) -> bool:
+        """Remove a note from the index.
+
+        Args:
+            note_id: The note identifier.
+
+        Returns:
+            True if the note was indexed, False otherwise.
+        """
+        terms = self._documents.pop(note_id, None)
+        if terms is None:
+            return False
+
+        for token in terms:
+            postings = self._postings[token]
+            del postings[note_id]
+            if not postings:
+                del self._postings[token]
+                self._sorted_vocabulary = None
+
+        for tag in self._document_tags.pop(note_id):
+            notes = self._tags.get(tag)
+            if notes is not None:
+                notes.discard(note_id)
+                if not notes:
+                    del self._tags[tag]
+
+        self._total_length -= self._lengths.pop(note_id)
+        return True
+
+    def _vocabulary(self) -> List[str]:
+        if self._sorted_vocabulary is None:
+            self._sorted_vocabulary = sorted(self._postings)
+        return self._sorted_vocabulary
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        """Find all indexed tokens starting with a prefix.
+
+        Args:
+            prefix: The token prefix (lower case).
+
+        Returns:
+            Matching tokens in sorted order.
+        """
+        vocabulary = self._vocabulary()
+        matches = []
+        for position in range(bisect_left(vocabulary, prefix), len(vocabulary)):
+            token = vocabulary[position]
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def substring_candidates(self, query: str) -> Optional[Set[str]]:
+        """Find notes that may contain a query as a substring.
+
+        Every word token of the query must occur inside some token of a note
+        for the query to be a substring of its content or of one of its tags,
+        so only the vocabulary is scanned. Candidates still have to be
+        verified against the decrypted note.
+
+        Args:
+            query: The search query.
+
+        Returns:
+            The candidate note ids, or None if the query has no word tokens
+            and every note is a candidate.
+        """
+        query_tokens = set(tokenize(query))
+        if not query_tokens:
+            return None
+
+        candidates: Optional[Set[str]] = None
+        for query_token in query_tokens:
+            matching: Set[str] = set()
+            for token, postings in self._postings.items():
+                if query_token in token:
+                    matching.update(postings)
+            candidates = matching if candidates is None else candidates & matching
+            if not candidates:
+                return set()
+        return candidates
+
+    def notes_with_tag(self, tag: str) -> Set[str]:
+        """Get the notes carrying a tag (case-insensitive exact match)."""
+        return set(self._tags.get(tag.lower(), ()))
+
+    def rank(self, query: str, prefix: bool = True) -> List[Tuple[str, float]]:
+        """Rank notes against a query with BM25.
+
+        Args:
+            query: The search query.
+            prefix: If True, each query token also matches indexed tokens it is
+                a prefix of.
+
+        Returns:
+            (note_id, score) tuples, best match first. Notes that match no
+            query token are omitted.
+        """
+        document_count = len(self._documents)
+        if document_count == 0:
+            return []
+        average_length = self._total_length / document_count or 1.0
+
+        scores: Dict[str, float] = {}
+        for query_token in dict.fromkeys(tokenize(query)):
+            if prefix:
+                tokens = self.expand_prefix(query_token)
+            else:
+                tokens = [query_token] if query_token in self._postings else []
+
+            for token in tokens:
+                postings = self._postings[token]
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for note_id, frequency in postings.items():
+                    length_norm = 1 - self.B + self.B * self._lengths[note_id] / average_length
+                    score = idf * frequency * (self.K1 + 1) / (frequency + self.K1 * length_norm)
+                    scores[note_id] = scores.get(note_id, 0.0) + score
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to a JSON-compatible dictionary.
+
+        Only per-note term frequencies and tags are stored; postings are
+        rebuilt on load.
+        """
+        return {
+            'version': INDEX_VERSION,
+            'documents': {
+                note_id: {
+                    'terms': terms,
+                    'tags': self._document_tags[note_id],
+                    'length': self._lengths[note_id],
+                }
+                for note_id, terms in self._documents.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'NoteIndex':
+        """Rebuild an index serialized with to_dict.
+
+        Raises:
+            ValueError: If the data was written by an unsupported version.
+        """
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported note index version: {data.get('version')}")
+
+        index = cls()
+        for note_id, document in data['documents'].items():
+            terms = document['terms']
+            index._documents[note_id] = terms
+            index._document_tags[note_id] = document['tags']
+            index._lengths[note_id] = document['length']
+            index._total_length += document['length']
+            for token, frequency in terms.items():
+                index._postings.setdefault(token, {})[note_id] = frequency
+            for tag in document['tags']:
+                index._tags.setdefault(tag, set()).add(note_id)
+        return index
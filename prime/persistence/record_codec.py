@@ -0,0 +1,471 @@
+"""Compact binary record codec for PRIME.
+
+The Memory Manager stores records as JSON by default. This module provides a
+compact, versioned binary alternative for the dataclasses that dominate
+storage (Session, Note, Reminder and ApplicationUsage):
+
+- Dataclasses are encoded positionally, straight from their attributes,
+  without the deep copy made by dataclasses.asdict
+- Session command histories are decoded lazily (see LazyHistory)
+- Timestamps are stored as integer microseconds since the epoch instead of
+  ISO strings (timezone-aware datetimes fall back to ISO strings)
+- The body uses the MessagePack wire format. The msgpack package is used if
+  it is installed; otherwise a pure-Python encoder/decoder for the subset of
+  the format needed here produces identical bytes
+
+An encoded record is ``MAGIC + version + body``. MAGIC is a byte that can
+never start a JSON document, so readers can tell the formats apart.
+"""
+
+import struct
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from prime.models.data_models import (
+    ApplicationUsage, Command, CommandRecord, CommandResult, Entity,
+    Intent, Note, Reminder, Session
+)
+from prime.persistence.lazy_history import LazyHistory, export_history
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# First byte of every binary record (0xc1 is never used by MessagePack and
+# cannot start a JSON document)
+MAGIC = b'\xc1'
+
+# Version of the binary record format
+CODEC_VERSION = 1
+
+# Record type tags
+_TYPE_SESSION = 1
+_TYPE_NOTE = 2
+_TYPE_REMINDER = 3
+_TYPE_USAGE = 4
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def is_binary(data: bytes) -> bool:
+    """Check whether plaintext record bytes use the binary format."""
+    return data[:1] == MAGIC
+
+
+def encode(obj: Any, journal_generation: Optional[str] = None) -> bytes:
+    """Encode a Session, Note, Reminder or ApplicationUsage.
+
+    Args:
+        obj: The dataclass instance to encode.
+        journal_generation: For sessions, the generation of the session
+            journal the snapshot belongs to.
+
+    Returns:
+        The encoded record.
+
+    Raises:
+        TypeError: If obj is not a supported dataclass or contains values
+            that cannot be encoded.
+    """
+    if isinstance(obj, Session):
+        body = [
+            _TYPE_SESSION,
+            obj.session_id,
+            obj.user_id,
+            _pack_time(obj.start_time),
+            _pack_time(obj.end_time),
+            export_history(obj.command_history, _command_record_from_list, _command_record_to_list),
+            obj.context_state,
+            journal_generation,
+        ]
+    elif isinstance(obj, Note):
+        body = [
+            _TYPE_NOTE,
+            obj.note_id,
+            obj.content,
+            list(obj.tags),
+            _pack_time(obj.created_at),
+            _pack_time(obj.updated_at),
+        ]
+    elif isinstance(obj, Reminder):
+        body = [
+            _TYPE_REMINDER,
+            obj.reminder_id,
+            obj.content,
+            _pack_time(obj.due_time),
+            obj.is_completed,
+        ]
+    elif isinstance(obj, ApplicationUsage):
+        body = [
+            _TYPE_USAGE,
+            obj.application_name,
+            obj.launch_count,
+            _pack_time(obj.last_launched),
+            _pack_time(obj.first_launched),
+        ]
+    else:
+        raise TypeError(f"Cannot encode {type(obj).__name__} records")
+
+    return MAGIC + bytes([CODEC_VERSION]) + packb(body)
+
+
+def decode(data: bytes) -> Any:
+    """Decode a record encoded with encode.
+
+    Returns:
+        The Session, Note, Reminder or ApplicationUsage instance.
+
+    Raises:
+        ValueError: If the data is not a binary record or was written by an
+            unsupported version.
+    """
+    return decode_with_generation(data)[0]
+
+
+def decode_with_generation(data: bytes) -> Tuple[Any, Optional[str]]:
+    """Decode a record, also returning a session snapshot's journal generation.
+
+    Returns:
+        (record, journal_generation) tuple. journal_generation is None for
+        records other than sessions.
+
+    Raises:
+        ValueError: If the data is not a binary record or was written by an
+            unsupported version.
+    """
+    if not is_binary(data) or len(data) < 2:
+        raise ValueError("Not a binary record")
+    if data[1] != CODEC_VERSION:
+        raise ValueError(f"Unsupported record codec version: {data[1]}")
+
+    body = unpackb(data[2:])
+    record_type = body[0]
+    if record_type == _TYPE_SESSION:
+        _, session_id, user_id, start, end, history, context_state, generation = body
+        session = Session(
+            session_id=session_id,
+            user_id=user_id,
+            start_time=_unpack_time(start),
+            end_time=_unpack_time(end),
+            command_history=LazyHistory(history, _command_record_from_list),
+            context_state=context_state
+        )
+        return session, generation
+    if record_type == _TYPE_NOTE:
+        _, note_id, content, tags, created, updated = body
+        return Note(
+            note_id=note_id,
+            content=content,
+            tags=tags,
+            created_at=_unpack_time(created),
+            updated_at=_unpack_time(updated)
+        ), None
+    if record_type == _TYPE_REMINDER:
+        _, reminder_id, content, due, is_completed = body
+        return Reminder(
+            reminder_id=reminder_id,
+            content=content,
+            due_time=_unpack_time(due),
+            is_completed=is_completed
+        ), None
+    if record_type == _TYPE_USAGE:
+        _, application_name, launch_count, last, first = body
+        return ApplicationUsage(
+            application_name=application_name,
+            launch_count=launch_count,
+            last_launched=_unpack_time(last),
+            first_launched=_unpack_time(first)
+        ), None
+    raise ValueError(f"Unknown record type: {record_type}")
+
+
+def _pack_time(value: Optional[datetime]) -> Any:
+    """Encode a datetime as integer microseconds since the epoch."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        # Keep the offset of timezone-aware datetimes
+        return value.isoformat()
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _unpack_time(value: Any) -> Optional[datetime]:
+    """Decode a datetime encoded with _pack_time."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _command_record_to_list(record: CommandRecord) -> List[Any]:
+    """Flatten a CommandRecord and its nested dataclasses into a list."""
+    command = record.command
+    intent = command.intent
+    result = record.result
+    return [
+        command.command_id,
+        intent.intent_type,
+        [[entity.entity_type, entity.value, entity.confidence] for entity in intent.entities],
+        intent.confidence,
+        intent.requires_clarification,
+        command.parameters,
+        _pack_time(command.timestamp),
+        command.requires_confirmation,
+        result.command_id,
+        result.success,
+        result.output,
+        result.error,
+        result.execution_time_ms,
+        _pack_time(record.timestamp),
+    ]
+
+
+def _command_record_from_list(values: List[Any]) -> CommandRecord:
+    """Rebuild a CommandRecord flattened by _command_record_to_list."""
+    (
+        command_id, intent_type, entities, intent_confidence, requires_clarification,
+        parameters, command_time, requires_confirmation,
+        result_command_id, success, output, error, execution_time_ms, record_time
+    ) = values
+    return CommandRecord(
+        command=Command(
+            command_id=command_id,
+            intent=Intent(
+                intent_type=intent_type,
+                entities=[
+                    Entity(entity_type=entity_type, value=value, confidence=confidence)
+                    for entity_type, value, confidence in entities
+                ],
+                confidence=intent_confidence,
+                requires_clarification=requires_clarification
+            ),
+            parameters=parameters,
+            timestamp=_unpack_time(command_time),
+            requires_confirmation=requires_confirmation
+        ),
+        result=CommandResult(
+            command_id=result_command_id,
+            success=success,
+            output=output,
+            error=error,
+            execution_time_ms=execution_time_ms
+        ),
+        timestamp=_unpack_time(record_time)
+    )
+
+
+def packb(obj: Any) -> bytes:
+    """Serialize a value in the MessagePack format.
+
+    Supports None, bool, int (64-bit), float, str, bytes, lists, tuples and
+    dicts.
+
+    Raises:
+        TypeError: If the value contains unsupported types.
+    """
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    out: List[bytes] = []
+    _pack(obj, out)
+    return b''.join(out)
+
+
+def unpackb(data: bytes) -> Any:
+    """Deserialize a value serialized with packb.
+
+    Raises:
+        ValueError: If the data is truncated or malformed.
+    """
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    value, offset = _unpack(data, 0)
+    if offset != len(data):
+        raise ValueError("Extra data after MessagePack value")
+    return value
+
+
+def _pack(obj: Any, out: List[bytes]) -> None:
+    """Append the MessagePack encoding of obj to out."""
+    if obj is None:
+        out.append(b'\xc0')
+    elif obj is True:
+        out.append(b'\xc3')
+    elif obj is False:
+        out.append(b'\xc2')
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out.append(b'\xcb' + struct.pack('>d', obj))
+    elif isinstance(obj, str):
+        encoded = obj.encode('utf-8')
+        size = len(encoded)
+        if size < 32:
+            out.append(bytes([0xa0 | size]))
+        elif size < 0x100:
+            out.append(b'\xd9' + bytes([size]))
+        elif size < 0x10000:
+            out.append(b'\xda' + struct.pack('>H', size))
+        else:
+            out.append(b'\xdb' + struct.pack('>I', size))
+        out.append(encoded)
+    elif isinstance(obj, (bytes, bytearray)):
+        size = len(obj)
+        if size < 0x100:
+            out.append(b'\xc4' + bytes([size]))
+        elif size < 0x10000:
+            out.append(b'\xc5' + struct.pack('>H', size))
+        else:
+            out.append(b'\xc6' + struct.pack('>I', size))
+        out.append(bytes(obj))
+    elif isinstance(obj, (list, tuple)):
+        size = len(obj)
+        if size < 16:
+            out.append(bytes([0x90 | size]))
+        elif size < 0x10000:
+            out.append(b'\xdc' + struct.pack('>H', size))
+        else:
+            out.append(b'\xdd' + struct.pack('>I', size))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        size = len(obj)
+        if size < 16:
+            out.append(bytes([0x80 | size]))
+        elif size < 0x10000:
+            out.append(b'\xde' + struct.pack('>H', size))
+        else:
+            out.append(b'\xdf' + struct.pack('>I', size))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+
+def _pack_int(value: int, out: List[bytes]) -> None:
+    """Append the smallest MessagePack encoding of an integer to out."""
+    if 0 <= value < 0x80:
+        out.append(bytes([value]))
+    elif -32 <= value < 0:
+        out.append(bytes([value & 0xff]))
+    elif value >= 0:
+        if value < 0x100:
+            out.append(b'\xcc' + bytes([value]))
+        elif value < 0x10000:
+            out.append(b'\xcd' + struct.pack('>H', value))
+        elif value < 0x100000000:
+            out.append(b'\xce' + struct.pack('>I', value))
+        elif value < 0x10000000000000000:
+            out.append(b'\xcf' + struct.pack('>Q', value))
+        else:
+            raise TypeError("Integer too large for MessagePack")
+    else:
+        if value >= -0x80:
+            out.append(b'\xd0' + struct.pack('>b', value))
+        elif value >= -0x8000:
+            out.append(b'\xd1' + struct.pack('>h', value))
+        elif value >= -0x80000000:
+            out.append(b'\xd2' + struct.pack('>i', value))
+        elif value >= -0x8000000000000000:
+            out.append(b'\xd3' + struct.pack('>q', value))
+        else:
+            raise TypeError("Integer too small for MessagePack")
+
+
+# Fixed-size formats: first byte -> (struct format, size)
+_FIXED_FORMATS = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+
+# Variable-size formats: first byte -> (kind, struct format of the length)
+_SIZED_FORMATS = {
+    0xc4: ('bin', '>B'), 0xc5: ('bin', '>H'), 0xc6: ('bin', '>I'),
+    0xd9: ('str', '>B'), 0xda: ('str', '>H'), 0xdb: ('str', '>I'),
+    0xdc: ('array', '>H'), 0xdd: ('array', '>I'),
+    0xde: ('map', '>H'), 0xdf: ('map', '>I'),
+}
+
+
+def _unpack(data: bytes, offset: int) -> Tuple[Any, int]:
+    """Decode one MessagePack value starting at offset.
+
+    Returns:
+        (value, offset just past the value) tuple.
+    """
+    try:
+        first = data[offset]
+    except IndexError:
+        raise ValueError("Truncated MessagePack data") from None
+    offset += 1
+
+    if first < 0x80:
+        return first, offset
+    if first >= 0xe0:
+        return first - 0x100, offset
+    if 0xa0 <= first <= 0xbf:
+        return _take_str(data, offset, first & 0x1f)
+    if 0x90 <= first <= 0x9f:
+        return _take_array(data, offset, first & 0x0f)
+    if 0x80 <= first <= 0x8f:
+        return _take_map(data, offset, first & 0x0f)
+    if first == 0xc0:
+        return None, offset
+    if first == 0xc2:
+        return False, offset
+    if first == 0xc3:
+        return True, offset
+
+    if first in _FIXED_FORMATS:
+        fmt, size = _FIXED_FORMATS[first]
+        _check_available(data, offset, size)
+        return struct.unpack_from(fmt, data, offset)[0], offset + size
+
+    if first in _SIZED_FORMATS:
+        kind, fmt = _SIZED_FORMATS[first]
+        length_size = struct.calcsize(fmt)
+        _check_available(data, offset, length_size)
+        length = struct.unpack_from(fmt, data, offset)[0]
+        offset += length_size
+        if kind == 'str':
+            return _take_str(data, offset, length)
+        if kind == 'bin':
+            _check_available(data, offset, length)
+            return bytes(data[offset:offset + length]), offset + length
+        if kind == 'array':
+            return _take_array(data, offset, length)
+        return _take_map(data, offset, length)
+
+    raise ValueError(f"Unsupported MessagePack type byte: 0x{first:02x}")
+
+
+def _check_available(data: bytes, offset: int, size: int) -> None:
+    if offset + size > len(data):
+        raise ValueError("Truncated MessagePack data")
+
+
+def _take_str(data: bytes, offset: int, length: int) -> Tuple[str, int]:
+    _check_available(data, offset, length)
+    return data[offset:offset + length].decode('utf-8'), offset + length
+
+
+def _take_array(data: bytes, offset: int, length: int) -> Tuple[List[Any], int]:
+    items = []
+    for _ in range(length):
+        item, offset = _unpack(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _take_map(data: bytes, offset: int, length: int) -> Tuple[Dict[Any, Any], int]:
+    result = {}
+    for _ in range(length):
+        key, offset = _unpack(data, offset)
+        value, offset = _unpack(data, offset)
+        result[key] = value
+    return result, offset
@@ -0,0 +1,136 @@
+"""Record locking for the PRIME Memory Manager.
+
+Read-modify-write updates (usage counters, per-user indexes, preferences)
+must not interleave, whether the writers are threads of one process or
+several PRIME processes sharing a storage directory. RecordLocks provides
+both kinds of exclusion for ``(collection, owner, record_id)`` keys:
+
+- In-process: keys are hashed onto a fixed number of stripes, each guarded by
+  a reentrant lock, so unrelated records rarely contend and memory use does
+  not grow with the number of records
+- Across processes: each stripe also takes an advisory ``fcntl`` byte-range
+  lock on a single lock file owned by the backend. On platforms without
+  ``fcntl`` only the in-process locks are used
+
+POSIX record locks belong to the process, not to a thread or file
+descriptor, so a lock file must be opened once per process. RecordLocks.for_path
+returns the shared instance for a lock file.
+"""
+
+import os
+import threading
+import weakref
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Number of lock stripes
+DEFAULT_STRIPES = 64
+
+# A record lock key: (collection, owner, record_id)
+RecordKey = Tuple[str, Optional[str], str]
+
+_instances: 'weakref.WeakValueDictionary[str, RecordLocks]' = weakref.WeakValueDictionary()
+_instances_lock = threading.Lock()
+
+
+class RecordLocks:
+    """Striped per-record locks, optionally shared with other processes."""
+
+    def __init__(self, lock_path: Optional[Path] = None, stripes: int = DEFAULT_STRIPES):
+        """
+        Initialize the locks.
+
+        Args:
+            lock_path: Lock file for cross-process locking, or None to lock
+                within this process only
+            stripes: Number of lock stripes
+        """
+        self.stripes = stripes
+        self.lock_path = Path(lock_path) if lock_path is not None else None
+        self._locks = [threading.RLock() for _ in range(stripes)]
+        # Per-stripe hold count, so nested acquisitions by the holding thread
+        # release the process-wide lock only when the outermost one exits
+        self._depth = [0] * stripes
+        self._fd: Optional[int] = None
+        if self.lock_path is not None and fcntl is not None:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(str(self.lock_path), os.O_RDWR | os.O_CREAT, 0o600)
+
+    @classmethod
+    def for_path(cls, lock_path: Optional[Path], stripes: int = DEFAULT_STRIPES) -> 'RecordLocks':
+        """Get the process-wide locks for a lock file.
+
+        Args:
+            lock_path: The lock file, or None for private in-process locks.
+            stripes: Number of lock stripes for a new instance.
+
+        Returns:
+            The RecordLocks instance shared by everything in this process
+            that uses lock_path.
+        """
+        if lock_path is None:
+            return cls(None, stripes)
+        key = os.path.abspath(lock_path)
+        with _instances_lock:
+            locks = _instances.get(key)
+            if locks is None:
+                locks = cls(Path(key), stripes)
+                _instances[key] = locks
+            return locks
+
+    def stripe(self, key: RecordKey) -> int:
+        """Get the stripe guarding a record key."""
+        collection, owner, record_id = key
+        return zlib.crc32(f"{collection}\0{owner or ''}\0{record_id}".encode('utf-8')) % self.stripes
+
+    @contextmanager
+    def hold(self, keys: Iterable[RecordKey]) -> Iterator[None]:
+        """Lock several records for the duration of a with block.
+
+        Stripes are always taken in ascending order, so callers locking
+        overlapping sets of records cannot deadlock.
+
+        Args:
+            keys: The (collection, owner, record_id) keys to lock.
+        """
+        stripes = sorted({self.stripe(key) for key in keys})
+        acquired: List[int] = []
+        try:
+            for stripe in stripes:
+                self._acquire(stripe)
+                acquired.append(stripe)
+            yield
+        finally:
+            for stripe in reversed(acquired):
+                self._release(stripe)
+
+    def _acquire(self, stripe: int) -> None:
+        self._locks[stripe].acquire()
+        if self._depth[stripe] == 0 and self._fd is not None:
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+            except BaseException:
+                self._locks[stripe].release()
+                raise
+        self._depth[stripe] += 1
+
+    def _release(self, stripe: int) -> None:
+        self._depth[stripe] -= 1
+        if self._depth[stripe] == 0 and self._fd is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+        self._locks[stripe].release()
+
+    def __del__(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
@@ -0,0 +1,112 @@
+"""Due-time ordered reminder index for PRIME.
+
+The ReminderIndex keeps a user's pending reminders sorted by due time, so the
+Memory Manager can find due reminders with a binary search and only decrypt
+those, no matter how many future or completed reminders exist. Completed
+reminders are tracked separately so they can be archived without a scan.
+
+The index is persisted by the Memory Manager as an encrypted record.
+"""
+
+from bisect import bisect_right, insort
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+# Version of the serialized index format
+INDEX_VERSION = 1
+
+
+class ReminderIndex:
+    """Sorted index of one user's pending reminders."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # (due_time, reminder_id) pairs of pending reminders, sorted
+        self._pending: List[Tuple[datetime, str]] = []
+        # reminder_id -> due_time of pending reminders
+        self._due_times: Dict[str, datetime] = {}
+        # ids of completed reminders that have not been archived
+        self._completed: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def completed_ids(self) -> List[str]:
+        """Get the ids of completed, unarchived reminders."""
+        return sorted(self._completed)
+
+    def add(self, reminder_id: str, due_time: datetime, is_completed: bool) -> None:
+        """Index a reminder, replacing any previous version of it.
+
+        Args:
+            reminder_id: The reminder identifier.
+            due_time: When the reminder is due.
+            is_completed: Whether the reminder is already completed.
+        """
+        self.remove(reminder_id)
+        if is_completed:
+            self._completed.add(reminder_id)
+        else:
+            self._due_times[reminder_id] = due_time
+            insort(self._pending, (due_time, reminder_id))
+
+    def remove(self, reminder_id: str) -> bool:
+        """Remove a reminder from the index.
+
+        Returns:
+            True if the reminder was indexed, False otherwise.
+        """
+        if reminder_id in self._completed:
+            self._completed.discard(reminder_id)
+            return True
+
+        due_time = self._due_times.pop(reminder_id, None)
+        if due_time is None:
+            return False
+        self._pending.remove((due_time, reminder_id))
+        return True
+
+    def due(self, now: datetime) -> List[str]:
+        """Get the pending reminders due at or before a time.
+
+        Args:
+            now: The reference time.
+
+        Returns:
+            Reminder ids, earliest due first.
+        """
+        end = bisect_right(self._pending, (now, chr(0x10FFFF)))
+        return [reminder_id for _, reminder_id in self._pending[:end]]
+
+    def next_due_time(self) -> Optional[datetime]:
+        """Get the due time of the earliest pending reminder, if any."""
+        return self._pending[0][0] if self._pending else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to a JSON-compatible dictionary."""
+        return {
+            'version': INDEX_VERSION,
+            'pending': [[due_time.isoformat(), reminder_id] for due_time, reminder_id in self._pending],
+            'completed': sorted(self._completed),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ReminderIndex':
+        """Rebuild an index serialized with to_dict.
+
+        Raises:
+            ValueError: If the data was written by an unsupported version.
+        """
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported reminder index version: {data.get('version')}")
+
+        index = cls()
+        for due_iso, reminder_id in data['pending']:
+            due_time = datetime.fromisoformat(due_iso)
+            index._pending.append((due_time, reminder_id))
+            index._due_times[reminder_id] = due_time
+        index._pending.sort()
+        index._completed = set(data['completed'])
+        return index
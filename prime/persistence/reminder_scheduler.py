@@ -0,0 +1,210 @@
+"""Reminder scheduler for PRIME.
+
+The ReminderScheduler runs in a background thread, sleeps until the next
+reminder of any watched user is due and then fires the registered callbacks.
+Because it asks the Memory Manager's due-time index for the next due time,
+each wake-up costs the same no matter how many future or completed reminders
+are stored.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, List, Optional, Set, Tuple
+
+from prime.models.data_models import Reminder
+from prime.persistence.memory_manager import MemoryManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderScheduler:
+    """
+    Fires callbacks when reminders become due.
+
+    Callbacks receive ``(user_id, reminder)``. By default a fired reminder is
+    marked completed so that it is not fired again; with
+    ``complete_on_fire=False`` reminders are only fired once per scheduler,
+    and reminders due after a fired but still pending one may be picked up
+    up to ``max_sleep_seconds`` late.
+
+    Attributes:
+        _memory_manager: MemoryManager holding the reminders
+        _max_sleep_seconds: Upper bound on a single sleep, so reminders
+            created by other components are picked up without notify()
+        _complete_on_fire: Whether fired reminders are marked completed
+        _users: User ids being watched
+        _callbacks: Callback functions for due reminders
+        _fired: (user_id, reminder_id) pairs already fired
+        _wake_event: Event used to interrupt the sleep
+    """
+
+    def __init__(
+        self,
+        memory_manager: MemoryManager,
+        max_sleep_seconds: float = 60.0,
+        complete_on_fire: bool = True
+    ):
+        """
+        Initialize the Reminder Scheduler.
+
+        Args:
+            memory_manager: MemoryManager holding the reminders
+            max_sleep_seconds: Longest time to sleep between checks (default: 60s)
+            complete_on_fire: Mark reminders completed once fired (default: True)
+        """
+        self._memory_manager = memory_manager
+        self._max_sleep_seconds = max_sleep_seconds
+        self._complete_on_fire = complete_on_fire
+        self._users: Set[str] = set()
+        self._callbacks: List[Callable[[str, Reminder], None]] = []
+        self._fired: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def watch_user(self, user_id: str) -> None:
+        """
+        Start firing reminders for a user.
+
+        Args:
+            user_id: The user identifier
+        """
+        with self._lock:
+            self._users.add(user_id)
+        self.notify()
+
+    def unwatch_user(self, user_id: str) -> None:
+        """
+        Stop firing reminders for a user.
+
+        Args:
+            user_id: The user identifier
+        """
+        with self._lock:
+            self._users.discard(user_id)
+
+    def add_callback(self, callback: Callable[[str, Reminder], None]) -> None:
+        """
+        Add a callback function to be called when a reminder is due.
+
+        Args:
+            callback: Function that takes (user_id, reminder) as arguments
+        """
+        with self._lock:
+            if callback not in self._callbacks:
+                self._callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable) -> None:
+        """
+        Remove a reminder callback.
+
+        Args:
+            callback: Callback function to remove
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def notify(self) -> None:
+        """Wake the scheduler, e.g. after creating a reminder due soon."""
+        self._wake_event.set()
+
+    def next_due_time(self) -> Optional[datetime]:
+        """
+        Get the earliest pending due time across watched users.
+
+        Returns:
+            The earliest due time, or None if nothing is pending
+        """
+        with self._lock:
+            users = list(self._users)
+
+        due_times = [
+            due_time for due_time in (
+                self._memory_manager.get_next_reminder_time(user_id) for user_id in users
+            )
+            if due_time is not None
+        ]
+        return min(due_times) if due_times else None
+
+    def run_pending(self) -> List[Tuple[str, Reminder]]:
+        """
+        Fire callbacks for every due reminder of the watched users.
+
+        Returns:
+            List of (user_id, reminder) pairs that were fired
+        """
+        with self._lock:
+            users = sorted(self._users)
+            callbacks = list(self._callbacks)
+
+        fired = []
+        for user_id in users:
+            for reminder in self._memory_manager.get_due_reminders(user_id):
+                key = (user_id, reminder.reminder_id)
+                if key in self._fired:
+                    continue
+
+                for callback in callbacks:
+                    try:
+                        callback(user_id, reminder)
+                    except Exception as e:
+                        logger.error(f"Reminder callback error: {e}")
+
+                if self._complete_on_fire:
+                    self._memory_manager.complete_reminder(reminder.reminder_id, user_id)
+                else:
+                    self._fired.add(key)
+                fired.append((user_id, reminder))
+
+        return fired
+
+    def start(self) -> None:
+        """Start firing reminders in a background thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._running = False
+        self._wake_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def is_running(self) -> bool:
+        """Check whether the background thread is running."""
+        return self._running
+
+    def _seconds_until_next_check(self) -> float:
+        """Time to sleep until the next reminder is due, capped at max_sleep_seconds."""
+        next_due = self.next_due_time()
+        if next_due is None:
+            return self._max_sleep_seconds
+        remaining = (next_due - datetime.now()).total_seconds()
+        if remaining <= 0:
+            # run_pending has just fired everything that was due, so an
+            # overdue entry is one kept pending by complete_on_fire=False
+            return self._max_sleep_seconds
+        return min(self._max_sleep_seconds, remaining)
+
+    def _run_loop(self) -> None:
+        """Internal scheduling loop (runs in background thread)."""
+        while self._running:
+            # Clear before checking so a notify() during the check is kept
+            self._wake_event.clear()
+            try:
+                self.run_pending()
+                timeout = self._seconds_until_next_check()
+            except Exception as e:
+                # Log error but keep scheduling
+                logger.error(f"Reminder scheduler error: {e}")
+                timeout = self._max_sleep_seconds
+
+            self._wake_event.wait(timeout)
@@ -0,0 +1,110 @@
+"""Per-user session index for PRIME.
+
+Sessions are stored keyed by session_id only, so without an index finding a
+user's sessions means decrypting every session in the store. The SessionIndex
+maps one user's session ids to their start and end times, which lets the
+Memory Manager list, delete and expire a user's sessions by touching only
+those sessions.
+
+The index is persisted by the Memory Manager as an encrypted record.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Version of the serialized index format
+INDEX_VERSION = 1
+
+
+class SessionIndex:
+    """Index of one user's sessions."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # session_id -> (start_time, end_time)
+        self._sessions: Dict[str, Tuple[datetime, Optional[datetime]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def add(self, session_id: str, start_time: datetime, end_time: Optional[datetime]) -> bool:
+        """Index a session, replacing any previous entry for it.
+
+        Args:
+            session_id: The session identifier.
+            start_time: When the session started.
+            end_time: When the session ended, or None if it is still open.
+
+        Returns:
+            True if the index changed, False if the entry was already current.
+        """
+        entry = (start_time, end_time)
+        if self._sessions.get(session_id) == entry:
+            return False
+        self._sessions[session_id] = entry
+        return True
+
+    def remove(self, session_id: str) -> bool:
+        """Remove a session from the index.
+
+        Returns:
+            True if the session was indexed, False otherwise.
+        """
+        return self._sessions.pop(session_id, None) is not None
+
+    def session_ids(self) -> List[str]:
+        """Get the indexed session ids, most recently started first."""
+        return sorted(
+            self._sessions,
+            key=lambda session_id: (self._sessions[session_id][0], session_id),
+            reverse=True
+        )
+
+    def inactive_since(self, cutoff: datetime) -> List[str]:
+        """Get the sessions whose last known activity is before a time.
+
+        A session's last known activity is its end time, or its start time if
+        it has not ended.
+
+        Args:
+            cutoff: The reference time.
+
+        Returns:
+            Session ids, in no particular order.
+        """
+        return [
+            session_id for session_id, (start_time, end_time) in self._sessions.items()
+            if (end_time or start_time) < cutoff
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to a JSON-compatible dictionary."""
+        return {
+            'version': INDEX_VERSION,
+            'sessions': {
+                session_id: [start_time.isoformat(), end_time.isoformat() if end_time else None]
+                for session_id, (start_time, end_time) in self._sessions.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SessionIndex':
+        """Rebuild an index serialized with to_dict.
+
+        Raises:
+            ValueError: If the data was written by an unsupported version.
+        """
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported session index version: {data.get('version')}")
+
+        index = cls()
+        for session_id, (start_iso, end_iso) in data['sessions'].items():
+            index._sessions[session_id] = (
+                datetime.fromisoformat(start_iso),
+                datetime.fromisoformat(end_iso) if end_iso else None
+            )
+        return index
@@ -0,0 +1,246 @@
+"""Per-user application usage table for PRIME.
+
+The UsageTable keeps every application a user has launched in one record:
+
+- Exact launch counts and first/last launch times, as returned by
+  MemoryManager.get_application_usage
+- Exponentially decayed launch scores, overall and bucketed by hour of day
+  and day of week, so recent habits outweigh old ones
+
+Decay is applied lazily. Each launch adds a weight of
+``2 ** ((t - reference) / half_life)`` instead of decaying every existing
+counter, so recording a launch is O(1); scores are divided by the weight of
+the query time when they are read. The reference time is moved forward
+whenever weights grow large, which rescales the table once in a while.
+
+The table holds application names, so the Memory Manager stores it as an
+encrypted record like any other user data.
+"""
+
+import heapq
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from prime.models.data_models import ApplicationUsage
+
+
+# Version of the serialized table format
+USAGE_TABLE_VERSION = 1
+
+# Default half-life of launch scores
+DEFAULT_HALF_LIFE_DAYS = 14.0
+
+# Buckets that scores can be ranked by
+BUCKET_HOUR = 'hour'
+BUCKET_WEEKDAY = 'weekday'
+BUCKET_ANY = 'any'
+
+# Weights are rebased once they exceed 2 ** _REBASE_EXPONENT
+_REBASE_EXPONENT = 64.0
+
+
+class _AppStats:
+    """Counters of one application."""
+
+    __slots__ = ('application_name', 'launch_count', 'first_launched', 'last_launched',
+                 'score', 'hours', 'weekdays')
+
+    def __init__(self, application_name: str, first_launched: datetime):
+        self.application_name = application_name
+        self.launch_count = 0
+        self.first_launched = first_launched
+        self.last_launched = first_launched
+        # Scores scaled by the table's reference weight
+        self.score = 0.0
+        self.hours = [0.0] * 24
+        self.weekdays = [0.0] * 7
+
+
+class UsageTable:
+    """Launch counts and time-bucketed, decaying launch scores of one user."""
+
+    def __init__(self, half_life_days: float = DEFAULT_HALF_LIFE_DAYS):
+        """Initialize an empty table.
+
+        Args:
+            half_life_days: Time after which a launch counts half as much.
+        """
+        self.half_life_days = half_life_days
+        self._half_life_seconds = half_life_days * 86400.0
+        self._reference: Optional[datetime] = None
+        self._apps: Dict[str, _AppStats] = {}
+
+    def __len__(self) -> int:
+        return len(self._apps)
+
+    def __contains__(self, application_name: str) -> bool:
+        return application_name in self._apps
+
+    def record(self, application_name: str, when: Optional[datetime] = None, count: int = 1) -> None:
+        """Record launches of an application.
+
+        Args:
+            application_name: The application that was launched.
+            when: Time of the launches. Defaults to now.
+            count: Number of launches.
+        """
+        if when is None:
+            when = datetime.now()
+        weight = self._weight(when, rebase=True) * count
+
+        stats = self._apps.get(application_name)
+        if stats is None:
+            stats = self._apps[application_name] = _AppStats(application_name, when)
+        stats.launch_count += count
+        stats.first_launched = min(stats.first_launched, when)
+        stats.last_launched = max(stats.last_launched, when)
+        stats.score += weight
+        stats.hours[when.hour] += weight
+        stats.weekdays[when.weekday()] += weight
+
+    def remove(self, application_name: str) -> bool:
+        """Remove an application.
+
+        Returns:
+            True if the application was in the table.
+        """
+        return self._apps.pop(application_name, None) is not None
+
+    def get(self, application_name: str) -> Optional[ApplicationUsage]:
+        """Get the launch counts of an application.
+
+        Returns:
+            ApplicationUsage, or None if it was never launched.
+        """
+        stats = self._apps.get(application_name)
+        return _to_usage(stats) if stats is not None else None
+
+    def all_usage(self) -> List[ApplicationUsage]:
+        """Get the launch counts of all applications, most launched first."""
+        usage = [_to_usage(stats) for stats in self._apps.values()]
+        usage.sort(key=lambda u: u.launch_count, reverse=True)
+        return usage
+
+    def top_apps(
+        self, k: int = 3, when: Optional[datetime] = None, bucket: str = BUCKET_HOUR
+    ) -> List[Tuple[str, float]]:
+        """Get the applications with the highest decayed launch scores.
+
+        Args:
+            k: Maximum number of applications.
+            when: The time to rank for. Defaults to now.
+            bucket: 'hour' to rank by launches at when's hour of day,
+                'weekday' by launches on when's day of the week, or 'any' by
+                all launches.
+
+        Returns:
+            (application_name, score) tuples, highest score first. A score is
+            the number of launches in the bucket, each counted as 0.5 **
+            (age / half-life). Applications with no launches in the bucket
+            are left out.
+
+        Raises:
+            ValueError: If bucket is unknown.
+        """
+        if when is None:
+            when = datetime.now()
+        if bucket == BUCKET_HOUR:
+            key = lambda stats: stats.hours[when.hour]
+        elif bucket == BUCKET_WEEKDAY:
+            key = lambda stats: stats.weekdays[when.weekday()]
+        elif bucket == BUCKET_ANY:
+            key = lambda stats: stats.score
+        else:
+            raise ValueError(f"Unknown usage bucket: {bucket!r}")
+
+        if not self._apps:
+            return []
+        scale = self._weight(when)
+        top = heapq.nlargest(k, self._apps.values(), key=key)
+        return [(stats.application_name, key(stats) / scale) for stats in top if key(stats) > 0]
+
+    def _weight(self, when: datetime, rebase: bool = False) -> float:
+        """Get the weight of a launch at a time, relative to the reference time."""
+        if self._reference is None:
+            self._reference = when
+        exponent = (when - self._reference).total_seconds() / self._half_life_seconds
+        if rebase and exponent > _REBASE_EXPONENT:
+            self._rebase(when)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rebase(self, when: datetime) -> None:
+        """Move the reference time forward, rescaling every score."""
+        factor = 2.0 ** -((when - self._reference).total_seconds() / self._half_life_seconds)
+        for stats in self._apps.values():
+            stats.score *= factor
+            stats.hours = [value * factor for value in stats.hours]
+            stats.weekdays = [value * factor for value in stats.weekdays]
+        self._reference = when
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the table to a JSON-compatible dictionary."""
+        return {
+            'version': USAGE_TABLE_VERSION,
+            'half_life_days': self.half_life_days,
+            'reference': self._reference.isoformat() if self._reference else None,
+            'apps': {
+                name: [
+                    stats.launch_count,
+                    stats.first_launched.isoformat(),
+                    stats.last_launched.isoformat(),
+                    stats.score,
+                    stats.hours,
+                    stats.weekdays,
+                ]
+                for name, stats in self._apps.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'UsageTable':
+        """Rebuild a table serialized with to_dict.
+
+        Raises:
+            ValueError: If the data was written by an unsupported version.
+        """
+        if data.get('version') != USAGE_TABLE_VERSION:
+            raise ValueError(f"Unsupported usage table version: {data.get('version')}")
+
+        table = cls(data['half_life_days'])
+        if data['reference']:
+            table._reference = datetime.fromisoformat(data['reference'])
+        for name, (count, first, last, score, hours, weekdays) in data['apps'].items():
+            stats = _AppStats(name, datetime.fromisoformat(first))
+            stats.launch_count = count
+            stats.last_launched = datetime.fromisoformat(last)
+            stats.score = score
+            stats.hours = list(hours)
+            stats.weekdays = list(weekdays)
+            table._apps[name] = stats
+        return table
+
+    @classmethod
+    def from_usage(
+        cls, usage_records: List[ApplicationUsage], half_life_days: float = DEFAULT_HALF_LIFE_DAYS
+    ) -> 'UsageTable':
+        """Build a table from per-application usage records.
+
+        Only launch counts and first/last launch times were kept for each
+        application, so all of its launches are attributed to the time it
+        was last launched.
+        """
+        table = cls(half_life_days)
+        for usage in sorted(usage_records, key=lambda u: u.last_launched):
+            table.record(usage.application_name, usage.last_launched, usage.launch_count)
+            table._apps[usage.application_name].first_launched = usage.first_launched
+        return table
+
+
+def _to_usage(stats: _AppStats) -> ApplicationUsage:
+    return ApplicationUsage(
+        application_name=stats.application_name,
+        launch_count=stats.launch_count,
+        last_launched=stats.last_launched,
+        first_launched=stats.first_launched
+    )
@@ -23,6 +23,7 @@ class Config:
     LOG_DIR = Path(os.getenv("PRIME_LOG_DIR", HOME_DIR / "logs"))
     DATA_DIR = Path(os.getenv("PRIME_DATA_DIR", HOME_DIR / "data"))
     CONFIG_DIR = Path(os.getenv("PRIME_CONFIG_DIR", HOME_DIR / "config"))
+    CACHE_DIR = Path(os.getenv("PRIME_CACHE_DIR", HOME_DIR / "cache"))
     
     # Logging
     LOG_LEVEL = os.getenv("PRIME_LOG_LEVEL", "INFO").upper()
@@ -44,6 +45,7 @@ class Config:
     # Storage Settings
     MAX_STORAGE_GB = int(os.getenv("PRIME_MAX_STORAGE_GB", "1"))
     SESSION_RETENTION_DAYS = int(os.getenv("PRIME_SESSION_RETENTION_DAYS", "30"))
+    USAGE_HALF_LIFE_DAYS = float(os.getenv("PRIME_USAGE_HALF_LIFE_DAYS", "14"))
     
     # Feature Flags
     ENABLE_SCREEN_READER = os.getenv("PRIME_ENABLE_SCREEN_READER", "true").lower() == "true"
@@ -61,6 +63,7 @@ class Config:
         cls.LOG_DIR.mkdir(parents=True, exist_ok=True)
         cls.DATA_DIR.mkdir(parents=True, exist_ok=True)
         cls.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        cls.CACHE_DIR.mkdir(parents=True, exist_ok=True)
     
     @classmethod
     def get_data_file(cls, filename: str) -> Path:
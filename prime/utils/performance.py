@@ -5,6 +5,7 @@ This module provides caching, profiling, and optimization utilities to improve
 PRIME's performance.
 """
 
+import math
 import time
 import functools
 from typing import Any, Callable, Dict, Optional, Tuple
@@ -255,7 +256,8 @@ class PerformanceProfiler:
     def __init__(self):
         """Initialize performance profiler."""
         self.timings: Dict[str, list] = {}
-        self._lock = threading.Lock()
+        # Reentrant, as get_all_stats calls get_stats
+        self._lock = threading.RLock()
     
     def record(self, operation: str, duration: float) -> None:
         """
@@ -278,19 +280,22 @@ class PerformanceProfiler:
             operation: Name of the operation
         
         Returns:
-            Dictionary with min, max, avg, total times, or None if not found
+            Dictionary with min, max, avg, total times and the p50 and p99
+            percentiles, or None if not found
         """
         with self._lock:
             if operation not in self.timings or not self.timings[operation]:
                 return None
             
-            times = self.timings[operation]
+            times = sorted(self.timings[operation])
             return {
                 "count": len(times),
-                "min": min(times),
-                "max": max(times),
+                "min": times[0],
+                "max": times[-1],
                 "avg": sum(times) / len(times),
-                "total": sum(times)
+                "total": sum(times),
+                "p50": _percentile(times, 50),
+                "p99": _percentile(times, 99)
             }
     
     def get_all_stats(self) -> Dict[str, Dict[str, float]]:
@@ -341,6 +346,12 @@ class PerformanceProfiler:
         return decorator
 
 
+def _percentile(sorted_times: list, percent: float) -> float:
+    """Get a percentile of sorted times (nearest rank)."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_times)))
+    return sorted_times[rank - 1]
+
+
 # Global profiler instance
 _global_profiler: Optional[PerformanceProfiler] = None
 
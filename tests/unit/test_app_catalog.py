@@ -0,0 +1,314 @@
+"""Unit tests for the application catalog.
+
+Tests the AppCatalog and its use by the Intent Parser and Command Executor
+to ensure:
+- PATH executables and .desktop applications are indexed
+- Spoken names resolve to the right application, exactly or fuzzily
+- Executables are only found by their exact name, and system administration
+  commands and sbin directories are never found
+- The catalog is cached on disk and only changed directories are rescanned
+- launch_app intents and launches use the resolved command and arguments,
+  and names that only resemble an application need confirmation
+"""
+
+import os
+import sys
+import pytest
+from prime.execution import AppCatalog, CommandExecutor, ConfirmationRequiredError
+from prime.execution import app_catalog as app_catalog_module
+from prime.nlp import IntentParser
+
+
+pytestmark = pytest.mark.skipif(sys.platform.startswith('win'), reason="uses POSIX executables")
+
+
+def make_executable(directory, name, body="exit 0"):
+    """Create an executable shell script."""
+    path = directory / name
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(0o755)
+    return path
+
+
+def make_desktop_file(directory, file_name, name, exec_line, extra=""):
+    """Create a .desktop file for an application."""
+    path = directory / file_name
+    path.write_text(f"[Desktop Entry]\nType=Application\nName={name}\nExec={exec_line}\n{extra}")
+    return path
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    """PATH and desktop directories with a few applications."""
+    bin_dir, local_bin, apps = tmp_path / "bin", tmp_path / "local-bin", tmp_path / "applications"
+    sbin = tmp_path / "sbin"
+    for directory in (bin_dir, local_bin, apps, sbin):
+        directory.mkdir()
+    for name in ("firefox", "google-chrome", "chromium", "code", "gimp", "python3", "kill", "chroot"):
+        make_executable(bin_dir, name)
+    (bin_dir / "README").write_text("not executable")
+    make_executable(local_bin, "gimp")
+    for name in ("poweroff", "shutdown", "reboot", "powertop"):
+        make_executable(sbin, name)
+    make_desktop_file(apps, "code.desktop", "Visual Studio Code", f"{bin_dir}/code --unity-launch %F")
+    make_desktop_file(apps, "google-chrome.desktop", "Google Chrome", f"{bin_dir}/google-chrome %U")
+    make_desktop_file(apps, "chromium.desktop", "Chromium Web Browser", f"{bin_dir}/chromium %U")
+    make_desktop_file(apps, "settings.desktop", "Settings", "settings", extra="NoDisplay=true\n")
+    return {
+        "path": [local_bin, bin_dir, sbin], "desktop": [apps], "cache": tmp_path / "cache",
+        "bin": bin_dir, "sbin": sbin,
+    }
+
+
+def make_catalog(dirs, **kwargs):
+    return AppCatalog(dirs["path"], dirs["desktop"], dirs["cache"], **kwargs)
+
+
+class TestIndexing:
+    """Test scanning directories into the catalog."""
+
+    def test_indexes_executables_and_desktop_files(self, dirs):
+        """Test which applications are found and their commands."""
+        catalog = make_catalog(dirs)
+        names = {entry.name: entry for entry in catalog.entries}
+
+        assert set(names) == {
+            "Visual Studio Code", "Google Chrome", "Chromium Web Browser",
+            "firefox", "google-chrome", "chromium", "code", "gimp", "python3",
+        }
+        assert names["Visual Studio Code"].argv == (f"{dirs['bin']}/code", "--unity-launch")
+        assert names["firefox"].command == str(dirs["bin"] / "firefox")
+
+    def test_skips_system_commands(self, dirs):
+        """Test that sbin directories and system administration commands are left out."""
+        catalog = make_catalog(dirs)
+        programs = {os.path.basename(entry.argv[0]) for entry in catalog.entries}
+
+        assert not programs & {"poweroff", "shutdown", "reboot", "powertop", "kill", "chroot"}
+
+    def test_earlier_path_directory_wins(self, dirs):
+        """Test that an executable shadows one later on PATH."""
+        catalog = make_catalog(dirs)
+
+        assert catalog.resolve("gimp").command == str(dirs["path"][0] / "gimp")
+
+    def test_hidden_desktop_file_shadows_later_one(self, dirs, tmp_path):
+        """Test that a user's hidden .desktop file hides the system one."""
+        user_apps = tmp_path / "user-applications"
+        user_apps.mkdir()
+        make_desktop_file(user_apps, "code.desktop", "Visual Studio Code", "code", extra="Hidden=true\n")
+
+        catalog = AppCatalog(dirs["path"], [user_apps, *dirs["desktop"]], dirs["cache"])
+
+        assert "Visual Studio Code" not in [entry.name for entry in catalog.entries]
+
+
+class TestResolve:
+    """Test resolving spoken names."""
+
+    @pytest.mark.parametrize("query,name", [
+        ("firefox", "firefox"),
+        ("Firefox", "firefox"),
+        ("visual studio code please", "Visual Studio Code"),
+        ("the visual studio code app", "Visual Studio Code"),
+        ("google chrome", "Google Chrome"),
+        ("google-chrome", "google-chrome"),
+        ("chrome", "Google Chrome"),
+        ("visual studio", "Visual Studio Code"),
+        ("visual studo code", "Visual Studio Code"),
+    ])
+    def test_resolves_names(self, dirs, query, name):
+        """Test exact, filler-word and fuzzy matches."""
+        assert make_catalog(dirs).resolve(query).name == name
+
+    def test_exact_and_fuzzy_matches(self, dirs):
+        """Test that only exact names and commands are exact matches."""
+        catalog = make_catalog(dirs)
+
+        assert catalog.match("visual studio code please").exact
+        assert catalog.match(str(dirs["bin"] / "firefox")).exact
+        fuzzy = catalog.match("visual studio")
+        assert not fuzzy.exact and fuzzy.score >= catalog.min_score
+
+    def test_executables_need_exact_names(self, dirs):
+        """Test that executables are not matched by similar names."""
+        catalog = make_catalog(dirs)
+
+        assert catalog.resolve("firefx") is None
+        assert catalog.resolve("gim") is None
+
+    @pytest.mark.parametrize("query", [
+        "power", "poweroff", "shutdown dialog", "reboot router", "kill switch", "kill", "chroot",
+    ])
+    def test_dangerous_near_misses(self, dirs, query):
+        """Test that names close to system administration commands find nothing."""
+        match = make_catalog(dirs).match(query)
+
+        assert match is None or not {"poweroff", "shutdown", "reboot", "kill", "chroot"} & {
+            os.path.basename(match.entry.argv[0])
+        }
+
+    def test_keeps_arguments(self, dirs):
+        """Test that arguments after an exact command are kept."""
+        catalog = make_catalog(dirs)
+
+        match = catalog.match("python3 script.py --verbose")
+        assert match.exact
+        assert match.argv == (str(dirs["bin"] / "python3"), "script.py", "--verbose")
+        assert catalog.match(match.command).argv == match.argv
+        assert catalog.match("code my-project").argv == (f"{dirs['bin']}/code", "--unity-launch", "my-project")
+
+    def test_resolves_commands_and_paths(self, dirs):
+        """Test that resolved commands resolve to themselves."""
+        catalog = make_catalog(dirs)
+        entry = catalog.resolve("visual studio code")
+
+        assert catalog.resolve(entry.command) == entry
+        assert catalog.resolve(str(dirs["bin"] / "firefox")).name == "firefox"
+
+    def test_no_match(self, dirs):
+        """Test that unrelated names and empty queries resolve to nothing."""
+        catalog = make_catalog(dirs)
+
+        assert catalog.resolve("spreadsheet") is None
+        assert catalog.resolve("please") is None
+        assert catalog.resolve("") is None
+
+    def test_search_ranks_matches(self, dirs):
+        """Test that search returns scored matches, best first."""
+        results = make_catalog(dirs).search("chrome", limit=3)
+
+        assert [entry.name for entry, _ in results] == ["Google Chrome", "Chromium Web Browser"]
+        assert all(0.5 <= score < 1.0 for _, score in results)
+
+
+class TestCache:
+    """Test the on-disk cache and incremental refresh."""
+
+    def test_cached_catalog_does_not_rescan(self, dirs, monkeypatch):
+        """Test that a new catalog with unchanged directories reads the cache."""
+        first = make_catalog(dirs)
+
+        def fail(directory):
+            raise AssertionError(f"{directory} was scanned again")
+        monkeypatch.setattr(app_catalog_module, "_scan_path_dir", fail)
+        monkeypatch.setattr(app_catalog_module, "_scan_desktop_dir", fail)
+        second = make_catalog(dirs)
+
+        assert second.entries == first.entries
+        assert second.resolve("firefox").name == "firefox"
+
+    def test_refresh_rescans_changed_directories(self, dirs, monkeypatch):
+        """Test that only a directory whose contents changed is scanned."""
+        catalog = make_catalog(dirs, refresh_interval=None)
+        make_executable(dirs["bin"], "thunderbird")
+        stat = dirs["bin"].stat()
+        os.utime(dirs["bin"], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        scanned = []
+        scan_path_dir = app_catalog_module._scan_path_dir
+        monkeypatch.setattr(app_catalog_module, "_scan_path_dir", lambda d: scanned.append(d) or scan_path_dir(d))
+        assert catalog.resolve("thunderbird") is None
+
+        assert catalog.refresh() is True
+        assert scanned == [str(dirs["bin"])]
+        assert catalog.resolve("thunderbird").name == "thunderbird"
+        assert catalog.refresh() is False
+
+    def test_unusable_cache_is_ignored(self, dirs):
+        """Test that a corrupted cache file is replaced."""
+        make_catalog(dirs)
+        [cache_file] = dirs["cache"].glob("app-catalog*.json")
+        cache_file.write_text('{"format": 3, "dirs": [["path", 1]]}')
+
+        assert make_catalog(dirs).resolve("firefox").name == "firefox"
+
+
+class TestIntegration:
+    """Test resolving applications when parsing and launching."""
+
+    def test_parser_returns_catalog_command(self, dirs):
+        """Test that launch_app intents carry the resolved command."""
+        catalog = make_catalog(dirs)
+        parser = IntentParser(app_catalog=catalog)
+
+        intent = parser.parse("open visual studio code please")
+        assert intent.intent_type == "launch_app"
+        assert intent.entities[0].value == catalog.resolve("visual studio code").command
+
+        # Unknown names are left as they were spoken
+        assert parser.parse("open spreadsheet").entities[0].value == "spreadsheet"
+
+    def test_parser_keeps_arguments(self, dirs):
+        """Test that the arguments of an exact command are kept."""
+        parser = IntentParser(app_catalog=make_catalog(dirs))
+
+        intent = parser.parse("launch python3 script.py")
+        assert intent.entities[0].value == f"{dirs['bin']}/python3 script.py"
+        assert not intent.requires_clarification
+
+    def test_parser_asks_about_fuzzy_match(self, dirs):
+        """Test that a name only resembling an application needs clarification."""
+        parser = IntentParser(app_catalog=make_catalog(dirs))
+
+        intent = parser.parse("open visual studio")
+        assert intent.entities[0].value == "visual studio"
+        assert parser.is_ambiguous(intent)
+        assert parser.generate_clarification_question(intent) == "Did you mean Visual Studio Code?"
+
+    def test_executor_launches_resolved_application(self, dirs):
+        """Test that the executor starts the resolved executable without a shell."""
+        make_executable(dirs["bin"], "sleeper", body="sleep 5")
+        executor = CommandExecutor(app_catalog=make_catalog(dirs))
+
+        process = executor.launch_application("sleeper please")
+        try:
+            assert process.args == [str(dirs["bin"] / "sleeper")]
+            assert process.poll() is None
+        finally:
+            process.terminate()
+            process.wait(timeout=2)
+
+    def test_executor_keeps_arguments(self, dirs):
+        """Test that the arguments given after the application are passed on."""
+        make_executable(dirs["bin"], "sleeper", body="sleep $1")
+        executor = CommandExecutor(app_catalog=make_catalog(dirs))
+
+        process = executor.launch_application("sleeper 5")
+        try:
+            assert process.args == [str(dirs["bin"] / "sleeper"), "5"]
+            assert process.poll() is None
+        finally:
+            process.terminate()
+            process.wait(timeout=2)
+
+    def test_executor_fails_fast_for_unknown_application(self, dirs):
+        """Test that an unknown name fails without starting a shell."""
+        executor = CommandExecutor(app_catalog=make_catalog(dirs))
+
+        with pytest.raises(FileNotFoundError, match="nonexistent_app_xyz123"):
+            executor.launch_application("nonexistent_app_xyz123")
+
+    @pytest.mark.parametrize("app_name", ["shutdown dialog", "reboot router", "kill switch", "poweroff"])
+    def test_executor_refuses_system_commands(self, dirs, app_name):
+        """Test that system administration commands on PATH are not started."""
+        executor = CommandExecutor(app_catalog=make_catalog(dirs))
+
+        with pytest.raises(FileNotFoundError):
+            executor.launch_application(app_name)
+
+    def test_executor_confirms_fuzzy_match(self, dirs):
+        """Test that a name only resembling an application is launched once confirmed."""
+        make_executable(dirs["bin"], "sleeper", body="sleep 5")
+        make_desktop_file(dirs["desktop"][0], "sleeper.desktop", "Sleepy Timer", f"{dirs['bin']}/sleeper")
+        executor = CommandExecutor(app_catalog=make_catalog(dirs))
+
+        with pytest.raises(ConfirmationRequiredError, match="Did you mean Sleepy Timer"):
+            executor.launch_application("sleepy timr")
+
+        process = executor.launch_application("sleepy timr", confirmed=True)
+        try:
+            assert process.args == [str(dirs["bin"] / "sleeper")]
+        finally:
+            process.terminate()
+            process.wait(timeout=2)
@@ -0,0 +1,273 @@
+"""Unit tests for the asyncio Context Engine.
+
+Tests the AsyncContextEngine to ensure:
+- Intents are returned and the session updated without waiting for storage
+- Sessions are saved in the background, coalescing queued saves
+- A full save queue makes add_to_history wait
+- Suggestions are computed in the background
+- User state is loaded and sessions are copied off the event loop
+- Turn latencies are recorded
+"""
+
+import asyncio
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+
+import pytest
+from prime.models import Command, CommandResult, Session
+from prime.nlp import AsyncContextEngine, IntentParser
+from prime.persistence import MemoryManager
+from prime.utils.performance import PerformanceProfiler
+
+
+@pytest.fixture
+def memory_manager():
+    """Create a MemoryManager on temporary storage."""
+    temp_dir = tempfile.mkdtemp()
+    yield MemoryManager(storage_dir=temp_dir)
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def make_engine(memory_manager):
+    """Create AsyncContextEngines with a private profiler."""
+    def make(**kwargs):
+        return AsyncContextEngine(IntentParser(), memory_manager, profiler=PerformanceProfiler(), **kwargs)
+    return make
+
+
+def make_session(session_id="async-session"):
+    return Session(
+        session_id=session_id,
+        user_id="test-user",
+        start_time=datetime.now(),
+        end_time=None
+    )
+
+
+async def run_command(engine, text, session):
+    """Process a command and add it to the history as succeeded."""
+    intent = await engine.process_command(text, session)
+    command_id = f"cmd-{len(session.command_history):03d}"
+    command = Command(
+        command_id=command_id,
+        intent=intent,
+        parameters={},
+        timestamp=datetime.now(),
+        requires_confirmation=False
+    )
+    result = CommandResult(
+        command_id=command_id,
+        success=True,
+        output="",
+        error=None,
+        execution_time_ms=10
+    )
+    await engine.add_to_history(command, result, session)
+    return intent
+
+
+def block_saves(engine):
+    """Make saves wait for the returned event; returns (release event, saved sessions)."""
+    release = threading.Event()
+    saved = []
+    save_history = engine.engine.save_session
+
+    def blocked(session):
+        release.wait(timeout=5)
+        saved.append(session)
+        save_history(session)
+    engine.engine.save_session = blocked
+    return release, saved
+
+
+class TestTurns:
+    """Test processing commands."""
+
+    def test_process_and_save(self, make_engine, memory_manager):
+        """Test that commands are parsed, kept in the session and saved."""
+        async def scenario():
+            session = make_session()
+            async with make_engine() as engine:
+                intent = await run_command(engine, "open Chrome", session)
+                await run_command(engine, "close it", session)
+                return engine, session, intent
+
+        engine, session, intent = asyncio.run(scenario())
+
+        assert intent.intent_type == "launch_app"
+        assert len(session.command_history) == 2
+        assert memory_manager.load_session(session.session_id).command_history == session.command_history
+        assert engine.pending_saves == 0 and engine.failed_saves == 0
+
+    def test_turn_does_not_wait_for_save(self, make_engine, memory_manager):
+        """Test that saves are coalesced while one is in progress."""
+        async def scenario():
+            session = make_session()
+            engine = make_engine()
+            release, saved = block_saves(engine)
+            await run_command(engine, "open Chrome", session)
+            await asyncio.sleep(0.05)
+            # The first save is in progress; the next ones are merged into one
+            for text in ["set volume to 50", "open Firefox", "mute"]:
+                await run_command(engine, text, session)
+            assert len(session.command_history) == 4
+            assert engine.pending_saves == 1
+            release.set()
+            await engine.close()
+            return session, saved
+
+        session, saved = asyncio.run(scenario())
+
+        assert [len(s.command_history) for s in saved] == [1, 4]
+        assert len(memory_manager.load_session(session.session_id).command_history) == 4
+
+    def test_full_queue_waits(self, make_engine):
+        """Test that add_to_history waits while too many sessions are queued."""
+        async def scenario():
+            engine = make_engine(max_pending_saves=1)
+            release, saved = block_saves(engine)
+            await run_command(engine, "open Chrome", make_session("a"))
+            await asyncio.sleep(0.05)
+            await run_command(engine, "open Chrome", make_session("b"))
+
+            waiting = asyncio.ensure_future(run_command(engine, "open Chrome", make_session("c")))
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+
+            release.set()
+            await waiting
+            await engine.close()
+            return saved
+
+        saved = asyncio.run(scenario())
+
+        assert [s.session_id for s in saved] == ["a", "b", "c"]
+
+    def test_failed_save_is_counted(self, make_engine):
+        """Test that a failing save does not stop later saves."""
+        async def scenario():
+            engine = make_engine()
+            save_history = engine.engine.save_session
+            calls = []
+
+            def fail_once(session):
+                calls.append(session.session_id)
+                if len(calls) == 1:
+                    raise OSError("disk full")
+                save_history(session)
+            engine.engine.save_session = fail_once
+
+            await run_command(engine, "open Chrome", make_session("a"))
+            await engine.flush()
+            await run_command(engine, "open Chrome", make_session("b"))
+            await engine.close()
+            return engine, calls
+
+        engine, calls = asyncio.run(scenario())
+
+        assert calls == ["a", "b"]
+        assert engine.failed_saves == 1
+
+    def test_user_state_loaded_off_the_loop(self, make_engine):
+        """Test that a user's state is read from storage on a worker thread."""
+        async def scenario():
+            engine = make_engine()
+            memory_manager = engine.engine.memory_manager
+            get_preference = memory_manager.get_preference
+            threads = []
+
+            def record_thread(key, user_id):
+                threads.append(threading.current_thread())
+                return get_preference(key, user_id)
+            memory_manager.get_preference = record_thread
+
+            await run_command(engine, "open Chrome", make_session())
+            await engine.close()
+            return threads
+
+        threads = asyncio.run(scenario())
+
+        assert threads
+        assert threading.main_thread() not in threads
+
+    def test_saved_context_state_is_a_copy(self, make_engine):
+        """Test that nested context state changed after a turn is not saved."""
+        async def scenario():
+            session = make_session()
+            session.context_state["recent"] = {"app": "Chrome"}
+            engine = make_engine()
+            release, saved = block_saves(engine)
+            await run_command(engine, "open Chrome", session)
+            await asyncio.sleep(0.05)
+            # The save in progress has its own copy
+            session.context_state["recent"]["app"] = "Firefox"
+            release.set()
+            await engine.close()
+            return saved
+
+        saved = asyncio.run(scenario())
+
+        assert saved[0].context_state == {"recent": {"app": "Chrome"}}
+
+    def test_invalid_queue_size(self, make_engine):
+        """Test that the save queue needs room for a session."""
+        with pytest.raises(ValueError):
+            make_engine(max_pending_saves=0)
+
+
+class TestBackgroundWork:
+    """Test suggestions and instrumentation."""
+
+    def test_suggestions_computed_in_background(self, make_engine):
+        """Test that suggestions follow the history without being awaited."""
+        async def scenario():
+            session = make_session()
+            async with make_engine() as engine:
+                assert engine.latest_suggestions(session) == []
+                for _ in range(4):
+                    await run_command(engine, "open Chrome", session)
+                    await run_command(engine, "set volume to 50", session)
+                await engine.flush()
+                return engine.latest_suggestions(session), await engine.get_suggestions(session)
+
+        latest, direct = asyncio.run(scenario())
+
+        assert any(s.suggestion_type == "automation" for s in latest)
+        assert latest == direct
+
+    def test_ended_sessions_are_forgotten(self, make_engine):
+        """Test that suggestions are dropped when a session ends or the engine closes."""
+        async def scenario():
+            ended, open_session = make_session("ended"), make_session("open")
+            engine = make_engine()
+            await run_command(engine, "open Chrome", ended)
+            await run_command(engine, "open Chrome", open_session)
+            await engine.end_session(ended)
+            assert engine.latest_suggestions(ended) == []
+            assert "ended" not in engine._suggestion_tasks
+            await engine.flush()
+            assert "ended" not in engine._suggestions
+            assert "open" in engine._suggestions
+            await engine.close()
+            return engine
+
+        engine = asyncio.run(scenario())
+
+        assert not engine._suggestions and not engine._suggestion_tasks
+
+    def test_latencies_recorded(self, make_engine):
+        """Test that turn latencies are recorded with percentiles."""
+        async def scenario():
+            async with make_engine() as engine:
+                for _ in range(3):
+                    await run_command(engine, "open Chrome", make_session())
+                return engine.profiler.get_all_stats()
+
+        stats = asyncio.run(scenario())
+
+        for operation in ("context.process_command", "context.add_to_history"):
+            assert stats[operation]["count"] == 3
+            assert stats[operation]["p50"] <= stats[operation]["p99"] <= stats[operation]["max"]
@@ -249,6 +249,104 @@ class TestResolveReference:
         entity = context_engine.resolve_reference("Chrome", sample_session)
         
         assert entity is None
+    
+    def test_resolve_matches_history_walk(self, context_engine, sample_session):
+        """Test that the summary resolves as walking the history back would."""
+        def walk(history):
+            for record in reversed(history):
+                for entity in record.command.intent.entities:
+                    if entity.confidence >= 0.5 and entity.entity_type in ContextEngine.REFERENCE_ENTITY_TYPES:
+                        return entity.value
+                output = record.result.output.strip()
+                if record.result.success and output and len(output) < 200:
+                    return output
+            return None
+        
+        entity_choices = [
+            [],
+            [Entity("number", 5, 0.9)],
+            [Entity("application", "Slack", 0.4)],
+            [Entity("application", "Firefox", 0.9), Entity("file_path", "/tmp/a.txt", 0.85)],
+            [Entity("file_path", "/tmp/b.txt", 0.85), Entity("file_path", "/tmp/c.txt", 0.9)],
+            [Entity("quoted_string", "Report", 0.9)],
+        ]
+        outputs = ["", "   ", "/tmp/out.txt", "x" * 300]
+        for i in range(60):
+            intent = Intent(
+                intent_type="search_files",
+                entities=entity_choices[(i * 7) % len(entity_choices)],
+                confidence=0.9,
+                requires_clarification=False
+            )
+            command = Command(
+                command_id=f"cmd-{i:03d}",
+                intent=intent,
+                parameters={},
+                timestamp=datetime.now(),
+                requires_confirmation=False
+            )
+            result = CommandResult(
+                command_id=f"cmd-{i:03d}",
+                success=i % 3 != 0,
+                output=outputs[(i * 5) % len(outputs)],
+                error=None,
+                execution_time_ms=50
+            )
+            sample_session.command_history.append(CommandRecord(command, result, datetime.now()))
+            
+            entity = context_engine.resolve_reference("it", sample_session)
+            assert (entity.value if entity else None) == walk(sample_session.command_history)
+
+
+class TestResolveTextReferences:
+    """Tests for resolving references inside command text."""
+    
+    @pytest.fixture
+    def session_with_file(self, sample_session):
+        intent = Intent(
+            intent_type="search_files",
+            entities=[Entity("file_path", "C:\\Users\\ada\\notes.txt", 0.9)],
+            confidence=0.9,
+            requires_clarification=False
+        )
+        command = Command(
+            command_id="cmd-001",
+            intent=intent,
+            parameters={},
+            timestamp=datetime.now(),
+            requires_confirmation=False
+        )
+        result = CommandResult(
+            command_id="cmd-001",
+            success=True,
+            output="",
+            error=None,
+            execution_time_ms=50
+        )
+        sample_session.command_history.append(CommandRecord(command, result, datetime.now()))
+        return sample_session
+    
+    def test_replaces_every_reference(self, context_engine, session_with_file):
+        """Test that all references are replaced, whatever their case."""
+        text = context_engine._resolve_text_references("Copy IT and then open That", session_with_file)
+        
+        assert text == "Copy C:\\Users\\ada\\notes.txt and then open C:\\Users\\ada\\notes.txt"
+    
+    def test_ignores_references_inside_words(self, context_engine, session_with_file):
+        """Test that "it" in "edit" or "this" in "thistle" is left alone."""
+        text = "edit the submitted thistle lastly"
+        
+        assert context_engine._resolve_text_references(text, session_with_file) == text
+    
+    def test_replaces_phrase_as_one_reference(self, context_engine, session_with_file):
+        """Test that "the last one" is replaced as a whole."""
+        text = context_engine._resolve_text_references("open the last one, please", session_with_file)
+        
+        assert text == "open C:\\Users\\ada\\notes.txt, please"
+    
+    def test_unresolved_references_are_kept(self, context_engine, sample_session):
+        """Test that text is unchanged when nothing can be referred to."""
+        assert context_engine._resolve_text_references("close it", sample_session) == "close it"
 
 
 class TestAddToHistory:
@@ -397,6 +495,63 @@ class TestGetSuggestions:
         # Should suggest alternatives
         assert len(suggestions) > 0
         assert any(s.suggestion_type == "alternative" for s in suggestions)
+    
+    def test_get_suggestions_ignores_older_errors(
+        self, context_engine, sample_session
+    ):
+        """Test that an error more than 5 commands ago is not suggested on."""
+        for i in range(6):
+            intent = Intent(
+                intent_type="search_files" if i == 0 else "adjust_volume",
+                entities=[],
+                confidence=0.9,
+                requires_clarification=False
+            )
+            command = Command(
+                command_id=f"cmd-{i:03d}",
+                intent=intent,
+                parameters={},
+                timestamp=datetime.now(),
+                requires_confirmation=False
+            )
+            result = CommandResult(
+                command_id=f"cmd-{i:03d}",
+                success=i != 0,
+                output="",
+                error="File not found" if i == 0 else None,
+                execution_time_ms=50
+            )
+            context_engine.add_to_history(command, result, sample_session)
+        
+        suggestions = context_engine.get_suggestions(sample_session)
+        
+        assert not any(s.suggestion_type == "alternative" for s in suggestions)
+
+    def test_get_suggestions_from_usage_at_this_hour(
+        self, context_engine, memory_manager, sample_session
+    ):
+        """Test suggesting the app usually launched at the current hour."""
+        now = datetime.now()
+        for day in range(1, 9):
+            memory_manager.record_application_usage("mail", "test-user", when=now - timedelta(days=day))
+            memory_manager.record_application_usage(
+                "games", "test-user", when=now - timedelta(days=day, hours=6)
+            )
+
+        command = Command(
+            command_id="cmd-001",
+            intent=Intent("launch_app", [], 0.9, False),
+            parameters={},
+            timestamp=now,
+            requires_confirmation=False
+        )
+        result = CommandResult("cmd-001", True, "", None, 10)
+        context_engine.add_to_history(command, result, sample_session)
+
+        suggestions = context_engine.get_suggestions(sample_session)
+
+        preferences = [s for s in suggestions if s.suggestion_type == "preference"]
+        assert [s.description for s in preferences] == ["Launch mail"]
 
 
 class TestLearnFromCorrection:
@@ -452,6 +607,53 @@ class TestLearnFromCorrection:
         
         assert stored is not None
         assert len(stored) == 1
+    
+    def test_relearned_correction_replaces_earlier_one(
+        self, context_engine, sample_session
+    ):
+        """Test that correcting the same text again keeps only the new correction."""
+        context_engine.learn_from_correction("opn", "open", sample_session)
+        context_engine.learn_from_correction("opn", "operate", sample_session)
+        
+        assert context_engine._corrections[sample_session.user_id] == [("opn", "operate")]
+        assert context_engine._apply_corrections("opn", sample_session.user_id) == "operate"
+    
+    def test_corrections_are_capped(
+        self, context_engine, sample_session
+    ):
+        """Test that only the most recent MAX_CORRECTIONS corrections are kept."""
+        context_engine.MAX_CORRECTIONS = 3
+        for i in range(5):
+            context_engine.learn_from_correction(f"typo{i}", f"fix{i}", sample_session)
+        
+        assert [o for o, _ in context_engine._corrections[sample_session.user_id]] == ["typo2", "typo3", "typo4"]
+        assert context_engine._apply_corrections("typo0 typo4", sample_session.user_id) == "typo0 fix4"
+    
+    def test_rewriter_is_cached_until_learning(
+        self, context_engine, sample_session
+    ):
+        """Test that corrections are compiled once and recompiled when learning."""
+        context_engine.learn_from_correction("opn", "open", sample_session)
+        user_id = sample_session.user_id
+        rewriter = context_engine._correction_rewriters[user_id]
+        
+        context_engine.process_command("opn chrome", sample_session)
+        assert context_engine._correction_rewriters[user_id] is rewriter
+        
+        context_engine.learn_from_correction("chrom", "chrome", sample_session)
+        assert context_engine._correction_rewriters[user_id] is not rewriter
+        assert context_engine._apply_corrections("opn chrom", user_id) == "open chrome"
+    
+    def test_stored_corrections_are_loaded(
+        self, intent_parser, memory_manager, sample_session
+    ):
+        """Test that a new engine applies and extends persisted corrections."""
+        ContextEngine(intent_parser, memory_manager).learn_from_correction("opn", "open", sample_session)
+        
+        engine = ContextEngine(intent_parser, memory_manager)
+        engine.learn_from_correction("clos", "close", sample_session)
+        
+        assert engine._apply_corrections("opn then clos", sample_session.user_id) == "open then close"
 
 
 class TestDetectRepetitivePattern:
@@ -565,6 +767,84 @@ class TestDetectRepetitivePattern:
         
         # Should not detect a pattern with random commands
         assert pattern is None
+    
+    @staticmethod
+    def _add_commands(context_engine, session, intent_types):
+        for intent_type in intent_types:
+            intent = Intent(
+                intent_type=intent_type,
+                entities=[],
+                confidence=0.9,
+                requires_clarification=False
+            )
+            command = Command(
+                command_id=f"cmd-{datetime.now().timestamp()}",
+                intent=intent,
+                parameters={},
+                timestamp=datetime.now(),
+                requires_confirmation=False
+            )
+            result = CommandResult(
+                command_id=command.command_id,
+                success=True,
+                output="Success",
+                error=None,
+                execution_time_ms=100
+            )
+            context_engine.add_to_history(command, result, session)
+    
+    def test_detect_top_patterns(
+        self, context_engine, sample_session
+    ):
+        """Test that several routines are returned, best first."""
+        self._add_commands(
+            context_engine, sample_session,
+            ["launch_app", "adjust_volume", "search_files"] * 5 + ["create_file", "delete_file"] * 3
+        )
+        
+        patterns = context_engine.detect_repetitive_patterns(sample_session, k=3)
+        
+        assert [p.commands for p in patterns] == [
+            ["launch_app", "adjust_volume", "search_files"],
+            ["create_file", "delete_file"],
+        ]
+        assert patterns[0].frequency == 5
+        assert patterns[0].description == "launch_app → adjust_volume → search_files"
+        assert context_engine.detect_repetitive_pattern(sample_session).commands == patterns[0].commands
+    
+    def test_patterns_persist_across_engines(
+        self, context_engine, intent_parser, memory_manager, sample_session
+    ):
+        """Test that command sequences are restored from memory."""
+        self._add_commands(context_engine, sample_session, ["launch_app", "adjust_volume"] * 2)
+        
+        restarted = ContextEngine(intent_parser, memory_manager)
+        self._add_commands(restarted, sample_session, ["launch_app", "adjust_volume"])
+        
+        pattern = restarted.detect_repetitive_pattern(sample_session)
+        assert pattern.commands == ["launch_app", "adjust_volume"]
+        assert pattern.frequency == 3
+
+    def test_patterns_are_replayed_from_sessions(
+        self, context_engine, intent_parser, memory_manager, sample_session
+    ):
+        """Test that sequences come from the stored sessions, not a preference rewritten per command."""
+        self._add_commands(context_engine, sample_session, ["launch_app", "adjust_volume"] * 2)
+        later = Session(
+            session_id="session-later",
+            user_id=sample_session.user_id,
+            start_time=datetime.now(),
+            end_time=None,
+            command_history=[],
+            context_state={}
+        )
+        self._add_commands(context_engine, later, ["launch_app", "adjust_volume"])
+
+        assert memory_manager.get_preference("command_sequences", sample_session.user_id) is None
+        restarted = ContextEngine(intent_parser, memory_manager)
+        pattern = restarted.detect_repetitive_pattern(later)
+        assert pattern.commands == ["launch_app", "adjust_volume"]
+        assert pattern.frequency == 3
 
 
 class TestContextIntegration:
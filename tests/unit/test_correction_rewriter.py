@@ -0,0 +1,80 @@
+"""Unit tests for the correction rewriter.
+
+Tests the CorrectionRewriter to ensure:
+- The longest correction wins and matches do not overlap
+- Replaced text is not corrected again
+- Later corrections of the same text replace earlier ones
+- Results match replacing each occurrence by its longest correction
+"""
+
+import re
+from hypothesis import given, strategies as st
+from prime.nlp.correction_rewriter import CorrectionRewriter
+
+
+def reference_rewrite(corrections, text):
+    """Rewrite text by scanning it and trying the longest original first."""
+    replacements = dict(corrections)
+    originals = sorted((o for o in replacements if o), key=len, reverse=True)
+    result, i = [], 0
+    while i < len(text):
+        for original in originals:
+            if text.startswith(original, i):
+                result.append(replacements[original])
+                i += len(original)
+                break
+        else:
+            result.append(text[i])
+            i += 1
+    return "".join(result)
+
+
+class TestCorrectionRewriter:
+    """Test rewriting text with corrections."""
+
+    def test_no_corrections(self):
+        """Test that text is unchanged without corrections."""
+        rewriter = CorrectionRewriter([])
+
+        assert len(rewriter) == 0
+        assert rewriter.rewrite("opn chrome") == "opn chrome"
+
+    def test_replaces_every_occurrence(self):
+        """Test simple replacements."""
+        rewriter = CorrectionRewriter([("opn", "open"), ("chrom", "chrome")])
+
+        assert rewriter.rewrite("opn chrom and opn mail") == "open chrome and open mail"
+
+    def test_longest_match_wins(self):
+        """Test that a longer original is preferred over its prefix."""
+        rewriter = CorrectionRewriter([("vol", "volume"), ("vol up", "volume up"), ("vol upp", "volume up")])
+
+        assert rewriter.rewrite("vol upp") == "volume up"
+        assert rewriter.rewrite("vol down") == "volume down"
+
+    def test_no_cascading(self):
+        """Test that replaced text is not corrected again."""
+        rewriter = CorrectionRewriter([("a", "b"), ("b", "c")])
+
+        assert rewriter.rewrite("ab") == "bc"
+
+    def test_later_correction_wins(self):
+        """Test that the last correction of a text is used."""
+        rewriter = CorrectionRewriter([("opn", "open"), ("opn", "operate")])
+
+        assert len(rewriter) == 1
+        assert rewriter.rewrite("opn") == "operate"
+
+    def test_special_characters(self):
+        """Test that originals are matched literally."""
+        rewriter = CorrectionRewriter([("c++ (ide)", "clion"), ("", "ignored"), (".", "dot")])
+
+        assert rewriter.rewrite("open c++ (ide).") == "open cliondot"
+
+    @given(
+        st.lists(st.tuples(st.text("abc ", max_size=4), st.text("xyz", max_size=3)), max_size=12),
+        st.text("abc ", max_size=30)
+    )
+    def test_matches_reference(self, corrections, text):
+        """Test generated corrections against a direct scan."""
+        assert CorrectionRewriter(corrections).rewrite(text) == reference_rewrite(corrections, text)
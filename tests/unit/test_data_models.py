@@ -6,6 +6,7 @@ and that their fields are properly typed and accessible.
 """
 
 import pytest
+from dataclasses import asdict
 from datetime import datetime
 from prime.models import (
     Action,
@@ -13,8 +14,10 @@ from prime.models import (
     Command,
     CommandRecord,
     CommandResult,
+    ContextSummary,
     Coordinates,
     Entity,
+    EntityMention,
     Intent,
     Note,
     Process,
@@ -190,6 +193,86 @@ class TestSession:
         )
         assert len(session.command_history) == 1
         assert session.context_state["last_app"] == "chrome"
+    
+    @staticmethod
+    def _record(command_id, intent_type, entities, success=True, output="Success"):
+        intent = Intent(
+            intent_type=intent_type,
+            entities=entities,
+            confidence=0.9,
+            requires_clarification=False
+        )
+        command = Command(
+            command_id=command_id,
+            intent=intent,
+            parameters={},
+            timestamp=datetime.now(),
+            requires_confirmation=False
+        )
+        result = CommandResult(
+            command_id=command_id,
+            success=success,
+            output=output,
+            error=None if success else "Failed",
+            execution_time_ms=100
+        )
+        return CommandRecord(command=command, result=result, timestamp=datetime.now())
+    
+    def test_session_summary(self):
+        session = Session(
+            session_id="sess_001",
+            user_id="user_123",
+            start_time=datetime.now(),
+            end_time=None
+        )
+        chrome = Entity(entity_type="application", value="chrome", confidence=0.95)
+        unsure = Entity(entity_type="application", value="slack", confidence=0.3)
+        session.command_history.append(self._record("cmd_001", "launch_app", [chrome], output="  started  "))
+        session.command_history.append(self._record("cmd_002", "launch_app", [unsure], success=False))
+        
+        summary = session.summary()
+        assert summary.record_count == 2
+        assert list(summary.recent_intents) == ["launch_app", "launch_app"]
+        assert summary.latest_entities["application"] == EntityMention(chrome, 0, 0)
+        assert [index for index, _ in summary.recent_errors] == [1]
+        assert summary.last_output == (0, "started")
+        
+        # Appended records are added to the same summary
+        session.command_history.append(self._record("cmd_003", "adjust_volume", []))
+        assert session.summary() is summary
+        assert list(summary.recent_intents) == ["launch_app", "launch_app", "adjust_volume"]
+        assert summary.last_output == (2, "Success")
+    
+    def test_session_summary_rebuilt_when_history_replaced(self):
+        session = Session(
+            session_id="sess_001",
+            user_id="user_123",
+            start_time=datetime.now(),
+            end_time=None,
+            command_history=[self._record("cmd_001", "launch_app", [])]
+        )
+        assert list(session.summary().recent_intents) == ["launch_app"]
+        
+        session.command_history = [self._record("cmd_002", "search_files", [])]
+        summary = session.summary()
+        assert summary.record_count == 1
+        assert list(summary.recent_intents) == ["search_files"]
+        
+        # Bounded however long the history grows
+        for i in range(ContextSummary.MAX_INTENTS + 5):
+            session.command_history.append(self._record(f"cmd_{i}", "launch_app", [], success=False))
+        assert len(session.summary().recent_intents) == ContextSummary.MAX_INTENTS
+        assert len(session.summary().recent_errors) == ContextSummary.MAX_ERRORS
+    
+    def test_session_summary_is_not_a_field(self):
+        history = [self._record("cmd_001", "launch_app", [])]
+        session = Session("sess_001", "user_123", datetime(2024, 1, 1), None, list(history))
+        other = Session("sess_001", "user_123", datetime(2024, 1, 1), None, list(history))
+        session.summary()
+        
+        assert "_summary" not in asdict(session)
+        assert session == other
+        assert "_summary" not in repr(session)
 
 
 class TestVoiceProfile:
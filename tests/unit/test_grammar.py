@@ -0,0 +1,132 @@
+"""Unit tests for intent grammar loading.
+
+Tests the grammar file and hot reloading to ensure:
+- The shipped grammar loads and drives the Intent Parser
+- Invalid grammar files are rejected
+- A running parser picks up a changed grammar file
+"""
+
+import json
+import os
+import pytest
+from pathlib import Path
+from prime.nlp import IntentParser
+from prime.nlp.grammar import (
+    DEFAULT_GRAMMAR_PATH, GrammarWatcher, load_grammar
+)
+from prime.models import Intent
+
+
+def write_grammar(path: Path, intents: dict, version: int = 1) -> None:
+    """Write a grammar file with the given intents and bumped mtime."""
+    data = json.loads(DEFAULT_GRAMMAR_PATH.read_text())
+    data["version"] = version
+    data["intents"] = intents
+    path.write_text(json.dumps(data))
+    # Make sure the modification time differs from the previous write
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+GREET = {"greet": {"keywords": ["hello"], "entity_types": ["name"], "patterns": [r"hello\s+(\w+)"]}}
+
+
+class TestLoadGrammar:
+    """Test loading grammar files."""
+
+    def test_shipped_grammar(self):
+        """Test that the shipped grammar has every table."""
+        grammar = load_grammar()
+
+        assert "launch_app" in grammar.intent_patterns
+        assert "the" in grammar.stop_words
+        assert grammar.required_entities["launch_app"] == ["application"]
+        assert grammar.missing_entity_questions["create_note"] == "What would you like me to note down?"
+        assert grammar.intent_descriptions["manage_wifi"] == "manage Wi-Fi"
+
+    def test_grammar_is_compiled(self):
+        """Test that a loaded grammar has its matcher and file hash."""
+        grammar = load_grammar()
+
+        assert len(grammar.source_hash) == 64
+        assert grammar.matcher.match("volume up")[0] == "adjust_volume"
+
+    def test_changed_file_is_loaded(self, tmp_path):
+        """Test that a changed file is loaded with a new hash."""
+        path = tmp_path / "grammar.json"
+        write_grammar(path, GREET)
+        first = load_grammar(path)
+        write_grammar(path, {**GREET, "bye": {"keywords": ["bye"], "entity_types": [], "patterns": []}})
+
+        grammar = load_grammar(path)
+
+        assert "bye" in grammar.intent_patterns
+        assert grammar.source_hash != first.source_hash
+
+    def test_unsupported_version(self, tmp_path):
+        """Test that grammar files of other versions are rejected."""
+        path = tmp_path / "grammar.json"
+        write_grammar(path, GREET, version=2)
+        with pytest.raises(ValueError, match="Unsupported grammar version"):
+            load_grammar(path)
+
+    def test_invalid_pattern(self, tmp_path):
+        """Test that invalid regular expressions are rejected on load."""
+        path = tmp_path / "grammar.json"
+        write_grammar(path, {"broken": {"keywords": ["x"], "entity_types": [], "patterns": ["(unclosed"]}})
+        with pytest.raises(ValueError, match="Invalid grammar pattern"):
+            load_grammar(path)
+
+
+class TestHotReload:
+    """Test reloading a changed grammar file."""
+
+    def test_parser_picks_up_changes(self, tmp_path):
+        """Test that parse uses a grammar written after the parser started."""
+        path = tmp_path / "grammar.json"
+        write_grammar(path, GREET)
+        parser = IntentParser(grammar_path=path, reload_interval=0)
+        assert parser.parse("hello Ada").intent_type == "greet"
+        assert parser.parse("bye now").intent_type == "unknown"
+
+        write_grammar(path, {"bye": {"keywords": ["bye"], "entity_types": [], "patterns": [r"bye"]}})
+
+        assert parser.parse("bye now").intent_type == "bye"
+        assert parser.parse("hello Ada").intent_type == "unknown"
+
+    def test_invalid_change_keeps_grammar(self, tmp_path):
+        """Test that a broken grammar file does not replace a working one."""
+        path = tmp_path / "grammar.json"
+        write_grammar(path, GREET)
+        watcher = GrammarWatcher(path, check_interval=0)
+
+        path.write_text("{ not json")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+
+        assert watcher.poll() is None
+        assert "greet" in watcher.grammar.intent_patterns
+
+    def test_checks_are_rate_limited(self, tmp_path):
+        """Test that the file is not checked again within the interval."""
+        path = tmp_path / "grammar.json"
+        write_grammar(path, GREET)
+        parser = IntentParser(grammar_path=path, reload_interval=3600)
+
+        write_grammar(path, {"bye": {"keywords": ["bye"], "entity_types": [], "patterns": [r"bye"]}})
+
+        assert parser.parse("bye").intent_type == "unknown"
+        assert parser.reload_grammar() is True
+        assert parser.parse("bye").intent_type == "bye"
+
+    def test_clarification_tables_come_from_grammar(self, tmp_path):
+        """Test that clarification questions use the loaded grammar."""
+        path = tmp_path / "grammar.json"
+        data = json.loads(DEFAULT_GRAMMAR_PATH.read_text())
+        data["missing_entity_questions"]["launch_app"] = "Launch what?"
+        path.write_text(json.dumps(data))
+
+        parser = IntentParser(grammar_path=path)
+        intent = Intent("launch_app", [], 0.8, True)
+
+        assert parser.generate_clarification_question(intent) == "Launch what?"
+        assert parser.is_ambiguous(Intent("launch_app", [], 0.8, False))
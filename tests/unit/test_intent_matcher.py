@@ -0,0 +1,151 @@
+"""Unit tests for the compiled intent matcher.
+
+Tests the IntentMatcher and its use by the Intent Parser to ensure:
+- Overlapping keywords and keywords sharing a prefix are all counted
+- parse gives the same intents, confidences and entities as matching every
+  intent's keywords and patterns one by one
+- Reassigned or recompiled intent patterns take effect
+"""
+
+import re
+import pytest
+from hypothesis import given, settings, strategies as st
+from prime.nlp import IntentParser
+from prime.nlp.intent_matcher import IntentMatcher
+from prime.models import Intent
+
+
+def reference_parse(parser: IntentParser, text: str) -> Intent:
+    """Parse text by checking each intent's keywords and patterns in turn."""
+    if not text or not text.strip():
+        return Intent("unknown", [], 0.0, True)
+    normalized_text = text.lower().strip()
+
+    best_match, best_confidence, matched_entities = None, 0.0, []
+    for intent_type, pattern_info in parser.intent_patterns.items():
+        if intent_type == "unknown":
+            continue
+        keyword_matches = sum(1 for keyword in pattern_info["keywords"] if keyword in normalized_text)
+        if keyword_matches > 0:
+            for pattern in pattern_info["patterns"]:
+                match = re.search(pattern, normalized_text, re.IGNORECASE)
+                if match:
+                    confidence = min(0.9, 0.5 + (keyword_matches * 0.2))
+                    if confidence > best_confidence:
+                        best_confidence, best_match = confidence, intent_type
+                        matched_entities = parser._extract_entities_from_match(
+                            match, pattern_info["entity_types"]
+                        )
+                    break
+
+    if best_match is None:
+        for intent_type, pattern_info in parser.intent_patterns.items():
+            if intent_type == "unknown":
+                continue
+            keyword_matches = sum(1 for keyword in pattern_info["keywords"] if keyword in normalized_text)
+            if keyword_matches > 0:
+                confidence = min(0.7, 0.3 + (keyword_matches * 0.2))
+                if confidence > best_confidence:
+                    best_confidence, best_match = confidence, intent_type
+                    matched_entities = parser.extract_entities(normalized_text)
+
+    requires_clarification = (
+        best_match is None or
+        best_confidence < 0.5 or
+        (len(matched_entities) == 0 and parser.intent_patterns.get(best_match, {}).get("entity_types", []))
+    )
+    return Intent(best_match or "unknown", matched_entities, best_confidence, requires_clarification)
+
+
+COMMANDS = [
+    "open Chrome", "launch Visual Studio Code", "run the tests", "start music",
+    "set volume to 50", "turn volume down", "volume up", "increase the volume",
+    "make the brightness up", "brightness down", "lower brightness",
+    "find files named report.pdf", "search budget files", "locate ~/notes/todo.txt",
+    "take a note buy milk", "remember to call mom", "write down the address",
+    "create a new file called draft.md", "make file todo", "delete the file old.log",
+    "remove /tmp/cache", "move a.txt to b.txt", "copy photos to backup",
+    "shutdown the computer", "power off", "turn off the pc", "restart", "reboot the system",
+    "turn on wifi", "connect to wi-fi home", "bluetooth off", "switch off the bluetooth",
+    "list all running processes", "what's running", "kill process 1234", "stop chrome",
+    "read the screen", "what's on the screen", "remind me to stretch in 10 minutes",
+    "set a reminder to pay rent at 9", "hello there", "", "   ", "turn", "screen",
+    "running", "restart running processes", "new screen file", "create system note",
+]
+
+VOCABULARY = sorted({
+    keyword for info in IntentParser().intent_patterns.values() for keyword in info["keywords"]
+} | {"the", "to", "a", "file", "computer", "50", "up", "down", "on", "off", "me", "at", "in",
+     "called", "named", "process", "Chrome", "~/docs", "'x'"})
+
+
+class TestIntentMatcher:
+    """Test the matcher on its own."""
+
+    def test_counts_overlapping_keywords(self):
+        """Test that keywords inside and at the start of others are counted."""
+        matcher = IntentMatcher({
+            "a": {"keywords": ["start", "starting"], "entity_types": [], "patterns": []},
+            "b": {"keywords": ["restart"], "entity_types": [], "patterns": []},
+        })
+
+        assert matcher.keyword_matches("restarting") == {"a": 2, "b": 1}
+        assert matcher.keyword_matches("restart") == {"a": 1, "b": 1}
+        assert matcher.keyword_matches("starting late, start") == {"a": 2}
+        assert matcher.keyword_matches("walk") == {}
+
+    def test_prefers_pattern_matches_then_earlier_intents(self):
+        """Test the confidence order of candidates."""
+        matcher = IntentMatcher({
+            "first": {"keywords": ["go"], "entity_types": [], "patterns": [r"never"]},
+            "second": {"keywords": ["go", "now"], "entity_types": [], "patterns": []},
+            "third": {"keywords": ["go"], "entity_types": ["x"], "patterns": [r"go (\w+)"]},
+        })
+
+        intent_type, confidence, match = matcher.match("go home now")
+        assert (intent_type, confidence, match.group(1)) == ("third", 0.7, "home")
+        assert matcher.match("go, now")[:2] == ("second", 0.7)
+        assert matcher.match("hello") == (None, 0.0, None)
+
+    def test_no_keywords(self):
+        """Test a grammar without keywords."""
+        assert IntentMatcher({"unknown": {"keywords": [], "entity_types": [], "patterns": []}}).match("open") == (None, 0.0, None)
+
+    def test_invalid_pattern_fails_to_compile(self):
+        """Test that every pattern is compiled up front, even of intents never mentioned."""
+        with pytest.raises(re.error):
+            IntentMatcher({
+                "greet": {"keywords": ["hello"], "entity_types": [], "patterns": [r"hello"]},
+                "broken": {"keywords": ["xyzzy"], "entity_types": [], "patterns": [r"(unclosed"]},
+            })
+
+
+class TestParserUsesMatcher:
+    """Test that parse keeps its results."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.parser = IntentParser()
+
+    def test_corpus_matches_reference(self):
+        """Test a corpus of commands against the reference parse."""
+        for command in COMMANDS:
+            assert self.parser.parse(command) == reference_parse(self.parser, command), command
+
+    @settings(max_examples=300, deadline=None)
+    @given(st.lists(st.sampled_from(VOCABULARY), min_size=1, max_size=6))
+    def test_generated_commands_match_reference(self, words):
+        """Test generated commands against the reference parse."""
+        command = " ".join(words)
+        assert self.parser.parse(command) == reference_parse(self.parser, command)
+
+    def test_reassigned_patterns_are_compiled(self):
+        """Test that new and edited intent patterns take effect."""
+        self.parser.intent_patterns = {
+            "greet": {"keywords": ["hello"], "entity_types": ["name"], "patterns": [r"hello\s+(\w+)"]},
+        }
+        assert self.parser.parse("hello Ada").intent_type == "greet"
+
+        self.parser.intent_patterns["greet"]["keywords"] = ["hi"]
+        self.parser.compile_patterns()
+        assert self.parser.parse("hello Ada").intent_type == "unknown"
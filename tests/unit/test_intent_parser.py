@@ -324,6 +324,100 @@ class TestEntityExtraction:
         assert isinstance(entities, list)
 
 
+class TestEntitySpans:
+    """Test entity spans from the single-pass lexer."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.parser = IntentParser()
+    
+    def test_spans_have_offsets(self):
+        """Test that span offsets point at each entity's text."""
+        text = 'copy "Q3 report" to /mnt/backup and set volume to 40'
+        spans = self.parser.extract_entity_spans(text)
+        
+        assert [(s.entity_type, s.value) for s in spans] == [
+            ("quoted_string", "Q3 report"),
+            ("file_path", "/mnt/backup"),
+            ("number", 40),
+        ]
+        for span in spans:
+            assert text[span.start:span.end] == span.text
+    
+    def test_entities_in_positional_order(self):
+        """Test that entities are returned in the order they appear."""
+        entities = self.parser.extract_entities("turn Spotify down to 20 then open ~/music/list.m3u")
+        
+        assert [e.entity_type for e in entities] == ["application", "direction", "number", "file_path"]
+    
+    def test_no_numbers_inside_paths(self):
+        """Test that numbers that are part of a path are not reported."""
+        entities = self.parser.extract_entities("open /var/log/2024/app.log and C:\\Data\\2023\\x.csv")
+        
+        assert [(e.entity_type, e.value) for e in entities] == [
+            ("file_path", "/var/log/2024/app.log"),
+            ("file_path", "C:\\Data\\2023\\x.csv"),
+        ]
+    
+    def test_no_names_inside_quotes(self):
+        """Test that capitalized words inside quotes are not application names."""
+        entities = self.parser.extract_entities('open "Annual Report" in Word')
+        
+        assert [(e.entity_type, e.value) for e in entities] == [
+            ("quoted_string", "Annual Report"),
+            ("application", "Word"),
+        ]
+    
+    def test_capitalized_directions_end_application_names(self):
+        """Test that a capitalized direction word is a direction, not part of a name."""
+        entities = self.parser.extract_entities("Open Up then turn Spotify Down")
+        
+        assert [(e.entity_type, e.value) for e in entities] == [
+            ("application", "Open"),
+            ("direction", "up"),
+            ("application", "Spotify"),
+            ("direction", "down"),
+        ]
+    
+    def test_application_names_are_whole_words(self):
+        """Test that a capitalized part of a longer word is not an application name."""
+        for text in ["open iPhone settings", "launch myChrome now", "open McAfee", "start 3DSpotify"]:
+            entities = self.parser.extract_entities(text)
+            assert not any(e.entity_type == "application" for e in entities), text
+        
+        entities = self.parser.extract_entities("open iPhone and Chrome")
+        assert [(e.entity_type, e.value) for e in entities] == [("application", "Chrome")]
+    
+    def test_drive_letter_ending_a_word(self):
+        """Test that a Windows path is found when a word runs into its drive letter."""
+        spans = self.parser.extract_entity_spans("open abc:\\x and then d:\\y")
+        
+        assert [(s.entity_type, s.value, s.start) for s in spans] == [
+            ("file_path", "c:\\x", 7),
+            ("file_path", "d:\\y", 21),
+        ]
+    
+    def test_case_insensitive_numbers_and_directions(self):
+        """Test that directions are found in capitalized text."""
+        entities = self.parser.extract_entities("Volume UP by 10")
+        
+        assert [(e.entity_type, e.value) for e in entities] == [
+            ("application", "Volume"),
+            ("direction", "up"),
+            ("number", 10),
+        ]
+    
+    def test_directions_inside_words_are_ignored(self):
+        """Test that direction words must stand on their own."""
+        assert self.parser.extract_entities("upload the setup file") == []
+    
+    def test_stop_words_are_not_applications(self):
+        """Test that capitalized stop words are skipped."""
+        entities = self.parser.extract_entities("The 5 files")
+        
+        assert [(e.entity_type, e.value) for e in entities] == [("number", 5)]
+
+
 class TestAmbiguityDetection:
     """Test ambiguity detection in intents."""
     
@@ -522,3 +616,66 @@ class TestEdgeCases:
         result = self.parser.parse("open файл.txt")
         # Should at least not crash
         assert isinstance(result, Intent)
+
+
+class TestParseBatchAndCache:
+    """Test batch parsing and the parse result cache."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.parser = IntentParser()
+    
+    def test_repeated_commands_hit_the_cache(self):
+        """Test that a repeated command is only matched once."""
+        first = self.parser.parse("Volume up")
+        second = self.parser.parse("  volume UP ")
+        
+        assert first == second
+        stats = self.parser.cache_stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    
+    def test_cached_intents_are_copies(self):
+        """Test that modifying a returned intent does not change the cache."""
+        intent = self.parser.parse("set volume to 50")
+        intent.confidence = 0.1
+        intent.entities[0].value = 99
+        
+        again = self.parser.parse("set volume to 50")
+        assert again.confidence > 0.5
+        assert again.entities[0].value == 50
+    
+    def test_changing_patterns_clears_the_cache(self):
+        """Test that cached results are dropped when intent patterns change."""
+        assert self.parser.parse("hello Ada").intent_type == "unknown"
+        
+        patterns = dict(self.parser.intent_patterns)
+        patterns["greet"] = {"keywords": ["hello"], "entity_types": ["name"], "patterns": [r"hello\s+(\w+)"]}
+        self.parser.intent_patterns = patterns
+        
+        assert self.parser.parse("hello Ada").intent_type == "greet"
+    
+    def test_cache_can_be_disabled(self):
+        """Test a parser without a cache."""
+        parser = IntentParser(cache_size=0)
+        assert parser.parse("volume up") == parser.parse("volume up")
+        assert parser.cache_stats()["size"] == 0
+    
+    def test_parse_batch_keeps_input_order(self):
+        """Test that batch results match single parses, in input order."""
+        texts = ["open Chrome", "volume up", "", "Volume Up", "shutdown", None, "open chrome"]
+        
+        results = self.parser.parse_batch(texts)
+        
+        assert results == [IntentParser(cache_size=0).parse(text) for text in texts]
+        assert results[1] is not results[3]
+        assert self.parser.cache_stats()["size"] == 3
+    
+    def test_parse_batch_in_worker_processes(self):
+        """Test that large batches parsed by workers give the same results."""
+        self.parser.PARALLEL_BATCH_MIN = 4
+        texts = [f"set volume to {i}" for i in range(6)] + ["copy a to b", "read the screen"]
+        
+        results = self.parser.parse_batch(texts, workers=2)
+        
+        assert results == [IntentParser(cache_size=0).parse(text) for text in texts]
+        assert self.parser.cache_stats()["size"] == len(texts)
@@ -0,0 +1,192 @@
+"""Unit tests for password-based key derivation.
+
+Tests derive_key_from_password, the derived key cache and key stores to ensure:
+- Cached derivations return the same keys without rerunning the KDF
+- The cache is size-bounded, expires entries and zeroizes evicted keys
+- scrypt can be used instead of PBKDF2
+- Key stores verify passwords and upgrade weaker KDF parameters
+- Stores created with derive_key_from_password can adopt a key store
+"""
+
+import json
+import pytest
+import tempfile
+import shutil
+import time
+from prime.persistence import (
+    MemoryManager, DerivedKeyCache, default_kdf_params, derive_key_from_password
+)
+from prime.persistence import key_derivation
+
+# Cheap parameters so that tests run fast
+FAST_PBKDF2 = {'algorithm': 'pbkdf2', 'iterations': 1000}
+STRONG_PBKDF2 = {'algorithm': 'pbkdf2', 'iterations': 2000}
+FAST_SCRYPT = {'algorithm': 'scrypt', 'n': 2 ** 10, 'r': 8, 'p': 1}
+
+
+class TestDerivedKeyCache:
+    """Test the derived key cache."""
+
+    def test_cached_derivation_skips_kdf(self, monkeypatch):
+        """Test that deriving the same key twice runs the KDF once."""
+        calls = []
+        original_derive = key_derivation._derive
+        monkeypatch.setattr(
+            key_derivation, "_derive",
+            lambda *args: calls.append(args) or original_derive(*args)
+        )
+        salt = b"cache_test_salt_"
+
+        key1 = derive_key_from_password("secret", salt, FAST_PBKDF2)
+        key2 = derive_key_from_password("secret", salt, FAST_PBKDF2)
+        key3 = derive_key_from_password("secret", salt, FAST_PBKDF2, use_cache=False)
+
+        assert key1 == key2 == key3
+        assert len(calls) == 2
+
+    def test_entries_depend_on_all_inputs(self):
+        """Test that password, salt and parameters are all part of the key."""
+        cache = DerivedKeyCache()
+        cache.put("pw", b"salt", FAST_PBKDF2, b"key")
+
+        assert cache.get("pw", b"salt", FAST_PBKDF2) == b"key"
+        assert cache.get("pw2", b"salt", FAST_PBKDF2) is None
+        assert cache.get("pw", b"salt2", FAST_PBKDF2) is None
+        assert cache.get("pw", b"salt", STRONG_PBKDF2) is None
+
+    def test_size_bound_evicts_least_recently_used(self):
+        """Test that the oldest unused entry is evicted and zeroized."""
+        cache = DerivedKeyCache(max_size=2)
+        cache.put("a", b"salt", FAST_PBKDF2, b"key_a")
+        stored_a = next(iter(cache._entries.values()))[0]
+        cache.put("b", b"salt", FAST_PBKDF2, b"key_b")
+        cache.get("a", b"salt", FAST_PBKDF2)
+        cache.put("c", b"salt", FAST_PBKDF2, b"key_c")
+
+        assert len(cache) == 2
+        assert cache.get("b", b"salt", FAST_PBKDF2) is None
+        assert cache.get("a", b"salt", FAST_PBKDF2) == b"key_a"
+
+        cache.clear()
+        assert len(cache) == 0
+        assert stored_a == bytearray(len(b"key_a"))
+
+    def test_entries_expire(self):
+        """Test that entries expire after the TTL."""
+        cache = DerivedKeyCache(ttl_seconds=0.05)
+        cache.put("pw", b"salt", FAST_PBKDF2, b"key")
+        time.sleep(0.1)
+
+        assert cache.get("pw", b"salt", FAST_PBKDF2) is None
+        assert len(cache) == 0
+
+    def test_cleanup_expired(self):
+        """Test removing expired entries explicitly."""
+        cache = DerivedKeyCache(ttl_seconds=0.05)
+        cache.put("pw", b"salt", FAST_PBKDF2, b"key")
+        time.sleep(0.1)
+
+        assert cache.cleanup_expired() == 1
+
+
+class TestKeyDerivationFunctions:
+    """Test the supported key derivation functions."""
+
+    def test_scrypt_keys_work_with_manager(self):
+        """Test that scrypt-derived keys can encrypt data."""
+        key = derive_key_from_password("secret", b"scrypt_test_salt", FAST_SCRYPT)
+
+        assert key != derive_key_from_password("secret", b"scrypt_test_salt", FAST_PBKDF2)
+        manager = MemoryManager(encryption_key=key, storage_dir=tempfile.mkdtemp())
+        assert manager.decrypt_data(manager.encrypt_data(b"data")) == b"data"
+
+    def test_default_kdf_params(self):
+        """Test the default parameters and unknown algorithms."""
+        assert default_kdf_params()['iterations'] == 480000
+        assert default_kdf_params('scrypt')['algorithm'] == 'scrypt'
+        with pytest.raises(ValueError):
+            default_kdf_params('md5')
+
+
+class TestKeyStore:
+    """Test password-protected key stores."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_open_with_password_round_trip(self, temp_storage):
+        """Test that data stored under a password can be read back."""
+        manager = MemoryManager.open_with_password("secret", temp_storage, kdf_params=FAST_PBKDF2)
+        manager.store_preference("theme", "dark", "user")
+
+        reopened = MemoryManager.open_with_password("secret", temp_storage, kdf_params=FAST_PBKDF2)
+        assert reopened.encryption_key == manager.encryption_key
+        assert reopened.get_preference("theme", "user") == "dark"
+
+    def test_wrong_password_is_rejected(self, temp_storage):
+        """Test that an incorrect password raises ValueError."""
+        MemoryManager.open_with_password("secret", temp_storage, kdf_params=FAST_PBKDF2)
+
+        with pytest.raises(ValueError, match="Incorrect password"):
+            MemoryManager.open_with_password("wrong", temp_storage, kdf_params=FAST_PBKDF2)
+
+    def test_weaker_parameters_are_upgraded(self, temp_storage):
+        """Test that opening with stronger parameters re-wraps the data key."""
+        manager = MemoryManager.open_with_password("secret", temp_storage, kdf_params=FAST_PBKDF2)
+        manager.store_preference("theme", "dark", "user")
+
+        upgraded = MemoryManager.open_with_password("secret", temp_storage, kdf_params=FAST_SCRYPT)
+        assert upgraded.get_preference("theme", "user") == "dark"
+        assert _stored_kdf(upgraded) == FAST_SCRYPT
+
+        # Weaker parameters never downgrade the key store
+        MemoryManager.open_with_password("secret", temp_storage, kdf_params=FAST_PBKDF2)
+        assert _stored_kdf(upgraded) == FAST_SCRYPT
+
+    def test_stronger_iterations_are_upgraded(self, temp_storage):
+        """Test that more PBKDF2 iterations count as an upgrade."""
+        MemoryManager.open_with_password("secret", temp_storage, kdf_params=FAST_PBKDF2)
+        manager = MemoryManager.open_with_password("secret", temp_storage, kdf_params=STRONG_PBKDF2)
+
+        assert _stored_kdf(manager) == STRONG_PBKDF2
+
+    def test_legacy_store_adopts_key_store(self, temp_storage):
+        """Test that stores encrypted with derive_key_from_password keep working."""
+        legacy_salt = b"legacy_salt_1234"
+        legacy_key = derive_key_from_password("secret", legacy_salt)
+        MemoryManager(encryption_key=legacy_key, storage_dir=temp_storage).store_preference(
+            "theme", "dark", "user"
+        )
+
+        manager = MemoryManager.open_with_password(
+            "secret", temp_storage, kdf_params=FAST_PBKDF2, legacy_salt=legacy_salt
+        )
+        assert manager.get_preference("theme", "user") == "dark"
+
+        reopened = MemoryManager.open_with_password("secret", temp_storage, kdf_params=FAST_PBKDF2)
+        assert reopened.get_preference("theme", "user") == "dark"
+
+    def test_sqlite_backend_key_store(self, temp_storage):
+        """Test that key stores work with the SQLite backend."""
+        manager = MemoryManager.open_with_password(
+            "secret", temp_storage, backend='sqlite', kdf_params=FAST_PBKDF2
+        )
+        manager.store_preference("theme", "dark", "user")
+        manager.close()
+
+        reopened = MemoryManager.open_with_password(
+            "secret", temp_storage, backend='sqlite', kdf_params=FAST_PBKDF2
+        )
+        try:
+            assert reopened.get_preference("theme", "user") == "dark"
+        finally:
+            reopened.close()
+
+
+def _stored_kdf(manager):
+    """Read the KDF parameters recorded in a manager's key store."""
+    return json.loads(manager.backend.read('keystore', 'kdf'))['kdf']
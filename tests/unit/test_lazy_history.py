@@ -0,0 +1,172 @@
+"""Unit tests for lazily loaded session history.
+
+Tests the LazyHistory and its use by the Memory Manager to ensure:
+- Records are decoded only when accessed, and only once
+- The history behaves like a list
+- Loading a session decodes no records, and saving it back writes records
+  that were never accessed as they were stored
+- iter_history yields records newest or oldest first
+"""
+
+import pytest
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from prime.persistence import MemoryManager
+from prime.persistence.lazy_history import LazyHistory
+from prime.models.data_models import (
+    Session, CommandRecord, Command, CommandResult, ContextSummary, Intent, Entity
+)
+
+
+def make_record(i: int) -> CommandRecord:
+    """Create a command record numbered i."""
+    timestamp = datetime(2024, 1, 1, 10, 0, 0) + timedelta(seconds=i)
+    return CommandRecord(
+        command=Command(
+            command_id=f"cmd_{i}",
+            intent=Intent(
+                intent_type="launch_app",
+                entities=[Entity(entity_type="application", value=f"app{i}", confidence=0.9)],
+                confidence=0.9,
+                requires_clarification=False
+            ),
+            parameters={"app_name": f"app{i}"},
+            timestamp=timestamp,
+            requires_confirmation=False
+        ),
+        result=CommandResult(
+            command_id=f"cmd_{i}",
+            success=True,
+            output=f"App{i} launched",
+            error=None,
+            execution_time_ms=100
+        ),
+        timestamp=timestamp
+    )
+
+
+class TestLazyHistory:
+    """Test the lazy sequence on its own."""
+
+    @pytest.fixture
+    def history(self):
+        """Create a history of 10 records stored as their numbers."""
+        return LazyHistory(range(10), make_record)
+
+    def test_decodes_on_access(self, history):
+        """Test that only accessed records are decoded."""
+        assert len(history) == 10
+        assert history.decoded_count == 0
+
+        assert [r.command.command_id for r in history[-3:]] == ["cmd_7", "cmd_8", "cmd_9"]
+        assert history.decoded_count == 3
+        assert history[-1] is history[9]
+        assert history.decoded_count == 3
+
+    def test_behaves_like_a_list(self, history):
+        """Test list operations and comparison."""
+        records = [make_record(i) for i in range(10)]
+        assert history == records
+        assert records == history
+        assert list(reversed(history)) == records[::-1]
+
+        history.append(make_record(10))
+        history.extend([make_record(11)])
+        del history[0]
+        assert [r.command.command_id for r in history[:2]] == ["cmd_1", "cmd_2"]
+        assert history[-1] == make_record(11)
+        assert history != records
+
+    def test_export_keeps_stored_form(self, history):
+        """Test that unaccessed records are exported without re-encoding."""
+        history[0]
+        history.append(make_record(10))
+        encode = lambda record: record.command.command_id
+
+        exported = history.export(make_record, encode)
+
+        assert exported == ["cmd_0", 1, 2, 3, 4, 5, 6, 7, 8, 9, "cmd_10"]
+        assert history.export(lambda value: None, encode) == [f"cmd_{i}" for i in range(11)]
+
+    def test_copy(self, history):
+        """Test that a copy shares decoded records and decodes nothing."""
+        first = history[0]
+
+        copy = history.copy()
+        copy.append(make_record(10))
+
+        assert len(history) == 10 and len(copy) == 11
+        assert copy.decoded_count == 2
+        assert copy[0] is first
+
+
+@pytest.mark.parametrize("record_format", ["json", "binary"])
+class TestMemoryManagerLazyHistory:
+    """Test lazily loaded history as used by the Memory Manager."""
+
+    @pytest.fixture
+    def manager(self, record_format):
+        """Create a MemoryManager with temporary storage."""
+        temp_dir = tempfile.mkdtemp()
+        yield MemoryManager(storage_dir=temp_dir, record_format=record_format)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def session(self, manager):
+        """Save a session of 30 records, the last 10 of them journaled."""
+        session = Session(
+            session_id="long_session",
+            user_id="user1",
+            start_time=datetime(2024, 1, 1, 10, 0, 0),
+            end_time=None,
+            command_history=[make_record(i) for i in range(20)],
+            context_state={"mode": "work"}
+        )
+        manager.save_session(session)
+        for i in range(20, 30):
+            session.command_history.append(make_record(i))
+            manager.save_session(session)
+        return session
+
+    def test_load_decodes_nothing(self, manager, session):
+        """Test that loading a session does not build its records."""
+        loaded = manager.load_session("long_session")
+
+        assert isinstance(loaded.command_history, LazyHistory)
+        assert loaded.command_history.decoded_count <= 1
+        assert loaded.command_history[-5:] == session.command_history[-5:]
+        assert loaded == session
+
+    def test_summary_decodes_the_tail(self, manager, session):
+        """Test that summarizing a long loaded history reads its last records only."""
+        for i in range(30, 80):
+            session.command_history.append(make_record(i))
+        manager.save_session(session)
+        loaded = manager.load_session("long_session")
+
+        summary = loaded.summary()
+        assert summary.record_count == 80
+        assert loaded.command_history.decoded_count <= ContextSummary.MAX_RECORDS + 1
+        assert summary.latest_entities == session.summary().latest_entities
+
+    def test_save_without_access(self, manager, session):
+        """Test that a loaded session is saved back intact."""
+        loaded = manager.load_session("long_session")
+        loaded.command_history.append(make_record(30))
+        manager.save_session(loaded)
+        manager.compact_session("long_session")
+
+        reloaded = manager.load_session("long_session")
+        assert reloaded.command_history == session.command_history + [make_record(30)]
+
+    def test_iter_history(self, manager, session):
+        """Test iterating newest or oldest first."""
+        newest = manager.iter_history("long_session")
+        assert [next(newest).command.command_id for _ in range(3)] == ["cmd_29", "cmd_28", "cmd_27"]
+        assert list(manager.iter_history("long_session", newest_first=False)) == session.command_history
+
+    def test_iter_history_missing_session(self, manager):
+        """Test that iterating a missing session raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            manager.iter_history("missing")
@@ -0,0 +1,211 @@
+"""Unit tests for storage maintenance.
+
+Tests the storage size tracking, compaction and the MaintenanceWorker to
+ensure:
+- Backends track their size incrementally, including deletions
+- Compaction removes leftover temporary files and reclaims free pages
+- A maintenance pass expires sessions, archives completed reminders and
+  compacts session journals, and reports the reclaimed bytes
+- Old sessions are deleted until the store fits the quota
+- The background thread can be started and stopped
+"""
+
+import pytest
+import tempfile
+import shutil
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from prime.persistence import (
+    MemoryManager,
+    MaintenanceWorker,
+    FileStorageBackend,
+    SQLiteStorageBackend,
+)
+from prime.models.data_models import (
+    Session, CommandRecord, Command, CommandResult, Intent, Reminder
+)
+
+
+def make_session(session_id: str, days_ago: float, commands: int = 0) -> Session:
+    """Create an ended session that was last active days_ago days ago."""
+    start_time = datetime.now() - timedelta(days=days_ago)
+    session = Session(
+        session_id=session_id,
+        user_id="user1",
+        start_time=start_time,
+        end_time=start_time,
+        command_history=[],
+        context_state={}
+    )
+    for i in range(commands):
+        add_command(session, i)
+    return session
+
+
+def add_command(session: Session, i: int) -> None:
+    """Append a command record numbered i to a session."""
+    session.command_history.append(CommandRecord(
+        command=Command(
+            command_id=f"cmd_{i}",
+            intent=Intent(intent_type="launch_app", entities=[], confidence=0.9,
+                          requires_clarification=False),
+            parameters={"app_name": f"app{i}"},
+            timestamp=session.start_time,
+            requires_confirmation=False
+        ),
+        result=CommandResult(command_id=f"cmd_{i}", success=True, output="done",
+                             error=None, execution_time_ms=10),
+        timestamp=session.start_time
+    ))
+
+
+@pytest.fixture
+def temp_storage():
+    """Create a temporary storage directory for testing."""
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class TestStorageSize:
+    """Test backend size tracking and compaction."""
+
+    @pytest.mark.parametrize("backend_class,path", [
+        (FileStorageBackend, ""),
+        (SQLiteStorageBackend, "store.db"),
+    ])
+    def test_size_grows_and_shrinks(self, temp_storage, backend_class, path):
+        """Test that the size follows writes and deletions."""
+        backend = backend_class(Path(temp_storage) / path)
+        empty = backend.storage_size()
+
+        for i in range(50):
+            backend.write("notes", f"n{i}", b"x" * 4096, owner="alice")
+        full = backend.storage_size()
+        assert full >= empty + 50 * 4096
+
+        backend.delete_owner("notes", "alice")
+        backend.compact()
+        assert backend.storage_size() < full
+        backend.close()
+
+    def test_file_size_matches_disk(self, temp_storage):
+        """Test that the tracked size equals the size of the record files."""
+        backend = FileStorageBackend(temp_storage)
+        backend.storage_size()
+        backend.write("notes", "a", b"12345", owner="alice")
+        backend.write("notes", "a", b"123", owner="alice")
+        backend.append("journal", "b", b"1234")
+        backend.append("journal", "b", b"56")
+        backend.write("notes", "c", b"1")
+        backend.delete("notes", "c")
+
+        on_disk = sum(path.stat().st_size for path in Path(temp_storage).rglob("*.json"))
+        assert backend.storage_size() == on_disk == 9
+        assert FileStorageBackend(temp_storage).storage_size() == 9
+
+    def test_file_compact_removes_stale_temp_files(self, temp_storage):
+        """Test that leftover temporary files and empty directories are removed."""
+        backend = FileStorageBackend(temp_storage)
+        backend.write("notes", "a", b"data", owner="alice")
+        backend.delete("notes", "a", owner="alice")
+        stale = Path(temp_storage) / "notes" / ".b.json.tmp"
+        stale.write_bytes(b"x" * 100)
+        old = time.time() - FileStorageBackend.STALE_TEMP_SECONDS - 10
+        os.utime(stale, (old, old))
+
+        assert backend.compact() == 100
+        assert not stale.exists()
+        assert not (Path(temp_storage) / "notes" / "alice").exists()
+
+
+class TestMaintenanceWorker:
+    """Test maintenance passes."""
+
+    @pytest.fixture
+    def manager(self, temp_storage):
+        """Create a MemoryManager that never compacts journals by itself."""
+        return MemoryManager(storage_dir=temp_storage, session_compaction_threshold=1000)
+
+    def test_run_once_expires_archives_and_compacts(self, manager):
+        """Test that a pass does every kind of maintenance and reports it."""
+        for i in range(3):
+            manager.save_session(make_session(f"old{i}", days_ago=60, commands=5))
+        recent = make_session("recent", days_ago=1)
+        manager.save_session(recent)
+        for i in range(20):
+            add_command(recent, i)
+            manager.save_session(recent)
+        manager.create_reminders([
+            Reminder("done", "Done", datetime.now() - timedelta(hours=1), True),
+            Reminder("pending", "Pending", datetime.now() + timedelta(hours=1), False),
+        ], "user1")
+
+        worker = MaintenanceWorker(manager, retention_days=30, batch_size=2,
+                                   batch_pause_seconds=0, min_journal_bytes=0)
+        report = worker.run_once()
+
+        assert report.sessions_expired == 3
+        assert report.reminders_archived == 1
+        assert report.journals_compacted == 1
+        assert report.reclaimed_bytes > 0
+        assert report.size_after == manager.storage_size()
+        assert report.run_time_seconds >= 0
+        assert not report.over_quota
+        assert worker.last_report is report
+
+        assert manager.list_sessions("user1") == ["recent"]
+        assert len(manager.load_session("recent").command_history) == 20
+        assert [r.reminder_id for r in manager.get_archived_reminders("user1")] == ["done"]
+        assert manager.get_next_reminder_time("user1") is not None
+
+    def test_second_pass_has_nothing_to_do(self, manager):
+        """Test that a pass on a maintained store changes nothing."""
+        manager.save_session(make_session("old", days_ago=60))
+        worker = MaintenanceWorker(manager, retention_days=30, batch_pause_seconds=0)
+        worker.run_once()
+
+        report = worker.run_once()
+        assert (report.sessions_expired, report.reminders_archived, report.journals_compacted) == (0, 0, 0)
+
+    def test_quota_deletes_oldest_sessions(self, manager):
+        """Test that older sessions are deleted until the store fits."""
+        for days_ago in [20, 10, 5, 0.1]:
+            manager.save_session(make_session(f"s{days_ago}", days_ago=days_ago, commands=50))
+        quota = manager.storage_size() * 2 // 3
+
+        worker = MaintenanceWorker(manager, max_storage_bytes=quota, retention_days=30,
+                                   batch_pause_seconds=0)
+        report = worker.run_once()
+
+        assert report.quota_sessions_deleted >= 1
+        assert not report.over_quota
+        assert manager.storage_size() <= quota
+        assert "s0.1" in manager.list_sessions("user1")
+        assert "s20" not in manager.list_sessions("user1")
+
+    def test_reports_when_still_over_quota(self, manager):
+        """Test that recent data is kept even if the quota is exceeded."""
+        manager.save_session(make_session("today", days_ago=0.1, commands=10))
+
+        report = MaintenanceWorker(manager, max_storage_bytes=1, batch_pause_seconds=0).run_once()
+
+        assert report.over_quota
+        assert manager.list_sessions("user1") == ["today"]
+
+    def test_start_and_stop(self, manager):
+        """Test that the background thread runs a pass and stops."""
+        manager.save_session(make_session("old", days_ago=60))
+        worker = MaintenanceWorker(manager, interval_seconds=60, retention_days=30)
+
+        worker.start()
+        assert worker.is_running()
+        deadline = time.time() + 5
+        while worker.last_report is None and time.time() < deadline:
+            time.sleep(0.01)
+        worker.stop()
+
+        assert not worker.is_running()
+        assert worker.last_report.sessions_expired == 1
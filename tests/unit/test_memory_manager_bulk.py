@@ -0,0 +1,128 @@
+"""Unit tests for the Memory Manager bulk APIs.
+
+Tests store_notes, load_notes, create_reminders and
+record_application_usage_batch to ensure:
+- Bulk operations produce the same results as the per-item methods
+- Indexes are kept in step with bulk writes
+- Invalid items are rejected before anything is written
+- The worker pool and the SQLite backend give the same results
+"""
+
+import pytest
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from prime.persistence import MemoryManager
+from prime.models.data_models import Note, Reminder
+
+
+def make_note(i: int) -> Note:
+    """Create a note numbered i."""
+    return Note(
+        note_id=f"note_{i}",
+        content=f"Imported note number {i}",
+        tags=["import", f"batch{i % 3}"],
+        created_at=datetime(2024, 1, 1, 10, 0, 0) + timedelta(minutes=i),
+        updated_at=datetime(2024, 1, 1, 10, 0, 0) + timedelta(minutes=i)
+    )
+
+
+def make_reminder(i: int, minutes_from_now: float) -> Reminder:
+    """Create a reminder numbered i."""
+    return Reminder(
+        reminder_id=f"reminder_{i}",
+        content=f"Calendar event {i}",
+        due_time=datetime.now() + timedelta(minutes=minutes_from_now),
+        is_completed=False
+    )
+
+
+class TestBulkOperations:
+    """Test bulk note, reminder and usage operations."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture(params=[1, 4], ids=["serial", "pool"])
+    def memory_manager(self, request, temp_storage):
+        """Create a MemoryManager with and without the worker pool."""
+        manager = MemoryManager(storage_dir=temp_storage, worker_count=request.param)
+        yield manager
+        manager.close()
+
+    def test_store_notes(self, memory_manager, temp_storage):
+        """Test that stored notes can be searched and loaded."""
+        assert memory_manager.store_notes([make_note(i) for i in range(40)], "user") == 40
+
+        assert len(memory_manager.search_notes("imported", "user")) == 40
+        assert len(memory_manager.get_notes_by_tag("batch1", "user")) == 13
+
+        user_dir = next((Path(temp_storage) / 'notes').iterdir())
+        assert len(list(user_dir.glob("*.json"))) == 40
+
+    def test_store_notes_rejects_invalid_items(self, memory_manager):
+        """Test that nothing is stored if any item is not a Note."""
+        with pytest.raises(TypeError):
+            memory_manager.store_notes([make_note(0), {"not": "a note"}], "user")
+
+        assert memory_manager.search_notes("imported", "user") == []
+
+    def test_store_notes_empty(self, memory_manager):
+        """Test that an empty batch stores nothing."""
+        assert memory_manager.store_notes([], "user") == 0
+
+    def test_load_notes_preserves_order(self, memory_manager):
+        """Test that notes are returned in the requested order."""
+        memory_manager.store_notes([make_note(i) for i in range(30)], "user")
+
+        ids = [f"note_{i}" for i in (29, 3, 17)] + ["missing"] + [f"note_{i}" for i in range(20)]
+        loaded = memory_manager.load_notes(ids, "user")
+
+        assert [note.note_id for note in loaded] == [i for i in ids if i != "missing"]
+        assert loaded[0] == make_note(29)
+        assert memory_manager.load_notes(["note_1"], "other") == []
+
+    def test_create_reminders(self, memory_manager):
+        """Test that bulk reminders are indexed by due time."""
+        reminders = [make_reminder(i, -i - 1 if i % 2 else 60) for i in range(20)]
+        assert memory_manager.create_reminders(reminders, "user") == 20
+
+        due = memory_manager.get_due_reminders("user")
+        assert [r.reminder_id for r in due] == [f"reminder_{i}" for i in range(19, 0, -2)]
+
+    def test_create_reminders_rejects_invalid_items(self, memory_manager):
+        """Test that nothing is stored if any item is not a Reminder."""
+        with pytest.raises(TypeError):
+            memory_manager.create_reminders([make_reminder(0, -1), "not a reminder"], "user")
+
+        assert memory_manager.get_due_reminders("user") == []
+
+    def test_record_application_usage_batch(self, memory_manager):
+        """Test that batched launches are counted like individual ones."""
+        memory_manager.record_application_usage("chrome", "user")
+
+        launches = ["chrome", "vscode", "chrome"] + [f"app{i}" for i in range(20)]
+        assert memory_manager.record_application_usage_batch(launches, "user") == 22
+
+        assert memory_manager.get_application_usage("chrome", "user").launch_count == 3
+        assert memory_manager.get_application_usage("vscode", "user").launch_count == 1
+        assert len(memory_manager.get_all_application_usage("user")) == 22
+        assert memory_manager.record_application_usage_batch([], "user") == 0
+
+    def test_sqlite_backend_bulk(self, temp_storage):
+        """Test that the SQLite backend writes and reads batches."""
+        manager = MemoryManager(storage_dir=temp_storage, backend='sqlite', worker_count=4)
+        try:
+            manager.store_notes([make_note(i) for i in range(30)], "user")
+            manager.create_reminders([make_reminder(i, -1) for i in range(5)], "user")
+
+            assert len(manager.load_notes([f"note_{i}" for i in range(30)], "user")) == 30
+            assert len(manager.search_notes_ranked("imported", "user")) == 30
+            assert len(manager.get_due_reminders("user")) == 5
+        finally:
+            manager.close()
@@ -0,0 +1,173 @@
+"""Unit tests for Memory Manager record locking.
+
+Tests the striped record locks and their use by the Memory Manager to
+ensure:
+- Concurrent read-modify-write updates from threads are not lost
+- Managers sharing a store, in one process or several, do not overwrite
+  each other's updates
+- Preferences changed by different managers are merged on flush
+"""
+
+import multiprocessing
+import pytest
+import tempfile
+import shutil
+import threading
+from datetime import datetime
+from prime.persistence import MemoryManager
+from prime.persistence import record_lock
+from prime.persistence.record_lock import RecordLocks
+from prime.models.data_models import Note
+
+
+def record_launches(storage_dir: str, encryption_key: bytes, count: int) -> None:
+    """Record count launches of one application (run in a child process)."""
+    manager = MemoryManager(encryption_key=encryption_key, storage_dir=storage_dir)
+    for _ in range(count):
+        manager.record_application_usage("chrome", "alice")
+
+
+class TestRecordLocks:
+    """Test the striped record locks."""
+
+    def test_stripes_are_stable(self):
+        """Test that a key always maps to the same stripe."""
+        locks = RecordLocks(stripes=8)
+        key = ("usage_patterns", "alice", "chrome")
+
+        assert locks.stripe(key) == locks.stripe(key)
+        assert 0 <= locks.stripe(key) < 8
+
+    def test_hold_is_reentrant(self):
+        """Test that a thread can lock a record it already holds."""
+        locks = RecordLocks()
+        key = ("notes", None, "n1")
+
+        with locks.hold([key]):
+            with locks.hold([key, ("notes", None, "n2")]):
+                pass
+
+        assert locks._depth == [0] * locks.stripes
+
+    def test_hold_excludes_other_threads(self):
+        """Test that a held record blocks other threads until released."""
+        locks = RecordLocks()
+        key = ("notes", None, "n1")
+        entered = threading.Event()
+
+        def worker():
+            with locks.hold([key]):
+                entered.set()
+
+        with locks.hold([key]):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            assert not entered.wait(0.1)
+        thread.join(1)
+        assert entered.is_set()
+
+    def test_for_path_is_shared(self, tmp_path):
+        """Test that every user of a lock file shares one instance."""
+        first = RecordLocks.for_path(tmp_path / ".lock")
+
+        assert RecordLocks.for_path(tmp_path / ".lock") is first
+        assert RecordLocks.for_path(None) is not RecordLocks.for_path(None)
+
+
+class TestMemoryManagerLocking:
+    """Test concurrent use of the Memory Manager."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture(params=["file", "sqlite"])
+    def memory_manager(self, request, temp_storage):
+        """Create a MemoryManager for each backend."""
+        manager = MemoryManager(storage_dir=temp_storage, backend=request.param)
+        yield manager
+        manager.close()
+
+    def run_threads(self, target, count: int = 8) -> None:
+        """Run target(i) in count threads and wait for them."""
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_usage_updates(self, memory_manager):
+        """Test that no launch is lost when threads update the same record."""
+        self.run_threads(lambda i: [
+            memory_manager.record_application_usage("chrome", "alice") for _ in range(25)
+        ])
+
+        assert memory_manager.get_application_usage("chrome", "alice").launch_count == 200
+
+    def test_concurrent_batches(self, memory_manager):
+        """Test that overlapping usage batches are counted exactly."""
+        self.run_threads(lambda i: [
+            memory_manager.record_application_usage_batch(["chrome", "vscode", f"app{i}"], "alice")
+            for _ in range(10)
+        ])
+
+        assert memory_manager.get_application_usage("chrome", "alice").launch_count == 80
+        assert memory_manager.get_application_usage("vscode", "alice").launch_count == 80
+        assert memory_manager.get_application_usage("app3", "alice").launch_count == 10
+
+    def test_concurrent_notes_keep_index(self, memory_manager):
+        """Test that notes stored from several threads are all indexed."""
+        now = datetime.now()
+        self.run_threads(lambda i: [
+            memory_manager.store_note(Note(f"n{i}_{j}", "shared topic", [], now, now), "alice")
+            for j in range(5)
+        ])
+
+        assert len(memory_manager.search_notes("topic", "alice")) == 40
+
+    def test_managers_sharing_a_store(self, temp_storage):
+        """Test that two managers on one store do not lose each other's updates."""
+        first = MemoryManager(storage_dir=temp_storage)
+        second = MemoryManager(encryption_key=first.encryption_key, storage_dir=temp_storage)
+
+        self.run_threads(lambda i: [
+            (first if i % 2 else second).record_application_usage("chrome", "alice")
+            for _ in range(25)
+        ])
+
+        assert first.get_application_usage("chrome", "alice").launch_count == 200
+
+    def test_preferences_are_merged(self, temp_storage):
+        """Test that preferences set through different managers are all kept."""
+        first = MemoryManager(storage_dir=temp_storage)
+        second = MemoryManager(encryption_key=first.encryption_key, storage_dir=temp_storage)
+
+        first.get_preference("theme", "alice")
+        second.get_preference("theme", "alice")
+        first.store_preference("theme", "dark", "alice")
+        second.store_preference("volume", 7, "alice")
+
+        reopened = MemoryManager(encryption_key=first.encryption_key, storage_dir=temp_storage)
+        assert reopened.get_preference("theme", "alice") == "dark"
+        assert reopened.get_preference("volume", "alice") == 7
+        assert second.get_preference("theme", "alice") == "dark"
+
+    @pytest.mark.skipif(record_lock.fcntl is None, reason="fcntl is not available")
+    def test_processes_sharing_a_store(self, temp_storage):
+        """Test that updates from separate processes are not lost."""
+        manager = MemoryManager(storage_dir=temp_storage)
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=record_launches, args=(temp_storage, manager.encryption_key, 20))
+            for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+
+        assert [process.exitcode for process in processes] == [0, 0, 0]
+        assert manager.get_application_usage("chrome", "alice").launch_count == 60
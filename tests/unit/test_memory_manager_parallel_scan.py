@@ -0,0 +1,123 @@
+"""Unit tests for the Memory Manager parallel scan pipeline.
+
+Tests scans with parallel_scans enabled to ensure:
+- Results match serial scans exactly, in the same order
+- Records are yielded in input order with bounded read-ahead
+- Decoding errors reach the caller
+"""
+
+import pytest
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from cryptography.fernet import InvalidToken
+from prime.persistence import MemoryManager
+from prime.models.data_models import Note, Reminder, Session
+
+
+class TestParallelScan:
+    """Test the worker-pool scan pipeline."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def populated_storage(self, temp_storage):
+        """Create a store with notes, reminders, usage and sessions."""
+        manager = MemoryManager(storage_dir=temp_storage)
+        now = datetime.now()
+        manager.store_notes([
+            Note(
+                note_id=f"note_{i}",
+                content=f"note {i} about {'meetings' if i % 2 else 'groceries'}",
+                tags=["tag"],
+                created_at=now,
+                updated_at=now - timedelta(minutes=i)
+            )
+            for i in range(60)
+        ], "user")
+        manager.create_reminders([
+            Reminder(
+                reminder_id=f"reminder_{i}",
+                content=f"reminder {i}",
+                due_time=now - timedelta(minutes=i),
+                is_completed=False
+            )
+            for i in range(40)
+        ], "user")
+        manager.record_application_usage_batch(
+            [f"app{i}" for i in range(30) for _ in range(i % 5 + 1)], "user"
+        )
+        for i in range(20):
+            manager.save_session(Session(
+                session_id=f"session_{i}",
+                user_id=f"user{i % 3}",
+                start_time=now,
+                end_time=None,
+                command_history=[],
+                context_state={}
+            ))
+        manager.close()
+        return temp_storage, manager.encryption_key
+
+    def open_managers(self, populated_storage):
+        """Open a serial and a parallel manager on the same store."""
+        storage_dir, key = populated_storage
+        serial = MemoryManager(encryption_key=key, storage_dir=storage_dir, worker_count=1)
+        parallel = MemoryManager(
+            encryption_key=key, storage_dir=storage_dir, worker_count=4, parallel_scans=True
+        )
+        return serial, parallel
+
+    def test_results_match_serial_scans(self, populated_storage):
+        """Test that parallel scans return exactly what serial scans do."""
+        serial, parallel = self.open_managers(populated_storage)
+        try:
+            for manager_call in (
+                lambda m: m.search_notes("meet", "user"),
+                lambda m: m.search_notes("!", "user"),
+                lambda m: m.search_notes_ranked("note", "user"),
+                lambda m: m.get_notes_by_tag("tag", "user"),
+                lambda m: m.get_due_reminders("user"),
+                lambda m: m.get_all_application_usage("user"),
+            ):
+                assert manager_call(parallel) == manager_call(serial)
+            assert parallel.rebuild_session_index() == serial.rebuild_session_index() == 20
+            assert parallel.list_sessions("user1") == serial.list_sessions("user1")
+        finally:
+            serial.close()
+            parallel.close()
+
+    def test_scan_preserves_order_with_bounded_read_ahead(self, temp_storage):
+        """Test that records come back in input order without reading everything first."""
+        manager = MemoryManager(storage_dir=temp_storage, worker_count=2, parallel_scans=True)
+        try:
+            consumed = []
+
+            def records():
+                for i in range(100):
+                    consumed.append(i)
+                    yield str(i), manager.encrypt_data(str(i).encode())
+
+            scan = manager._scan(records(), lambda data: int(manager.decrypt_data(data)))
+            first = [next(scan) for _ in range(3)]
+
+            assert first == [("0", 0), ("1", 1), ("2", 2)]
+            assert len(consumed) < 100
+            assert [value for _, value in scan] == list(range(3, 100))
+        finally:
+            manager.close()
+
+    def test_decoding_errors_reach_caller(self, populated_storage):
+        """Test that a wrong key still raises instead of returning nothing."""
+        storage_dir, _ = populated_storage
+        manager = MemoryManager(storage_dir=storage_dir, worker_count=4, parallel_scans=True)
+        try:
+            with pytest.raises(InvalidToken):
+                manager.get_all_application_usage("user")
+        finally:
+            manager.close()
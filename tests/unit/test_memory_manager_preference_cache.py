@@ -0,0 +1,160 @@
+"""Unit tests for the Memory Manager preference cache.
+
+Tests the in-memory preference cache and write-behind flushing to ensure:
+- Repeated reads and writes do not decrypt the preference record
+- Write-through mode (the default) persists every change immediately
+- Write-behind mode coalesces changes until an interval, threshold or close
+- Cached values behave exactly like values read back from storage
+- Deleting a user discards pending changes
+- File writes are atomic and leave no temporary files behind
+"""
+
+import pytest
+import tempfile
+import shutil
+import time
+from pathlib import Path
+from prime.persistence import MemoryManager
+
+
+class TestPreferenceCache:
+    """Test preference caching and write-behind flushing."""
+
+    @pytest.fixture
+    def temp_storage_dir(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def manager(self, temp_storage_dir):
+        """Create a write-through MemoryManager."""
+        return MemoryManager(storage_dir=temp_storage_dir)
+
+    def reopen(self, manager, temp_storage_dir):
+        """Open a fresh manager on the same store."""
+        return MemoryManager(encryption_key=manager.encryption_key, storage_dir=temp_storage_dir)
+
+    def test_repeated_access_does_not_decrypt(self, manager, monkeypatch):
+        """Test that cached preferences are served without decryption."""
+        manager.store_preference("theme", "dark", "user")
+
+        calls = []
+        original_decrypt = manager.decrypt_data
+        monkeypatch.setattr(
+            manager, "decrypt_data",
+            lambda data: calls.append(data) or original_decrypt(data)
+        )
+
+        for _ in range(10):
+            manager.store_preference("volume", 50, "user")
+            assert manager.get_preference("theme", "user") == "dark"
+
+        assert calls == []
+
+    def test_write_through_persists_immediately(self, manager, temp_storage_dir):
+        """Test that the default mode writes every change."""
+        manager.store_preference("theme", "dark", "user")
+
+        assert self.reopen(manager, temp_storage_dir).get_preference("theme", "user") == "dark"
+
+    def test_cached_values_match_storage_semantics(self, manager):
+        """Test that values come back as a storage round trip would return them."""
+        manager.store_preference("pairs", [("a", "b")], "user")
+
+        value = manager.get_preference("pairs", "user")
+        assert value == [["a", "b"]]
+
+        # Mutating a returned value does not change the cached preference
+        value.append(["c", "d"])
+        assert manager.get_preference("pairs", "user") == [["a", "b"]]
+
+    def test_invalid_value_does_not_reach_cache(self, manager):
+        """Test that non-serializable values are rejected up front."""
+        with pytest.raises(TypeError):
+            manager.store_preference("bad", object(), "user")
+
+        assert manager.get_preference("bad", "user") is None
+
+    def test_write_behind_defers_until_flush(self, temp_storage_dir):
+        """Test that write-behind changes are written by flush_preferences."""
+        manager = MemoryManager(storage_dir=temp_storage_dir, preference_flush_interval=3600)
+        try:
+            manager.store_preference("theme", "dark", "user")
+            manager.store_preference("theme", "light", "user")
+            manager.store_preference("theme", "dark", "other")
+
+            assert manager.get_preference("theme", "user") == "light"
+            assert self.reopen(manager, temp_storage_dir).get_preference("theme", "user") is None
+
+            assert manager.flush_preferences() == 2
+            assert manager.flush_preferences() == 0
+            reopened = self.reopen(manager, temp_storage_dir)
+            assert reopened.get_preference("theme", "user") == "light"
+            assert reopened.get_preference("theme", "other") == "dark"
+        finally:
+            manager.close()
+
+    def test_write_behind_flushes_on_threshold(self, temp_storage_dir):
+        """Test that reaching the change threshold flushes immediately."""
+        manager = MemoryManager(
+            storage_dir=temp_storage_dir,
+            preference_flush_interval=3600,
+            preference_flush_threshold=3
+        )
+        try:
+            manager.store_preference("a", 1, "user")
+            manager.store_preference("b", 2, "user")
+            assert self.reopen(manager, temp_storage_dir).get_preference("a", "user") is None
+
+            manager.store_preference("c", 3, "user")
+            assert self.reopen(manager, temp_storage_dir).get_preference("c", "user") == 3
+        finally:
+            manager.close()
+
+    def test_write_behind_flushes_on_interval(self, temp_storage_dir):
+        """Test that the background thread flushes pending changes."""
+        manager = MemoryManager(storage_dir=temp_storage_dir, preference_flush_interval=0.05)
+        try:
+            manager.store_preference("theme", "dark", "user")
+
+            deadline = time.time() + 5.0
+            while time.time() < deadline:
+                if self.reopen(manager, temp_storage_dir).get_preference("theme", "user") == "dark":
+                    break
+                time.sleep(0.05)
+            else:
+                pytest.fail("Preference was not flushed by the background thread")
+        finally:
+            manager.close()
+
+    def test_close_flushes_pending_changes(self, temp_storage_dir):
+        """Test that closing the manager writes pending changes."""
+        manager = MemoryManager(storage_dir=temp_storage_dir, preference_flush_interval=3600)
+        manager.store_preference("theme", "dark", "user")
+        manager.close()
+
+        assert self.reopen(manager, temp_storage_dir).get_preference("theme", "user") == "dark"
+
+    def test_delete_user_data_discards_pending_changes(self, temp_storage_dir):
+        """Test that deleted users are not written back by a later flush."""
+        manager = MemoryManager(storage_dir=temp_storage_dir, preference_flush_interval=3600)
+        try:
+            manager.store_preference("theme", "dark", "user")
+            manager.delete_user_data("user")
+
+            assert manager.get_preference("theme", "user") is None
+            assert manager.flush_preferences() == 0
+            assert list((Path(temp_storage_dir) / 'preferences').iterdir()) == []
+        finally:
+            manager.close()
+
+    def test_writes_leave_no_temporary_files(self, manager, temp_storage_dir):
+        """Test that atomic writes clean up after themselves."""
+        for i in range(5):
+            manager.store_preference("counter", i, "user")
+
+        files = list((Path(temp_storage_dir) / 'preferences').iterdir())
+        assert len(files) == 1
+        assert files[0].suffix == '.json'
@@ -0,0 +1,172 @@
+"""Unit tests for the Memory Manager session index.
+
+Tests the per-user session index to ensure:
+- list_sessions returns a user's sessions without decrypting other users'
+- delete_user_data only touches the user's own sessions
+- Expired sessions are deleted according to the retention period
+- Stores written before indexing existed are indexed on first use
+"""
+
+import pytest
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from prime.persistence import MemoryManager
+from prime.persistence.session_index import SessionIndex
+from prime.models.data_models import Session
+
+
+def make_session(session_id: str, user_id: str, days_ago: float = 0, ended: bool = False) -> Session:
+    """Create a session that started days_ago days ago."""
+    start_time = datetime.now() - timedelta(days=days_ago)
+    return Session(
+        session_id=session_id,
+        user_id=user_id,
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=1) if ended else None,
+        command_history=[],
+        context_state={}
+    )
+
+
+class TestSessionIndex:
+    """Test the in-memory session index."""
+
+    def test_session_ids_most_recent_first(self):
+        """Test that sessions are listed newest first."""
+        now = datetime.now()
+        index = SessionIndex()
+        index.add("old", now - timedelta(days=2), None)
+        index.add("new", now, None)
+
+        assert index.session_ids() == ["new", "old"]
+        assert "old" in index
+        assert index.add("new", now, None) is False
+
+    def test_inactive_since_uses_end_time(self):
+        """Test that ended sessions expire by end time."""
+        now = datetime.now()
+        index = SessionIndex()
+        index.add("open", now - timedelta(days=10), None)
+        index.add("ended_recently", now - timedelta(days=10), now - timedelta(days=1))
+
+        assert index.inactive_since(now - timedelta(days=5)) == ["open"]
+
+    def test_serialization_round_trip(self):
+        """Test that a serialized index behaves like the original."""
+        now = datetime.now()
+        index = SessionIndex()
+        index.add("s1", now, None)
+        index.add("s2", now - timedelta(days=2), now - timedelta(days=1))
+
+        restored = SessionIndex.from_dict(index.to_dict())
+
+        assert restored.session_ids() == index.session_ids()
+        assert restored.inactive_since(now) == ["s2"]
+
+    def test_from_dict_rejects_unknown_version(self):
+        """Test that unsupported index versions are rejected."""
+        with pytest.raises(ValueError, match="Unsupported session index version"):
+            SessionIndex.from_dict({"version": 99, "sessions": {}})
+
+
+class TestMemoryManagerSessionIndex:
+    """Test the session index as used by the Memory Manager."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def memory_manager(self, temp_storage):
+        """Create a MemoryManager instance with temporary storage."""
+        return MemoryManager(storage_dir=temp_storage)
+
+    def test_list_sessions(self, memory_manager):
+        """Test listing each user's sessions."""
+        memory_manager.save_session(make_session("a1", "alice", days_ago=1))
+        memory_manager.save_session(make_session("a2", "alice"))
+        memory_manager.save_session(make_session("b1", "bob"))
+
+        assert memory_manager.list_sessions("alice") == ["a2", "a1"]
+        assert memory_manager.list_sessions("bob") == ["b1"]
+        assert memory_manager.list_sessions("nobody") == []
+
+    def test_delete_user_data_only_decrypts_own_sessions(self, memory_manager, monkeypatch):
+        """Test that deleting a user does not decrypt other users' sessions."""
+        for i in range(10):
+            memory_manager.save_session(make_session(f"bob_{i}", "bob"))
+        memory_manager.save_session(make_session("alice_1", "alice"))
+
+        calls = []
+        original_decrypt = memory_manager.decrypt_data
+        monkeypatch.setattr(
+            memory_manager, "decrypt_data",
+            lambda data: calls.append(data) or original_decrypt(data)
+        )
+
+        memory_manager.delete_user_data("alice")
+
+        # Only the one session listed in the user's (cached) index
+        assert len(calls) == 1
+        assert memory_manager.list_sessions("alice") == []
+        assert len(memory_manager.list_sessions("bob")) == 10
+        with pytest.raises(FileNotFoundError):
+            memory_manager.load_session("alice_1")
+
+    def test_changed_owner_moves_session(self, memory_manager):
+        """Test that re-saving a session for another user updates both indexes."""
+        session = make_session("s1", "alice")
+        memory_manager.save_session(session)
+        session.user_id = "bob"
+        memory_manager.save_session(session)
+
+        assert memory_manager.list_sessions("alice") == []
+        assert memory_manager.list_sessions("bob") == ["s1"]
+
+    def test_delete_expired_sessions(self, memory_manager):
+        """Test that sessions past the retention period are deleted."""
+        memory_manager.save_session(make_session("old", "alice", days_ago=40))
+        memory_manager.save_session(make_session("old_ended", "bob", days_ago=40, ended=True))
+        memory_manager.save_session(make_session("recent", "alice", days_ago=1))
+
+        assert memory_manager.delete_expired_sessions(retention_days=30) == 2
+        assert memory_manager.list_sessions("alice") == ["recent"]
+        assert memory_manager.list_sessions("bob") == []
+        assert memory_manager.delete_expired_sessions(retention_days=30) == 0
+
+    def test_ending_a_session_updates_index(self, memory_manager):
+        """Test that ending a session is reflected in its retention."""
+        session = make_session("s1", "alice", days_ago=40)
+        memory_manager.save_session(session)
+        session.end_time = datetime.now()
+        memory_manager.save_session(session)
+
+        assert memory_manager.delete_expired_sessions(retention_days=30) == 0
+
+    def test_existing_store_is_indexed_on_first_use(self, memory_manager, temp_storage):
+        """Test that stores written before session indexing are indexed."""
+        memory_manager.save_session(make_session("a1", "alice"))
+        memory_manager.save_session(make_session("b1", "bob"))
+        shutil.rmtree(Path(temp_storage) / 'session_index')
+
+        reopened = MemoryManager(
+            encryption_key=memory_manager.encryption_key, storage_dir=temp_storage
+        )
+        assert reopened.list_sessions("alice") == ["a1"]
+
+        reopened.delete_user_data("bob")
+        with pytest.raises(FileNotFoundError):
+            reopened.load_session("b1")
+
+    def test_rebuild_session_index(self, memory_manager):
+        """Test rebuilding the indexes explicitly."""
+        memory_manager.save_session(make_session("a1", "alice"))
+        memory_manager.save_session(make_session("b1", "bob"))
+
+        assert memory_manager.rebuild_session_index() == 2
+        assert memory_manager.list_sessions("bob") == ["b1"]
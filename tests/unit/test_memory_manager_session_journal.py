@@ -0,0 +1,231 @@
+"""Unit tests for the Memory Manager session journal.
+
+Tests incremental session persistence to ensure:
+- Saving a grown session appends one frame instead of rewriting the snapshot
+- Loading replays the snapshot plus the journaled frames
+- The journal is compacted into a new snapshot after a threshold
+- Stale and torn frames are ignored
+- Sessions that changed in other ways are rewritten in full
+"""
+
+import pytest
+import tempfile
+import shutil
+from datetime import datetime
+from pathlib import Path
+from prime.persistence import MemoryManager
+from prime.models.data_models import (
+    Session, CommandRecord, Command, CommandResult, Intent, Entity
+)
+
+
+def make_record(i: int) -> CommandRecord:
+    """Create a command record numbered i."""
+    timestamp = datetime(2024, 1, 1, 10, 0, i % 60)
+    return CommandRecord(
+        command=Command(
+            command_id=f"cmd_{i}",
+            intent=Intent(
+                intent_type="launch_app",
+                entities=[Entity(entity_type="application", value=f"app{i}", confidence=0.9)],
+                confidence=0.9,
+                requires_clarification=False
+            ),
+            parameters={"app_name": f"app{i}"},
+            timestamp=timestamp,
+            requires_confirmation=False
+        ),
+        result=CommandResult(
+            command_id=f"cmd_{i}",
+            success=True,
+            output=f"App{i} launched",
+            error=None,
+            execution_time_ms=100
+        ),
+        timestamp=timestamp
+    )
+
+
+class TestSessionJournal:
+    """Test journaled session saves."""
+
+    @pytest.fixture
+    def temp_storage_dir(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def manager(self, temp_storage_dir):
+        """Create a MemoryManager that compacts every 5 frames."""
+        return MemoryManager(storage_dir=temp_storage_dir, session_compaction_threshold=5)
+
+    @pytest.fixture
+    def session(self):
+        """Create an empty session."""
+        return Session(
+            session_id="journal_session",
+            user_id="user1",
+            start_time=datetime(2024, 1, 1, 10, 0, 0),
+            end_time=None,
+            command_history=[],
+            context_state={}
+        )
+
+    def reopen(self, manager, temp_storage_dir):
+        """Open a fresh manager on the same store."""
+        return MemoryManager(encryption_key=manager.encryption_key, storage_dir=temp_storage_dir)
+
+    def journal_path(self, temp_storage_dir, session):
+        """Path of a session's journal file."""
+        return Path(temp_storage_dir) / 'session_journal' / f'{session.session_id}.json'
+
+    def snapshot_path(self, temp_storage_dir, session):
+        """Path of a session's snapshot file."""
+        return Path(temp_storage_dir) / 'sessions' / f'{session.session_id}.json'
+
+    def test_appending_records_does_not_rewrite_snapshot(self, manager, session, temp_storage_dir):
+        """Test that each new command appends one frame to the journal."""
+        manager.save_session(session)
+        snapshot = self.snapshot_path(temp_storage_dir, session).read_bytes()
+
+        for i in range(3):
+            session.command_history.append(make_record(i))
+            manager.save_session(session)
+
+        assert self.snapshot_path(temp_storage_dir, session).read_bytes() == snapshot
+        assert len(self.journal_path(temp_storage_dir, session).read_bytes().splitlines()) == 3
+
+    def test_load_replays_journal(self, manager, session, temp_storage_dir):
+        """Test that a reopened manager sees journaled records and state."""
+        manager.save_session(session)
+        for i in range(3):
+            session.command_history.append(make_record(i))
+            manager.save_session(session)
+        session.context_state["last_app"] = "app2"
+        session.end_time = datetime(2024, 1, 1, 11, 0, 0)
+        manager.save_session(session)
+
+        loaded = self.reopen(manager, temp_storage_dir).load_session(session.session_id)
+
+        assert [r.command.command_id for r in loaded.command_history] == ["cmd_0", "cmd_1", "cmd_2"]
+        assert loaded.context_state == {"last_app": "app2"}
+        assert loaded.end_time == session.end_time
+
+    def test_unchanged_session_writes_nothing(self, manager, session, temp_storage_dir):
+        """Test that saving an unchanged session appends no frame."""
+        manager.save_session(session)
+        manager.save_session(session)
+
+        assert not self.journal_path(temp_storage_dir, session).exists()
+
+    def test_journal_is_compacted(self, manager, session, temp_storage_dir):
+        """Test that the journal is folded into the snapshot at the threshold."""
+        manager.save_session(session)
+        for i in range(5):
+            session.command_history.append(make_record(i))
+            manager.save_session(session)
+
+        assert not self.journal_path(temp_storage_dir, session).exists()
+        loaded = self.reopen(manager, temp_storage_dir).load_session(session.session_id)
+        assert len(loaded.command_history) == 5
+
+    def test_compact_session(self, manager, session, temp_storage_dir):
+        """Test compacting a session explicitly."""
+        manager.save_session(session)
+        session.command_history.append(make_record(0))
+        manager.save_session(session)
+
+        assert manager.compact_session(session.session_id) == 1
+        assert not self.journal_path(temp_storage_dir, session).exists()
+        assert len(manager.load_session(session.session_id).command_history) == 1
+
+    def test_loaded_session_keeps_appending(self, manager, session, temp_storage_dir):
+        """Test that sessions loaded by another manager are journaled too."""
+        session.command_history.append(make_record(0))
+        manager.save_session(session)
+
+        other = self.reopen(manager, temp_storage_dir)
+        loaded = other.load_session(session.session_id)
+        snapshot = self.snapshot_path(temp_storage_dir, session).read_bytes()
+        loaded.command_history.append(make_record(1))
+        other.save_session(loaded)
+
+        assert self.snapshot_path(temp_storage_dir, session).read_bytes() == snapshot
+        assert len(manager.load_session(session.session_id).command_history) == 2
+
+    def test_rewritten_history_replaces_snapshot(self, manager, session, temp_storage_dir):
+        """Test that a history that did not just grow is saved in full."""
+        session.command_history.extend([make_record(0), make_record(1)])
+        manager.save_session(session)
+        session.command_history.append(make_record(2))
+        manager.save_session(session)
+
+        session.command_history = [make_record(5)]
+        manager.save_session(session)
+
+        assert not self.journal_path(temp_storage_dir, session).exists()
+        loaded = self.reopen(manager, temp_storage_dir).load_session(session.session_id)
+        assert [r.command.command_id for r in loaded.command_history] == ["cmd_5"]
+
+    def test_stale_frames_are_ignored(self, manager, session, temp_storage_dir):
+        """Test that frames of an older snapshot are not replayed twice."""
+        manager.save_session(session)
+        session.command_history.append(make_record(0))
+        manager.save_session(session)
+        stale_journal = self.journal_path(temp_storage_dir, session).read_bytes()
+
+        # Simulate a crash between writing a snapshot and deleting the journal
+        manager.compact_session(session.session_id)
+        self.journal_path(temp_storage_dir, session).write_bytes(stale_journal)
+
+        loaded = self.reopen(manager, temp_storage_dir).load_session(session.session_id)
+        assert len(loaded.command_history) == 1
+
+    def test_torn_frame_ends_journal(self, manager, session, temp_storage_dir):
+        """Test that a partially written last frame is ignored."""
+        manager.save_session(session)
+        session.command_history.append(make_record(0))
+        manager.save_session(session)
+
+        with open(self.journal_path(temp_storage_dir, session), 'ab') as f:
+            f.write(b'gAAAAAtorn')
+
+        loaded = self.reopen(manager, temp_storage_dir).load_session(session.session_id)
+        assert len(loaded.command_history) == 1
+
+    def test_delete_user_data_removes_journal(self, manager, session, temp_storage_dir):
+        """Test that deleting a user removes session journals."""
+        manager.save_session(session)
+        session.command_history.append(make_record(0))
+        manager.save_session(session)
+
+        manager.delete_user_data("user1")
+
+        assert not self.journal_path(temp_storage_dir, session).exists()
+        with pytest.raises(FileNotFoundError):
+            manager.load_session(session.session_id)
+
+    def test_sqlite_backend_journal(self, session, temp_storage_dir):
+        """Test that the SQLite backend appends journal frames."""
+        manager = MemoryManager(storage_dir=temp_storage_dir, backend='sqlite')
+        try:
+            manager.save_session(session)
+            for i in range(3):
+                session.command_history.append(make_record(i))
+                manager.save_session(session)
+
+            journal = manager.backend.read('session_journal', session.session_id)
+            assert len(journal.splitlines()) == 3
+        finally:
+            manager.close()
+
+        reopened = MemoryManager(
+            encryption_key=manager.encryption_key, storage_dir=temp_storage_dir, backend='sqlite'
+        )
+        try:
+            loaded = reopened.load_session(session.session_id)
+            assert len(loaded.command_history) == 3
+        finally:
+            reopened.close()
@@ -0,0 +1,259 @@
+"""Unit tests for Memory Manager storage backends.
+
+Tests the pluggable storage backends to ensure:
+- The SQLite backend supports the full MemoryManager API
+- Records stay encrypted inside the database
+- Backends can be selected by name or passed as instances
+- An owner whose records were all deleted has no records
+- Existing file-layout stores migrate to SQLite without the encryption key
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import shutil
+from pathlib import Path
+from datetime import datetime, timedelta
+from prime.persistence import (
+    MemoryManager, FileStorageBackend, SQLiteStorageBackend, migrate_storage
+)
+from prime.persistence.memory_manager import SQLITE_DATABASE_NAME
+from prime.persistence.migrate import migrate_file_store, main
+from prime.models.data_models import (
+    Session, Note, Reminder, CommandRecord, Command, CommandResult,
+    Intent, Entity
+)
+
+
+def make_session(session_id: str, user_id: str) -> Session:
+    """Create a session with one command record."""
+    intent = Intent(
+        intent_type="launch_app",
+        entities=[Entity("application", "chrome", 0.9)],
+        confidence=0.9,
+        requires_clarification=False
+    )
+    command = Command(
+        command_id="cmd_001",
+        intent=intent,
+        parameters={"app": "chrome"},
+        timestamp=datetime.now(),
+        requires_confirmation=False
+    )
+    result = CommandResult(
+        command_id="cmd_001",
+        success=True,
+        output="Launched",
+        error=None,
+        execution_time_ms=42
+    )
+    return Session(
+        session_id=session_id,
+        user_id=user_id,
+        start_time=datetime.now(),
+        end_time=None,
+        command_history=[CommandRecord(command, result, datetime.now())],
+        context_state={"last_app": "chrome"}
+    )
+
+
+def populate(manager: MemoryManager, user_id: str) -> None:
+    """Store one record of every kind for a user."""
+    manager.store_preference("theme", "dark", user_id)
+    manager.save_session(make_session(f"sess_{user_id}", user_id))
+    manager.store_note(Note(
+        note_id="note_001",
+        content="Buy milk",
+        tags=["shopping"],
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ), user_id)
+    manager.create_reminder(Reminder(
+        reminder_id="rem_001",
+        content="Call mom",
+        due_time=datetime.now() - timedelta(minutes=5),
+        is_completed=False
+    ), user_id)
+    manager.record_application_usage("chrome", user_id)
+
+
+class TestSQLiteBackend:
+    """Test the MemoryManager API on top of the SQLite backend."""
+
+    @pytest.fixture
+    def temp_storage_dir(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def manager(self, temp_storage_dir):
+        """Create a MemoryManager backed by SQLite."""
+        manager = MemoryManager(storage_dir=temp_storage_dir, backend='sqlite')
+        yield manager
+        manager.close()
+
+    def test_backend_selected_by_name(self, manager, temp_storage_dir):
+        """Test that 'sqlite' creates the database inside the storage dir."""
+        assert isinstance(manager.backend, SQLiteStorageBackend)
+        assert (Path(temp_storage_dir) / SQLITE_DATABASE_NAME).exists()
+
+    def test_backend_instance_is_used(self, temp_storage_dir):
+        """Test that a StorageBackend instance is used as given."""
+        backend = SQLiteStorageBackend(Path(temp_storage_dir) / "custom.db")
+        manager = MemoryManager(storage_dir=temp_storage_dir, backend=backend)
+        assert manager.backend is backend
+        manager.close()
+
+    def test_unknown_backend_raises_error(self, temp_storage_dir):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError, match="Unknown storage backend"):
+            MemoryManager(storage_dir=temp_storage_dir, backend='nosql')
+
+    def test_full_api_round_trip(self, manager):
+        """Test every record type round-trips through SQLite."""
+        populate(manager, "user1")
+
+        assert manager.get_preference("theme", "user1") == "dark"
+        session = manager.load_session("sess_user1")
+        assert session.user_id == "user1"
+        assert session.command_history[0].command.intent.entities[0].value == "chrome"
+        assert [n.note_id for n in manager.search_notes("milk", "user1")] == ["note_001"]
+        assert [r.reminder_id for r in manager.get_due_reminders("user1")] == ["rem_001"]
+        assert manager.get_application_usage("chrome", "user1").launch_count == 1
+        assert len(manager.get_all_application_usage("user1")) == 1
+
+    def test_load_nonexistent_session_raises_error(self, manager):
+        """Test that loading a missing session raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            manager.load_session("missing")
+
+    def test_records_are_encrypted(self, manager, temp_storage_dir):
+        """Test that plaintext never reaches the database."""
+        populate(manager, "user1")
+        connection = sqlite3.connect(str(Path(temp_storage_dir) / SQLITE_DATABASE_NAME))
+        blobs = [bytes(row[0]) for row in connection.execute("SELECT data FROM records")]
+        connection.close()
+
+        assert blobs
+        for blob in blobs:
+            assert b"Buy milk" not in blob
+            assert b"dark" not in blob
+
+    def test_delete_user_data(self, manager):
+        """Test that deleting a user leaves other users untouched."""
+        populate(manager, "user1")
+        populate(manager, "user2")
+
+        manager.delete_user_data("user1")
+
+        assert manager.get_preference("theme", "user1") is None
+        assert manager.search_notes("milk", "user1") == []
+        assert manager.get_due_reminders("user1") == []
+        assert manager.get_all_application_usage("user1") == []
+        with pytest.raises(FileNotFoundError):
+            manager.load_session("sess_user1")
+
+        assert manager.get_preference("theme", "user2") == "dark"
+        assert manager.load_session("sess_user2").user_id == "user2"
+
+    def test_persists_across_manager_instances(self, manager, temp_storage_dir):
+        """Test that data is readable by a new manager with the same key."""
+        populate(manager, "user1")
+        manager.close()
+
+        reopened = MemoryManager(
+            encryption_key=manager.encryption_key,
+            storage_dir=temp_storage_dir,
+            backend='sqlite'
+        )
+        assert reopened.get_preference("theme", "user1") == "dark"
+        reopened.close()
+
+
+class TestHasOwner:
+    """Test checking whether an owner has records."""
+
+    @pytest.fixture
+    def temp_storage_dir(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.mark.parametrize("backend_name", ["file", "sqlite"])
+    def test_owner_without_records(self, temp_storage_dir, backend_name):
+        """Test that an owner whose records were all deleted has none."""
+        if backend_name == "file":
+            backend = FileStorageBackend(Path(temp_storage_dir))
+        else:
+            backend = SQLiteStorageBackend(Path(temp_storage_dir) / "store.db")
+        assert not backend.has_owner("notes", "user1")
+
+        backend.write("notes", "note1", b"data", owner="user1")
+        assert backend.has_owner("notes", "user1")
+
+        backend.delete("notes", "note1", owner="user1")
+        assert not backend.has_owner("notes", "user1")
+        if backend_name == "file":
+            # The emptied directory is left behind until compact()
+            assert (Path(temp_storage_dir) / "notes" / "user1").is_dir()
+        backend.close()
+
+
+class TestMigration:
+    """Test migrating file-layout stores to SQLite."""
+
+    @pytest.fixture
+    def temp_storage_dir(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_migrate_storage_copies_every_record(self, temp_storage_dir):
+        """Test that every file record is copied to the target backend."""
+        file_manager = MemoryManager(storage_dir=temp_storage_dir)
+        populate(file_manager, "user1")
+
+        source = FileStorageBackend(Path(temp_storage_dir))
+        target = SQLiteStorageBackend(Path(temp_storage_dir) / "copy.db")
+        copied = migrate_storage(source, target)
+
+        assert copied == len(list(source.iter_all()))
+        assert sorted(source.iter_all()) == sorted(target.iter_all())
+        target.close()
+
+    def test_migrated_store_opens_with_same_key(self, temp_storage_dir):
+        """Test that the migrated store serves the same data."""
+        file_manager = MemoryManager(storage_dir=temp_storage_dir)
+        populate(file_manager, "user1")
+
+        record_count = len(list(FileStorageBackend(Path(temp_storage_dir)).iter_all()))
+        assert migrate_file_store(Path(temp_storage_dir)) == record_count
+
+        sqlite_manager = MemoryManager(
+            encryption_key=file_manager.encryption_key,
+            storage_dir=temp_storage_dir,
+            backend='sqlite'
+        )
+        assert sqlite_manager.get_preference("theme", "user1") == "dark"
+        assert sqlite_manager.load_session("sess_user1").user_id == "user1"
+        assert len(sqlite_manager.search_notes("milk", "user1")) == 1
+        assert len(sqlite_manager.get_due_reminders("user1")) == 1
+        assert sqlite_manager.get_application_usage("chrome", "user1").launch_count == 1
+        sqlite_manager.close()
+
+    def test_migrate_missing_directory_raises_error(self, temp_storage_dir):
+        """Test that migrating a missing directory fails cleanly."""
+        with pytest.raises(FileNotFoundError):
+            migrate_file_store(Path(temp_storage_dir) / "missing")
+
+    def test_cli_reports_record_count(self, temp_storage_dir, capsys):
+        """Test the command-line entry point."""
+        populate(MemoryManager(storage_dir=temp_storage_dir), "user1")
+        record_count = len(list(FileStorageBackend(Path(temp_storage_dir)).iter_all()))
+
+        assert main([temp_storage_dir]) == 0
+        assert f"Migrated {record_count} records" in capsys.readouterr().out
@@ -0,0 +1,248 @@
+"""Unit tests for the note inverted index.
+
+Tests the NoteIndex and its use by the Memory Manager to ensure:
+- Incremental add/remove keeps postings and tags consistent
+- Substring candidates never miss a note that search_notes would match
+- Prefix matching and BM25 ranking order results sensibly
+- The index is encrypted at rest and rebuilt for existing stores
+- Searches only decrypt candidate notes
+"""
+
+import pytest
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from prime.persistence import MemoryManager
+from prime.persistence.note_index import NoteIndex, tokenize
+from prime.models.data_models import Note
+
+
+def make_note(note_id: str, content: str, tags=None, age_minutes: int = 0) -> Note:
+    """Create a note updated age_minutes ago."""
+    timestamp = datetime.now() - timedelta(minutes=age_minutes)
+    return Note(
+        note_id=note_id,
+        content=content,
+        tags=tags or [],
+        created_at=timestamp,
+        updated_at=timestamp
+    )
+
+
+class TestNoteIndex:
+    """Test the in-memory index structure."""
+
+    def test_tokenize_lowercases_words(self):
+        """Test that tokens are lower-case word runs."""
+        assert tokenize("Buy MILK, eggs & bread!") == ["buy", "milk", "eggs", "bread"]
+
+    def test_add_and_remove(self):
+        """Test that removing a note drops its postings and tags."""
+        index = NoteIndex()
+        index.add("n1", "python tips", ["Work"])
+        index.add("n2", "python tricks", [])
+
+        assert len(index) == 2
+        assert index.notes_with_tag("work") == {"n1"}
+
+        assert index.remove("n1") is True
+        assert index.remove("n1") is False
+        assert "n1" not in index
+        assert index.notes_with_tag("work") == set()
+        assert index.expand_prefix("ti") == []
+
+    def test_add_replaces_previous_version(self):
+        """Test that re-adding a note replaces its old tokens."""
+        index = NoteIndex()
+        index.add("n1", "old content", [])
+        index.add("n1", "new content", [])
+
+        assert index.substring_candidates("old") == set()
+        assert index.substring_candidates("new") == {"n1"}
+
+    def test_substring_candidates_match_inside_words(self):
+        """Test that partial-word queries still find candidates."""
+        index = NoteIndex()
+        index.add("n1", "programming tips", [])
+        index.add("n2", "grocery list", ["personal"])
+
+        assert index.substring_candidates("gram") == {"n1"}
+        assert index.substring_candidates("sonal") == {"n2"}
+        assert index.substring_candidates("ing tip") == {"n1"}
+        assert index.substring_candidates("nothing") == set()
+
+    def test_substring_candidates_without_words(self):
+        """Test that queries without word characters return None."""
+        index = NoteIndex()
+        index.add("n1", "a note", [])
+
+        assert index.substring_candidates("") is None
+        assert index.substring_candidates("!?") is None
+
+    def test_expand_prefix(self):
+        """Test prefix expansion over the sorted vocabulary."""
+        index = NoteIndex()
+        index.add("n1", "meeting meet meal", [])
+
+        assert index.expand_prefix("mee") == ["meet", "meeting"]
+        assert index.expand_prefix("x") == []
+
+    def test_rank_prefers_more_relevant_notes(self):
+        """Test that BM25 puts the note matching more query terms first."""
+        index = NoteIndex()
+        index.add("n1", "python", [])
+        index.add("n2", "python testing guide", [])
+        index.add("n3", "grocery list", [])
+
+        ranked = index.rank("python testing")
+        assert [note_id for note_id, _ in ranked] == ["n2", "n1"]
+        assert ranked[0][1] > ranked[1][1]
+
+    def test_rank_prefix_toggle(self):
+        """Test that prefix matching can be disabled."""
+        index = NoteIndex()
+        index.add("n1", "programming", [])
+
+        assert [note_id for note_id, _ in index.rank("prog")] == ["n1"]
+        assert index.rank("prog", prefix=False) == []
+
+    def test_serialization_round_trip(self):
+        """Test that a serialized index behaves like the original."""
+        index = NoteIndex()
+        index.add("n1", "python tips", ["Work"])
+        index.add("n2", "grocery list", [])
+
+        restored = NoteIndex.from_dict(index.to_dict())
+
+        assert restored.note_ids == index.note_ids
+        assert restored.notes_with_tag("work") == {"n1"}
+        assert restored.rank("python") == index.rank("python")
+
+    def test_from_dict_rejects_unknown_version(self):
+        """Test that unsupported index versions are rejected."""
+        with pytest.raises(ValueError, match="Unsupported note index version"):
+            NoteIndex.from_dict({"version": 99, "documents": {}})
+
+
+class TestMemoryManagerNoteIndex:
+    """Test the note index as used by the Memory Manager."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def memory_manager(self, temp_storage):
+        """Create a MemoryManager instance with temporary storage."""
+        return MemoryManager(storage_dir=temp_storage)
+
+    def test_index_is_encrypted(self, memory_manager, temp_storage):
+        """Test that the persisted index does not leak note words."""
+        memory_manager.store_note(make_note("n1", "confidential merger plans"), "user")
+
+        index_files = list((Path(temp_storage) / 'note_index').glob("*.json"))
+        assert len(index_files) == 1
+        assert b"merger" not in index_files[0].read_bytes()
+
+    def test_search_decrypts_only_candidates(self, memory_manager, monkeypatch):
+        """Test that search_notes does not decrypt non-matching notes."""
+        for i in range(20):
+            memory_manager.store_note(make_note(f"n{i}", f"shopping item {i}"), "user")
+        memory_manager.store_note(make_note("target", "dentist appointment"), "user")
+
+        calls = []
+        original_decrypt = memory_manager.decrypt_data
+        monkeypatch.setattr(
+            memory_manager, "decrypt_data",
+            lambda data: calls.append(data) or original_decrypt(data)
+        )
+
+        results = memory_manager.search_notes("dentist", "user")
+
+        assert [n.note_id for n in results] == ["target"]
+        # The cached index is reused, so only the matching note is decrypted
+        assert len(calls) == 1
+
+    def test_search_keeps_substring_semantics(self, memory_manager):
+        """Test that partial-word and multi-word queries behave as before."""
+        memory_manager.store_note(make_note("n1", "Python programming tips", age_minutes=1), "user")
+        memory_manager.store_note(make_note("n2", "tips for programming", age_minutes=0), "user")
+
+        assert [n.note_id for n in memory_manager.search_notes("gram", "user")] == ["n2", "n1"]
+        assert [n.note_id for n in memory_manager.search_notes("programming tips", "user")] == ["n1"]
+        assert len(memory_manager.search_notes("", "user")) == 2
+
+    def test_updated_note_is_reindexed(self, memory_manager):
+        """Test that updating a note replaces its indexed content."""
+        memory_manager.store_note(make_note("n1", "original text"), "user")
+        memory_manager.store_note(make_note("n1", "revised text"), "user")
+
+        assert memory_manager.search_notes("original", "user") == []
+        assert len(memory_manager.search_notes("revised", "user")) == 1
+
+    def test_search_notes_ranked(self, memory_manager):
+        """Test ranked search with prefix matching and a limit."""
+        memory_manager.store_note(make_note("n1", "meeting notes"), "user")
+        memory_manager.store_note(make_note("n2", "team meeting meeting"), "user")
+        memory_manager.store_note(make_note("n3", "groceries"), "user")
+
+        results = memory_manager.search_notes_ranked("meet", "user")
+        assert [n.note_id for n in results] == ["n2", "n1"]
+        assert len(memory_manager.search_notes_ranked("meet", "user", limit=1)) == 1
+        assert memory_manager.search_notes_ranked("meet", "user", prefix=False) == []
+        assert memory_manager.search_notes_ranked("meet", "nobody") == []
+
+    def test_get_notes_by_tag(self, memory_manager):
+        """Test tag lookups through the tag index."""
+        memory_manager.store_note(make_note("n1", "a", ["Work"], age_minutes=1), "user")
+        memory_manager.store_note(make_note("n2", "b", ["work"], age_minutes=0), "user")
+        memory_manager.store_note(make_note("n3", "c", ["workshop"]), "user")
+
+        assert [n.note_id for n in memory_manager.get_notes_by_tag("WORK", "user")] == ["n2", "n1"]
+        assert memory_manager.get_notes_by_tag("work", "nobody") == []
+
+    def test_index_rebuilt_for_existing_store(self, memory_manager, temp_storage):
+        """Test that stores without an index are indexed on first search."""
+        memory_manager.store_note(make_note("n1", "legacy note"), "user")
+        shutil.rmtree(Path(temp_storage) / 'note_index')
+
+        reopened = MemoryManager(
+            encryption_key=memory_manager.encryption_key, storage_dir=temp_storage
+        )
+        assert [n.note_id for n in reopened.search_notes("legacy", "user")] == ["n1"]
+        assert (Path(temp_storage) / 'note_index').exists()
+
+    def test_rebuild_note_index(self, memory_manager, temp_storage):
+        """Test explicit rebuilds for one user and for every user."""
+        memory_manager.store_note(make_note("n1", "first"), "user1")
+        memory_manager.store_note(make_note("n2", "second"), "user2")
+        memory_manager.store_note(make_note("n3", "third"), "user2")
+        shutil.rmtree(Path(temp_storage) / 'note_index')
+
+        assert memory_manager.rebuild_note_index("user1") == 1
+        assert memory_manager.rebuild_note_index() == 3
+        assert len(memory_manager.search_notes_ranked("third", "user2")) == 1
+
+    def test_index_sees_notes_from_other_instances(self, memory_manager, temp_storage):
+        """Test that a cached index is refreshed after another instance writes."""
+        memory_manager.store_note(make_note("n1", "alpha"), "user")
+        assert len(memory_manager.search_notes("alpha", "user")) == 1
+
+        other = MemoryManager(
+            encryption_key=memory_manager.encryption_key, storage_dir=temp_storage
+        )
+        other.store_note(make_note("n2", "beta"), "user")
+
+        assert [n.note_id for n in memory_manager.search_notes("beta", "user")] == ["n2"]
+
+    def test_delete_user_data_removes_index(self, memory_manager, temp_storage):
+        """Test that deleting a user removes their note index."""
+        memory_manager.store_note(make_note("n1", "private"), "user")
+        memory_manager.delete_user_data("user")
+
+        assert list((Path(temp_storage) / 'note_index').glob("*.json")) == []
+        assert memory_manager.search_notes_ranked("private", "user") == []
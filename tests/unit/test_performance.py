@@ -0,0 +1,43 @@
+"""Unit tests for the performance utilities.
+
+Tests the PerformanceProfiler to ensure:
+- Statistics include the p50 and p99 percentiles
+- Statistics of all operations can be read
+"""
+
+from prime.utils.performance import PerformanceProfiler
+
+
+class TestPerformanceProfiler:
+    """Tests for PerformanceProfiler."""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles of recorded times."""
+        profiler = PerformanceProfiler()
+        for duration in reversed(range(1, 201)):
+            profiler.record("turn", duration / 1000)
+
+        stats = profiler.get_stats("turn")
+
+        assert stats["count"] == 200
+        assert stats["p50"] == 0.1
+        assert stats["p99"] == 0.198
+        assert stats["max"] == 0.2
+
+    def test_single_sample(self):
+        """Test that percentiles of one time are that time."""
+        profiler = PerformanceProfiler()
+        profiler.record("turn", 0.5)
+
+        assert profiler.get_stats("turn")["p99"] == 0.5
+
+    def test_all_stats(self):
+        """Test reading the statistics of every operation."""
+        profiler = PerformanceProfiler()
+        profiler.record("parse", 0.1)
+        profiler.record("save", 0.2)
+
+        stats = profiler.get_all_stats()
+
+        assert set(stats) == {"parse", "save"}
+        assert stats["save"]["p50"] == 0.2
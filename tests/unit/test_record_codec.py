@@ -0,0 +1,216 @@
+"""Unit tests for the compact binary record codec.
+
+Tests the record codec and the Memory Manager's binary record format to
+ensure:
+- Every supported dataclass survives a round trip unchanged
+- The pure-Python MessagePack encoder matches the wire format
+- Stores mixing JSON and binary records are readable in either mode
+- Binary records use AES-GCM framing and are smaller than JSON records
+"""
+
+import pytest
+import tempfile
+import shutil
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from cryptography.fernet import InvalidToken
+from prime.persistence import MemoryManager
+from prime.persistence import record_codec
+from prime.models.data_models import (
+    ApplicationUsage, Command, CommandRecord, CommandResult, Entity,
+    Intent, Note, Reminder, Session
+)
+
+
+def make_command_record(i: int) -> CommandRecord:
+    """Create a command record numbered i."""
+    timestamp = datetime(2024, 1, 1, 10, 0, 0, 123456) + timedelta(seconds=i)
+    return CommandRecord(
+        command=Command(
+            command_id=f"cmd_{i}",
+            intent=Intent(
+                intent_type="launch_app",
+                entities=[Entity("application", "chrome", 0.9)],
+                confidence=0.85,
+                requires_clarification=False
+            ),
+            parameters={"app": "chrome", "args": [1, 2.5, None]},
+            timestamp=timestamp,
+            requires_confirmation=False
+        ),
+        result=CommandResult(
+            command_id=f"cmd_{i}",
+            success=i % 2 == 0,
+            output="ok",
+            error=None if i % 2 == 0 else "failed",
+            execution_time_ms=42
+        ),
+        timestamp=timestamp
+    )
+
+
+def make_session() -> Session:
+    """Create a session with some history."""
+    return Session(
+        session_id="s1",
+        user_id="alice",
+        start_time=datetime(2024, 1, 1, 9, 0, 0),
+        end_time=None,
+        command_history=[make_command_record(i) for i in range(3)],
+        context_state={"last_app": "chrome", "count": 3, "nested": {"ok": True}}
+    )
+
+
+class TestRecordCodec:
+    """Test encoding and decoding records."""
+
+    @pytest.mark.parametrize("record", [
+        make_session(),
+        Note("n1", "Buy milk", ["shopping", "home"], datetime(2024, 1, 1), datetime(2024, 1, 2, 3, 4, 5, 6)),
+        Reminder("r1", "Call mom", datetime(2024, 6, 1, 18, 30), True),
+        ApplicationUsage("vscode", 12, datetime(2024, 3, 1, 8), datetime(2023, 1, 1)),
+    ], ids=["session", "note", "reminder", "usage"])
+    def test_round_trip(self, record):
+        """Test that records decode to equal objects."""
+        data = record_codec.encode(record)
+
+        assert record_codec.is_binary(data)
+        assert record_codec.decode(data) == record
+
+    def test_session_journal_generation(self):
+        """Test that a session snapshot keeps its journal generation."""
+        data = record_codec.encode(make_session(), journal_generation="abc")
+
+        session, generation = record_codec.decode_with_generation(data)
+        assert session == make_session()
+        assert generation == "abc"
+
+    def test_timezone_aware_datetimes(self):
+        """Test that timezone-aware datetimes keep their offset."""
+        due = datetime(2024, 6, 1, 18, 30, tzinfo=timezone(timedelta(hours=2)))
+        reminder = Reminder("r1", "Call mom", due, False)
+
+        assert record_codec.decode(record_codec.encode(reminder)).due_time == due
+
+    def test_unsupported_type(self):
+        """Test that other objects are rejected."""
+        with pytest.raises(TypeError):
+            record_codec.encode({"not": "a record"})
+
+    def test_rejects_json_and_unknown_versions(self):
+        """Test that JSON and newer records are rejected."""
+        with pytest.raises(ValueError, match="Not a binary record"):
+            record_codec.decode(b'{"note_id": "n1"}')
+
+        data = bytearray(record_codec.encode(Reminder("r1", "x", datetime(2024, 1, 1), False)))
+        data[1] = 99
+        with pytest.raises(ValueError, match="Unsupported record codec version"):
+            record_codec.decode(bytes(data))
+
+    def test_truncated_data(self):
+        """Test that truncated records are rejected."""
+        data = record_codec.encode(make_session())
+
+        with pytest.raises(ValueError):
+            record_codec.decode(data[:len(data) // 2])
+
+    @pytest.mark.parametrize("value, expected", [
+        (None, b'\xc0'),
+        (True, b'\xc3'),
+        (5, b'\x05'),
+        (-1, b'\xff'),
+        (300, b'\xcd\x01\x2c'),
+        (-200, b'\xd1\xff\x38'),
+        (2 ** 40, b'\xcf\x00\x00\x01\x00\x00\x00\x00\x00'),
+        (1.5, b'\xcb\x3f\xf8\x00\x00\x00\x00\x00\x00'),
+        ("abc", b'\xa3abc'),
+        (b'\x00', b'\xc4\x01\x00'),
+        ([1, "a"], b'\x92\x01\xa1a'),
+        ({"a": 1}, b'\x81\xa1a\x01'),
+    ])
+    def test_messagepack_wire_format(self, value, expected):
+        """Test that values encode to standard MessagePack bytes."""
+        assert record_codec.packb(value) == expected
+        assert record_codec.unpackb(expected) == value
+
+
+class TestBinaryRecordFormat:
+    """Test the binary record format in the Memory Manager."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def json_manager(self, temp_storage):
+        """Create a MemoryManager writing JSON records."""
+        return MemoryManager(storage_dir=temp_storage)
+
+    @pytest.fixture
+    def binary_manager(self, temp_storage, json_manager):
+        """Create a MemoryManager writing binary records to the same store."""
+        return MemoryManager(
+            encryption_key=json_manager.encryption_key,
+            storage_dir=temp_storage,
+            record_format='binary'
+        )
+
+    def test_unknown_record_format(self, temp_storage):
+        """Test that unknown record formats are rejected."""
+        with pytest.raises(ValueError, match="Unknown record format"):
+            MemoryManager(storage_dir=temp_storage, record_format='xml')
+
+    def test_mixed_store_is_readable(self, json_manager, binary_manager):
+        """Test that both formats read records written in either format."""
+        json_manager.store_note(Note("n1", "hello json", [], datetime.now(), datetime.now()), "alice")
+        binary_manager.store_note(Note("n2", "hello binary", [], datetime.now(), datetime.now()), "alice")
+        binary_manager.save_session(make_session())
+        binary_manager.record_application_usage("chrome", "alice")
+        json_manager.record_application_usage("chrome", "alice")
+
+        for manager in (json_manager, binary_manager):
+            assert {note.note_id for note in manager.search_notes("hello", "alice")} == {"n1", "n2"}
+            assert manager.load_session("s1") == make_session()
+            assert manager.get_application_usage("chrome", "alice").launch_count == 2
+
+    def test_binary_reminders(self, json_manager, binary_manager):
+        """Test reminder flows over binary records."""
+        binary_manager.create_reminder(Reminder("r1", "x", datetime.now() - timedelta(minutes=1), False), "alice")
+
+        assert [r.reminder_id for r in json_manager.get_due_reminders("alice")] == ["r1"]
+        assert binary_manager.complete_reminder("r1", "alice")
+        assert binary_manager.archive_completed_reminders("alice") == 1
+        assert json_manager.get_archived_reminders("alice")[0].is_completed
+
+    def test_binary_records_are_smaller(self, json_manager, binary_manager, temp_storage):
+        """Test that binary records are AES-GCM framed and smaller than JSON."""
+        session = make_session()
+        json_manager.save_session(session)
+        json_size = (Path(temp_storage) / 'sessions' / 's1.json').stat().st_size
+        binary_manager.save_session(session)
+        data = (Path(temp_storage) / 'sessions' / 's1.json').read_bytes()
+
+        assert data[:1] == b'\x01'
+        assert len(data) < json_size / 2
+
+    def test_wrong_key_raises_invalid_token(self, binary_manager, temp_storage):
+        """Test that AES-GCM records fail like Fernet ones under the wrong key."""
+        binary_manager.save_session(make_session())
+        other = MemoryManager(storage_dir=temp_storage, record_format='binary')
+
+        with pytest.raises(InvalidToken):
+            other.load_session("s1")
+
+    def test_sqlite_backend(self, temp_storage):
+        """Test that the SQLite backend stores binary records."""
+        manager = MemoryManager(storage_dir=temp_storage, backend='sqlite', record_format='binary')
+        try:
+            manager.store_notes(
+                [Note(f"n{i}", "imported", [], datetime.now(), datetime.now()) for i in range(5)], "alice"
+            )
+            assert len(manager.load_notes([f"n{i}" for i in range(5)], "alice")) == 5
+        finally:
+            manager.close()
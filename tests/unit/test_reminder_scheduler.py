@@ -0,0 +1,269 @@
+"""Unit tests for the reminder index and scheduler.
+
+Tests the due-time index and ReminderScheduler to ensure:
+- The index returns due reminders in order and tracks completion
+- get_due_reminders only decrypts due reminders
+- Completed reminders can be archived out of the active set
+- The scheduler fires callbacks for due reminders exactly once
+- The background thread wakes up when a reminder becomes due
+"""
+
+import pytest
+import tempfile
+import shutil
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from prime.persistence import MemoryManager, ReminderScheduler
+from prime.persistence.reminder_index import ReminderIndex
+from prime.models.data_models import Reminder
+
+
+def make_reminder(reminder_id: str, minutes_from_now: float, is_completed: bool = False) -> Reminder:
+    """Create a reminder due minutes_from_now minutes from now."""
+    return Reminder(
+        reminder_id=reminder_id,
+        content=f"Reminder {reminder_id}",
+        due_time=datetime.now() + timedelta(minutes=minutes_from_now),
+        is_completed=is_completed
+    )
+
+
+class TestReminderIndex:
+    """Test the in-memory due-time index."""
+
+    def test_due_returns_earliest_first(self):
+        """Test that due() returns only due reminders, in order."""
+        now = datetime.now()
+        index = ReminderIndex()
+        index.add("late", now - timedelta(minutes=1), False)
+        index.add("early", now - timedelta(minutes=10), False)
+        index.add("future", now + timedelta(minutes=10), False)
+
+        assert index.due(now) == ["early", "late"]
+        assert index.next_due_time() == now - timedelta(minutes=10)
+
+    def test_completed_reminders_are_not_pending(self):
+        """Test that completed reminders are tracked separately."""
+        now = datetime.now()
+        index = ReminderIndex()
+        index.add("r1", now - timedelta(minutes=1), False)
+        index.add("r1", now - timedelta(minutes=1), True)
+
+        assert index.due(now) == []
+        assert len(index) == 0
+        assert index.completed_ids == ["r1"]
+
+        assert index.remove("r1") is True
+        assert index.completed_ids == []
+        assert index.remove("r1") is False
+
+    def test_serialization_round_trip(self):
+        """Test that a serialized index behaves like the original."""
+        now = datetime.now()
+        index = ReminderIndex()
+        index.add("r1", now - timedelta(minutes=1), False)
+        index.add("r2", now + timedelta(minutes=1), False)
+        index.add("r3", now, True)
+
+        restored = ReminderIndex.from_dict(index.to_dict())
+
+        assert restored.due(now) == ["r1"]
+        assert restored.next_due_time() == index.next_due_time()
+        assert restored.completed_ids == ["r3"]
+
+    def test_from_dict_rejects_unknown_version(self):
+        """Test that unsupported index versions are rejected."""
+        with pytest.raises(ValueError, match="Unsupported reminder index version"):
+            ReminderIndex.from_dict({"version": 99, "pending": [], "completed": []})
+
+
+class TestMemoryManagerReminderIndex:
+    """Test the reminder index as used by the Memory Manager."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def memory_manager(self, temp_storage):
+        """Create a MemoryManager instance with temporary storage."""
+        return MemoryManager(storage_dir=temp_storage)
+
+    def test_get_due_reminders_decrypts_only_due(self, memory_manager, monkeypatch):
+        """Test that future and completed reminders are not decrypted."""
+        for i in range(20):
+            memory_manager.create_reminder(make_reminder(f"future_{i}", 60 + i), "user")
+            memory_manager.create_reminder(make_reminder(f"done_{i}", -60, True), "user")
+        memory_manager.create_reminder(make_reminder("due", -1), "user")
+
+        calls = []
+        original_decrypt = memory_manager.decrypt_data
+        monkeypatch.setattr(
+            memory_manager, "decrypt_data",
+            lambda data: calls.append(data) or original_decrypt(data)
+        )
+
+        due = memory_manager.get_due_reminders("user")
+
+        assert [r.reminder_id for r in due] == ["due"]
+        assert len(calls) == 1
+
+    def test_get_next_reminder_time(self, memory_manager):
+        """Test looking up the earliest pending due time."""
+        assert memory_manager.get_next_reminder_time("user") is None
+
+        soon = make_reminder("soon", 5)
+        memory_manager.create_reminder(make_reminder("later", 50), "user")
+        memory_manager.create_reminder(soon, "user")
+
+        assert memory_manager.get_next_reminder_time("user") == soon.due_time
+
+    def test_complete_reminder(self, memory_manager):
+        """Test that completing a reminder removes it from due reminders."""
+        memory_manager.create_reminder(make_reminder("r1", -1), "user")
+
+        assert memory_manager.complete_reminder("r1", "user") is True
+        assert memory_manager.complete_reminder("missing", "user") is False
+        assert memory_manager.get_due_reminders("user") == []
+
+    def test_archive_completed_reminders(self, memory_manager, temp_storage):
+        """Test that archiving moves completed reminders out of the active set."""
+        memory_manager.create_reminder(make_reminder("r1", -1), "user")
+        memory_manager.create_reminder(make_reminder("r2", -2, True), "user")
+        memory_manager.complete_reminder("r1", "user")
+        memory_manager.create_reminder(make_reminder("r3", -3), "user")
+
+        assert memory_manager.archive_completed_reminders("user") == 2
+        assert memory_manager.archive_completed_reminders("user") == 0
+        assert memory_manager.archive_completed_reminders("nobody") == 0
+
+        archived = memory_manager.get_archived_reminders("user")
+        assert [r.reminder_id for r in archived] == ["r2", "r1"]
+        assert [r.reminder_id for r in memory_manager.get_due_reminders("user")] == ["r3"]
+
+        user_dir = next((Path(temp_storage) / 'reminders').iterdir())
+        assert sorted(p.stem for p in user_dir.glob("*.json")) == ["r3"]
+
+    def test_index_rebuilt_for_existing_store(self, memory_manager, temp_storage):
+        """Test that stores without an index are indexed on first use."""
+        memory_manager.create_reminder(make_reminder("r1", -1), "user")
+        shutil.rmtree(Path(temp_storage) / 'reminder_index')
+
+        reopened = MemoryManager(
+            encryption_key=memory_manager.encryption_key, storage_dir=temp_storage
+        )
+        assert [r.reminder_id for r in reopened.get_due_reminders("user")] == ["r1"]
+
+    def test_delete_user_data_removes_index_and_archive(self, memory_manager, temp_storage):
+        """Test that deleting a user removes archived reminders and the index."""
+        memory_manager.create_reminder(make_reminder("r1", -1, True), "user")
+        memory_manager.archive_completed_reminders("user")
+
+        memory_manager.delete_user_data("user")
+
+        assert memory_manager.get_archived_reminders("user") == []
+        assert list((Path(temp_storage) / 'reminder_index').glob("*.json")) == []
+
+
+class TestReminderScheduler:
+    """Test firing reminders through the scheduler."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def memory_manager(self, temp_storage):
+        """Create a MemoryManager instance with temporary storage."""
+        return MemoryManager(storage_dir=temp_storage)
+
+    def test_run_pending_fires_and_completes(self, memory_manager):
+        """Test that due reminders fire once and are marked completed."""
+        memory_manager.create_reminder(make_reminder("due", -1), "user")
+        memory_manager.create_reminder(make_reminder("future", 60), "user")
+
+        fired = []
+        scheduler = ReminderScheduler(memory_manager)
+        scheduler.add_callback(lambda user_id, reminder: fired.append((user_id, reminder.reminder_id)))
+        scheduler.watch_user("user")
+
+        assert [r.reminder_id for _, r in scheduler.run_pending()] == ["due"]
+        assert fired == [("user", "due")]
+        assert scheduler.run_pending() == []
+        assert memory_manager.get_due_reminders("user") == []
+
+    def test_run_pending_without_completing(self, memory_manager):
+        """Test that complete_on_fire=False fires once and keeps the reminder."""
+        memory_manager.create_reminder(make_reminder("due", -1), "user")
+
+        scheduler = ReminderScheduler(memory_manager, complete_on_fire=False)
+        scheduler.watch_user("user")
+
+        assert len(scheduler.run_pending()) == 1
+        assert scheduler.run_pending() == []
+        assert len(memory_manager.get_due_reminders("user")) == 1
+
+    def test_failing_callback_does_not_stop_others(self, memory_manager):
+        """Test that callback errors are contained."""
+        memory_manager.create_reminder(make_reminder("due", -1), "user")
+
+        fired = []
+
+        def failing(user_id, reminder):
+            raise RuntimeError("boom")
+
+        scheduler = ReminderScheduler(memory_manager)
+        scheduler.add_callback(failing)
+        scheduler.add_callback(lambda user_id, reminder: fired.append(reminder.reminder_id))
+        scheduler.watch_user("user")
+        scheduler.run_pending()
+
+        assert fired == ["due"]
+
+    def test_unwatched_users_are_ignored(self, memory_manager):
+        """Test that only watched users' reminders fire."""
+        memory_manager.create_reminder(make_reminder("due", -1), "user")
+
+        scheduler = ReminderScheduler(memory_manager)
+        assert scheduler.run_pending() == []
+
+        scheduler.watch_user("user")
+        scheduler.unwatch_user("user")
+        assert scheduler.run_pending() == []
+
+    def test_next_due_time_across_users(self, memory_manager):
+        """Test that the earliest due time across watched users is used."""
+        first = make_reminder("first", 5)
+        memory_manager.create_reminder(first, "user1")
+        memory_manager.create_reminder(make_reminder("second", 10), "user2")
+
+        scheduler = ReminderScheduler(memory_manager)
+        assert scheduler.next_due_time() is None
+
+        scheduler.watch_user("user1")
+        scheduler.watch_user("user2")
+        assert scheduler.next_due_time() == first.due_time
+
+    def test_background_thread_fires_when_due(self, memory_manager):
+        """Test that the scheduler sleeps until a reminder is due, then fires."""
+        fired = threading.Event()
+        memory_manager.create_reminder(make_reminder("soon", 0.3 / 60), "user")
+
+        scheduler = ReminderScheduler(memory_manager, max_sleep_seconds=30.0)
+        scheduler.add_callback(lambda user_id, reminder: fired.set())
+        scheduler.watch_user("user")
+        scheduler.start()
+        try:
+            assert scheduler.is_running()
+            assert fired.wait(timeout=5.0)
+        finally:
+            scheduler.stop()
+
+        assert not scheduler.is_running()
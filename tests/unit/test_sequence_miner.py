@@ -0,0 +1,144 @@
+"""Unit tests for the command sequence miner.
+
+Tests the SequenceMiner to ensure:
+- Sequences are counted as commands are added
+- Commands falling out of the window are forgotten
+- Long pauses end sequences
+- Top-k candidates are ranked and repetitions of a routine are left out
+- The window is stored and restored
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from hypothesis import given, settings, strategies as st
+from prime.nlp.sequence_miner import SequenceMiner
+
+
+START = datetime(2024, 1, 1, 9, 0)
+
+
+def add_all(miner, commands, start=START, step=timedelta(seconds=10)):
+    """Add commands a fixed interval apart; returns the time after the last one."""
+    for i, command in enumerate(commands):
+        miner.add(command, start + i * step)
+    return start + len(commands) * step
+
+
+def rescan(commands, min_length, max_length):
+    """Count the sequences of a list of commands from scratch."""
+    counts = {}
+    for length in range(min_length, max_length + 1):
+        for i in range(len(commands) - length + 1):
+            sequence = tuple(commands[i:i + length])
+            counts[sequence] = counts.get(sequence, 0) + 1
+    return counts
+
+
+class TestCounting:
+    """Test counting sequences."""
+
+    def test_counts_sequences(self):
+        """Test that sequences of each length are counted."""
+        miner = SequenceMiner()
+        add_all(miner, ["a", "b", "a", "b", "c"])
+
+        assert miner.count(("a", "b")) == 2
+        assert miner.count(("b", "a", "b")) == 1
+        assert miner.count(("a", "b", "a", "b")) == 1
+        assert miner.count(("a",)) == 0
+        assert len(miner) == 5
+
+    def test_window_forgets_old_commands(self):
+        """Test that only the sequences of the last commands are counted."""
+        miner = SequenceMiner(window=4)
+        add_all(miner, ["a", "b", "a", "b", "c", "d", "c", "d"])
+
+        assert len(miner) == 4
+        assert miner.count(("a", "b")) == 0
+        assert miner.count(("c", "d")) == 2
+        # Sequences starting before the window are forgotten
+        assert miner.count(("b", "c")) == 0
+        assert miner.count(("c", "d", "c")) == 1
+
+    def test_long_pause_ends_sequence(self):
+        """Test that sequences do not span a pause longer than max_gap_seconds."""
+        miner = SequenceMiner(max_gap_seconds=60)
+        later = add_all(miner, ["a", "b"])
+        add_all(miner, ["c", "d"], start=later + timedelta(minutes=5))
+
+        assert miner.count(("a", "b")) == 1
+        assert miner.count(("b", "c")) == 0
+        assert miner.count(("c", "d")) == 1
+
+    @settings(max_examples=50, deadline=None)
+    @given(
+        commands=st.lists(st.sampled_from("abcd"), max_size=60),
+        window=st.integers(min_value=1, max_value=30)
+    )
+    def test_matches_rescan(self, commands, window):
+        """Test that streaming counts equal a rescan of the commands in the window."""
+        miner = SequenceMiner(window=window)
+        add_all(miner, commands)
+
+        expected = rescan(commands[-window:], 2, 4)
+        for sequence in rescan(commands, 2, 4):
+            assert miner.count(sequence) == expected.get(sequence, 0)
+        assert len(miner) == min(len(commands), window)
+
+    def test_invalid_settings(self):
+        """Test that impossible settings are rejected."""
+        with pytest.raises(ValueError):
+            SequenceMiner(min_length=3, max_length=2)
+        with pytest.raises(ValueError):
+            SequenceMiner(window=0)
+
+
+class TestTopK:
+    """Test ranking candidate sequences."""
+
+    def test_ranks_by_frequency_then_length(self):
+        """Test that frequent, long sequences come first."""
+        miner = SequenceMiner()
+        add_all(miner, ["a", "b", "c"] * 5 + ["x", "y"] * 4)
+
+        top = miner.top_k(3)
+
+        assert [(s.commands, s.frequency) for s in top] == [(("a", "b", "c"), 5), (("x", "y"), 4)]
+        assert top[0].last_occurrence == START + timedelta(seconds=140)
+
+    def test_leaves_out_parts_of_a_routine(self):
+        """Test that rotations and parts of a repeated routine are reported once."""
+        miner = SequenceMiner()
+        add_all(miner, ["a", "b", "c"] * 6)
+
+        assert [s.commands for s in miner.top_k(5)] == [("a", "b", "c")]
+
+    def test_min_support(self):
+        """Test that sequences seen fewer than min_support times are not reported."""
+        miner = SequenceMiner(min_support=3)
+        add_all(miner, ["a", "b"] * 2)
+
+        assert miner.top_k() == []
+
+
+class TestPersistence:
+    """Test storing and restoring the window."""
+
+    def test_round_trip(self):
+        """Test that a restored miner has the same counts."""
+        miner = SequenceMiner(window=10)
+        add_all(miner, ["a", "b", "c"] * 5)
+
+        restored = SequenceMiner(window=10)
+        restored.load_dict(miner.to_dict())
+
+        assert len(restored) == len(miner)
+        assert restored.top_k() == miner.top_k()
+        assert restored.count(("a", "b")) == miner.count(("a", "b"))
+        assert restored.last_timestamp == miner.last_timestamp
+        assert SequenceMiner().last_timestamp is None
+
+    def test_unsupported_version(self):
+        """Test that state from another version is rejected."""
+        with pytest.raises(ValueError):
+            SequenceMiner().load_dict({'version': 99, 'events': []})
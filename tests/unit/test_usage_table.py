@@ -0,0 +1,153 @@
+"""Unit tests for the per-user usage table.
+
+Tests the UsageTable and its use by the Memory Manager to ensure:
+- Launch counts and first/last launch times are exact
+- Scores are bucketed by hour of day and day of week and decay over time
+- Stores with one record per application are migrated to a table
+"""
+
+import pytest
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from prime.persistence import MemoryManager
+from prime.persistence.memory_manager import USAGE_TABLE_RECORD
+from prime.persistence.usage_table import UsageTable
+from prime.models.data_models import ApplicationUsage
+
+
+MONDAY_9AM = datetime(2024, 1, 1, 9, 15)
+
+
+class TestUsageTable:
+    """Test the in-memory usage table."""
+
+    def test_counts_and_times(self):
+        """Test that launches are counted exactly."""
+        table = UsageTable()
+        table.record("chrome", MONDAY_9AM)
+        table.record("chrome", MONDAY_9AM + timedelta(days=1), count=2)
+
+        usage = table.get("chrome")
+        assert usage.launch_count == 3
+        assert usage.first_launched == MONDAY_9AM
+        assert usage.last_launched == MONDAY_9AM + timedelta(days=1)
+        assert table.get("vscode") is None
+
+    def test_top_apps_by_hour(self):
+        """Test that apps are ranked by launches at the same hour."""
+        table = UsageTable()
+        for day in range(5):
+            table.record("mail", MONDAY_9AM + timedelta(days=day))
+            table.record("music", MONDAY_9AM + timedelta(days=day, hours=9))
+        table.record("music", MONDAY_9AM + timedelta(days=5, hours=9))
+
+        when = MONDAY_9AM + timedelta(days=7)
+        assert [name for name, _ in table.top_apps(3, when)] == ["mail"]
+        assert [name for name, _ in table.top_apps(3, when, bucket="any")] == ["music", "mail"]
+        saturday = MONDAY_9AM + timedelta(days=12)
+        assert [name for name, _ in table.top_apps(3, saturday, bucket="weekday")] == ["music"]
+
+    def test_scores_decay(self):
+        """Test that a launch counts half as much after one half-life."""
+        table = UsageTable(half_life_days=7)
+        table.record("mail", MONDAY_9AM)
+
+        [(_, score)] = table.top_apps(1, MONDAY_9AM + timedelta(days=7))
+        assert score == pytest.approx(0.5)
+
+    def test_recent_habits_win(self):
+        """Test that recent launches outweigh more numerous old ones."""
+        table = UsageTable(half_life_days=7)
+        for week in range(4):
+            table.record("old_editor", MONDAY_9AM + timedelta(hours=week), count=2)
+        for day in range(3):
+            table.record("new_editor", MONDAY_9AM + timedelta(days=60 + day))
+
+        assert table.top_apps(1, MONDAY_9AM + timedelta(days=63), bucket="any")[0][0] == "new_editor"
+
+    def test_rebase_keeps_scores(self):
+        """Test that moving the reference time does not change scores."""
+        table = UsageTable(half_life_days=1)
+        table.record("mail", MONDAY_9AM)
+        table.record("mail", MONDAY_9AM + timedelta(days=100))
+
+        [(_, score)] = table.top_apps(1, MONDAY_9AM + timedelta(days=100))
+        assert score == pytest.approx(1.0)
+
+    def test_unknown_bucket(self):
+        """Test that unknown buckets are rejected."""
+        with pytest.raises(ValueError, match="Unknown usage bucket"):
+            UsageTable().top_apps(bucket="minute")
+
+    def test_serialization_round_trip(self):
+        """Test that a serialized table behaves like the original."""
+        table = UsageTable()
+        table.record("chrome", MONDAY_9AM)
+        table.record("vscode", MONDAY_9AM + timedelta(hours=3), count=4)
+
+        restored = UsageTable.from_dict(table.to_dict())
+
+        assert restored.all_usage() == table.all_usage()
+        assert restored.top_apps(2, MONDAY_9AM, "any") == table.top_apps(2, MONDAY_9AM, "any")
+
+    def test_from_dict_rejects_unknown_version(self):
+        """Test that unsupported table versions are rejected."""
+        with pytest.raises(ValueError, match="Unsupported usage table version"):
+            UsageTable.from_dict({"version": 99})
+
+
+class TestMemoryManagerUsageTable:
+    """Test the usage table as used by the Memory Manager."""
+
+    @pytest.fixture
+    def temp_storage(self):
+        """Create a temporary storage directory for testing."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def memory_manager(self, temp_storage):
+        """Create a MemoryManager instance with temporary storage."""
+        return MemoryManager(storage_dir=temp_storage)
+
+    def test_one_record_per_user(self, memory_manager, temp_storage):
+        """Test that all of a user's applications share one record."""
+        for app in ["chrome", "vscode", "slack"]:
+            memory_manager.record_application_usage(app, "alice")
+
+        user_dir = next((Path(temp_storage) / "usage_patterns").iterdir())
+        assert [path.stem for path in user_dir.iterdir()] == [USAGE_TABLE_RECORD]
+        assert len(memory_manager.get_all_application_usage("alice")) == 3
+
+    def test_get_top_applications(self, memory_manager):
+        """Test ranking a user's applications for a time of day."""
+        for day in range(3):
+            memory_manager.record_application_usage("mail", "alice", when=MONDAY_9AM + timedelta(days=day))
+        memory_manager.record_application_usage("games", "alice", when=MONDAY_9AM + timedelta(hours=12))
+
+        top = memory_manager.get_top_applications("alice", k=5, when=MONDAY_9AM + timedelta(days=3))
+        assert [name for name, _ in top] == ["mail"]
+        assert memory_manager.get_top_applications("bob") == []
+
+    def test_legacy_records_are_migrated(self, memory_manager, temp_storage):
+        """Test that per-application records are folded into a table."""
+        safe_user_id = memory_manager._sanitize_user_id("alice")
+        for app, count in [("chrome", 4), ("vscode", 2)]:
+            memory_manager._write_record("usage_patterns", memory_manager._sanitize_user_id(app), {
+                "application_name": app,
+                "launch_count": count,
+                "first_launched": MONDAY_9AM.isoformat(),
+                "last_launched": (MONDAY_9AM + timedelta(days=1)).isoformat(),
+            }, owner=safe_user_id)
+
+        memory_manager.record_application_usage("chrome", "alice")
+
+        assert memory_manager.get_application_usage("chrome", "alice").launch_count == 5
+        assert memory_manager.get_application_usage("vscode", "alice") == ApplicationUsage(
+            "vscode", 2, MONDAY_9AM + timedelta(days=1), MONDAY_9AM
+        )
+        user_dir = Path(temp_storage) / "usage_patterns" / safe_user_id
+        assert [path.stem for path in user_dir.iterdir()] == [USAGE_TABLE_RECORD]
@@ -0,0 +1,227 @@
+"""Unit tests for the per-user state cache.
+
+Tests the UserStateCache and its use by the Context Engine to ensure:
+- States are loaded on a miss and reused on a hit
+- Least recently used users are evicted over the user and memory limits
+- Idle users expire after the TTL
+- Statistics count hits, misses, evictions and expirations
+- Evicted, expired and cleared states are passed to on_evict
+- An evicted user's corrections and command sequences are loaded again
+- Command sequences are stored on eviction and only newer commands replayed
+"""
+
+import shutil
+import tempfile
+from datetime import datetime
+
+import pytest
+from prime.models import Command, CommandResult, Intent, Session
+from prime.nlp import ContextEngine, IntentParser
+from prime.nlp.sequence_miner import SequenceMiner
+from prime.nlp.user_state import UserState, UserStateCache
+from prime.persistence import MemoryManager
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def loads():
+    """Record of loaded users."""
+    return []
+
+
+@pytest.fixture
+def make_cache(loads):
+    """Create caches whose states have as many corrections as the user id says."""
+    def load(user_id):
+        loads.append(user_id)
+        corrections = [(f"typo{i}", f"fix{i}") for i in range(int(user_id.split("-")[1]))]
+        return UserState(corrections, SequenceMiner())
+
+    def make(**kwargs):
+        return UserStateCache(load, **kwargs)
+    return make
+
+
+class TestUserStateCache:
+    """Test the cache on its own."""
+
+    def test_loads_on_miss(self, make_cache, loads):
+        """Test that a state is loaded once and then reused."""
+        cache = make_cache()
+
+        state = cache.get("user-2")
+
+        assert cache.get("user-2") is state
+        assert state.corrections == [("typo0", "fix0"), ("typo1", "fix1")]
+        assert state.rewriter.rewrite("typo1") == "fix1"
+        assert loads == ["user-2"]
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 50.0)
+
+    def test_evicts_least_recently_used(self, make_cache, loads):
+        """Test that the user limit evicts the least recently used user."""
+        cache = make_cache(max_users=2)
+        cache.get("user-1")
+        cache.get("user-2")
+        cache.get("user-1")
+
+        cache.get("user-3")
+
+        assert cache.user_ids() == ["user-1", "user-3"]
+        assert cache.get_stats()["evictions"] == 1
+        cache.get("user-2")
+        assert loads == ["user-1", "user-2", "user-3", "user-2"]
+
+    def test_memory_budget(self, make_cache):
+        """Test that users are evicted to keep the estimated size within the budget."""
+        probe = make_cache()
+        budget = probe.get("user-10").estimated_size() * 2
+        cache = make_cache(memory_budget_bytes=budget)
+
+        cache.get("user-10")
+        cache.get("user-11")
+        cache.get("user-12")
+
+        stats = cache.get_stats()
+        assert stats["memory_bytes"] <= budget
+        assert cache.user_ids() == ["user-12"]
+        assert stats["evictions"] == 2
+
+    def test_resize_evicts_others(self, make_cache):
+        """Test that a growing state makes older users leave."""
+        probe = make_cache()
+        budget = probe.get("user-0").estimated_size() * 3
+        cache = make_cache(memory_budget_bytes=budget)
+        cache.get("user-0")
+        state = cache.get("user-1")
+
+        state.set_corrections([(f"longer typo {i}", f"longer fix {i}") for i in range(50)])
+        cache.resize("user-1")
+
+        assert cache.user_ids() == ["user-1"]
+        assert cache.get_stats()["memory_bytes"] == state.estimated_size()
+
+    def test_idle_users_expire(self, make_cache):
+        """Test that users idle for longer than the TTL are dropped."""
+        clock = FakeClock()
+        cache = make_cache(ttl_seconds=60, clock=clock)
+        cache.get("user-1")
+        clock.now = 30
+        cache.get("user-2")
+        clock.now = 70
+
+        cache.get("user-2")
+
+        assert cache.user_ids() == ["user-2"]
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_on_evict(self, make_cache):
+        """Test that every dropped state is passed to on_evict."""
+        clock = FakeClock()
+        dropped = []
+        cache = make_cache(
+            max_users=2, ttl_seconds=60, clock=clock,
+            on_evict=lambda user_id, state: dropped.append((user_id, len(state.corrections)))
+        )
+        cache.get("user-1")
+        cache.get("user-2")
+        cache.get("user-3")
+        clock.now = 70
+        cache.get("user-4")
+        cache.get("user-5")
+        cache.evict("user-5")
+        cache.get("user-6")
+        cache.clear()
+
+        assert dropped == [("user-1", 1), ("user-2", 2), ("user-3", 3), ("user-5", 5), ("user-4", 4), ("user-6", 6)]
+
+    def test_invalid_limits(self, make_cache):
+        """Test that limits must be positive."""
+        with pytest.raises(ValueError):
+            make_cache(max_users=0)
+        with pytest.raises(ValueError):
+            make_cache(ttl_seconds=0)
+
+
+class TestContextEngineUserState:
+    """Test the Context Engine with bounded per-user state."""
+
+    @pytest.fixture
+    def memory_manager(self):
+        temp_dir = tempfile.mkdtemp()
+        yield MemoryManager(storage_dir=temp_dir)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def session(user_id):
+        return Session(f"session-{user_id}", user_id, datetime.now(), None)
+
+    @staticmethod
+    def add(engine, session, intent_type):
+        intent = Intent(intent_type, [], 0.9, False)
+        command = Command(f"cmd-{len(session.command_history)}", intent, {}, datetime.now(), False)
+        result = CommandResult(command.command_id, True, "", None, 10)
+        engine.add_to_history(command, result, session)
+
+    def test_evicted_user_is_reloaded(self, memory_manager):
+        """Test that corrections and sequences survive eviction."""
+        engine = ContextEngine(IntentParser(), memory_manager, max_users=1)
+        ada, bob = self.session("ada"), self.session("bob")
+        engine.learn_from_correction("opn", "open", ada)
+        for _ in range(3):
+            self.add(engine, ada, "launch_app")
+            self.add(engine, ada, "adjust_volume")
+
+        engine.learn_from_correction("clos", "close", bob)
+        assert "ada" not in engine._corrections
+
+        assert engine._apply_corrections("opn", "ada") == "open"
+        assert engine.detect_repetitive_pattern(ada).commands == ["launch_app", "adjust_volume"]
+        stats = engine.get_user_state_stats()
+        assert stats["users"] == 1
+        assert stats["evictions"] == 2
+        assert stats["misses"] == 3
+
+    def test_sequences_stored_on_eviction(self, memory_manager):
+        """Test that an evicted user's sequences are stored and only newer commands replayed."""
+        engine = ContextEngine(IntentParser(), memory_manager, max_users=1)
+        ada, bob = self.session("ada"), self.session("bob")
+        for _ in range(3):
+            self.add(engine, ada, "launch_app")
+            self.add(engine, ada, "adjust_volume")
+        assert memory_manager.get_preference("command_sequences", "ada") is None
+
+        # Evicted by bob, stored with bob's save
+        self.add(engine, bob, "launch_app")
+        stored = memory_manager.get_preference("command_sequences", "ada")
+        assert len(stored["events"]) == 6
+
+        # Not stored again until ada leaves memory, so a restart replays them
+        self.add(engine, ada, "launch_app")
+        self.add(engine, ada, "adjust_volume")
+        read = []
+        iter_history = memory_manager.iter_history
+        memory_manager.iter_history = lambda session_id: read.append(session_id) or iter_history(session_id)
+        earlier = Session("session-earlier", "ada", datetime(2024, 1, 1), None)
+        memory_manager.save_session(earlier)
+        later = ContextEngine(IntentParser(), memory_manager)
+
+        assert later.detect_repetitive_pattern(ada).frequency == 4
+        assert read == ["session-ada"]
+
+    def test_default_budget_from_config(self, memory_manager):
+        """Test that the memory budget defaults to a share of MAX_MEMORY_MB."""
+        from prime.utils.config import Config
+        engine = ContextEngine(IntentParser(), memory_manager)
+
+        expected = int(Config.MAX_MEMORY_MB * ContextEngine.USER_STATE_MEMORY_SHARE * 1024 * 1024)
+        assert engine.get_user_state_stats()["memory_budget_bytes"] == expected